@@ -3,6 +3,8 @@ Streamlit GUI pro energetický štítek
 """
 import sys
 import os
+import time
+from functools import partial
 from pathlib import Path
 
 # Přidej parent directory do PYTHONPATH
@@ -21,21 +23,14 @@ from core.config import (
 from core.data_models import (
     ApartmentGeometry, HeatingSystemInfo, HeatingSystemType,
     ComputationMode, TemperatureProfile, UserInputs, DailyEnergyData,
-    AnnualResults
+    RCModelOrder, JobStatus
 )
-from core.weather_api import detect_location, fetch_hourly_weather, create_typical_year_weather
-from core.preprocess import (
-    clean_weather_data, align_daily_energy_to_hourly,
-    create_hourly_indoor_temp, validate_data_quality, merge_hourly_data
-)
-from core.baseline_split import split_heating_and_tuv
-from core.calibrator import calibrate_model_simple
-from core.simulate_year import (
-    simulate_annual_heating_demand, calculate_primary_energy,
-    estimate_uncertainty_bounds
-)
-from core.metrics import classify_energy_label, get_class_description, get_class_color
-from core.quality_flags import assess_quality_level, generate_disclaimers, suggest_improvements
+from core.weather_api import detect_location
+from core.metrics import get_class_description, get_class_color
+from core.jobs import JobManager
+from core.pipeline import run_pipeline
+from core.pipeline_cache import PipelineCache
+from core.results_store import ResultsStore, result_record
 from reports.report_builder import generate_html_report, save_html_report
 
 
@@ -47,6 +42,45 @@ st.set_page_config(
 )
 
 
+# Etapy výpočtu memoizované po dobu běhu serveru. Klíčem je klíč etapy
+# (pipeline_cache.stage_key), ostatní argumenty se nehashují (podtržítko).
+# Počasí se po WEATHER_CACHE_TTL stáhne znovu (čerstvá data se doplňují).
+WEATHER_CACHE_TTL = "1h"
+STAGE_CACHE_MAX_ENTRIES = 64
+
+# Interval překreslení při běžícím výpočtu (s)
+JOB_POLL_INTERVAL_S = 0.5
+
+
+@st.cache_data(show_spinner=False, ttl=WEATHER_CACHE_TTL, max_entries=STAGE_CACHE_MAX_ENTRIES)
+def _cached_weather_stage(stage, key, _fn, _args):
+    return _fn(*_args)
+
+
+@st.cache_data(show_spinner=False, max_entries=STAGE_CACHE_MAX_ENTRIES)
+def _cached_compute_stage(stage, key, _fn, _args):
+    return _fn(*_args)
+
+
+@st.cache_resource
+def get_job_manager():
+    """Fronta výpočtů na pozadí sdílená všemi relacemi serveru"""
+    return JobManager()
+
+
+def run_cached_stage(stage, key, fn, *args):
+    """StageRunner pro run_pipeline: každá etapa v cache Streamlitu"""
+    cached = _cached_weather_stage if stage in ('weather', 'typical_year') else _cached_compute_stage
+    return cached(stage, key, fn, args)
+
+
+def clear_computation_caches():
+    """Vymaže cache etap i diskovou cache celých výpočtů"""
+    _cached_weather_stage.clear()
+    _cached_compute_stage.clear()
+    PipelineCache().clear()
+
+
 def main():
     st.title("🏠 Orientační Energetický Štítek")
     st.markdown("*Odhad energetické náročnosti bytu z provozních dat*")
@@ -82,13 +116,19 @@ def main():
             "Kvalita",
             options=[
                 ComputationMode.BASIC,
+                ComputationMode.FAST,
                 ComputationMode.STANDARD,
+                ComputationMode.MULTISTART,
+                ComputationMode.BOOTSTRAP,
                 ComputationMode.ADVANCED
             ],
-            index=1,
+            index=2,
             format_func=lambda x: {
                 ComputationMode.BASIC: "🔸 BASIC (rychlý odhad)",
+                ComputationMode.FAST: "⚡ FAST (nejmenší čtverce)",
                 ComputationMode.STANDARD: "🔹 STANDARD (doporučeno)",
+                ComputationMode.MULTISTART: "🔷 MULTISTART (robustní)",
+                ComputationMode.BOOTSTRAP: "📊 BOOTSTRAP (intervaly spolehlivosti)",
                 ComputationMode.ADVANCED: "🔺 ADVANCED (pokročilé)"
             }[x]
         )
@@ -96,10 +136,34 @@ def main():
         # Info o režimu
         mode_info = {
             ComputationMode.BASIC: "Min. 1 den dat, hrubý lineární odhad",
+            ComputationMode.FAST: "Min. 7 dní dat, 1R1C model kalibrovaný v uzavřeném tvaru",
             ComputationMode.STANDARD: "Min. 7 dní dat, 1R1C model s kalibrací",
+            ComputationMode.MULTISTART: "Min. 14 dní dat, paralelní lokální optimalizace z více startů",
+            ComputationMode.BOOTSTRAP: "Min. 14 dní dat, STANDARD + intervaly parametrů z převzorkovaných dní",
             ComputationMode.ADVANCED: "Min. 28 dní dat, globální optimalizace"
         }
         st.info(mode_info[mode])
+        
+        model_order = st.selectbox(
+            "Model budovy",
+            options=list(RCModelOrder),
+            index=0,
+            format_func=lambda x: {
+                RCModelOrder.RC1R1C: "1R1C (jedna kapacita)",
+                RCModelOrder.RC2R2C: "2R2C (vzduch + obálka)",
+                RCModelOrder.RC3R2C: "3R2C (vzduch + obálka + okna)"
+            }[x],
+            help="Vyšší řád odliší rychlou dynamiku vzduchu od pomalé akumulace "
+                 "v konstrukci; kalibrace je pomalejší"
+        )
+        
+        st.divider()
+        
+        # Cache výpočtů
+        st.subheader("Cache výpočtů")
+        if st.button("🗑️ Vymazat cache", help="Vynutí nové stažení počasí a přepočet všech etap"):
+            clear_computation_caches()
+            st.success("✓ Cache vymazána")
     
     # Hlavní obsah - tabs
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -170,6 +234,19 @@ def main():
             
             volume = area * height
             st.metric("Objem bytu", f"{volume:.1f} m³")
+            
+            apartment_id = st.text_input(
+                "Označení bytu (volitelné)",
+                value="",
+                help="Při opakovaném výpočtu pro stejný byt se kalibrace spustí "
+                     "z uložených parametrů, při stejných datech se přeskočí"
+            ).strip() or None
+            
+            district = st.text_input(
+                "Městská část / okrsek (volitelné)",
+                value="",
+                help="Pro statistiky portfolia v úložišti výsledků"
+            ).strip() or None
         
         with col2:
             st.subheader("🌡️ Vnitřní teplota")
@@ -488,7 +565,10 @@ def main():
             n_days = len(st.session_state['daily_energy_data'])
             min_days = {
                 ComputationMode.BASIC: 1,
+                ComputationMode.FAST: 7,
                 ComputationMode.STANDARD: 7,
+                ComputationMode.MULTISTART: 14,
+                ComputationMode.BOOTSTRAP: 14,
                 ComputationMode.ADVANCED: 28
             }[mode]
             
@@ -504,49 +584,54 @@ def main():
         
         st.divider()
         
-        if st.button("🚀 SPUSTIT VÝPOČET", disabled=not can_compute, type="primary"):
-            with st.spinner("Probíhá výpočet..."):
-                try:
-                    # Získej avg_indoor_temp podle režimu
-                    temp_mode = st.session_state.get('temp_mode', 'day_night')
-                    
-                    if temp_mode == 'average':
-                        # Průměrná teplota režim
-                        avg_indoor_temp = st.session_state.get('temp_avg', 21.0)
-                    else:
-                        # Den/Noc režim - vypočítej průměr
-                        t_day = st.session_state.get('temp_day', 21.0)
-                        t_night = st.session_state.get('temp_night', 19.0)
-                        d_start = st.session_state.get('day_start_hour', 6)
-                        d_end = st.session_state.get('day_end_hour', 22)
-                        day_hours = d_end - d_start
-                        night_hours = 24 - day_hours
-                        avg_indoor_temp = (t_day * day_hours + t_night * night_hours) / 24
-                    
-                    results = run_computation(
-                        location=st.session_state['location'],
-                        area=area,
-                        height=height,
-                        system_type=system_type,
-                        efficiency=efficiency,
-                        temp_day=temp_day,
-                        temp_night=temp_night,
-                        day_start_hour=day_start_hour,
-                        day_end_hour=day_end_hour,
-                        daily_energy_data=st.session_state['daily_energy_data'],
-                        avg_indoor_temp=avg_indoor_temp,
-                        non_heating_months=st.session_state.get('non_heating_months', None),
-                        mode=mode,
-                        api_key=api_key
-                    )
-                    
-                    st.session_state['results'] = results
-                    st.success("✓ Výpočet dokončen!")
-                    st.balloons()
-                    
-                except Exception as e:
-                    st.error(f"❌ Chyba při výpočtu: {e}")
-                    st.exception(e)
+        job = active_job()
+        running = job is not None and not job.done
+        
+        if st.button("🚀 SPUSTIT VÝPOČET", disabled=not can_compute or running, type="primary"):
+            try:
+                # Získej avg_indoor_temp podle režimu
+                temp_mode = st.session_state.get('temp_mode', 'day_night')
+                
+                if temp_mode == 'average':
+                    # Průměrná teplota režim
+                    avg_indoor_temp = st.session_state.get('temp_avg', 21.0)
+                else:
+                    # Den/Noc režim - vypočítej průměr
+                    t_day = st.session_state.get('temp_day', 21.0)
+                    t_night = st.session_state.get('temp_night', 19.0)
+                    d_start = st.session_state.get('day_start_hour', 6)
+                    d_end = st.session_state.get('day_end_hour', 22)
+                    day_hours = d_end - d_start
+                    night_hours = 24 - day_hours
+                    avg_indoor_temp = (t_day * day_hours + t_night * night_hours) / 24
+                
+                job = submit_computation(
+                    location=st.session_state['location'],
+                    area=area,
+                    height=height,
+                    system_type=system_type,
+                    efficiency=efficiency,
+                    temp_day=temp_day,
+                    temp_night=temp_night,
+                    day_start_hour=day_start_hour,
+                    day_end_hour=day_end_hour,
+                    daily_energy_data=st.session_state['daily_energy_data'],
+                    avg_indoor_temp=avg_indoor_temp,
+                    non_heating_months=st.session_state.get('non_heating_months', None),
+                    mode=mode,
+                    api_key=api_key,
+                    apartment_id=apartment_id,
+                    model_order=model_order,
+                    district=district
+                )
+                st.session_state['job_id'] = job.job_id
+                
+            except Exception as e:
+                st.error(f"❌ Chyba při výpočtu: {e}")
+                st.exception(e)
+        
+        if job is not None:
+            render_job(job)
     
     # === TAB 5: Výsledky ===
     with tab5:
@@ -554,24 +639,21 @@ def main():
             display_results(st.session_state['results'])
         else:
             st.info("👈 Proveďte výpočet v předchozí záložce")
+    
+    # Běžící výpočet: překresli stránku pro nové události průběhu
+    job = active_job()
+    if job is not None and not job.done:
+        time.sleep(JOB_POLL_INTERVAL_S)
+        st.rerun()
 
 
-def run_computation(
+def submit_computation(
     location, area, height, system_type, efficiency,
     temp_day, temp_night, day_start_hour, day_end_hour,
     daily_energy_data, avg_indoor_temp, non_heating_months,
-    mode, api_key
+    mode, api_key, apartment_id=None, model_order=RCModelOrder.RC1R1C, district=None
 ):
-    """Hlavní výpočetní funkce s progress indikátory"""
-    
-    # Progress container
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    # 1. Vytvoř user inputs
-    status_text.text("⚙️ Připravuji vstupní data...")
-    progress_bar.progress(5)
-    
+    """Sestaví vstupy (ve vlákně skriptu) a zařadí výpočet do fronty na pozadí"""
     geometry = ApartmentGeometry(area_m2=area, height_m=height)
     heating_system = HeatingSystemInfo(
         system_type=system_type,
@@ -584,6 +666,11 @@ def run_computation(
         day_end_hour=day_end_hour
     )
     
+    # Manuální podíl TUV (pokud není zapnutá aproximace modelem)
+    tuv_percentage = None
+    if not st.session_state.get('use_tuv_model', True):
+        tuv_percentage = st.session_state.get('tuv_percentage', None)
+    
     user_inputs = UserInputs(
         geometry=geometry,
         heating_system=heating_system,
@@ -592,175 +679,88 @@ def run_computation(
         comfort_temperature=comfort_temp,
         daily_energy=daily_energy_data,
         avg_indoor_temp_c=avg_indoor_temp,
-        non_heating_months=non_heating_months
+        non_heating_months=non_heating_months,
+        tuv_percentage=tuv_percentage,
+        apartment_id=apartment_id,
+        district=district,
+        model_order=model_order
     )
     
-    # 2. Stáhni počasí
-    status_text.text("📡 Stahuji historická data o počasí...")
-    progress_bar.progress(10)
-    
-    dates = [d.date for d in daily_energy_data]
-    min_date = min(dates)
-    max_date = max(dates)
-    
-    weather_df = fetch_hourly_weather(location, min_date, max_date, api_key)
-    
-    status_text.text("🔧 Čistím a kontroluji data o počasí...")
-    progress_bar.progress(25)
-    
-    weather_df = clean_weather_data(weather_df)
-    
-    # 3. Preprocessing
-    status_text.text("🔧 Zpracovávám a zarovnávám data...")
-    progress_bar.progress(35)
-    
-    daily_df = pd.DataFrame([d.model_dump() for d in daily_energy_data])
-    daily_df, weather_df = align_daily_energy_to_hourly(daily_df, weather_df)
-    
-    indoor_temp_df = create_hourly_indoor_temp(
-        avg_indoor_temp,
-        weather_df,
-        day_temp=temp_day,
-        night_temp=temp_night,
-        day_start_hour=day_start_hour,
-        day_end_hour=day_end_hour
-    )
-    hourly_df = merge_hourly_data(weather_df, indoor_temp_df)
-    
-    warnings = validate_data_quality(daily_df, hourly_df)
-    
-    # 4. Baseline TUV
-    status_text.text("💧 Rozděluji spotřebu (vytápění vs. TUV)...")
-    progress_bar.progress(45)
+    return get_job_manager().submit(partial(compute_job, user_inputs, api_key))
+
+
+def compute_job(user_inputs, api_key, progress, should_stop):
+    """Hlavní výpočetní funkce (běží na pozadí, bez volání Streamlitu)"""
+    progress(5, "⚙️ Připravuji vstupní data...")
     
-    # Zkontroluj, zda je nastaven manuální podíl TUV
-    tuv_percentage = st.session_state.get('tuv_percentage', None)
-    use_tuv_model = st.session_state.get('use_tuv_model', True)
+    # 2.-12. Počasí, kalibrace, roční simulace - etapy s nezměněnými vstupy z cache
+    output = run_pipeline(user_inputs, api_key, cache=PipelineCache(), progress=progress,
+                          runner=run_cached_stage, should_stop=should_stop)
     
-    if not use_tuv_model and tuv_percentage is not None:
-        # Manuální nastavení podílu TUV
-        daily_df['baseline_tuv_kwh'] = daily_df['energy_total_kwh'] * (tuv_percentage / 100)
-        daily_df['heating_kwh'] = daily_df['energy_total_kwh'] * (1 - tuv_percentage / 100)
-        baseline_tuv = daily_df['baseline_tuv_kwh'].mean()
-        st.info(f"💧 Použit manuální podíl TUV: {tuv_percentage}% ({baseline_tuv:.2f} kWh/den)")
+    notes = list(output.notes)
+    if output.from_cache:
+        notes.append("♻️ Stejné vstupy, data počasí i verze výpočtu - výsledek načten z cache")
     else:
-        # Automatická aproximace modelem - využij měsíce bez topení pokud jsou
-        if non_heating_months and len(non_heating_months) > 0:
-            # Použij data z označených měsíců pro baseline TUV
-            daily_df['month'] = pd.to_datetime(daily_df['date']).dt.month
-            daily_df['year'] = pd.to_datetime(daily_df['date']).dt.year
-            
-            # Filtruj pouze rok 2025 a označené měsíce
-            non_heating_mask = (
-                (daily_df['year'] == 2025) & 
-                (daily_df['month'].isin(non_heating_months))
-            )
-            
-            if non_heating_mask.sum() > 0:
-                baseline_tuv_manual = daily_df.loc[non_heating_mask, 'energy_total_kwh'].mean()
-                daily_df = split_heating_and_tuv(daily_df, baseline_tuv_kwh=baseline_tuv_manual)
-                baseline_tuv = baseline_tuv_manual
-                months_used = daily_df.loc[non_heating_mask, 'month'].unique()
-                st.info(f"💧 Baseline TUV z měsíců bez topení: {baseline_tuv:.2f} kWh/den (použito {non_heating_mask.sum()} dní)")
-            else:
-                # Nebyly nalezeny žádné dny v označených měsících
-                daily_df = split_heating_and_tuv(daily_df)
-                baseline_tuv = daily_df['baseline_tuv_kwh'].iloc[0]
-                st.warning("⚠ V datech nebyla data z označených měsíců - použit automatický odhad")
-        else:
-            # Standardní aproximace (10. percentil)
-            daily_df = split_heating_and_tuv(daily_df)
-            baseline_tuv = daily_df['baseline_tuv_kwh'].iloc[0]
-    
-    # 5. Kalibrace
-    status_text.text("🎯 Kalibruji termický model...")
-    progress_bar.progress(55)
-    
-    calibrated = calibrate_model_simple(
-        daily_df,
-        hourly_df,
-        geometry.volume_m3,
-        geometry.area_m2,
-        avg_indoor_temp,
-        baseline_tuv,
-        mode=mode.value
-    )
-    
-    # 6. Typický rok
-    status_text.text("☀️ Vytvářím typický meteorologický rok...")
-    progress_bar.progress(70)
-    
-    typical_year = create_typical_year_weather(location, api_key)
-    
-    # 7. Simulace roku
-    status_text.text("📅 Simuluji roční potřebu tepla...")
-    progress_bar.progress(80)
-    
-    annual_sim = simulate_annual_heating_demand(
-        calibrated,
-        typical_year,
-        geometry.volume_m3,
-        geometry.area_m2,
-        comfort_temp
-    )
-    
-    heating_demand_kwh = annual_sim['heating_demand_W'].sum() / 1000
-    heating_per_m2 = heating_demand_kwh / area
-    
-    # 8. Primární energie
-    status_text.text("⚡ Počítám primární energii...")
-    progress_bar.progress(85)
-    
-    eff_final = efficiency if efficiency else heating_system.get_default_efficiency()[0]
-    primary = calculate_primary_energy(
-        heating_demand_kwh,
-        system_type.value,
-        eff_final
-    )
-    primary_per_m2 = primary / area
-    
-    # 9. Klasifikace
-    status_text.text("🏷️ Klasifikuji energetický štítek...")
-    progress_bar.progress(90)
-    
-    energy_class = classify_energy_label(heating_per_m2, primary_per_m2)
-    
-    # 10. Kvalita
-    quality = assess_quality_level(mode, len(daily_df), calibrated, warnings)
-    
-    # 11. Nejistota
-    lower, upper = estimate_uncertainty_bounds(calibrated, heating_per_m2, warnings)
-    
-    # 12. Disclaimery a návrhy
-    status_text.text("📋 Generuji doporučení...")
-    progress_bar.progress(95)
-    
-    disclaimers = generate_disclaimers(quality, mode, len(daily_df), warnings)
-    suggestions = suggest_improvements(quality, mode, len(daily_df), calibrated)
-    
-    annual_results = AnnualResults(
-        heating_demand_kwh_per_m2_year=heating_per_m2,
-        primary_energy_kwh_per_m2_year=primary_per_m2,
-        energy_class=energy_class,
-        quality_level=quality,
-        heating_demand_lower_bound=lower,
-        heating_demand_upper_bound=upper,
-        disclaimers=disclaimers
-    )
-    
-    # Dokončeno
-    status_text.text("✅ Výpočet úspěšně dokončen!")
-    progress_bar.progress(100)
+        # Uložení do úložiště výsledků (statistiky portfolia)
+        try:
+            ResultsStore().append(result_record(output.annual_results, output.calibrated, user_inputs))
+        except Exception as e:
+            notes.append(f"⚠ Výsledek se nepodařilo uložit do úložiště: {e}")
     
     return {
-        'annual_results': annual_results,
-        'calibrated': calibrated,
+        'annual_results': output.annual_results,
+        'calibrated': output.calibrated,
         'user_inputs': user_inputs,
-        'suggestions': suggestions,
-        'warnings': warnings
+        'suggestions': output.suggestions,
+        'warnings': output.warnings,
+        'notes': notes
     }
 
 
+def active_job():
+    """Úloha aktuální relace (None, pokud žádná není nebo ji server zapomněl)"""
+    job_id = st.session_state.get('job_id')
+    job = get_job_manager().get(job_id) if job_id else None
+    if job_id and job is None:
+        del st.session_state['job_id']
+    return job
+
+
+def render_job(job):
+    """Průběh úlohy na pozadí; po dokončení převezme výsledek do relace"""
+    job.poll()
+    
+    if not job.done:
+        st.progress(job.progress, text=job.message or "⏳ Čeká ve frontě na volný výpočet...")
+        if job.history:
+            with st.expander("Průběh výpočtu"):
+                for event in job.history:
+                    st.caption(f"{event.timestamp:%H:%M:%S} · {event.percent} % · {event.message}")
+        if st.button("⛔ Zrušit výpočet"):
+            job.cancel()
+            st.info("Výpočet se ruší...")
+        return
+    
+    get_job_manager().forget(job.job_id)
+    del st.session_state['job_id']
+    
+    if job.status == JobStatus.DONE:
+        results = job.result
+        for note in results['notes']:
+            if note.startswith("⚠"):
+                st.warning(note)
+            else:
+                st.info(note)
+        st.session_state['results'] = results
+        st.success("✓ Výpočet dokončen!")
+        st.balloons()
+    elif job.status == JobStatus.CANCELLED:
+        st.warning("⚠ Výpočet byl zrušen")
+    else:
+        st.error(f"❌ Chyba při výpočtu: {job.error}")
+        st.exception(job.error)
+
+
 def display_results(results):
     """Zobrazí výsledky"""
     annual = results['annual_results']
@@ -784,6 +784,10 @@ def display_results(results):
             """,
             unsafe_allow_html=True
         )
+        if annual.energy_class_probabilities:
+            st.caption("Pravděpodobnost tříd (Monte Carlo): " + ", ".join(
+                f"{c} {p:.0%}" for c, p in sorted(annual.energy_class_probabilities.items())
+            ))
     
     st.divider()
     
@@ -818,6 +822,35 @@ def display_results(results):
     # TODO: Přidat grafy (pozorovaná vs. modelovaná teplota, spotřeba, atd.)
     st.info("Grafy budou doplněny v další iteraci")
     
+    if calibrated.trace is not None:
+        trace = calibrated.trace
+        with st.expander("📉 Průběh kalibrace"):
+            st.line_chart(pd.DataFrame({
+                'Nejlepší cost': trace.best_cost,
+                'Rozptyl populace': trace.population_spread
+            }))
+            st.caption(
+                f"{trace.generations}/{trace.max_generations} generací, "
+                f"{trace.n_evaluations} vyhodnocení"
+                + (" - ukončeno po stagnaci" if trace.stopped_early else "")
+            )
+    
+    if calibrated.confidence is not None:
+        confidence = calibrated.confidence
+        with st.expander("📊 Intervaly spolehlivosti parametrů"):
+            st.dataframe(pd.DataFrame(
+                confidence.intervals, index=['dolní mez', 'horní mez']
+            ).T)
+            st.dataframe(pd.DataFrame(
+                confidence.correlation,
+                index=confidence.parameter_names, columns=confidence.parameter_names
+            ).round(2))
+            st.caption(
+                f"{confidence.confidence_level:.0%} intervaly z {confidence.n_replicates}/"
+                f"{confidence.n_requested} replikací blokového bootstrapu "
+                f"(bloky {confidence.block_days} dní)"
+            )
+    
     # Disclaimery
     st.subheader("⚠️ Upozornění")
     for disc in annual.disclaimers:
@@ -5,6 +5,9 @@ import pandas as pd
 import numpy as np
 from typing import Tuple, Optional
 
+from core.day_hour_matrix import DayHourMatrix
+from core.rc_kernel import step_seconds
+
 
 def estimate_baseline_tuv(daily_energy_df: pd.DataFrame, percentile: float = 10.0) -> float:
     """
@@ -82,7 +85,9 @@ def distribute_daily_heating_to_hours(
     """
     Rozloží denní vytápěcí energii do hodin podle tepelné potřeby.
     
-    Jednoduché rozdělení proporcionálně k (T_in - T_out)+.
+    Jednoduché rozdělení proporcionálně k (T_in - T_out)+ × délka kroku
+    jako normalizace řádků matice den × hodina (DayHourMatrix). Vzorky
+    mohou být i jemnější než hodinové (např. 15 min).
     
     Args:
         daily_heating_df: DataFrame s date, heating_kwh
@@ -92,48 +97,32 @@ def distribute_daily_heating_to_hours(
     Returns:
         DataFrame s timestamp, heating_power_estimate_kw (rozložená energie)
     """
-    # Připrav denní lookup
-    daily_lookup = {}
-    for _, row in daily_heating_df.iterrows():
-        # Zajisti, že date je porovnatelný jako date object
-        date_key = row['date'].date() if hasattr(row['date'], 'date') else row['date']
-        daily_lookup[date_key] = row['heating_kwh']
-    
-    # Pro každou hodinu vypočti tepelnou potřebu
     hourly_df = hourly_weather_df.copy()
-    hourly_df['date'] = hourly_df['timestamp'].dt.date
-    hourly_df['heating_day_total_kwh'] = hourly_df['date'].map(daily_lookup)
-    
-    # Delta teploty (pozitivní = potřeba topení)
-    hourly_df['delta_t'] = np.maximum(indoor_temp_c - hourly_df['temp_out_c'], 0)
-    
-    # Seskup podle dne a vypočti podíl každé hodiny
-    def distribute_day(group):
-        total_delta = group['delta_t'].sum()
-        
-        if total_delta > 0:
-            group['hour_share'] = group['delta_t'] / total_delta
-        else:
-            # Žádná potřeba topení - rovnoměrně rozděl (např. losses)
-            group['hour_share'] = 1.0 / len(group)
-        
-        # Energie této hodiny
-        day_total = group['heating_day_total_kwh'].iloc[0]
-        group['heating_energy_kwh'] = group['hour_share'] * day_total
-        
-        return group
-    
-    hourly_df = hourly_df.groupby('date', group_keys=False).apply(distribute_day)
+    
+    # Hodiny uspořádané do matice den × hodina (řádky = dny)
+    temp_matrix = DayHourMatrix.from_hourly(hourly_df, 'temp_out_c')
+    
+    # Denní energie seřazená podle řádků matice (dny bez dat = NaN)
+    day_totals = temp_matrix.align_daily(daily_heating_df, 'heating_kwh')
+    
+    # Delta teploty (pozitivní = potřeba topení) × délka kroku vzorku
+    delta_t = np.maximum(indoor_temp_c - hourly_df['temp_out_c'].to_numpy(dtype=float), 0)
+    delta_t = delta_t * step_seconds(hourly_df['timestamp']) / 3600
+    
+    # Podíl každé hodiny = normalizace řádku; den bez potřeby topení
+    # se rozdělí rovnoměrně (např. ztráty)
+    hour_share = temp_matrix.row_normalize(delta_t)
+    rows = np.maximum(temp_matrix.sample_rows, 0)
+    hourly_df['heating_energy_kwh'] = hour_share * day_totals[rows]
     
     # Kontrola konzistence
-    reconstructed_daily = hourly_df.groupby('date')['heating_energy_kwh'].sum()
-    original_daily = daily_heating_df.set_index('date')['heating_kwh']
+    reconstructed_daily = temp_matrix.row_sum(np.nan_to_num(hourly_df['heating_energy_kwh'].to_numpy()))
+    has_total = ~np.isnan(day_totals)
     
-    diff = (reconstructed_daily - original_daily).abs().mean()
+    diff = np.abs(reconstructed_daily[has_total] - day_totals[has_total]).mean() if has_total.any() else 0.0
     if diff > 0.01:
         print(f"⚠ Rekonstrukce denní energie má odchylku {diff:.4f} kWh")
     else:
         print(f"✓ Denní energie úspěšně rozložena do hodin")
     
     return hourly_df[['timestamp', 'temp_out_c', 'heating_energy_kwh']]
-
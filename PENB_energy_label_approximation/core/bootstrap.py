@@ -0,0 +1,192 @@
+"""
+Blokový bootstrap intervalů spolehlivosti kalibrovaných parametrů
+
+Dny měření se převzorkují po blocích (moving block bootstrap - zachová
+korelaci sousedních dní) a kalibrace se zopakuje pro každou replikaci.
+Převzorkování se realizuje vahami dní v CalibrationObjective: simulace
+běží přes celé okno beze změny (dynamika RC modelu zůstane spojitá),
+jen chyby jednotlivých dní se započtou tolikrát, kolikrát byl den vybrán.
+
+Replikace jsou nezávislé lokální optimalizace s teplým startem z bodového
+odhadu a běží paralelně v procesech (jako MULTISTART). Počet replikací i
+časový rozpočet lze nastavit; po vyčerpání rozpočtu se nezahájené
+replikace zruší, běžící procesy se ukončí a intervaly se spočtou
+z dokončených.
+"""
+import copy
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from core.calibrator import CalibrationObjective, _local_search, extra_parameters
+from core.data_models import ParameterConfidence
+from core.jobs import StopCheck, as_completed_cancellable, check_cancelled, stop_process_pool
+
+
+# Výchozí nastavení bootstrapu
+BOOTSTRAP_REPLICATES = 50
+BOOTSTRAP_BLOCK_DAYS = 3
+BOOTSTRAP_CONFIDENCE = 0.9
+BOOTSTRAP_MAXITER = 50          # iterací lokální optimalizace jedné replikace
+BOOTSTRAP_MIN_REPLICATES = 5    # méně dokončených replikací → bez intervalů
+
+
+def block_bootstrap_weights(
+    n_days: int,
+    block_days: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Váhy dní jedné replikace (kolikrát byl den vybrán).
+
+    Náhodné bloky block_days po sobě jdoucích dní se skládají za sebe,
+    dokud nepokryjí n_days; součet vah je vždy n_days.
+    """
+    block_days = max(1, min(block_days, n_days))
+    n_blocks = -(-n_days // block_days)
+    starts = rng.integers(0, n_days - block_days + 1, size=n_blocks)
+    days = (starts[:, None] + np.arange(block_days)).ravel()[:n_days]
+    return np.bincount(days, minlength=n_days).astype(float)
+
+
+def _bootstrap_replicate(
+    objective: CalibrationObjective,
+    day_weights: np.ndarray,
+    x_start: np.ndarray,
+    bounds: List[Tuple[float, float]]
+) -> np.ndarray:
+    """Kalibrace jedné replikace (v procesu workeru)"""
+    replicate = copy.copy(objective)
+    replicate.day_weights = day_weights
+    return _local_search(replicate, x_start, bounds, maxiter=BOOTSTRAP_MAXITER).x
+
+
+def bootstrap_parameters(
+    objective: CalibrationObjective,
+    x_opt: np.ndarray,
+    bounds: List[Tuple[float, float]],
+    n_replicates: int = BOOTSTRAP_REPLICATES,
+    block_days: int = BOOTSTRAP_BLOCK_DAYS,
+    time_budget_s: Optional[float] = None,
+    max_workers: int = 1,
+    seed: int = 42,
+    should_stop: Optional[StopCheck] = None
+) -> np.ndarray:
+    """
+    Parametry kalibrované na bootstrap replikacích.
+
+    Args:
+        objective: funkce nákladů kalibrace (bez vah dní)
+        x_opt: bodový odhad (teplý start všech replikací)
+        bounds: meze parametrů
+        n_replicates: počet replikací
+        block_days: délka bloku dní
+        time_budget_s: časový rozpočet v sekundách (None = bez omezení)
+        max_workers: počet procesů (1 = sekvenčně v aktuálním procesu)
+        seed: seed generátoru vah
+        should_stop: zrušení - sekvenčně před každou replikací, paralelně
+            průběžně i během čekání na procesy (běžící se ukončí)
+
+    Returns:
+        (k, p) vektory parametrů dokončených replikací (k ≤ n_replicates)
+    """
+    rng = np.random.default_rng(seed)
+    weights = [block_bootstrap_weights(objective.layout.n_days, block_days, rng)
+               for _ in range(n_replicates)]
+    x_opt = np.asarray(x_opt, dtype=float)
+    deadline = time.monotonic() + time_budget_s if time_budget_s is not None else None
+    completed: List[np.ndarray] = []
+
+    if max_workers > 1:
+        print(f"    * paralelní běh ({max_workers} procesů)")
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [
+                executor.submit(_bootstrap_replicate, objective, w, x_opt, bounds)
+                for w in weights
+            ]
+            timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            try:
+                for future in as_completed_cancellable(futures, should_stop, timeout=timeout):
+                    completed.append(future.result())
+            except TimeoutError:
+                pass
+        finally:
+            # Nezahájené replikace se zruší, běžící procesy se ukončí
+            stop_process_pool(executor)
+    else:
+        for w in weights:
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            check_cancelled(should_stop)
+            completed.append(_bootstrap_replicate(objective, w, x_opt, bounds))
+
+    print(f"    * dokončeno {len(completed)}/{n_replicates} replikací"
+          + (" (vyčerpán časový rozpočet)" if len(completed) < n_replicates else ""))
+    return np.array(completed).reshape(len(completed), len(x_opt))
+
+
+def summarize_replicates(
+    objective: CalibrationObjective,
+    samples: np.ndarray,
+    n_requested: int,
+    block_days: int = BOOTSTRAP_BLOCK_DAYS,
+    confidence_level: float = BOOTSTRAP_CONFIDENCE
+) -> ParameterConfidence:
+    """
+    Percentilové intervaly a korelace parametrů v jednotkách CalibratedParameters
+    (C_th v J/K) a odvozených celkových ztrát H_total.
+    """
+    names = ['H_env_W_per_K', 'infiltration_rate_per_h', 'C_th_J_per_K',
+             'internal_gains_W_per_m2']
+    names += list(extra_parameters(objective.model_order))
+    names.append('H_total_W_per_K')
+
+    values = samples.copy()
+    values[:, 2] = np.exp(values[:, 2])
+    H_total = np.array([objective.build_model(x).H_total for x in samples])
+    values = np.column_stack([values, H_total])
+
+    alpha = (1 - confidence_level) / 2
+    lower, upper = np.quantile(values, [alpha, 1 - alpha], axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = np.nan_to_num(np.corrcoef(values, rowvar=False))
+
+    return ParameterConfidence(
+        parameter_names=names,
+        intervals={name: (float(lo), float(hi)) for name, lo, hi in zip(names, lower, upper)},
+        correlation=correlation.tolist(),
+        confidence_level=confidence_level,
+        n_replicates=len(samples),
+        n_requested=n_requested,
+        block_days=block_days
+    )
+
+
+def bootstrap_confidence(
+    objective: CalibrationObjective,
+    x_opt: np.ndarray,
+    bounds: List[Tuple[float, float]],
+    n_replicates: int = BOOTSTRAP_REPLICATES,
+    block_days: int = BOOTSTRAP_BLOCK_DAYS,
+    time_budget_s: Optional[float] = None,
+    max_workers: int = 1,
+    confidence_level: float = BOOTSTRAP_CONFIDENCE,
+    seed: int = 42,
+    should_stop: Optional[StopCheck] = None
+) -> Optional[ParameterConfidence]:
+    """
+    Blokový bootstrap a souhrn intervalů (viz bootstrap_parameters).
+
+    Returns:
+        ParameterConfidence, nebo None pokud v rozpočtu doběhlo méně
+        než BOOTSTRAP_MIN_REPLICATES replikací
+    """
+    samples = bootstrap_parameters(objective, x_opt, bounds, n_replicates, block_days,
+                                   time_budget_s, max_workers, seed, should_stop)
+    if len(samples) < BOOTSTRAP_MIN_REPLICATES:
+        print(f"  ⚠ Málo replikací pro intervaly spolehlivosti ({len(samples)})")
+        return None
+    return summarize_replicates(objective, samples, n_replicates, block_days, confidence_level)
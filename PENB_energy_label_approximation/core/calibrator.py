@@ -2,15 +2,312 @@
 Kalibrace parametrů RC modelu podle naměřených dat
 """
 import os
-from concurrent.futures import ThreadPoolExecutor
-from typing import Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Tuple, Optional, List
 
 import numpy as np
 import pandas as pd
-from scipy.optimize import minimize, differential_evolution
+from scipy.optimize import minimize, differential_evolution, OptimizeResult
+from scipy.stats import qmc
 
-from core.rc_model import RC1Model, estimate_initial_parameters
-from core.data_models import CalibratedParameters
+from core import rc_kernel
+from core.rc_model import (
+    estimate_initial_parameters, RHO_AIR, CP_AIR, DEFAULT_SOLAR_APERTURE
+)
+from core.rc_statespace import (
+    build_rc_model, get_model_class, EXTRA_PARAMETER_BOUNDS, EXTRA_PARAMETER_DEFAULTS
+)
+from core.least_squares import fit_rc_least_squares, RCLeastSquaresFit
+from core.data_models import CalibratedParameters, CalibrationTrace, IncrementalState
+from core.day_hour_matrix import DayHourMatrix
+from core.jobs import StopCheck, as_completed_cancellable, check_cancelled, stop_process_pool
+from core.parameter_store import ParameterStore, calibration_data_hash
+
+
+# Meze parametrů [H_env, n, log(C_th), q_int]
+PARAMETER_BOUNDS = [
+    (10, 1000),      # H_env
+    (0.05, 2.0),     # n
+    (np.log(1e5), np.log(1e8)),  # log(C_th)
+    (0, 10)          # q_int
+]
+# Modely vyššího řádu (2R2C, 3R2C) mají za nimi parametry
+# EXTRA_PARAMETERS své třídy, viz parameter_bounds()
+
+# MULTISTART: počet lokálních startů a kolik jich musí najít stejné optimum
+MULTISTART_STARTS = 8
+MULTISTART_AGREEMENT = 3
+MULTISTART_COST_RTOL = 1e-3     # relativní shoda hodnoty cost
+MULTISTART_PARAM_TOL = 0.02     # shoda parametrů (podíl šířky bounds)
+
+# ADVANCED: differential evolution a kritérium stagnace
+DE_MAXITER = 100
+DE_POPSIZE = 10
+DE_STALL_RTOL = 1e-4            # relativní zlepšení považované za stagnaci
+DE_STALL_GENERATIONS = 10       # počet generací stagnace před ukončením
+DE_WARM_SPREAD = 0.05           # rozptyl teplé populace (podíl šířky bounds)
+
+# Kovariance parametrů (Laplaceova aproximace kolem optima)
+COVARIANCE_STEP = 1e-3          # krok konečných diferencí (podíl šířky bounds)
+PRIOR_STD_FRACTION = 0.25       # apriorní směrodatná odchylka (podíl šířky bounds)
+
+
+class ConvergenceMonitor:
+    """
+    Callback pro differential_evolution: zaznamenává průběh a ukončí
+    optimalizaci, pokud se nejlepší cost zlepšuje relativně méně než
+    `rtol` po dobu `patience` generací.
+    
+    Používá signaturu callback(intermediate_result) s population_energies,
+    kterou differential_evolution podporuje od SciPy 1.12 (viz requirements.txt).
+    
+    Atributy:
+        best_cost: nejlepší cost v každé generaci
+        population_spread: směrodatná odchylka cost populace v každé generaci
+        stopped_early: zda optimalizaci ukončilo kritérium stagnace
+    """
+    
+    def __init__(self, rtol: float = DE_STALL_RTOL, patience: int = DE_STALL_GENERATIONS):
+        self.rtol = rtol
+        self.patience = patience
+        self.best_cost: List[float] = []
+        self.population_spread: List[float] = []
+        self.stalled_generations = 0
+        self.stopped_early = False
+    
+    def __call__(self, intermediate_result: OptimizeResult) -> bool:
+        best = float(intermediate_result.fun)
+        energies = np.asarray(intermediate_result.population_energies, dtype=float)
+        
+        if self.best_cost:
+            previous = self.best_cost[-1]
+            improvement = (previous - best) / max(abs(previous), 1e-12)
+            if improvement < self.rtol:
+                self.stalled_generations += 1
+            else:
+                self.stalled_generations = 0
+        
+        self.best_cost.append(best)
+        self.population_spread.append(float(np.std(energies[np.isfinite(energies)])))
+        
+        if self.stalled_generations >= self.patience:
+            self.stopped_early = True
+            return True
+        return False
+    
+    def to_trace(self, result: OptimizeResult, max_generations: int) -> CalibrationTrace:
+        """Souhrn průběhu pro CalibratedParameters"""
+        return CalibrationTrace(
+            method="differential_evolution",
+            best_cost=self.best_cost,
+            population_spread=self.population_spread,
+            generations=len(self.best_cost),
+            max_generations=max_generations,
+            n_evaluations=int(result.nfev),
+            stopped_early=self.stopped_early
+        )
+
+
+class CalibrationObjective:
+    """
+    Funkce nákladů kalibrace: kombinace chyby teploty a denní energie.
+    
+    Vše, co nezávisí na parametrech (rozložení hodin do dní, pozorovaná
+    denní energie seřazená podle dní, dodané teplo), se spočte jednou při
+    vytvoření. Simulace, chyba teploty a denní součty energie se pak
+    počítají v jednom průchodu jádrem core.rc_kernel.
+    
+    Řádky nemusí být hodinové: délky kroků se odvodí z časových razítek
+    (15min data, nepravidelné kroky) a energie se váží délkou kroku.
+    
+    Váhy dní (day_weights, blokový bootstrap v core.bootstrap) převáží
+    chyby energie i teploty po dnech; simulace přitom běží přes celé okno.
+    
+    Instance je picklovatelná, lze ji předat do procesů.
+    
+    params: [H_env, n, log(C_th), q_int] + parametry vyššího řádu
+    (model_order "2r2c"/"3r2c", viz core.rc_statespace)
+    """
+    
+    def __init__(
+        self,
+        daily_energy_df: pd.DataFrame,
+        hourly_with_energy: pd.DataFrame,
+        geometry_volume_m3: float,
+        geometry_area_m2: float,
+        initial_indoor_temp: Optional[float] = None,
+        model_order: str = "1r1c"
+    ):
+        self.hourly = hourly_with_energy
+        self.model_order = get_model_class(model_order).ORDER
+        self.volume_m3 = geometry_volume_m3
+        self.area_m2 = geometry_area_m2
+        # Počáteční stav: první T_in, nebo konec předchozího okna (inkrementálně)
+        if initial_indoor_temp is None:
+            initial_indoor_temp = hourly_with_energy['temp_in_c'].iloc[0]
+        self.initial_indoor_temp = float(initial_indoor_temp)
+        
+        self.temp_in_target = hourly_with_energy['temp_in_c'].to_numpy(dtype=float)
+        self.temp_out = hourly_with_energy['temp_out_c'].to_numpy(dtype=float)
+        
+        # Dodané teplo nezávislé na parametrech: topení + slunce
+        self.q_in = hourly_with_energy['heating_power_W'].to_numpy(dtype=float)
+        if 'ghi_wm2' in hourly_with_energy.columns:
+            self.q_in = self.q_in + (
+                hourly_with_energy['ghi_wm2'].to_numpy(dtype=float)
+                * geometry_area_m2 * DEFAULT_SOLAR_APERTURE
+            )
+        
+        # Rozložení hodin do dní (jednou) a pozorovaná energie podle řádků
+        self.layout = DayHourMatrix.from_hourly(hourly_with_energy, 'temp_out_c')
+        self.observed_daily_kwh = self.layout.align_daily(daily_energy_df, 'heating_kwh')
+        self.has_observation = ~np.isnan(self.observed_daily_kwh)
+        
+        # Délky kroků z časových razítek (hodinová data → 3600 s)
+        self.dt_seconds = rc_kernel.uniform_step(
+            rc_kernel.step_seconds(hourly_with_energy['timestamp'])
+        )
+        self.step_hours = np.broadcast_to(
+            np.asarray(self.dt_seconds, dtype=float) / 3600, self.temp_out.shape
+        )
+        self.hourly_steps = np.ndim(self.dt_seconds) == 0 and self.dt_seconds == 3600
+        
+        # Seřazené hodiny → dny se vyhodnocují průběžně bez denních mezisoučtů
+        self.streaming = rc_kernel.days_are_contiguous(self.layout.sample_rows)
+        
+        # Váhy dní (n_dní) pro bootstrap; None = všechny dny váhu 1
+        self.day_weights: Optional[np.ndarray] = None
+    
+    def build_model(self, params):
+        """Vytvoří RC model (zvoleného řádu) z vektoru parametrů"""
+        return build_rc_model(
+            self.model_order,
+            H_env_W_per_K=params[0],
+            infiltration_rate_per_h=params[1],
+            volume_m3=self.volume_m3,
+            C_th_J_per_K=np.exp(params[2]),  # log pro stabilitu
+            area_m2=self.area_m2,
+            internal_gains_W_per_m2=params[3],
+            **extra_parameters(self.model_order, params)
+        )
+    
+    def score(self, params) -> Tuple[float, float, int, float, int]:
+        """
+        Simuluje model a vrátí součty chyb (bez hodinových mezivýsledků).
+        
+        Returns:
+            (T_in na konci okna, součet kvadrátů chyb teploty, počet hodin
+             s cílovou teplotou, součet relativních chyb energie, počet dní
+             s pozorováním)
+        """
+        model = self.build_model(params)
+        if model.N_STATES > 1 or not self.hourly_steps or self.day_weights is not None:
+            return self._score_trajectory(model)
+        
+        alpha, beta = model.step_coefficients()
+        args = (
+            alpha, beta, model.H_total, model.q_int * model.A,
+            self.initial_indoor_temp, self.temp_out, self.q_in,
+            self.temp_in_target, self.layout.sample_rows
+        )
+        
+        if self.streaming:
+            return rc_kernel.score_streaming(*args, self.observed_daily_kwh)
+        
+        # Neseřazené hodiny: denní součty se drží v poli (n_dní)
+        T_end, sum_sq, n_valid, daily_Wh = rc_kernel.simulate_and_score(
+            *args, self.layout.n_days
+        )
+        return (T_end, sum_sq, n_valid) + self._energy_errors(daily_Wh)
+    
+    def _energy_errors(self, daily_Wh: np.ndarray) -> Tuple[float, int]:
+        """
+        (součet relativních chyb energie, počet dní s pozorováním);
+        s day_weights vážený součet a součet vah
+        """
+        observed = self.observed_daily_kwh[self.has_observation]
+        energy_sim_kwh = daily_Wh[self.has_observation] / 1000  # W*h → kWh
+        pct_energy_errors = (
+            np.abs(observed - energy_sim_kwh) / (observed + rc_kernel.ENERGY_EPS_KWH)
+        )
+        if self.day_weights is not None:
+            weights = self.day_weights[self.has_observation]
+            return float(weights @ pct_energy_errors), float(weights.sum())
+        return float(pct_energy_errors.sum()), len(pct_energy_errors)
+    
+    def _trajectory(self, model) -> Tuple[np.ndarray, np.ndarray]:
+        """(teplota vzduchu po krocích, simulovaná denní energie Wh) přes průběh stavů"""
+        states = model.simulate_states(
+            self.initial_indoor_temp, self.temp_out,
+            self.q_in + model.q_int * model.A, self.dt_seconds
+        )
+        Q_needed = np.nan_to_num(np.maximum(model.heat_loss_W(states, self.temp_out), 0))
+        day_index = self.layout.sample_rows
+        inside = day_index >= 0
+        daily_Wh = np.bincount(day_index[inside], weights=(Q_needed * self.step_hours)[inside],
+                               minlength=self.layout.n_days)
+        return states[:, 0], daily_Wh
+    
+    def _score_trajectory(self, model) -> Tuple[float, float, int, float, int]:
+        """
+        score() přes průběh stavů: modely vyššího řádu (core.rc_statespace)
+        a nehodinové kroky
+        """
+        T, daily_Wh = self._trajectory(model)
+        
+        sq = (T - self.temp_in_target) ** 2
+        valid = ~np.isnan(sq)
+        
+        T_end = float(T[-1]) if len(T) else self.initial_indoor_temp
+        if self.day_weights is not None:
+            # Hodiny mimo dny (-1) si ponechají váhu 1
+            day_index = self.layout.sample_rows
+            weights = np.where(day_index >= 0, self.day_weights[np.maximum(day_index, 0)], 1.0)[valid]
+            return (T_end, float(weights @ sq[valid]), float(weights.sum())) + self._energy_errors(daily_Wh)
+        return (T_end, float(sq[valid].sum()), int(valid.sum())) + self._energy_errors(daily_Wh)
+    
+    def energy_residuals(self, params) -> np.ndarray:
+        """
+        Relativní chyby denní energie (simulace - pozorování) / pozorování
+        pro dny s pozorováním - rezidua pro odhad kovariance parametrů.
+        """
+        _, daily_Wh = self._trajectory(self.build_model(params))
+        observed = self.observed_daily_kwh[self.has_observation]
+        return (daily_Wh[self.has_observation] / 1000 - observed) / (observed + rc_kernel.ENERGY_EPS_KWH)
+    
+    def evaluate(self, params) -> Tuple[float, float]:
+        """
+        Simuluje model a vrátí (RMSE teploty °C, MAPE denní energie %).
+        """
+        _, sum_sq, n_valid, sum_pct, n_days = self.score(params)
+        
+        # Hodiny bez cílové teploty (NaN) se přeskočí
+        rmse_temp = np.sqrt(sum_sq / n_valid) if n_valid else np.nan
+        mape_energy = sum_pct / n_days * 100 if n_days else 100
+        
+        return float(rmse_temp), float(mape_energy)
+    
+    def end_state(self, params) -> IncrementalState:
+        """
+        Stav simulace na konci okna a součty chyb pro inkrementální kalibraci.
+        """
+        T_end, sum_sq, n_valid, sum_pct, n_days = self.score(params)
+        
+        return IncrementalState(
+            end_timestamp=pd.Timestamp(self.hourly['timestamp'].iloc[-1]).to_pydatetime(),
+            T_in_end_c=T_end,
+            n_temp_hours=n_valid,
+            sum_sq_temp_error=sum_sq,
+            n_energy_days=n_days,
+            sum_pct_energy_error=sum_pct
+        )
+    
+    def __call__(self, params) -> float:
+        rmse_temp, mape_energy = self.evaluate(params)
+        
+        # Kombinovaná cost
+        # Normalizuj RMSE (např. 1°C = 10% MAPE)
+        return rmse_temp * 10 + mape_energy
 
 
 def calibrate_model_simple(
@@ -20,10 +317,17 @@ def calibrate_model_simple(
     geometry_area_m2: float,
     avg_indoor_temp: float,
     baseline_tuv_kwh: float,
-    mode: str = "standard"
+    mode: str = "standard",
+    apartment_id: Optional[str] = None,
+    store: Optional[ParameterStore] = None,
+    model_order: str = "1r1c",
+    bootstrap_replicates: Optional[int] = None,
+    bootstrap_time_budget_s: Optional[float] = None,
+    should_stop: Optional[StopCheck] = None,
+    max_workers: Optional[int] = None
 ) -> CalibratedParameters:
     """
-    Kalibruje parametry 1R1C modelu.
+    Kalibruje parametry RC modelu (výchozí 1R1C).
     
     Args:
         daily_energy_df: denní spotřeby s heating_kwh
@@ -32,12 +336,50 @@ def calibrate_model_simple(
         geometry_area_m2: plocha bytu
         avg_indoor_temp: průměrná vnitřní teplota
         baseline_tuv_kwh: baseline TUV
-        mode: "basic", "standard", nebo "advanced"
+        mode: "basic", "fast", "standard", "multistart", "bootstrap", nebo "advanced"
+        apartment_id: ID bytu - pokud je zadáno, kalibrace startuje z poslední
+            uložené kalibrace a při nezměněných datech se přeskočí
+        store: úložiště kalibrací (None = výchozí ParameterStore)
+        model_order: řád RC modelu "1r1c", "2r2c" nebo "3r2c"
+        bootstrap_replicates: počet replikací režimu BOOTSTRAP
+            (None = core.bootstrap.BOOTSTRAP_REPLICATES)
+        bootstrap_time_budget_s: časový rozpočet bootstrapu v sekundách (None = bez omezení)
+        should_stop: zrušení výpočtu na pozadí - kontroluje se při každém
+            vyhodnocení funkce nákladů (paralelní starty/replikace po dokončení
+            každé z nich), při True se vyhodí core.jobs.ComputationCancelled
+        max_workers: počet paralelních workerů režimů ADVANCED, MULTISTART
+            a BOOTSTRAP (None = proměnné prostředí PENB_*, jinak počet CPU - 1)
     
     Returns:
         CalibratedParameters
     """
     print("\n=== Kalibrace parametrů ===")
+    model_order = get_model_class(model_order).ORDER
+    if model_order != "1r1c":
+        print(f"  Model {model_order.upper()}")
+    
+    # Poslední kalibrace bytu (pouze pro optimalizační režimy)
+    stored = None
+    data_hash = None
+    if apartment_id and mode != "basic":
+        store = store or ParameterStore()
+        data_hash = calibration_data_hash(
+            daily_energy_df,
+            hourly_weather_df,
+            geometry_volume_m3,
+            geometry_area_m2,
+            avg_indoor_temp,
+            baseline_tuv_kwh
+        )
+        stored = store.load(apartment_id)
+        
+        if stored is not None and stored.parameters.model_order.value != model_order:
+            print(f"  Uložená kalibrace bytu '{apartment_id}' je pro jiný řád modelu - nepoužije se")
+            stored = None
+        
+        if stored is not None and stored.data_hash == data_hash and stored.mode == mode:
+            print(f"  Data bytu '{apartment_id}' se nezměnila - používám uloženou kalibraci")
+            return stored.parameters
     
     # Počáteční odhad
     H_env_init, n_init, C_th_init = estimate_initial_parameters(
@@ -58,156 +400,128 @@ def calibrate_model_simple(
             baseline_TUV_kwh_per_day=baseline_tuv_kwh,
             internal_gains_W_per_m2=3.0,
             rmse_temperature_c=999.0,  # neznámé
-            mape_energy_pct=999.0
+            mape_energy_pct=999.0,
+            model_order=model_order,
+            **extra_parameters(model_order)
         )
     
     # STANDARD nebo ADVANCED: optimalizace
     
     # Připrav hodinová data s energií
-    from core.baseline_split import distribute_daily_heating_to_hours
-    
-    hourly_with_energy = distribute_daily_heating_to_hours(
+    hourly_with_energy = prepare_calibration_hours(
         daily_energy_df,
         hourly_weather_df,
-        indoor_temp_c=avg_indoor_temp
-    ).copy()
-    
-    # Připrav T_in (pokud nemáme skutečné, použijeme konstantu)
-    if 'temp_in_c' not in hourly_with_energy.columns:
-        hourly_with_energy['temp_in_c'] = avg_indoor_temp
-
-    # Převeď hodinovou energii na střední výkon ve wattech (pro simulaci)
-    hourly_with_energy['heating_power_W'] = (
-        hourly_with_energy['heating_energy_kwh'] * 1000  # kWh → W (průměrný výkon za hodinu)
+        avg_indoor_temp
     )
 
-    if hourly_with_energy.empty:
-        raise ValueError("Hourly dataframe for calibration is empty; cannot calibrate model.")
-
-    initial_indoor_temp = float(hourly_with_energy['temp_in_c'].iloc[0])
-    
-    # Funkce cost
-    def cost_function(params):
-        """
-        Funkce nákladů: kombinace chyby teploty a energie.
-        
-        params: [H_env, n, log(C_th), q_int]
-        """
-        H_env = params[0]
-        n = params[1]
-        C_th = np.exp(params[2])  # log pro stabilitu
-        q_int = params[3]
-        
-        # Vytvoř model
-        model = RC1Model(
-            H_env_W_per_K=H_env,
-            infiltration_rate_per_h=n,
-            volume_m3=geometry_volume_m3,
-            C_th_J_per_K=C_th,
-            area_m2=geometry_area_m2,
-            internal_gains_W_per_m2=q_int
-        )
-        
-        # Simuluj hodinový průběh
-        simulated = model.simulate_hourly(
-            initial_indoor_temp,
-            hourly_with_energy,
-            Q_heat_column='heating_power_W'
-        )
-        
-        # Chyba teploty
-        rmse_temp = np.sqrt(np.mean(
-            (simulated['T_in_simulated_c'] - simulated['temp_in_c'])**2
-        ))
-        
-        # Chyba denní energie
-        # Seskup simulaci zpět na dny
-        simulated['date'] = pd.to_datetime(simulated['timestamp'].dt.date)
-        
-        # Spočti potřebné teplo podle delta T
-        simulated['Q_needed_W'] = model.H_total * np.maximum(
-            simulated['T_in_simulated_c'] - simulated['temp_out_c'], 0
-        )
-        
-        daily_sim = simulated.groupby('date')['Q_needed_W'].sum().reset_index()
-        daily_sim['energy_sim_kwh'] = daily_sim['Q_needed_W'] / 1000  # W*h → kWh
-        
-        # Porovnej s pozorovanou
-        merged_daily = daily_energy_df.merge(
-            daily_sim[['date', 'energy_sim_kwh']], 
-            on='date', 
-            how='inner'
-        )
-        
-        if len(merged_daily) > 0:
-            mape_energy = np.mean(
-                np.abs(merged_daily['heating_kwh'] - merged_daily['energy_sim_kwh']) / 
-                (merged_daily['heating_kwh'] + 1e-6)
-            ) * 100
-        else:
-            mape_energy = 100
-        
-        # Kombinovaná cost
-        # Normalizuj RMSE (např. 1°C = 10% MAPE)
-        cost = rmse_temp * 10 + mape_energy
-        
-        return cost
-    
+    objective = CalibrationObjective(
+        daily_energy_df,
+        hourly_with_energy,
+        geometry_volume_m3,
+        geometry_area_m2,
+        model_order=model_order
+    )
+    # Optimalizace v tomto procesu vyhodnocují přes obal s kontrolou zrušení
+    fit_objective = _StoppableObjective(objective, should_stop) if should_stop else objective
+    extra_names = get_model_class(model_order).EXTRA_PARAMETERS
     # Počáteční parametry
     x0 = [
         H_env_init,
         n_init,
         np.log(C_th_init),
         3.0  # internal gains
-    ]
+    ] + [EXTRA_PARAMETER_DEFAULTS[name] for name in extra_names]
+    x_warm = None
+    ls_fit = None
     
-    # Bounds
-    bounds = [
-        (10, 1000),      # H_env
-        (0.05, 2.0),     # n
-        (np.log(1e5), np.log(1e8)),  # log(C_th)
-        (0, 10)          # q_int
-    ]
+    # Přesnější start (a výsledek režimu FAST) z lineárních nejmenších čtverců
+    try:
+        ls_fit = fit_rc_least_squares(
+            daily_energy_df,
+            least_squares_hours(hourly_with_energy, hourly_weather_df),
+            avg_indoor_temp
+        )
+        x0 = list(least_squares_to_vector(
+            ls_fit, geometry_volume_m3, geometry_area_m2, C_th_init, n_init
+        )) + x0[len(PARAMETER_BOUNDS):]
+        print(f"  Nejmenší čtverce ({ls_fit.method}): "
+              f"H_total = {ls_fit.H_total_W_per_K:.1f} ± {ls_fit.H_total_std:.1f} W/K")
+    except ValueError as e:
+        print(f"  ⚠ Nejmenší čtverce selhaly ({e}), start z lineární regrese")
+    
+    bounds = parameter_bounds(model_order)
+    
+    if stored is not None and mode != "fast":
+        # Teplý start z poslední kalibrace bytu (FAST bere výsledek nejmenších čtverců)
+        x_warm = np.clip(parameters_to_vector(stored.parameters),
+                         [b[0] for b in bounds], [b[1] for b in bounds])
+        x0 = list(x_warm)
+        print(f"  Teplý start z kalibrace {stored.calibrated_at:%Y-%m-%d} "
+              f"(H_env = {stored.parameters.H_env_W_per_K:.1f} W/K)")
+    
+    trace = None
     
     if mode == "advanced":
         # ADVANCED: použij differential evolution (globální optimalizace)
         print("  Režim ADVANCED: globální optimalizace...")
-        cpu_count = os.cpu_count() or 2
-        default_workers = max(1, cpu_count - 1)
-        env_override = os.getenv("PENB_ADVANCED_THREADS")
-        try:
-            max_workers = max(1, int(env_override)) if env_override else default_workers
-        except ValueError:
-            max_workers = default_workers
+        n_workers = _resolve_worker_count("PENB_ADVANCED_THREADS", max_workers)
+        monitor = ConvergenceMonitor()
         
         de_kwargs = dict(
             bounds=bounds,
-            maxiter=100,
-            popsize=10,
+            maxiter=DE_MAXITER,
+            popsize=DE_POPSIZE,
             seed=42,
-            disp=False
+            disp=False,
+            callback=monitor
         )
+        if x_warm is not None:
+            de_kwargs['init'] = warm_start_population(x_warm, bounds, DE_POPSIZE)
         
-        if max_workers > 1:
-            print(f"    * paralelní vyhodnocení ({max_workers} vláken)")
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if n_workers > 1:
+            print(f"    * paralelní vyhodnocení ({n_workers} vláken)")
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
                 result = differential_evolution(
-                    cost_function,
+                    fit_objective,
                     workers=executor.map,
                     updating='deferred',
                     **de_kwargs
                 )
         else:
             result = differential_evolution(
-                cost_function,
+                fit_objective,
                 **de_kwargs
             )
+        
+        trace = monitor.to_trace(result, DE_MAXITER)
+        print(f"    * {trace.generations}/{DE_MAXITER} generací, "
+              f"{trace.n_evaluations} vyhodnocení"
+              + (" (ukončeno stagnací)" if trace.stopped_early else ""))
+    elif mode == "fast":
+        # FAST: parametry i kovariance přímo z lineárních nejmenších čtverců,
+        # jediná simulace se spustí pro RMSE/MAPE
+        print("  Režim FAST: kalibrace v uzavřeném tvaru")
+        result = OptimizeResult(x=np.asarray(x0, dtype=float), nfev=0)
+    elif mode == "multistart":
+        # MULTISTART: paralelní lokální optimalizace z LHS startů
+        print(f"  Režim MULTISTART: {MULTISTART_STARTS} lokálních optimalizací...")
+        n_workers = _resolve_worker_count("PENB_MULTISTART_PROCESSES", max_workers)
+        
+        result = run_multistart(
+            objective if n_workers > 1 else fit_objective,
+            x0,
+            bounds,
+            n_starts=MULTISTART_STARTS,
+            n_agree=MULTISTART_AGREEMENT,
+            max_workers=n_workers,
+            should_stop=should_stop
+        )
     else:
-        # STANDARD: lokální optimalizace
-        print("  Režim STANDARD: lokální optimalizace...")
+        # STANDARD (i BOOTSTRAP): lokální optimalizace
+        print(f"  Režim {mode.upper()}: lokální optimalizace...")
         
         result = minimize(
-            cost_function,
+            fit_objective,
             x0,
             method='L-BFGS-B',
             bounds=bounds,
@@ -221,40 +535,7 @@ def calibrate_model_simple(
     q_int_opt = result.x[3]
     
     # Spočti finální metriky
-    final_model = RC1Model(
-        H_env_W_per_K=H_env_opt,
-        infiltration_rate_per_h=n_opt,
-        volume_m3=geometry_volume_m3,
-        C_th_J_per_K=C_th_opt,
-        area_m2=geometry_area_m2,
-        internal_gains_W_per_m2=q_int_opt
-    )
-    
-    final_sim = final_model.simulate_hourly(
-        initial_indoor_temp,
-        hourly_with_energy,
-        Q_heat_column='heating_power_W'
-    )
-    
-    rmse_final = np.sqrt(np.mean(
-        (final_sim['T_in_simulated_c'] - final_sim['temp_in_c'])**2
-    ))
-    
-    # MAPE energie
-    final_sim['date'] = pd.to_datetime(final_sim['timestamp'].dt.date)
-    final_sim['Q_needed_W'] = final_model.H_total * np.maximum(
-        final_sim['T_in_simulated_c'] - final_sim['temp_out_c'], 0
-    )
-    
-    daily_final = final_sim.groupby('date')['Q_needed_W'].sum().reset_index()
-    daily_final['energy_sim_kwh'] = daily_final['Q_needed_W'] / 1000
-    
-    merged = daily_energy_df.merge(daily_final[['date', 'energy_sim_kwh']], on='date')
-    
-    mape_final = np.mean(
-        np.abs(merged['heating_kwh'] - merged['energy_sim_kwh']) / 
-        (merged['heating_kwh'] + 1e-6)
-    ) * 100
+    rmse_final, mape_final = objective.evaluate(result.x)
     
     print(f"\n✓ Kalibrace dokončena:")
     print(f"  - H_env = {H_env_opt:.1f} W/K")
@@ -263,13 +544,447 @@ def calibrate_model_simple(
     print(f"  - Interní zisky = {q_int_opt:.1f} W/m²")
     print(f"  - RMSE teploty = {rmse_final:.2f} °C")
     print(f"  - MAPE energie = {mape_final:.1f} %")
+    extra_final = extra_parameters(model_order, result.x)
+    for name, value in extra_final.items():
+        print(f"  - {name} = {value:.3f}")
     
-    return CalibratedParameters(
+    # Nejistota parametrů pro Monte Carlo (core.uncertainty); FAST ji bere
+    # z kovariance lstsq, ostatní režimy z Jakobiánu simulací
+    covariance = None
+    try:
+        if mode == "fast":
+            if ls_fit is None:
+                raise ValueError("nejmenší čtverce selhaly")
+            covariance = least_squares_covariance(ls_fit, geometry_area_m2, bounds)
+        else:
+            covariance = parameter_covariance(objective, result.x, bounds)
+        print(f"  - Nejistota: H_env ± {np.sqrt(covariance[0, 0]):.1f} W/K, "
+              f"C_th ×/÷ {np.exp(np.sqrt(covariance[2, 2])):.2f}")
+    except (ValueError, np.linalg.LinAlgError) as e:
+        print(f"  ⚠ Kovarianci parametrů nelze odhadnout ({e})")
+    
+    confidence = None
+    if mode == "bootstrap":
+        # BOOTSTRAP: intervaly spolehlivosti z převzorkovaných dní
+        from core.bootstrap import BOOTSTRAP_REPLICATES, bootstrap_confidence
+        n_replicates = bootstrap_replicates or BOOTSTRAP_REPLICATES
+        print(f"  Blokový bootstrap: {n_replicates} replikací...")
+        confidence = bootstrap_confidence(
+            objective,
+            result.x,
+            bounds,
+            n_replicates=n_replicates,
+            time_budget_s=bootstrap_time_budget_s,
+            max_workers=_resolve_worker_count("PENB_BOOTSTRAP_PROCESSES", max_workers),
+            should_stop=should_stop
+        )
+        if confidence is not None:
+            lower, upper = confidence.intervals['H_total_W_per_K']
+            print(f"  - H_total {confidence.confidence_level:.0%} interval: "
+                  f"{lower:.1f} - {upper:.1f} W/K")
+    
+    calibrated = CalibratedParameters(
         H_env_W_per_K=H_env_opt,
         infiltration_rate_per_h=n_opt,
         C_th_J_per_K=C_th_opt,
         baseline_TUV_kwh_per_day=baseline_tuv_kwh,
         internal_gains_W_per_m2=q_int_opt,
         rmse_temperature_c=rmse_final,
-        mape_energy_pct=mape_final
+        mape_energy_pct=mape_final,
+        model_order=model_order,
+        parameter_covariance=covariance.tolist() if covariance is not None else None,
+        confidence=confidence,
+        trace=trace,
+        **extra_final
+    )
+    
+    if data_hash is not None:
+        store.save(apartment_id, calibrated, data_hash, mode,
+                   state=objective.end_state(result.x))
+    
+    return calibrated
+
+
+def prepare_calibration_hours(
+    daily_energy_df: pd.DataFrame,
+    hourly_weather_df: pd.DataFrame,
+    avg_indoor_temp: float
+) -> pd.DataFrame:
+    """
+    Hodinová data pro kalibraci: rozložená denní energie, T_in a topný výkon.
+    
+    Raises:
+        ValueError: pokud po rozložení nezbyla žádná hodina
+    """
+    from core.baseline_split import distribute_daily_heating_to_hours
+    
+    hourly_with_energy = distribute_daily_heating_to_hours(
+        daily_energy_df,
+        hourly_weather_df,
+        indoor_temp_c=avg_indoor_temp
+    ).copy()
+    
+    # Připrav T_in (pokud nemáme skutečné, použijeme konstantu)
+    if 'temp_in_c' not in hourly_with_energy.columns:
+        hourly_with_energy['temp_in_c'] = avg_indoor_temp
+
+    # Převeď energii kroku na střední výkon ve wattech (pro simulaci)
+    step_hours = rc_kernel.step_seconds(hourly_with_energy['timestamp']) / 3600
+    hourly_with_energy['heating_power_W'] = (
+        hourly_with_energy['heating_energy_kwh'] * 1000 / step_hours  # kWh → W
+    )
+
+    if hourly_with_energy.empty:
+        raise ValueError("Hourly dataframe for calibration is empty; cannot calibrate model.")
+    
+    return hourly_with_energy
+
+
+def least_squares_hours(
+    hourly_with_energy: pd.DataFrame,
+    hourly_weather_df: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Hodiny pro fit nejmenších čtverců: topný výkon z rozložení denní energie
+    a měřené veličiny (T_in, GHI) z hodinových dat, pokud jsou k dispozici.
+    """
+    measured = [col for col in ('temp_in_c', 'ghi_wm2') if col in hourly_weather_df.columns]
+    hours = hourly_with_energy[['timestamp', 'temp_out_c', 'heating_power_W']]
+    if not measured:
+        return hours
+    return hours.merge(hourly_weather_df[['timestamp'] + measured], on='timestamp', how='left')
+
+
+def least_squares_to_vector(
+    fit: RCLeastSquaresFit,
+    geometry_volume_m3: float,
+    geometry_area_m2: float,
+    C_th_default: float,
+    infiltration_rate: float
+) -> np.ndarray:
+    """
+    Vektor [H_env, n, log(C_th), q_int] z fitu nejmenších čtverců.
+    
+    H_total se rozdělí na obálku a větrání při zadané infiltraci; C_th se
+    bere z ARX fitu, u denní bilance zůstane C_th_default. Hodnoty se
+    omezí na PARAMETER_BOUNDS.
+    """
+    H_vent = RHO_AIR * CP_AIR * infiltration_rate * geometry_volume_m3 / 3600
+    C_th = fit.C_th_J_per_K if fit.C_th_J_per_K is not None else C_th_default
+    
+    x = np.array([
+        fit.H_total_W_per_K - H_vent,
+        infiltration_rate,
+        np.log(C_th),
+        fit.Q_internal_W / geometry_area_m2
+    ])
+    return np.clip(x, [b[0] for b in PARAMETER_BOUNDS], [b[1] for b in PARAMETER_BOUNDS])
+
+
+def least_squares_covariance(
+    fit: RCLeastSquaresFit,
+    geometry_area_m2: float,
+    bounds: List[Tuple[float, float]]
+) -> np.ndarray:
+    """
+    Kovariance vektoru parametrů z kovariance lstsq (delta metoda, bez simulací).
+    
+    H_env = H_total - H_vent (infiltrace pevná), log(C_th) a q_int = Q_int/A
+    se mapují přes gradienty fitu (RCLeastSquaresFit.gradients). Parametry,
+    které fit neurčí (infiltrace, C_th u denní bilance, parametry vyššího
+    řádu), mají apriorní rozptyl (PRIOR_STD_FRACTION·šířka mezí)² jako
+    v parameter_covariance.
+    
+    Returns:
+        (p, p) kovariance ve stejném pořadí jako vektor parametrů
+    """
+    widths = np.array([b[1] - b[0] for b in bounds], dtype=float)
+    covariance = np.diag((PRIOR_STD_FRACTION * widths) ** 2)
+    
+    quantities = {0: 'H_total', 3: 'Q_internal_W'}
+    scales = {0: 1.0, 3: 1.0 / geometry_area_m2}
+    if 'C_th' in fit.gradients:
+        quantities[2] = 'C_th'
+        scales[2] = 1.0 / fit.C_th_J_per_K   # d log(C) = dC / C
+    
+    index = list(quantities)
+    scale = np.array([scales[i] for i in index])
+    block = fit.covariance([quantities[i] for i in index]) * np.outer(scale, scale)
+    covariance[np.ix_(index, index)] = block
+    return covariance
+
+
+def parameter_bounds(model_order: str = "1r1c") -> List[Tuple[float, float]]:
+    """Meze vektoru parametrů pro daný řád modelu"""
+    extra_names = get_model_class(model_order).EXTRA_PARAMETERS
+    return PARAMETER_BOUNDS + [EXTRA_PARAMETER_BOUNDS[name] for name in extra_names]
+
+
+def extra_parameters(model_order: str, params=None) -> dict:
+    """
+    Parametry vyššího řádu {název: hodnota} z vektoru parametrů
+    (bez vektoru výchozí hodnoty; pro 1R1C prázdný slovník).
+    """
+    extra_names = get_model_class(model_order).EXTRA_PARAMETERS
+    if params is None:
+        return {name: EXTRA_PARAMETER_DEFAULTS[name] for name in extra_names}
+    offset = len(PARAMETER_BOUNDS)
+    return {name: float(params[offset + i]) for i, name in enumerate(extra_names)}
+
+
+def parameters_to_vector(params: CalibratedParameters) -> np.ndarray:
+    """
+    Vektor optimalizace [H_env, n, log(C_th), q_int, ...] z CalibratedParameters
+    (parametry vyššího řádu bez hodnoty dostanou výchozí)
+    """
+    extra_names = get_model_class(params.model_order).EXTRA_PARAMETERS
+    extra = [
+        getattr(params, name) if getattr(params, name) is not None
+        else EXTRA_PARAMETER_DEFAULTS[name]
+        for name in extra_names
+    ]
+    return np.array([
+        params.H_env_W_per_K,
+        params.infiltration_rate_per_h,
+        np.log(params.C_th_J_per_K),
+        params.internal_gains_W_per_m2
+    ] + extra)
+
+
+def parameter_covariance(
+    objective: CalibrationObjective,
+    x: np.ndarray,
+    bounds: List[Tuple[float, float]]
+) -> np.ndarray:
+    """
+    Aposteriorní kovariance vektoru parametrů (Laplaceova aproximace).
+    
+    Hessián se aproximuje Gauss-Newtonem z relativních chyb denní energie
+    (Jakobián konečnými diferencemi, σ² z reziduí v optimu). Parametry,
+    které data neurčí (např. rozdělení H_total na obálku a infiltraci),
+    drží slabý normální prior se směrodatnou odchylkou
+    PRIOR_STD_FRACTION·šířka mezí - kovariance je tak vždy regulární.
+    
+    Returns:
+        (p, p) kovariance ve stejném pořadí jako x
+    
+    Raises:
+        ValueError: pokud nejsou žádné dny s pozorovanou energií
+    """
+    x = np.asarray(x, dtype=float)
+    lower = np.array([b[0] for b in bounds])
+    upper = np.array([b[1] for b in bounds])
+    widths = upper - lower
+    
+    residuals = objective.energy_residuals(x)
+    if len(residuals) == 0:
+        raise ValueError("Žádné dny s pozorovanou energií")
+    
+    # Jakobián centrálními diferencemi (u meze jednostranně)
+    jacobian = np.empty((len(residuals), len(x)))
+    for i in range(len(x)):
+        step = COVARIANCE_STEP * widths[i]
+        x_hi, x_lo = x.copy(), x.copy()
+        x_hi[i] = min(x[i] + step, upper[i])
+        x_lo[i] = max(x[i] - step, lower[i])
+        jacobian[:, i] = (
+            (objective.energy_residuals(x_hi) - objective.energy_residuals(x_lo))
+            / (x_hi[i] - x_lo[i])
+        )
+    
+    dof = max(len(residuals) - len(x), 1)
+    sigma2 = max(float(residuals @ residuals) / dof, 1e-6)
+    precision = jacobian.T @ jacobian / sigma2 + np.diag(1 / (PRIOR_STD_FRACTION * widths) ** 2)
+    return np.linalg.inv(precision)
+
+
+def warm_start_population(
+    x_warm: np.ndarray,
+    bounds: List[Tuple[float, float]],
+    popsize: int,
+    spread: float = DE_WARM_SPREAD,
+    seed: int = 42
+) -> np.ndarray:
+    """
+    Počáteční populace differential evolution kolem předchozího řešení.
+    
+    Polovina populace je normálně rozložena kolem x_warm (σ = spread × šířka
+    bounds), druhá polovina pokrývá bounds (LHS), aby se zachovala
+    schopnost najít jiné optimum, pokud se byt změnil.
+    
+    Returns:
+        Pole (popsize × n_params, n_params); první řádek je x_warm
+    """
+    n_params = len(bounds)
+    n_total = popsize * n_params
+    n_local = n_total // 2
+    
+    lower = np.array([b[0] for b in bounds], dtype=float)
+    upper = np.array([b[1] for b in bounds], dtype=float)
+    
+    rng = np.random.default_rng(seed)
+    local = x_warm + rng.normal(0, spread, (n_local, n_params)) * (upper - lower)
+    local[0] = x_warm
+    
+    spread_out = latin_hypercube_starts(bounds, n_total - n_local, seed=seed)
+    return np.clip(np.vstack([local, spread_out]), lower, upper)
+
+
+def _resolve_worker_count(env_var: str, override: Optional[int] = None) -> int:
+    """
+    Počet paralelních workerů: počet CPU - 1, lze přepsat proměnnou prostředí
+    nebo explicitní hodnotou `override` (má přednost).
+    """
+    if override is not None:
+        return max(1, int(override))
+    cpu_count = os.cpu_count() or 2
+    default_workers = max(1, cpu_count - 1)
+    env_override = os.getenv(env_var)
+    try:
+        return max(1, int(env_override)) if env_override else default_workers
+    except ValueError:
+        return default_workers
+
+
+def latin_hypercube_starts(
+    bounds: List[Tuple[float, float]],
+    n_starts: int,
+    x0: Optional[List[float]] = None,
+    seed: int = 42
+) -> np.ndarray:
+    """
+    Startovní body pro MULTISTART rovnoměrně pokrývající bounds (LHS).
+    
+    Args:
+        bounds: meze parametrů
+        n_starts: počet startů
+        x0: volitelný počáteční odhad - použije se jako první start
+        seed: seed generátoru
+    
+    Returns:
+        Pole (n_starts, n_params)
+    """
+    lower = np.array([b[0] for b in bounds], dtype=float)
+    upper = np.array([b[1] for b in bounds], dtype=float)
+    
+    sampler = qmc.LatinHypercube(d=len(bounds), seed=seed)
+    starts = qmc.scale(sampler.random(n_starts), lower, upper)
+    
+    if x0 is not None and n_starts > 0:
+        starts[0] = np.clip(np.asarray(x0, dtype=float), lower, upper)
+    
+    return starts
+
+
+class _StoppableObjective:
+    """Funkce nákladů s kontrolou zrušení výpočtu před každým vyhodnocením"""
+    
+    def __init__(self, objective, should_stop: StopCheck):
+        self.objective = objective
+        self.should_stop = should_stop
+    
+    def __call__(self, params) -> float:
+        check_cancelled(self.should_stop)
+        return self.objective(params)
+
+
+def _local_search(objective, x_start, bounds, maxiter: int = 100) -> OptimizeResult:
+    """Jedna lokální L-BFGS-B optimalizace (spouští se ve workeru)"""
+    return minimize(
+        objective,
+        x_start,
+        method='L-BFGS-B',
+        bounds=bounds,
+        options={'maxiter': maxiter}
+    )
+
+
+def _same_optimum(a: OptimizeResult, b: OptimizeResult, widths: np.ndarray) -> bool:
+    """Našly dva lokální běhy stejné optimum (cost i parametry)?"""
+    cost_scale = max(abs(a.fun), abs(b.fun), 1e-12)
+    if abs(a.fun - b.fun) > MULTISTART_COST_RTOL * cost_scale:
+        return False
+    return bool(np.all(np.abs(a.x - b.x) <= MULTISTART_PARAM_TOL * widths))
+
+
+def run_multistart(
+    objective,
+    x0: List[float],
+    bounds: List[Tuple[float, float]],
+    n_starts: int = MULTISTART_STARTS,
+    n_agree: int = MULTISTART_AGREEMENT,
+    max_workers: int = 1,
+    seed: int = 42,
+    should_stop: Optional[StopCheck] = None
+) -> OptimizeResult:
+    """
+    K lokálních L-BFGS-B optimalizací z LHS startů, paralelně v procesech.
+    
+    Jakmile n_agree dokončených běhů najde stejné (nejlepší) optimum,
+    zbývající starty se zruší.
+    
+    Args:
+        objective: picklovatelná funkce nákladů (CalibrationObjective)
+        x0: počáteční odhad (první start)
+        bounds: meze parametrů
+        n_starts: počet startů
+        n_agree: kolik běhů musí souhlasit pro předčasné ukončení
+        max_workers: počet procesů (1 = sekvenčně v aktuálním procesu)
+        seed: seed pro LHS
+        should_stop: zrušení - sekvenčně před každým startem, paralelně
+            průběžně i během čekání na procesy (běžící se ukončí)
+    
+    Returns:
+        OptimizeResult nejlepšího běhu; nfev = součet přes dokončené běhy,
+        nit = počet dokončených běhů
+    """
+    starts = latin_hypercube_starts(bounds, n_starts, x0=x0, seed=seed)
+    widths = np.array([b[1] - b[0] for b in bounds], dtype=float)
+    completed: List[OptimizeResult] = []
+    
+    def converged() -> bool:
+        best = min(completed, key=lambda r: r.fun)
+        agreeing = sum(1 for r in completed if _same_optimum(r, best, widths))
+        return agreeing >= n_agree
+    
+    stopped_early = False
+    
+    if max_workers > 1:
+        print(f"    * paralelní běh ({max_workers} procesů)")
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [
+                executor.submit(_local_search, objective, start, bounds)
+                for start in starts
+            ]
+            for future in as_completed_cancellable(futures, should_stop):
+                completed.append(future.result())
+                if converged():
+                    stopped_early = len(completed) < n_starts
+                    break
+        finally:
+            # Nezahájené starty se zruší, běžící procesy se ukončí
+            stop_process_pool(executor)
+    else:
+        for start in starts:
+            check_cancelled(should_stop)
+            completed.append(_local_search(objective, start, bounds))
+            if converged():
+                stopped_early = len(completed) < n_starts
+                break
+    
+    best = min(completed, key=lambda r: r.fun)
+    agreeing = sum(1 for r in completed if _same_optimum(r, best, widths))
+    
+    print(f"    * dokončeno {len(completed)}/{n_starts} startů, "
+          f"{agreeing} se shoduje na optimu"
+          + (" (předčasné ukončení)" if stopped_early else ""))
+    
+    return OptimizeResult(
+        x=best.x,
+        fun=best.fun,
+        success=best.success,
+        message=best.message,
+        nfev=int(sum(r.nfev for r in completed)),
+        nit=len(completed)
     )
@@ -3,15 +3,17 @@ Správa konfigurace a API tokenu
 """
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
-from core.data_models import APIConfig
+from core.data_models import APIConfig, LabelTables
 
 
 # Cesta k úložišti
 STORAGE_DIR = Path(__file__).parent.parent / "storage"
 TOKEN_STORE_PATH = STORAGE_DIR / "token_store.json"
 USER_INPUTS_PATH = STORAGE_DIR / "user_inputs.json"
+LABEL_TABLES_PATH = STORAGE_DIR / "label_tables.json"
 
 
 def ensure_storage_dir():
@@ -38,6 +40,30 @@ def load_api_config() -> APIConfig:
         return APIConfig()
 
 
+def load_label_tables(path: Optional[Path] = None) -> LabelTables:
+    """
+    Načte tabulky klasifikace a primární energie (hranice tříd, faktory).
+    Pokud soubor neexistuje, vrátí výchozí tabulky; chybějící klíče
+    souboru mají výchozí hodnoty.
+    """
+    path = Path(path) if path is not None else LABEL_TABLES_PATH
+    if not path.exists():
+        return LabelTables()
+    
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return LabelTables(**json.load(f))
+    except Exception as e:
+        print(f"Varování: Nelze načíst tabulky štítku: {e}")
+        return LabelTables()
+
+
+@lru_cache(maxsize=1)
+def default_label_tables() -> LabelTables:
+    """Tabulky štítku ze storage/label_tables.json (načtou se jednou za běh)"""
+    return load_label_tables()
+
+
 def save_api_config(config: APIConfig):
     """
     Uloží API konfiguraci do souboru.
@@ -3,7 +3,7 @@ Datové modely pro energetický štítek
 Využívá pydantic pro validaci vstupů
 """
 from enum import Enum
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime, date
 from pydantic import BaseModel, Field, field_validator
 
@@ -20,10 +20,20 @@ class HeatingSystemType(str, Enum):
 class ComputationMode(str, Enum):
     """Režimy kvality výpočtu"""
     BASIC = "basic"  # Minimální data, rychlý odhad
+    FAST = "fast"  # 7+ dní, kalibrace nejmenšími čtverci bez simulací
     STANDARD = "standard"  # 7+ dní, hodinová data
+    MULTISTART = "multistart"  # 14+ dní, více paralelních lokálních optimalizací
+    BOOTSTRAP = "bootstrap"  # 14+ dní, STANDARD + intervaly spolehlivosti z bootstrapu
     ADVANCED = "advanced"  # 28+ dní, pokročilá kalibrace
 
 
+class RCModelOrder(str, Enum):
+    """Řád RC modelu budovy"""
+    RC1R1C = "1r1c"  # jedna kapacita (vzduch + konstrukce)
+    RC2R2C = "2r2c"  # vzduch + obálka (dvě kapacity v sérii)
+    RC3R2C = "3r2c"  # 2R2C + přímá ztráta okny
+
+
 class QualityLevel(str, Enum):
     """Úroveň spolehlivosti výsledků"""
     LOW = "low"
@@ -31,6 +41,15 @@ class QualityLevel(str, Enum):
     HIGH = "high"
 
 
+class JobStatus(str, Enum):
+    """Stav výpočtu na pozadí (core/jobs.py)"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
 class EnergyClass(str, Enum):
     """Energetické třídy (orientační)"""
     A = "A"
@@ -107,6 +126,10 @@ class TemperatureProfile(BaseModel):
 
 class UserInputs(BaseModel):
     """Kompletní uživatelské vstupy"""
+    # Identifikace bytu (pro opakované štítkování, volitelné)
+    apartment_id: Optional[str] = Field(None, description="ID bytu pro uložení kalibrace")
+    district: Optional[str] = Field(None, description="Městská část / okrsek pro statistiky portfolia")
+    
     # Geometrie
     geometry: ApartmentGeometry
     
@@ -119,6 +142,9 @@ class UserInputs(BaseModel):
     # Režim výpočtu
     computation_mode: ComputationMode = ComputationMode.STANDARD
     
+    # Řád RC modelu pro kalibraci a roční simulaci
+    model_order: RCModelOrder = RCModelOrder.RC1R1C
+    
     # Požadovaná komfortní teplota
     comfort_temperature: TemperatureProfile = TemperatureProfile()
     
@@ -134,6 +160,9 @@ class UserInputs(BaseModel):
         description="Měsíce v aktuálním roce, kdy nebylo nutné topit"
     )
     
+    # Manuální podíl TUV na celkové spotřebě (None = odhad modelem)
+    tuv_percentage: Optional[float] = Field(None, ge=0, le=100, description="Podíl TUV v %")
+    
     @field_validator('daily_energy')
     @classmethod
     def validate_data_length(cls, v, info):
@@ -144,7 +173,10 @@ class UserInputs(BaseModel):
         mode = info.data['computation_mode']
         required_days = {
             ComputationMode.BASIC: 1,
+            ComputationMode.FAST: 7,
             ComputationMode.STANDARD: 7,
+            ComputationMode.MULTISTART: 14,
+            ComputationMode.BOOTSTRAP: 14,
             ComputationMode.ADVANCED: 28
         }
         
@@ -166,6 +198,36 @@ class WeatherData(BaseModel):
     humidity_pct: Optional[float] = Field(None, ge=0, le=100, description="Relativní vlhkost %")
 
 
+class CalibrationTrace(BaseModel):
+    """Průběh globální optimalizace (po generacích)"""
+    method: str = Field(description="Optimalizační metoda, např. differential_evolution")
+    best_cost: List[float] = Field(default_factory=list, description="Nejlepší cost v každé generaci")
+    population_spread: List[float] = Field(
+        default_factory=list,
+        description="Směrodatná odchylka cost v populaci v každé generaci"
+    )
+    generations: int = Field(ge=0, description="Počet proběhlých generací")
+    max_generations: int = Field(ge=0, description="Maximální počet generací")
+    n_evaluations: int = Field(ge=0, description="Počet vyhodnocení funkce nákladů")
+    stopped_early: bool = Field(default=False, description="Ukončeno kritérium stagnace")
+
+
+class ParameterConfidence(BaseModel):
+    """Intervaly spolehlivosti a korelace parametrů z blokového bootstrapu"""
+    parameter_names: List[str] = Field(description="Názvy parametrů (pořadí korelační matice)")
+    intervals: Dict[str, Tuple[float, float]] = Field(description="Interval (dolní, horní) parametru")
+    correlation: List[List[float]] = Field(description="Korelační matice parametrů")
+    confidence_level: float = Field(gt=0, lt=1, description="Hladina intervalů, např. 0.9")
+    n_replicates: int = Field(ge=0, description="Počet dokončených replikací")
+    n_requested: int = Field(ge=0, description="Počet požadovaných replikací")
+    block_days: int = Field(ge=1, description="Délka bloku dní")
+    
+    def relative_width(self, name: str, estimate: float) -> float:
+        """Šířka intervalu parametru vztažená k bodovému odhadu"""
+        lower, upper = self.intervals[name]
+        return (upper - lower) / abs(estimate) if estimate else float('inf')
+
+
 class CalibratedParameters(BaseModel):
     """Kalibrované parametry budovy"""
     H_env_W_per_K: float = Field(gt=0, description="Tepelné ztráty obálkou W/K")
@@ -177,6 +239,77 @@ class CalibratedParameters(BaseModel):
     # Kvalita kalibrace
     rmse_temperature_c: float = Field(ge=0, description="RMSE vnitřní teploty °C")
     mape_energy_pct: float = Field(ge=0, description="MAPE denní energie %")
+    
+    # Vyšší řády RC modelu (None pro 1R1C)
+    model_order: RCModelOrder = RCModelOrder.RC1R1C
+    air_capacity_fraction: Optional[float] = Field(
+        None, gt=0, lt=1, description="Podíl C_th připadající na vzduch a vnitřní vybavení"
+    )
+    envelope_split: Optional[float] = Field(
+        None, gt=0, lt=1, description="Podíl odporu obálky mezi vzduchem a uzlem obálky"
+    )
+    window_fraction: Optional[float] = Field(
+        None, ge=0, lt=1, description="Podíl H_env jdoucí přímo ze vzduchu ven (okna)"
+    )
+    
+    # Aposteriorní kovariance vektoru parametrů [H_env, n, log(C_th), q_int, ...]
+    # (pořadí jako calibrator.parameters_to_vector; None = neodhadnuta)
+    parameter_covariance: Optional[List[List[float]]] = Field(
+        None, description="Kovariance parametrů z Hessiánu (Laplaceova aproximace)"
+    )
+    
+    # Intervaly spolehlivosti z blokového bootstrapu (pouze BOOTSTRAP)
+    confidence: Optional[ParameterConfidence] = None
+    
+    # Průběh optimalizace (pouze ADVANCED)
+    trace: Optional[CalibrationTrace] = None
+
+
+class OnlineEstimate(BaseModel):
+    """Aktuální odhad parametrů z rekurzivního (online) odhadu"""
+    H_total_W_per_K: float = Field(description="Celkové tepelné ztráty (obálka + větrání) W/K")
+    C_th_J_per_K: Optional[float] = Field(None, description="Tepelná kapacita J/K (jen z hodinových T_in)")
+    internal_gains_W_per_m2: float = Field(description="Interní zisky W/m²")
+    solar_aperture: float = Field(description="Efektivní plocha pro sluneční zisky (podíl plochy)")
+    n_hourly_updates: int = Field(ge=0)
+    n_daily_updates: int = Field(ge=0)
+
+
+class IncrementalState(BaseModel):
+    """Stav simulace na konci kalibračního okna (pro inkrementální kalibraci)"""
+    end_timestamp: datetime = Field(description="Poslední hodina okna")
+    T_in_end_c: float = Field(description="Simulovaná vnitřní teplota na konci okna °C")
+    
+    # Součty chyb přes všechna okna; každé okno je vyhodnocené s parametry
+    # platnými při jeho kalibraci (historie se znovu nesimuluje)
+    n_temp_hours: int = Field(default=0, ge=0)
+    sum_sq_temp_error: float = Field(default=0.0, ge=0)
+    n_energy_days: int = Field(default=0, ge=0)
+    sum_pct_energy_error: float = Field(default=0.0, ge=0, description="Součet |chyba|/pozorování")
+
+
+class StoredCalibration(BaseModel):
+    """Uložená kalibrace bytu pro teplý start dalšího výpočtu"""
+    apartment_id: str
+    data_hash: str = Field(description="Hash vstupních dat kalibrace")
+    mode: str = Field(description="Režim, ve kterém kalibrace proběhla")
+    parameters: CalibratedParameters
+    state: Optional[IncrementalState] = None
+    calibrated_at: datetime = Field(default_factory=datetime.now)
+
+
+class Scenario(BaseModel):
+    """Varianta "co kdyby" nad jedním kalibrovaným modelem (změny proti kalibraci)"""
+    name: str = Field(description="Název varianty")
+    setpoint_delta_c: float = Field(default=0.0, ge=-10.0, le=10.0,
+                                    description="Posun denní i noční teploty °C")
+    infiltration_factor: float = Field(default=1.0, gt=0, description="Násobek intenzity infiltrace")
+    H_env_factor: float = Field(default=1.0, gt=0, description="Násobek ztrát obálkou (zateplení)")
+    internal_gains_factor: float = Field(default=1.0, ge=0, description="Násobek interních zisků")
+    heating_system: Optional[HeatingSystemInfo] = Field(
+        None, description="Jiný zdroj tepla (None = stávající)"
+    )
+    heater_power_W: Optional[float] = Field(None, gt=0, description="Výkon otopné soustavy W")
 
 
 class AnnualResults(BaseModel):
@@ -189,12 +322,83 @@ class AnnualResults(BaseModel):
     # Interval spolehlivosti (5% - 95%)
     heating_demand_lower_bound: Optional[float] = None
     heating_demand_upper_bound: Optional[float] = None
+    energy_class_probabilities: Optional[Dict[str, float]] = Field(
+        None, description="Pravděpodobnost tříd z Monte Carlo simulace"
+    )
     
     # Metadata
     disclaimers: List[str] = []
     computation_date: datetime = Field(default_factory=datetime.now)
 
 
+class PipelineOutput(BaseModel):
+    """Výsledek celého výpočtu bytu (ukládá se do cache výpočtů)"""
+    annual_results: AnnualResults
+    calibrated: CalibratedParameters
+    suggestions: List[str] = []
+    warnings: List[str] = Field(default_factory=list, description="Varování kvality dat")
+    notes: List[str] = Field(default_factory=list, description="Informace o průběhu výpočtu")
+    from_cache: bool = Field(default=False, description="Výsledek vrácen z cache")
+
+
+class ProgressEvent(BaseModel):
+    """Událost průběhu výpočtu na pozadí"""
+    percent: int = Field(ge=0, le=100)
+    message: str
+    timestamp: datetime = Field(default_factory=datetime.now)
+
+
+class LabelTables(BaseModel):
+    """
+    Tabulky klasifikace a primární energie (data, ne kód).
+    
+    Hranice tříd jsou horní meze tříd A-F (G je vše nad poslední); lze je
+    přepsat souborem storage/label_tables.json (viz config.load_label_tables).
+    """
+    primary_thresholds: List[float] = Field(
+        default=[50, 75, 110, 150, 200, 270],
+        description="Horní meze tříd A-F podle primární energie kWh/(m²·rok)"
+    )
+    heating_thresholds: List[float] = Field(
+        default=[30, 50, 75, 100, 130, 180],
+        description="Horní meze tříd A-F podle potřeby tepla kWh/(m²·rok)"
+    )
+    primary_energy_factors: Dict[str, float] = Field(
+        default={'electricity': 3.0, 'natural_gas': 1.1},
+        description="Faktor primární energie nosiče"
+    )
+    system_carriers: Dict[str, str] = Field(
+        default={
+            HeatingSystemType.CONDENSING_BOILER.value: 'natural_gas',
+            HeatingSystemType.HEAT_PUMP_AIR.value: 'electricity',
+            HeatingSystemType.HEAT_PUMP_WATER.value: 'electricity',
+            HeatingSystemType.DIRECT_ELECTRIC.value: 'electricity',
+        },
+        description="Energetický nosič zdroje tepla"
+    )
+    unknown_system_factor: float = Field(
+        default=2.0, gt=0, description="Faktor pro neznámý zdroj (násobí přímo potřebu tepla)"
+    )
+    default_efficiency: Dict[str, float] = Field(
+        default={
+            HeatingSystemType.CONDENSING_BOILER.value: 0.85,
+            HeatingSystemType.DIRECT_ELECTRIC.value: 0.98,
+            HeatingSystemType.HEAT_PUMP_AIR.value: 2.5,
+            HeatingSystemType.HEAT_PUMP_WATER.value: 3.0,
+        },
+        description="Účinnost/COP zdroje, pokud není zadána"
+    )
+    
+    @field_validator('primary_thresholds', 'heating_thresholds')
+    @classmethod
+    def thresholds_increasing(cls, v):
+        if len(v) != len(EnergyClass) - 1:
+            raise ValueError(f'Hranic tříd musí být {len(EnergyClass) - 1}, je {len(v)}')
+        if any(b <= a for a, b in zip(v, v[1:])):
+            raise ValueError('Hranice tříd musí být rostoucí')
+        return v
+
+
 class APIConfig(BaseModel):
     """Konfigurace API"""
     weather_api_key: Optional[str] = None
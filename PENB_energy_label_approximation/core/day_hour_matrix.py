@@ -0,0 +1,228 @@
+"""
+Reprezentace hodinové řady jako matice den × hodina (n_dní × 24)
+
+Hodinové vzorky se jednou rozloží do matice s vektorem dní a maskou
+platnosti (mezery v datech, přechod na letní/zimní čas). Denní agregace
+je pak součet řádku a hodinové podíly jsou normalizace řádku - bez
+opakovaného groupby podle timestamp.dt.date.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+HOURS_PER_DAY = 24
+
+
+class DayHourMatrix:
+    """
+    Hodinová řada uspořádaná do matice (n_dní × 24).
+
+    Atributy:
+        values: float64 matice (n_dní × 24), NaN v neplatných buňkách
+        dates: datetime64[D] vektor dní (řádky matice)
+        mask: bool matice platných buněk
+
+    Pokud matice vznikla z DataFrame (from_hourly), pamatuje si rozložení
+    původních vzorků (řádek/hodina každého vzorku). Metody row_sum() a
+    row_normalize() pak pracují přímo s hodnotami vzorků ve stejném pořadí
+    jako původní DataFrame - i pro data s více vzorky v jedné hodině.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        dates: np.ndarray,
+        mask: Optional[np.ndarray] = None,
+        sample_rows: Optional[np.ndarray] = None,
+        sample_hours: Optional[np.ndarray] = None
+    ):
+        self.values = np.asarray(values, dtype=float)
+        self.dates = np.asarray(dates).astype('datetime64[D]')
+        self.mask = ~np.isnan(self.values) if mask is None else np.asarray(mask, dtype=bool)
+        self.sample_rows = sample_rows
+        self.sample_hours = sample_hours
+
+        if self.values.shape != (len(self.dates), HOURS_PER_DAY):
+            raise ValueError(
+                f"Matice musí mít tvar (n_dní, 24), má {self.values.shape} "
+                f"pro {len(self.dates)} dní"
+            )
+
+    @classmethod
+    def from_hourly(
+        cls,
+        hourly_df: pd.DataFrame,
+        column: str,
+        dates=None
+    ) -> 'DayHourMatrix':
+        """
+        Vytvoří matici ze sloupce hodinového DataFrame.
+
+        Args:
+            hourly_df: DataFrame s timestamp a sloupcem `column`
+            column: název sloupce s hodnotami
+            dates: dny pro řádky matice (None = všechny dny v hourly_df)
+
+        Returns:
+            DayHourMatrix; více vzorků ve stejné hodině se zprůměruje,
+            vzorky mimo `dates` mají sample_rows = -1
+        """
+        timestamps = pd.to_datetime(hourly_df['timestamp']).to_numpy()
+        days = timestamps.astype('datetime64[D]')
+
+        if dates is None:
+            dates = np.unique(days)
+        else:
+            dates = np.asarray(pd.to_datetime(pd.Series(dates)).to_numpy()).astype('datetime64[D]')
+
+        n_days = len(dates)
+        hours = (timestamps - days).astype('timedelta64[h]').astype(np.int64)
+
+        # Pozice dne v `dates`; vzorky mimo zadané dny dostanou řádek -1
+        rows = np.searchsorted(dates, days)
+        inside = rows < n_days
+        if n_days > 0:
+            inside &= dates[np.minimum(rows, n_days - 1)] == days
+        rows = np.where(inside, rows, -1)
+
+        matrix = cls(np.full((n_days, HOURS_PER_DAY), np.nan), dates,
+                     sample_rows=rows, sample_hours=hours)
+        return matrix.with_samples(hourly_df[column].to_numpy(dtype=float))
+
+    @property
+    def n_days(self) -> int:
+        return len(self.dates)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def _require_layout(self):
+        if self.sample_rows is None:
+            raise ValueError("Matice nemá rozložení vzorků (nevznikla z hodinových dat)")
+
+    def with_samples(self, sample_values: np.ndarray) -> 'DayHourMatrix':
+        """
+        Nová matice se stejným rozložením naplněná hodnotami vzorků.
+
+        Args:
+            sample_values: hodnoty ve stejném pořadí jako původní DataFrame
+        """
+        self._require_layout()
+        sample_values = np.asarray(sample_values, dtype=float)
+        keep = (self.sample_rows >= 0) & ~np.isnan(sample_values)
+
+        size = self.n_days * HOURS_PER_DAY
+        flat = self.sample_rows[keep] * HOURS_PER_DAY + self.sample_hours[keep]
+        sums = np.bincount(flat, weights=sample_values[keep], minlength=size)
+        counts = np.bincount(flat, minlength=size)
+
+        values = np.full(size, np.nan)
+        np.divide(sums, counts, out=values, where=counts > 0)
+
+        return DayHourMatrix(
+            values.reshape(self.n_days, HOURS_PER_DAY),
+            self.dates,
+            mask=(counts > 0).reshape(self.n_days, HOURS_PER_DAY),
+            sample_rows=self.sample_rows,
+            sample_hours=self.sample_hours
+        )
+
+    def with_values(self, values: np.ndarray) -> 'DayHourMatrix':
+        """Nová matice se stejnými dny, maskou a rozložením, jiné hodnoty"""
+        values = np.where(self.mask, values, np.nan)
+        return DayHourMatrix(values, self.dates, self.mask,
+                             self.sample_rows, self.sample_hours)
+
+    def daily_sum(self) -> np.ndarray:
+        """Denní součty (součet platných buněk řádku)"""
+        return np.where(self.mask, self.values, 0.0).sum(axis=1)
+
+    def daily_mean(self) -> np.ndarray:
+        """Denní průměry; dny bez platné hodiny jsou NaN"""
+        counts = self.mask.sum(axis=1)
+        means = np.full(self.n_days, np.nan)
+        np.divide(self.daily_sum(), counts, out=means, where=counts > 0)
+        return means
+
+    def row_shares(self) -> 'DayHourMatrix':
+        """
+        Podíly hodin na denním součtu (normalizace řádků).
+
+        Dny s nulovým součtem se rozdělí rovnoměrně mezi platné hodiny.
+        """
+        totals = self.daily_sum()[:, None]
+        counts = self.mask.sum(axis=1)[:, None]
+        uniform = np.divide(1.0, counts, out=np.zeros_like(totals), where=counts > 0)
+        shares = np.divide(self.values, totals, out=np.zeros_like(self.values), where=totals > 0)
+        return self.with_values(np.where(totals > 0, shares, uniform))
+
+    def to_hourly(self) -> np.ndarray:
+        """Hodnoty buněk rozvinuté zpět na původní vzorky (NaN mimo dny)"""
+        self._require_layout()
+        inside = self.sample_rows >= 0
+        out = np.full(len(self.sample_rows), np.nan)
+        out[inside] = self.values[self.sample_rows[inside], self.sample_hours[inside]]
+        return out
+
+    def row_sum(self, sample_values: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Denní součty hodnot vzorků (bez sestavení matice).
+
+        Args:
+            sample_values: hodnoty ve stejném pořadí jako původní DataFrame
+            weights: volitelné váhy vzorků
+
+        Returns:
+            (n_dní,) součty pro řádky matice
+        """
+        self._require_layout()
+        inside = self.sample_rows >= 0
+        values = np.asarray(sample_values, dtype=float)[inside]
+        if weights is not None:
+            values = values * np.asarray(weights, dtype=float)[inside]
+        return np.bincount(self.sample_rows[inside], weights=values, minlength=self.n_days)
+
+    def row_normalize(self, sample_values: np.ndarray) -> np.ndarray:
+        """
+        Podíly vzorků na součtu jejich dne (normalizace řádků ve vzorcích).
+
+        Dny s nulovým součtem se rozdělí rovnoměrně mezi vzorky dne.
+
+        Returns:
+            Podíly ve stejném pořadí jako sample_values (NaN mimo dny)
+        """
+        self._require_layout()
+        values = np.asarray(sample_values, dtype=float)
+        inside = self.sample_rows >= 0
+        rows = np.where(inside, self.sample_rows, 0)
+
+        totals = self.row_sum(values)[rows]
+        counts = np.bincount(self.sample_rows[inside], minlength=self.n_days)[rows]
+
+        shares = np.where(
+            totals > 0,
+            values / np.where(totals > 0, totals, 1.0),
+            1.0 / np.maximum(counts, 1)
+        )
+        return np.where(inside, shares, np.nan)
+
+    def align_daily(self, daily_df: pd.DataFrame, column: str) -> np.ndarray:
+        """
+        Hodnoty denního DataFrame seřazené podle řádků matice.
+
+        Returns:
+            (n_dní,) pole; dny, které v daily_df nejsou, jsou NaN
+        """
+        daily_dates = pd.to_datetime(daily_df['date']).to_numpy().astype('datetime64[D]')
+        series = pd.Series(daily_df[column].to_numpy(dtype=float), index=daily_dates)
+        series = series[~series.index.duplicated(keep='first')]
+        return series.reindex(self.dates).to_numpy()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Dlouhý formát: timestamp, value pro platné buňky"""
+        rows, hours = np.nonzero(self.mask)
+        timestamps = self.dates[rows].astype('datetime64[ns]') + hours.astype('timedelta64[h]')
+        return pd.DataFrame({'timestamp': timestamps, 'value': self.values[rows, hours]})
@@ -0,0 +1,207 @@
+"""
+Inkrementální kalibrace při příchodu nových denních odečtů
+
+Plná kalibrace bytu (calibrate_model_simple s apartment_id) uloží kromě
+parametrů i stav simulace na konci okna: vnitřní teplotu T_in a součty
+chyb (kvadráty chyb teploty, relativní chyby energie). Nové dny se pak
+simulují od uloženého T_in - historie se znovu nesimuluje ani nestahuje.
+
+Parametry se zpřesní několika kroky L-BFGS-B z uloženého řešení. Historie
+je v nákladech zastoupena kvadratickou vazbou na předchozí parametry
+(váha roste s počtem dní historie vůči novým dnům, historie se ale počítá
+nejvýše INCREMENTAL_MAX_HISTORY_DAYS dní), takže pár nových dní parametry
+posune jen mírně, ale ani po letech přírůstků kalibrace nezamrzne.
+
+Historie se znovu nesimuluje, proto RMSE/MAPE výsledku jsou metriky okna
+(nové dny s novými parametry). Součty chyb ve stavu se sčítají přes okna,
+každé vyhodnocené s parametry platnými v době jeho kalibrace. Kovariance
+a intervaly spolehlivosti se přebírají z poslední plné kalibrace.
+"""
+import hashlib
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+from core.calibrator import (
+    CalibrationObjective, PARAMETER_BOUNDS,
+    parameters_to_vector, prepare_calibration_hours
+)
+from core.data_models import CalibratedParameters, IncrementalState
+from core.parameter_store import ParameterStore, calibration_data_hash
+
+
+INCREMENTAL_MAXITER = 5
+# Odchylka parametru (podíl šířky bounds), která stojí 1 jednotku cost
+# při stejném počtu dní historie a nových dní
+INCREMENTAL_PRIOR_SCALE = 0.05
+# Strop dní historie pro váhu vazby (starší dny už váhu nezvyšují)
+INCREMENTAL_MAX_HISTORY_DAYS = 365
+
+
+class AnchoredObjective:
+    """
+    Cost nových dní + kvadratická vazba na předchozí parametry.
+
+    cost(p) = cost_new(p) + weight * Σ ((p - p_prev) / (scale * šířka))²
+    """
+
+    def __init__(
+        self,
+        objective: CalibrationObjective,
+        x_prev: np.ndarray,
+        weight: float,
+        scale: float = INCREMENTAL_PRIOR_SCALE
+    ):
+        self.objective = objective
+        self.x_prev = np.asarray(x_prev, dtype=float)
+        self.weight = weight
+        self.widths = np.array([b[1] - b[0] for b in PARAMETER_BOUNDS], dtype=float) * scale
+
+    def __call__(self, params) -> float:
+        deviation = (np.asarray(params, dtype=float) - self.x_prev) / self.widths
+        return self.objective(params) + self.weight * float(np.sum(deviation**2))
+
+
+def history_weight(
+    history_days: int,
+    new_days: int,
+    max_history_days: int = INCREMENTAL_MAX_HISTORY_DAYS
+) -> float:
+    """
+    Váha vazby na předchozí parametry: dny historie (nejvýše max_history_days)
+    na jeden nový den.
+    """
+    return min(history_days, max_history_days) / max(new_days, 1)
+
+
+def merge_states(previous: IncrementalState, window: IncrementalState) -> IncrementalState:
+    """
+    Stav na konci nového okna se součty chyb přes celou historii.
+
+    Součty se jen sčítají - dřívější okna zůstávají vyhodnocená s tehdejšími
+    parametry, nejde o chybu aktuálních parametrů na celé historii.
+    """
+    return IncrementalState(
+        end_timestamp=window.end_timestamp,
+        T_in_end_c=window.T_in_end_c,
+        n_temp_hours=previous.n_temp_hours + window.n_temp_hours,
+        sum_sq_temp_error=previous.sum_sq_temp_error + window.sum_sq_temp_error,
+        n_energy_days=previous.n_energy_days + window.n_energy_days,
+        sum_pct_energy_error=previous.sum_pct_energy_error + window.sum_pct_energy_error
+    )
+
+
+def calibrate_incremental(
+    apartment_id: str,
+    new_daily_energy_df: pd.DataFrame,
+    new_hourly_weather_df: pd.DataFrame,
+    geometry_volume_m3: float,
+    geometry_area_m2: float,
+    avg_indoor_temp: float,
+    store: Optional[ParameterStore] = None,
+    maxiter: int = INCREMENTAL_MAXITER
+) -> CalibratedParameters:
+    """
+    Zpřesní uloženou kalibraci bytu o nové dny.
+
+    Args:
+        apartment_id: ID bytu s uloženou plnou kalibrací
+        new_daily_energy_df: nové denní spotřeby s heating_kwh (starší dny se ignorují)
+        new_hourly_weather_df: hodinové počasí pro nové dny
+        geometry_volume_m3: objem bytu
+        geometry_area_m2: plocha bytu
+        avg_indoor_temp: průměrná vnitřní teplota
+        store: úložiště kalibrací (None = výchozí ParameterStore)
+        maxiter: počet iterací L-BFGS-B
+
+    Returns:
+        CalibratedParameters; RMSE/MAPE jsou metriky nového okna,
+        parameter_covariance a confidence z poslední plné kalibrace
+
+    Raises:
+        ValueError: byt nemá uloženou kalibraci se stavem simulace, nebo je
+            kalibrace pro model vyššího řádu (stav ukládá jen teplotu vzduchu)
+    """
+    store = store or ParameterStore()
+    stored = store.load(apartment_id)
+
+    if stored is None or stored.state is None:
+        raise ValueError(
+            f"Byt '{apartment_id}' nemá uloženou kalibraci - "
+            f"nejprve spusťte plnou kalibraci s apartment_id"
+        )
+    if stored.parameters.model_order.value != "1r1c":
+        raise ValueError(
+            f"Inkrementální kalibrace podporuje pouze model 1R1C "
+            f"(byt '{apartment_id}' má {stored.parameters.model_order.value.upper()})"
+        )
+
+    previous = stored.state
+    print(f"\n=== Inkrementální kalibrace '{apartment_id}' ===")
+
+    # Pouze dny po konci uloženého okna
+    dates = pd.to_datetime(new_daily_energy_df['date'])
+    new_daily = new_daily_energy_df[dates > pd.Timestamp(previous.end_timestamp).normalize()]
+
+    if new_daily.empty:
+        print("  Žádné nové dny - používám uloženou kalibraci")
+        return stored.parameters
+
+    first_day = pd.to_datetime(new_daily['date']).min()
+    hourly_times = pd.to_datetime(new_hourly_weather_df['timestamp'])
+    new_hourly = new_hourly_weather_df[hourly_times >= first_day]
+
+    hourly_with_energy = prepare_calibration_hours(new_daily, new_hourly, avg_indoor_temp)
+    objective = CalibrationObjective(
+        new_daily,
+        hourly_with_energy,
+        geometry_volume_m3,
+        geometry_area_m2,
+        initial_indoor_temp=previous.T_in_end_c
+    )
+
+    # Zpřesnění z uložených parametrů, historie jako vazba
+    x_prev = np.clip(parameters_to_vector(stored.parameters),
+                     [b[0] for b in PARAMETER_BOUNDS], [b[1] for b in PARAMETER_BOUNDS])
+    weight = history_weight(previous.n_energy_days, len(new_daily))
+
+    result = minimize(
+        AnchoredObjective(objective, x_prev, weight),
+        x_prev,
+        method='L-BFGS-B',
+        bounds=PARAMETER_BOUNDS,
+        options={'maxiter': maxiter}
+    )
+
+    window = objective.end_state(result.x)
+    state = merge_states(previous, window)
+    rmse = np.sqrt(window.sum_sq_temp_error / window.n_temp_hours) if window.n_temp_hours else 999.0
+    mape = window.sum_pct_energy_error / window.n_energy_days * 100 if window.n_energy_days else 999.0
+
+    calibrated = CalibratedParameters(
+        H_env_W_per_K=result.x[0],
+        infiltration_rate_per_h=result.x[1],
+        C_th_J_per_K=np.exp(result.x[2]),
+        baseline_TUV_kwh_per_day=stored.parameters.baseline_TUV_kwh_per_day,
+        internal_gains_W_per_m2=result.x[3],
+        rmse_temperature_c=rmse,
+        mape_energy_pct=mape,
+        parameter_covariance=stored.parameters.parameter_covariance,
+        confidence=stored.parameters.confidence
+    )
+
+    # Hash řetězí předchozí hash s novými daty (včetně baseline TUV jako u plné kalibrace)
+    window_hash = calibration_data_hash(
+        new_daily, hourly_with_energy, geometry_volume_m3, geometry_area_m2, avg_indoor_temp,
+        stored.parameters.baseline_TUV_kwh_per_day
+    )
+    data_hash = hashlib.sha256((stored.data_hash + window_hash).encode('utf-8')).hexdigest()
+    store.save(apartment_id, calibrated, data_hash, stored.mode, state=state)
+
+    print(f"✓ +{len(new_daily)} dní ({result.nfev} vyhodnocení): "
+          f"H_env {stored.parameters.H_env_W_per_K:.1f} → {calibrated.H_env_W_per_K:.1f} W/K, "
+          f"MAPE okna {mape:.1f} %")
+
+    return calibrated
@@ -0,0 +1,254 @@
+"""
+Výpočty na pozadí s průběhem a zrušením (pro GUI)
+
+JobManager drží sdílenou frontu úloh (ThreadPoolExecutor s omezeným
+počtem workerů - víc souběžných uživatelů čeká ve frontě, server zůstává
+volný). Úloha je funkce fn(progress, should_stop):
+
+- progress(procenta, text) zapíše událost průběhu do fronty úlohy, GUI ji
+  při dalším překreslení vyzvedne přes Job.poll();
+- should_stop() vrací True po Job.cancel(). Výpočet se ruší kooperativně:
+  progress() po zrušení vyhodí ComputationCancelled a kalibrace kontroluje
+  should_stop při vyhodnocení funkce nákladů (viz calibrate_model_simple).
+
+Vlákna, ne procesy: úloha sdílí cache etap GUI a do procesů by se musely
+serializovat vstupy i výsledky; těžké části kalibrace si procesy
+(MULTISTART, BOOTSTRAP) spouštějí samy.
+"""
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from core.data_models import JobStatus, ProgressEvent
+
+
+# Počet souběžně běžících výpočtů (ostatní čekají ve frontě)
+JOB_WORKERS = 2
+# Jak dlouho se drží dokončené úlohy, které si GUI nevyzvedlo (s)
+JOB_RETENTION_S = 3600
+# Jak často se při čekání na procesy kontroluje zrušení (s)
+CANCEL_POLL_S = 0.1
+
+StopCheck = Callable[[], bool]
+
+
+class ComputationCancelled(Exception):
+    """Výpočet byl zrušen uživatelem"""
+
+
+def check_cancelled(should_stop: Optional[StopCheck]) -> None:
+    """Vyhodí ComputationCancelled, pokud bylo požádáno o zrušení"""
+    if should_stop is not None and should_stop():
+        raise ComputationCancelled("Výpočet byl zrušen")
+
+
+def as_completed_cancellable(
+    futures: Iterable[Future],
+    should_stop: Optional[StopCheck],
+    timeout: Optional[float] = None
+) -> Iterator[Future]:
+    """
+    Jako concurrent.futures.as_completed, ale zrušení se kontroluje
+    každých CANCEL_POLL_S i během čekání na dlouho běžící úlohu.
+
+    Raises:
+        ComputationCancelled: should_stop() vrátilo True
+        TimeoutError: do timeout sekund nebyly hotové všechny úlohy
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    pending = set(futures)
+    while pending:
+        check_cancelled(should_stop)
+        poll_s = CANCEL_POLL_S
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"{len(pending)} úloh nedokončeno v časovém limitu")
+            poll_s = min(poll_s, remaining)
+        done, pending = wait(pending, timeout=poll_s, return_when=FIRST_COMPLETED)
+        yield from done
+
+
+def stop_process_pool(executor: ProcessPoolExecutor) -> None:
+    """
+    Ukončí pool procesů hned: zruší nezahájené úlohy a běžící workery ukončí.
+
+    shutdown(wait=False, cancel_futures=True) nechá rozběhnuté úlohy
+    doběhnout na pozadí - po předčasném konci (shoda startů, vyčerpaný
+    rozpočet, zrušení uživatelem) by dál zabíraly CPU.
+    """
+    terminate_workers = getattr(executor, 'terminate_workers', None)
+    if terminate_workers is not None:  # Python 3.14+
+        terminate_workers()
+        return
+
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join()
+
+
+class Job:
+    """
+    Jedna úloha ve frontě.
+
+    Attributes:
+        job_id: identifikátor úlohy
+        status: JobStatus
+        history: všechny dosud vyzvednuté události průběhu
+        result: návratová hodnota úlohy (status DONE)
+        error: výjimka úlohy (status FAILED)
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.status = JobStatus.QUEUED
+        self.history: List[ProgressEvent] = []
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.error_traceback: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        self._events: "queue.Queue[ProgressEvent]" = queue.Queue()
+        self._cancel = threading.Event()
+        self._future: Optional[Future] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    @property
+    def progress(self) -> int:
+        """Poslední hlášené procento (po poll())"""
+        return self.history[-1].percent if self.history else 0
+
+    @property
+    def message(self) -> str:
+        """Poslední hlášený text (po poll())"""
+        return self.history[-1].message if self.history else ""
+
+    def report(self, percent: int, message: str) -> None:
+        """Callback průběhu pro úlohu; po zrušení vyhodí ComputationCancelled"""
+        check_cancelled(self.cancel_requested)
+        self._events.put(ProgressEvent(percent=percent, message=message))
+
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        """Požádá o zrušení; úloha čekající ve frontě se zruší hned"""
+        self._cancel.set()
+        if self._future is not None and self._future.cancel():
+            self._finish(JobStatus.CANCELLED)
+
+    def poll(self) -> List[ProgressEvent]:
+        """Vyzvedne nové události průběhu (přidá je do history)"""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+        self.history.extend(events)
+        return events
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Počká na dokončení úlohy, vrací done"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(0.01)
+        return self.done
+
+    def _finish(self, status: JobStatus) -> None:
+        self.finished_at = time.monotonic()
+        self.status = status
+
+
+class JobManager:
+    """
+    Fronta výpočtů na pozadí sdílená všemi relacemi GUI.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        if max_workers is None:
+            try:
+                max_workers = max(1, int(os.getenv("PENB_JOB_WORKERS", JOB_WORKERS)))
+            except ValueError:
+                max_workers = JOB_WORKERS
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="penb-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[Callable[[int, str], None], StopCheck], Any]) -> Job:
+        """
+        Zařadí úlohu fn(progress, should_stop) do fronty.
+
+        Returns:
+            Job (status QUEUED, po převzetí workerem RUNNING)
+        """
+        self._prune()
+        job = Job(uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        job._future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def forget(self, job_id: str) -> None:
+        """Odebere úlohu (po vyzvednutí výsledku)"""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def active_jobs(self) -> int:
+        """Počet čekajících a běžících úloh"""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.done)
+
+    def shutdown(self, cancel: bool = True) -> None:
+        """Ukončí frontu (běžící úlohy se při cancel=True požádají o zrušení)"""
+        if cancel:
+            with self._lock:
+                jobs = list(self._jobs.values())
+            for job in jobs:
+                job.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=cancel)
+
+    def _run(self, job: Job, fn) -> None:
+        if job.cancel_requested():
+            job._finish(JobStatus.CANCELLED)
+            return
+
+        job.status = JobStatus.RUNNING
+        try:
+            job.result = fn(job.report, job.cancel_requested)
+            job._finish(JobStatus.DONE)
+        except ComputationCancelled:
+            print(f"⚠ Úloha {job.job_id[:8]} zrušena")
+            job._finish(JobStatus.CANCELLED)
+        except Exception as e:
+            job.error = e
+            job.error_traceback = traceback.format_exc()
+            job._finish(JobStatus.FAILED)
+
+    def _prune(self) -> None:
+        """Zapomene dokončené úlohy starší než JOB_RETENTION_S"""
+        now = time.monotonic()
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job.done and now - job.finished_at > JOB_RETENTION_S]:
+                del self._jobs[job_id]
@@ -0,0 +1,279 @@
+"""
+Kalibrace 1R1C modelu v uzavřeném tvaru (lineární nejmenší čtverce)
+
+Diskretizovaný 1R1C model je lineární v parametrech (ARX tvar):
+
+    T_in[k+1] = a·T_in[k] + b·T_out[k] + c·Q_heat[k] + d·GHI[k] + e
+
+    a = α,  b = (1 - α),  c = β,  d = β·A·ap,  e = β·Q_int
+
+kde α = exp(-dt·H/C), β = (1 - α)/H je přesný krok modelu (ZOH,
+core.rc_kernel). Jedno volání lstsq tedy dá H, C_th i zisky včetně
+kovariance odhadu.
+ARX tvar vyžaduje měřenou (proměnnou) vnitřní teplotu. Pokud je T_in
+konstantní (typický případ - známe jen průměrnou teplotu), fituje se
+denní ustálená bilance:
+
+    Q_heat_avg = H·(T_in - T_out) - A_sol·GHI - Q_int
+
+která určí H a zisky (C_th zůstane neurčené).
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.day_hour_matrix import DayHourMatrix
+from core.rc_kernel import zoh_parameters
+
+
+MIN_TEMP_IN_STD_C = 0.05   # pod touto variabilitou T_in je ARX tvar neurčený
+C_TH_RANGE_J_PER_K = (1e5, 1e8)  # fyzikálně přípustná tepelná kapacita bytu
+
+
+class LinearFit:
+    """
+    Výsledek lineárního fitu.
+
+    Atributy:
+        names: názvy koeficientů
+        coef: odhady koeficientů
+        covariance: kovariance odhadu σ²·(XᵀX)⁻¹
+        residual_std: směrodatná odchylka reziduí
+        n_obs: počet pozorování
+    """
+
+    def __init__(self, names: List[str], coef: np.ndarray, covariance: np.ndarray,
+                 residual_std: float, n_obs: int):
+        self.names = names
+        self.coef = coef
+        self.covariance = covariance
+        self.residual_std = residual_std
+        self.n_obs = n_obs
+
+    @property
+    def std_errors(self) -> np.ndarray:
+        return np.sqrt(np.clip(np.diag(self.covariance), 0, None))
+
+    def __getitem__(self, name: str) -> float:
+        return float(self.coef[self.names.index(name)])
+
+
+class RCLeastSquaresFit:
+    """
+    Fyzikální parametry z lineárního fitu.
+
+    Atributy:
+        method: "arx" (hodinový dynamický tvar) nebo "steady_state" (denní bilance)
+        H_total_W_per_K, H_total_std: celkové ztráty a jejich směrodatná chyba
+        C_th_J_per_K, C_th_std: tepelná kapacita (None pro steady_state)
+        Q_internal_W: interní zisky (W, celý byt)
+        solar_aperture_m2: efektivní plocha pro sluneční zisky
+        fit: podkladový LinearFit
+        gradients: gradienty fyzikálních veličin ('H_total', 'C_th',
+            'Q_internal_W') podle fit.coef pro delta metodu
+    """
+
+    def __init__(self, method: str, H_total_W_per_K: float, H_total_std: float,
+                 Q_internal_W: float, solar_aperture_m2: float, fit: LinearFit,
+                 C_th_J_per_K: Optional[float] = None, C_th_std: Optional[float] = None,
+                 gradients: Optional[Dict[str, np.ndarray]] = None):
+        self.method = method
+        self.H_total_W_per_K = H_total_W_per_K
+        self.H_total_std = H_total_std
+        self.C_th_J_per_K = C_th_J_per_K
+        self.C_th_std = C_th_std
+        self.Q_internal_W = Q_internal_W
+        self.solar_aperture_m2 = solar_aperture_m2
+        self.fit = fit
+        self.gradients = gradients or {}
+
+    def covariance(self, quantities: List[str]) -> np.ndarray:
+        """
+        Kovariance veličin (názvy z gradients) delta metodou: J·Σ·Jᵀ,
+        kde Σ je kovariance koeficientů lstsq.
+        """
+        jacobian = np.array([self.gradients[name] for name in quantities])
+        return jacobian @ self.fit.covariance @ jacobian.T
+
+
+def ordinary_least_squares(X: np.ndarray, y: np.ndarray, names: List[str]) -> LinearFit:
+    """
+    OLS přes np.linalg.lstsq s kovariancí koeficientů.
+
+    Raises:
+        ValueError: málo pozorování nebo singulární matice regresorů
+    """
+    valid = np.isfinite(y) & np.isfinite(X).all(axis=1)
+    X, y = X[valid], y[valid]
+    n_obs, n_params = X.shape
+
+    if n_obs <= n_params:
+        raise ValueError(f"Málo pozorování pro fit ({n_obs}, potřeba > {n_params})")
+
+    coef, _, rank, _ = np.linalg.lstsq(X, y, rcond=None)
+    if rank < n_params:
+        raise ValueError(f"Regresory jsou lineárně závislé (hodnost {rank} < {n_params})")
+
+    residuals = y - X @ coef
+    sigma2 = float(residuals @ residuals) / (n_obs - n_params)
+    covariance = sigma2 * np.linalg.inv(X.T @ X)
+
+    return LinearFit(names, coef, covariance, float(np.sqrt(sigma2)), n_obs)
+
+
+def fit_arx(hourly_df: pd.DataFrame, dt_seconds: float = 3600) -> RCLeastSquaresFit:
+    """
+    Fit hodinového ARX tvaru z po sobě jdoucích hodin.
+
+    Args:
+        hourly_df: timestamp, temp_in_c, temp_out_c, heating_power_W, (ghi_wm2)
+
+    Raises:
+        ValueError: T_in je (téměř) konstantní nebo fit není fyzikální
+            (θ_heat ≤ 0 nebo θ_loss mimo (0, 1))
+    """
+    T_in = hourly_df['temp_in_c'].to_numpy(dtype=float)
+    if np.nanstd(T_in) < MIN_TEMP_IN_STD_C:
+        raise ValueError("Vnitřní teplota je konstantní - ARX tvar nelze určit")
+
+    T_out = hourly_df['temp_out_c'].to_numpy(dtype=float)
+    Q_heat = hourly_df['heating_power_W'].to_numpy(dtype=float)
+
+    # Pouze dvojice hodin vzdálené přesně dt
+    timestamps = pd.to_datetime(hourly_df['timestamp']).to_numpy()
+    consecutive = np.diff(timestamps) == np.timedelta64(int(dt_seconds), 's')
+
+    # Parametrizace přes rozdíly: T[k+1] - T[k] = θ1(T_out - T_in) + θ2·Q + θ3·GHI + θ4
+    columns = [T_out[:-1] - T_in[:-1], Q_heat[:-1]]
+    names = ['theta_loss', 'theta_heat']
+    if 'ghi_wm2' in hourly_df.columns:
+        columns.append(hourly_df['ghi_wm2'].to_numpy(dtype=float)[:-1])
+        names.append('theta_solar')
+    columns.append(np.ones(len(T_in) - 1))
+    names.append('theta_const')
+
+    X = np.column_stack(columns)[consecutive]
+    y = np.diff(T_in)[consecutive]
+    fit = ordinary_least_squares(X, y, names)
+
+    theta_loss, theta_heat = fit['theta_loss'], fit['theta_heat']
+    if theta_heat <= 0:
+        raise ValueError("ARX fit vrátil nefyzikální tepelnou kapacitu (θ_heat ≤ 0)")
+
+    # θ_loss = 1 - α, θ_heat = β
+    H_total, C_th = zoh_parameters(1 - theta_loss, theta_heat, dt_seconds)
+
+    # Chyby parametrů (delta metoda)
+    i_loss, i_heat = names.index('theta_loss'), names.index('theta_heat')
+    grad_H = np.zeros(len(names))
+    grad_H[i_loss] = 1 / theta_heat
+    grad_H[i_heat] = -theta_loss / theta_heat**2
+
+    # C = -dt·θ_loss / (θ_heat·ln(1 - θ_loss))
+    log_alpha = np.log(1 - theta_loss)
+    grad_C = np.zeros(len(names))
+    grad_C[i_loss] = -dt_seconds / theta_heat * (
+        log_alpha + theta_loss / (1 - theta_loss)
+    ) / log_alpha**2
+    grad_C[i_heat] = -C_th / theta_heat
+
+    # Q_int = θ_const / θ_heat
+    theta_const = fit['theta_const']
+    grad_Q = np.zeros(len(names))
+    grad_Q[names.index('theta_const')] = 1 / theta_heat
+    grad_Q[i_heat] = -theta_const / theta_heat**2
+
+    return RCLeastSquaresFit(
+        method="arx",
+        H_total_W_per_K=H_total,
+        H_total_std=float(np.sqrt(grad_H @ fit.covariance @ grad_H)),
+        Q_internal_W=theta_const / theta_heat,
+        solar_aperture_m2=fit['theta_solar'] / theta_heat if 'theta_solar' in names else 0.0,
+        fit=fit,
+        C_th_J_per_K=C_th,
+        C_th_std=float(np.sqrt(grad_C @ fit.covariance @ grad_C)),
+        gradients={'H_total': grad_H, 'C_th': grad_C, 'Q_internal_W': grad_Q}
+    )
+
+
+def fit_steady_state(
+    daily_energy_df: pd.DataFrame,
+    hourly_weather_df: pd.DataFrame,
+    avg_indoor_temp: float
+) -> RCLeastSquaresFit:
+    """
+    Fit denní ustálené bilance z denní spotřeby na vytápění.
+
+    Args:
+        daily_energy_df: date, heating_kwh
+        hourly_weather_df: timestamp, temp_out_c, (ghi_wm2, temp_in_c)
+        avg_indoor_temp: vnitřní teplota, pokud hourly_weather_df nemá temp_in_c
+    """
+    temp_out = DayHourMatrix.from_hourly(hourly_weather_df, 'temp_out_c')
+    mean_out = temp_out.daily_mean()
+
+    if 'temp_in_c' in hourly_weather_df.columns:
+        mean_in = temp_out.with_samples(hourly_weather_df['temp_in_c'].to_numpy(dtype=float)).daily_mean()
+    else:
+        mean_in = np.full(temp_out.n_days, avg_indoor_temp)
+
+    power_W = temp_out.align_daily(daily_energy_df, 'heating_kwh') * 1000 / 24
+
+    delta_T = mean_in - mean_out
+    constant = -np.ones(temp_out.n_days)
+    fit = None
+
+    # Sluneční člen jen pokud GHI mezi dny dostatečně kolísá (jinak splývá se zisky)
+    if 'ghi_wm2' in hourly_weather_df.columns:
+        ghi = temp_out.with_samples(hourly_weather_df['ghi_wm2'].to_numpy(dtype=float)).daily_mean()
+        try:
+            fit = ordinary_least_squares(
+                np.column_stack([delta_T, -ghi, constant]), power_W,
+                ['H_total', 'solar_aperture_m2', 'Q_internal_W']
+            )
+        except ValueError:
+            fit = None
+
+    if fit is None:
+        fit = ordinary_least_squares(
+            np.column_stack([delta_T, constant]), power_W, ['H_total', 'Q_internal_W']
+        )
+    names = fit.names
+    unit = np.eye(len(names))
+
+    return RCLeastSquaresFit(
+        method="steady_state",
+        H_total_W_per_K=fit['H_total'],
+        H_total_std=float(fit.std_errors[0]),
+        Q_internal_W=fit['Q_internal_W'],
+        solar_aperture_m2=fit['solar_aperture_m2'] if 'solar_aperture_m2' in names else 0.0,
+        fit=fit,
+        gradients={name: unit[names.index(name)] for name in ('H_total', 'Q_internal_W')}
+    )
+
+
+def fit_rc_least_squares(
+    daily_energy_df: pd.DataFrame,
+    hourly_df: pd.DataFrame,
+    avg_indoor_temp: float
+) -> RCLeastSquaresFit:
+    """
+    ARX fit, pokud jsou hodinová data s měřenou T_in, jinak denní bilance.
+
+    Args:
+        daily_energy_df: date, heating_kwh
+        hourly_df: timestamp, temp_out_c, (temp_in_c, heating_power_W, ghi_wm2)
+        avg_indoor_temp: průměrná vnitřní teplota
+    """
+    if {'temp_in_c', 'heating_power_W'} <= set(hourly_df.columns):
+        try:
+            arx = fit_arx(hourly_df)
+            if arx.H_total_W_per_K > 0 and \
+                    C_TH_RANGE_J_PER_K[0] <= arx.C_th_J_per_K <= C_TH_RANGE_J_PER_K[1]:
+                return arx
+            print("  ARX fit vrátil nefyzikální parametry, používám denní bilanci")
+        except ValueError as e:
+            print(f"  ARX fit nelze použít ({e}), používám denní bilanci")
+
+    return fit_steady_state(daily_energy_df, hourly_df, avg_indoor_temp)
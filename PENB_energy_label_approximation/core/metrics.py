@@ -1,13 +1,55 @@
 """
 Klasifikace do energetických tříd a výpočet metrik
 """
-from core.data_models import EnergyClass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core.config import default_label_tables
+from core.data_models import EnergyClass, LabelTables
+from core.simulate_year import calculate_primary_energy_array
+
+
+# Třídy v pořadí hranic (A = pod první hranicí, G = nad poslední)
+CLASS_LETTERS = np.array([c.value for c in EnergyClass])
+
+
+def classify_energy_labels(
+    heating_demand_kwh_per_m2_year,
+    primary_energy_kwh_per_m2_year,
+    use_primary: bool = True,
+    tables: Optional[LabelTables] = None
+) -> np.ndarray:
+    """
+    Přiřadí orientační energetické třídy celému poli bytů najednou.
+    
+    Třída = počet hranic ≤ hodnota (np.searchsorted), hranice viz LabelTables.
+    
+    Args:
+        heating_demand_kwh_per_m2_year: měrná potřeba tepla (skalár nebo pole)
+        primary_energy_kwh_per_m2_year: primární energie (skalár nebo pole)
+        use_primary: použít primární energii (True) nebo potřebu tepla (False)
+        tables: tabulky hranic (None = default_label_tables())
+    
+    Returns:
+        Pole písmen tříd ('A' - 'G') tvaru vstupu
+    """
+    tables = tables or default_label_tables()
+    if use_primary:
+        values, thresholds = primary_energy_kwh_per_m2_year, tables.primary_thresholds
+    else:
+        values, thresholds = heating_demand_kwh_per_m2_year, tables.heating_thresholds
+    index = np.searchsorted(np.asarray(thresholds, dtype=float),
+                            np.asarray(values, dtype=float), side='right')
+    return CLASS_LETTERS[index]
 
 
 def classify_energy_label(
     heating_demand_kwh_per_m2_year: float,
     primary_energy_kwh_per_m2_year: float,
-    use_primary: bool = True
+    use_primary: bool = True,
+    tables: Optional[LabelTables] = None
 ) -> EnergyClass:
     """
     Přiřadí orientační energetickou třídu.
@@ -19,45 +61,41 @@ def classify_energy_label(
         heating_demand_kwh_per_m2_year: měrná potřeba tepla
         primary_energy_kwh_per_m2_year: primární energie
         use_primary: použít primární energii (True) nebo potřebu tepla (False)
+        tables: tabulky hranic (None = default_label_tables())
     
     Returns:
         EnergyClass
     """
-    value = primary_energy_kwh_per_m2_year if use_primary else heating_demand_kwh_per_m2_year
+    return EnergyClass(str(classify_energy_labels(
+        heating_demand_kwh_per_m2_year, primary_energy_kwh_per_m2_year, use_primary, tables
+    )))
+
+
+def classify_portfolio(
+    portfolio: pd.DataFrame,
+    use_primary: bool = True,
+    tables: Optional[LabelTables] = None
+) -> pd.DataFrame:
+    """
+    Primární energie a třída pro portfolio bytů jedním voláním.
     
-    # Orientační hranice (pro bytové domy, zjednodušené)
-    if use_primary:
-        # Primární energie
-        if value < 50:
-            return EnergyClass.A
-        elif value < 75:
-            return EnergyClass.B
-        elif value < 110:
-            return EnergyClass.C
-        elif value < 150:
-            return EnergyClass.D
-        elif value < 200:
-            return EnergyClass.E
-        elif value < 270:
-            return EnergyClass.F
-        else:
-            return EnergyClass.G
-    else:
-        # Potřeba tepla
-        if value < 30:
-            return EnergyClass.A
-        elif value < 50:
-            return EnergyClass.B
-        elif value < 75:
-            return EnergyClass.C
-        elif value < 100:
-            return EnergyClass.D
-        elif value < 130:
-            return EnergyClass.E
-        elif value < 180:
-            return EnergyClass.F
-        else:
-            return EnergyClass.G
+    Args:
+        portfolio: sloupce heating_kwh_per_m2, system_type a volitelně
+            efficiency_or_cop (chybějící/NaN = výchozí účinnost zdroje)
+    
+    Returns:
+        Kopie portfolia se sloupci primary_kwh_per_m2 a energy_class
+    """
+    result = portfolio.copy()
+    efficiency = (result['efficiency_or_cop'] if 'efficiency_or_cop' in result.columns
+                  else None)
+    result['primary_kwh_per_m2'] = calculate_primary_energy_array(
+        result['heating_kwh_per_m2'], result['system_type'], efficiency, tables
+    )
+    result['energy_class'] = classify_energy_labels(
+        result['heating_kwh_per_m2'], result['primary_kwh_per_m2'], use_primary, tables
+    )
+    return result
 
 
 def get_class_description(energy_class: EnergyClass) -> str:
@@ -0,0 +1,210 @@
+"""
+Online (rekurzivní) odhad parametrů RC modelu z průběžně přicházejících dat
+
+Alternativa k dávkové calibrate_model_simple: každá nová hodina nebo den
+aktualizuje odhad metodou rekurzivních nejmenších čtverců (RLS) v čase O(1),
+bez opakované simulace a optimalizace. Odhady pro mnoho bytů se drží
+v jednom poli (n_bytů × n_parametrů) a aktualizují vektorově.
+
+Dvě lineární formy 1R1C modelu:
+
+1) Hodinová (přesný krok ZOH, dt = 1 h), pokud známe vnitřní teplotu:
+   T_in[k+1] - T_in[k] = θ1·(T_out - T_in[k]) + θ2·Q_heat + θ3·GHI + θ4
+   θ1 = 1 - α, θ2 = β, θ3 = β·A·ap, θ4 = β·q_int·A
+   (α = exp(-dt·H/C), β = (1 - α)/H, viz core.rc_kernel)
+
+2) Denní ustálená bilance (pouze denní spotřeba):
+   Q_heat_avg = H·(T_in - T_out) - A_sol·GHI - Q_int
+"""
+from typing import Optional, Union
+
+import numpy as np
+
+from core.data_models import OnlineEstimate
+from core.rc_kernel import zoh_parameters
+
+
+class RecursiveLeastSquares:
+    """
+    Rekurzivní nejmenší čtverce pro n_series nezávislých řad najednou.
+
+    Atributy:
+        theta: (n_series, n_params) aktuální odhady
+        P: (n_series, n_params, n_params) kovariance odhadu (bez σ²)
+        n_updates: (n_series,) počet aktualizací
+    """
+
+    def __init__(
+        self,
+        n_params: int,
+        n_series: int = 1,
+        forgetting: float = 1.0,
+        initial_covariance: Union[float, np.ndarray] = 1e4,
+        theta0: Optional[np.ndarray] = None
+    ):
+        """
+        Args:
+            n_params: počet parametrů
+            n_series: počet nezávislých řad (bytů)
+            forgetting: faktor zapomínání λ ∈ (0, 1] (1 = bez zapomínání)
+            initial_covariance: počáteční rozptyl (skalár nebo vektor n_params)
+            theta0: počáteční odhad (n_params,) nebo (n_series, n_params)
+        """
+        if not 0 < forgetting <= 1:
+            raise ValueError(f"Faktor zapomínání musí být v (0, 1], je {forgetting}")
+
+        self.forgetting = forgetting
+        self.theta = np.zeros((n_series, n_params))
+        if theta0 is not None:
+            self.theta[:] = theta0
+
+        P0 = np.diag(np.broadcast_to(np.asarray(initial_covariance, dtype=float), (n_params,)))
+        self.P = np.repeat(P0[None, :, :], n_series, axis=0)
+        self.n_updates = np.zeros(n_series, dtype=np.int64)
+
+    def update(self, phi: np.ndarray, y: np.ndarray, active: Optional[np.ndarray] = None):
+        """
+        Jeden krok RLS pro všechny řady.
+
+        Args:
+            phi: regresory (n_series, n_params)
+            y: pozorování (n_series,)
+            active: maska řad, které mají nové pozorování (None = všechny;
+                řady s NaN v phi nebo y se přeskočí)
+        """
+        phi = np.atleast_2d(np.asarray(phi, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+
+        valid = np.isfinite(y) & np.isfinite(phi).all(axis=1)
+        if active is not None:
+            valid &= np.asarray(active, dtype=bool)
+        if not valid.any():
+            return
+
+        phi_v = phi[valid]
+        P_v = self.P[valid]
+        theta_v = self.theta[valid]
+
+        P_phi = np.einsum('nij,nj->ni', P_v, phi_v)
+        denominator = self.forgetting + np.einsum('ni,ni->n', phi_v, P_phi)
+        gain = P_phi / denominator[:, None]
+        error = y[valid] - np.einsum('ni,ni->n', phi_v, theta_v)
+
+        self.theta[valid] = theta_v + gain * error[:, None]
+        P_new = (P_v - gain[:, :, None] * P_phi[:, None, :]) / self.forgetting
+        self.P[valid] = 0.5 * (P_new + np.transpose(P_new, (0, 2, 1)))  # symetrie
+        self.n_updates[valid] += 1
+
+
+class OnlineRCEstimator:
+    """
+    Průběžný odhad H_total, C_th a zisků pro jeden nebo více bytů.
+
+    Hodinové aktualizace (update_hour) vyžadují měřenou vnitřní teplotu
+    a určí i C_th. Denní aktualizace (update_day) stačí na H_total a zisky.
+    """
+
+    def __init__(
+        self,
+        area_m2: Union[float, np.ndarray],
+        n_apartments: int = 1,
+        forgetting: float = 0.999,
+        dt_seconds: float = 3600
+    ):
+        """
+        Args:
+            area_m2: plocha bytu (skalár nebo pole n_apartments)
+            n_apartments: počet sledovaných bytů
+            forgetting: faktor zapomínání (sledování pomalých změn, např. po rekonstrukci)
+            dt_seconds: délka hodinového kroku
+        """
+        self.n_apartments = n_apartments
+        self.area_m2 = np.broadcast_to(np.asarray(area_m2, dtype=float), (n_apartments,)).copy()
+        self.dt = dt_seconds
+
+        # Hodinová forma: [θ1, θ2, θ3, θ4]
+        self.hourly = RecursiveLeastSquares(4, n_apartments, forgetting, initial_covariance=1e2)
+
+        # Denní forma: [H_total, A_sol, Q_int]; apriorně H ~ 100 W/K, q_int ~ 3 W/m²
+        theta0 = np.column_stack([
+            np.full(n_apartments, 100.0),
+            0.02 * self.area_m2,
+            3.0 * self.area_m2
+        ])
+        self.daily = RecursiveLeastSquares(
+            3, n_apartments, forgetting,
+            initial_covariance=[1e4, 1e2, 1e4],
+            theta0=theta0
+        )
+
+    def _column(self, values) -> np.ndarray:
+        return np.broadcast_to(np.asarray(values, dtype=float), (self.n_apartments,))
+
+    def update_hour(self, T_in_prev, T_in, T_out, Q_heat_W, ghi_wm2=0.0, active=None):
+        """
+        Aktualizace z jedné hodiny (vnitřní teplota na začátku a konci hodiny).
+
+        Všechny argumenty jsou skaláry nebo pole (n_apartments,).
+        """
+        T_in_prev = self._column(T_in_prev)
+        phi = np.column_stack([
+            self._column(T_out) - T_in_prev,
+            self._column(Q_heat_W),
+            self._column(ghi_wm2),
+            np.ones(self.n_apartments)
+        ])
+        self.hourly.update(phi, self._column(T_in) - T_in_prev, active)
+
+    def update_day(self, heating_kwh, mean_temp_out_c, mean_temp_in_c, mean_ghi_wm2=0.0, active=None):
+        """
+        Aktualizace z jednoho dne (denní spotřeba na vytápění a denní průměry).
+
+        Všechny argumenty jsou skaláry nebo pole (n_apartments,).
+        """
+        phi = np.column_stack([
+            self._column(mean_temp_in_c) - self._column(mean_temp_out_c),
+            -self._column(mean_ghi_wm2),
+            -np.ones(self.n_apartments)
+        ])
+        mean_power_W = self._column(heating_kwh) * 1000 / 24
+        self.daily.update(phi, mean_power_W, active)
+
+    def estimate(self, apartment: int = 0) -> Optional[OnlineEstimate]:
+        """
+        Aktuální odhad parametrů bytu.
+
+        H_total a zisky se berou z denní formy, pokud už proběhla alespoň
+        jedna denní aktualizace, jinak z hodinové. C_th je k dispozici jen
+        z hodinové formy (po alespoň 4 aktualizacích a pro θ2 > 0, 0 < θ1 < 1).
+
+        Returns:
+            OnlineEstimate, nebo None, dokud odhad nevychází z dat (žádná
+            denní aktualizace a hodinová forma ještě nedává platné
+            parametry) - jinak by se vrátila jen počáteční hodnota theta0
+        """
+        area = self.area_m2[apartment]
+        n_hourly = int(self.hourly.n_updates[apartment])
+        n_daily = int(self.daily.n_updates[apartment])
+
+        theta1, theta2, theta3, theta4 = self.hourly.theta[apartment]
+        dynamic_ok = n_hourly >= 4 and theta2 > 0 and 0 < theta1 < 1
+        C_th = zoh_parameters(1 - theta1, theta2, self.dt)[1] if dynamic_ok else None
+
+        if n_daily == 0 and not dynamic_ok:
+            return None
+
+        if n_daily > 0:
+            H_total, A_sol, Q_int = self.daily.theta[apartment]
+        else:
+            H_total = theta1 / theta2
+            A_sol = theta3 / theta2
+            Q_int = theta4 / theta2
+
+        return OnlineEstimate(
+            H_total_W_per_K=float(H_total),
+            C_th_J_per_K=float(C_th) if dynamic_ok else None,
+            internal_gains_W_per_m2=float(Q_int / area),
+            solar_aperture=float(A_sol / area),
+            n_hourly_updates=n_hourly,
+            n_daily_updates=n_daily
+        )
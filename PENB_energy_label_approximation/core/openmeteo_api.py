@@ -12,6 +12,8 @@ from typing import List, Tuple
 import pandas as pd
 import numpy as np
 
+from core.weather_schema import make_weather_frame, concat_weather_frames
+
 
 def fetch_openmeteo_historical(
     latitude: float,
@@ -35,7 +37,8 @@ def fetch_openmeteo_historical(
         end_date: Konec období
     
     Returns:
-        DataFrame s sloupci: timestamp, temp_out_c, humidity_pct, wind_mps, ghi_wm2
+        DataFrame podle schématu core.weather_schema: timestamp, temp_out_c,
+        ghi_wm2, wind_mps, humidity_pct, source
     """
     
     print(f"\n📡 Open-Meteo API: Stahuji data pro {latitude:.4f}, {longitude:.4f}")
@@ -70,16 +73,11 @@ def fetch_openmeteo_historical(
         
         # Vytvoř DataFrame
         df = pd.DataFrame({
-            'timestamp': pd.to_datetime(times),
             'temp_out_c': hourly['temperature_2m'],
             'humidity_pct': hourly['relative_humidity_2m'],
             'wind_kmh': hourly['wind_speed_10m'],
             'ghi_wm2': hourly['shortwave_radiation']
-        })
-        
-        # Konverze km/h → m/s
-        df['wind_mps'] = df['wind_kmh'] / 3.6
-        df = df.drop('wind_kmh', axis=1)
+        }, dtype=float)
         
         # Kontrola NaN hodnot
         nan_count = df.isna().sum().sum()
@@ -88,6 +86,16 @@ def fetch_openmeteo_historical(
             df = df.interpolate(method='linear', limit=3, limit_area='inside')
             df = df.bfill().ffill()
         
+        # Konverze km/h → m/s a vynucení schématu (float32, kategorie zdroje)
+        df = make_weather_frame(
+            pd.to_datetime(times),
+            df['temp_out_c'],
+            ghi_wm2=df['ghi_wm2'],
+            wind_mps=df['wind_kmh'] / 3.6,
+            humidity_pct=df['humidity_pct'],
+            source='Open-Meteo'
+        )
+        
         print(f"   ✅ Úspěšně staženo: {len(df)} hodin")
         print(f"   📍 Skutečná poloha: {data['latitude']:.4f}, {data['longitude']:.4f}")
         print(f"   🏔️  Nadmořská výška: {data['elevation']:.1f} m")
@@ -285,8 +293,7 @@ def fetch_with_fallback_strategy(
     
     # Spojení dat
     if all_data:
-        df_combined = pd.concat(all_data, ignore_index=True)
-        df_combined = df_combined.sort_values('timestamp').reset_index(drop=True)
+        df_combined = concat_weather_frames(all_data)
         
         print(f"\n{'='*70}")
         print(f"✅ CELKEM: {len(df_combined)} hodin")
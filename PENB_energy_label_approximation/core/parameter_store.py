@@ -0,0 +1,144 @@
+"""
+Úložiště kalibrovaných parametrů podle ID bytu
+
+Pro každý byt se ukládá poslední CalibratedParameters spolu s hashem
+vstupních dat. Při opakovaném štítkování stejného bytu (např. měsíčně
+s několika novými týdny dat) kalibrace startuje z uložených parametrů
+a při nezměněných datech se přeskočí úplně.
+
+Soubory: storage/calibrations/<id>-<hash id>.json (zápis atomicky přes
+os.replace). Znaky mimo [\\w.-] se v názvu nahradí '_', krátký hash přesného
+ID odliší např. "Byt 1" a "Byt_1"; načtení navíc porovná uložené ID.
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core.config import STORAGE_DIR
+from core.data_models import CalibratedParameters, IncrementalState, StoredCalibration
+
+
+PARAMETER_STORE_DIR = STORAGE_DIR / "calibrations"
+
+# Měřené hodinové veličiny, které čte kalibrace (simulace, fit nejmenších
+# čtverců i teplý start); volitelné se hashují, pokud jsou ve vstupu
+CALIBRATION_HOURLY_COLUMNS = ('temp_out_c', 'temp_in_c', 'ghi_wm2')
+
+
+def calibration_data_hash(
+    daily_energy_df: pd.DataFrame,
+    hourly_weather_df: pd.DataFrame,
+    *scalars
+) -> str:
+    """
+    Hash vstupů kalibrace (denní energie, hodinové počasí, skalární vstupy).
+
+    Z hodinových dat se hashují časová razítka a všechny měřené veličiny,
+    které kalibrace čte (CALIBRATION_HOURLY_COLUMNS - venkovní a vnitřní
+    teplota, sluneční záření). Ostatní sloupce (např. kategorie zdroje
+    počasí) hash nemění.
+
+    Args:
+        daily_energy_df: denní spotřeby (date, heating_kwh)
+        hourly_weather_df: hodinové počasí (timestamp, temp_out_c,
+            volitelně temp_in_c, ghi_wm2)
+        *scalars: další číselné vstupy (objem, plocha, teplota, ...)
+
+    Returns:
+        SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+
+    def update(values, dtype):
+        digest.update(np.ascontiguousarray(np.asarray(values, dtype=dtype)).tobytes())
+
+    update(pd.to_datetime(daily_energy_df['date']).to_numpy().astype('datetime64[D]').view(np.int64), np.int64)
+    update(daily_energy_df['heating_kwh'].to_numpy(dtype=float), np.float64)
+    update(pd.to_datetime(hourly_weather_df['timestamp']).to_numpy().astype('datetime64[s]').view(np.int64), np.int64)
+
+    for column in CALIBRATION_HOURLY_COLUMNS:
+        if column in hourly_weather_df.columns:
+            digest.update(column.encode('utf-8'))
+            update(hourly_weather_df[column].to_numpy(dtype=float), np.float64)
+
+    digest.update(np.asarray(scalars, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class ParameterStore:
+    """
+    Adresář s posledními kalibracemi bytů (jeden JSON na byt).
+    """
+
+    def __init__(self, root: Path = PARAMETER_STORE_DIR):
+        self.root = Path(root)
+
+    def _path(self, apartment_id: str) -> Path:
+        safe_id = re.sub(r'[^\w.-]', '_', apartment_id.strip())
+        if not safe_id:
+            raise ValueError("ID bytu nesmí být prázdné")
+        id_hash = hashlib.sha256(apartment_id.encode('utf-8')).hexdigest()[:8]
+        return self.root / f"{safe_id}-{id_hash}.json"
+
+    def load(self, apartment_id: str) -> Optional[StoredCalibration]:
+        """
+        Načte poslední kalibraci bytu. Vrací None, pokud neexistuje,
+        je soubor poškozený nebo patří jinému ID bytu.
+        """
+        path = self._path(apartment_id)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = StoredCalibration(**json.load(f))
+        except Exception as e:
+            print(f"Varování: Nelze načíst uloženou kalibraci {path.name}: {e}")
+            return None
+
+        if stored.apartment_id != apartment_id:
+            print(f"Varování: {path.name} patří bytu '{stored.apartment_id}', "
+                  f"ne '{apartment_id}' - ignoruji")
+            return None
+        return stored
+
+    def save(
+        self,
+        apartment_id: str,
+        parameters: CalibratedParameters,
+        data_hash: str,
+        mode: str,
+        state: Optional[IncrementalState] = None
+    ) -> Path:
+        """
+        Uloží kalibraci bytu (přepíše předchozí).
+
+        Args:
+            state: stav simulace na konci okna pro inkrementální kalibraci
+
+        Returns:
+            Cesta k uloženému souboru
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(apartment_id)
+
+        stored = StoredCalibration(
+            apartment_id=apartment_id,
+            data_hash=data_hash,
+            mode=mode,
+            parameters=parameters,
+            state=state
+        )
+
+        tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.tmp.json")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(stored.model_dump_json(indent=2))
+        os.replace(tmp_path, path)
+
+        return path
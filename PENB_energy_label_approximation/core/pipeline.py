@@ -0,0 +1,311 @@
+"""
+Celý výpočet štítku bytu jako posloupnost etap
+
+Etapy (každá je samostatná funkce, GUI i dávky je mohou volat zvlášť):
+1. fetch_weather        - naměřené hodinové počasí pro období dat
+2. fetch_typical_year   - typický rok pro lokalitu
+3. prepare_inputs       - zarovnání, vnitřní teplota, rozdělení vytápění/TUV
+4. calibrate            - kalibrace RC modelu
+5. evaluate_annual      - roční simulace, primární energie, třída, nejistota
+
+run_pipeline je spojí a výsledek uloží do PipelineCache pod klíčem ze
+vstupů, verze dat počasí a verze kódu (viz core/pipeline_cache.py); při
+shodě klíče se kalibrace i simulace přeskočí.
+
+Každá etapa se navíc spouští přes StageRunner s klíčem etapy
+(pipeline_cache.stage_key) - GUI tak etapy memoizuje zvlášť a změna
+vstupu, který čte jen pozdější etapa (např. zdroj tepla), přepočítá jen ji.
+"""
+from typing import Any, Callable, List, Optional, Tuple
+
+import pandas as pd
+
+from core.baseline_split import split_heating_and_tuv
+from core.calibrator import calibrate_model_simple
+from core.data_models import AnnualResults, CalibratedParameters, PipelineOutput, UserInputs
+from core.jobs import StopCheck, check_cancelled
+from core.metrics import classify_energy_label
+from core.pipeline_cache import PipelineCache, pipeline_cache_key, stage_key, weather_version
+from core.preprocess import (
+    align_daily_energy_to_hourly, clean_weather_data, create_hourly_indoor_temp,
+    merge_hourly_data, validate_data_quality
+)
+from core.quality_flags import assess_quality_level, generate_disclaimers, suggest_improvements
+from core.simulate_year import (
+    calculate_primary_energy, estimate_uncertainty_bounds, simulate_annual_heating_demand
+)
+from core.uncertainty import monte_carlo_annual
+from core.weather_api import create_typical_year_weather, fetch_hourly_weather
+
+
+# progress(procenta, text) - např. Streamlit progress bar
+ProgressCallback = Callable[[int, str], None]
+
+
+def _no_progress(percent: int, message: str) -> None:
+    pass
+
+
+# runner(etapa, klíč etapy, funkce, *argumenty) -> výsledek funkce (např. s memoizací)
+StageRunner = Callable[..., Any]
+
+
+def run_stage(stage: str, key: str, fn: Callable, *args):
+    """Výchozí StageRunner: etapa se vždy spustí"""
+    return fn(*args)
+
+
+def average_indoor_temperature(user_inputs: UserInputs) -> float:
+    """Průměrná vnitřní teplota: zadaná, nebo vážený průměr den/noc z profilu"""
+    if user_inputs.avg_indoor_temp_c is not None:
+        return user_inputs.avg_indoor_temp_c
+    profile = user_inputs.comfort_temperature
+    day_hours = profile.day_end_hour - profile.day_start_hour
+    return (profile.day_temp_c * day_hours + profile.night_temp_c * (24 - day_hours)) / 24
+
+
+def fetch_weather(user_inputs: UserInputs, api_key: str) -> pd.DataFrame:
+    """Etapa 1: vyčištěné hodinové počasí pro období denních spotřeb"""
+    dates = [d.date for d in user_inputs.daily_energy]
+    weather_df = fetch_hourly_weather(user_inputs.location, min(dates), max(dates), api_key)
+    return clean_weather_data(weather_df)
+
+
+def fetch_typical_year(user_inputs: UserInputs, api_key: str) -> pd.DataFrame:
+    """Etapa 2: typický meteorologický rok pro lokalitu"""
+    return create_typical_year_weather(user_inputs.location, api_key)
+
+
+def prepare_inputs(
+    user_inputs: UserInputs,
+    weather_df: pd.DataFrame
+) -> Tuple[pd.DataFrame, pd.DataFrame, float, List[str], List[str]]:
+    """
+    Etapa 3: zarovnání dat, vnitřní teplota a rozdělení na vytápění a TUV.
+
+    Returns:
+        (daily_df, hourly_df, baseline_tuv, warnings, notes)
+    """
+    avg_indoor_temp = average_indoor_temperature(user_inputs)
+    profile = user_inputs.comfort_temperature
+    notes: List[str] = []
+
+    daily_df = pd.DataFrame([d.model_dump() for d in user_inputs.daily_energy])
+    daily_df, weather_df = align_daily_energy_to_hourly(daily_df, weather_df)
+
+    indoor_temp_df = create_hourly_indoor_temp(
+        avg_indoor_temp,
+        weather_df,
+        day_temp=profile.day_temp_c,
+        night_temp=profile.night_temp_c,
+        day_start_hour=profile.day_start_hour,
+        day_end_hour=profile.day_end_hour
+    )
+    hourly_df = merge_hourly_data(weather_df, indoor_temp_df)
+
+    warnings = validate_data_quality(daily_df, hourly_df)
+
+    tuv_percentage = user_inputs.tuv_percentage
+    non_heating_months = user_inputs.non_heating_months
+
+    if tuv_percentage is not None:
+        # Manuální nastavení podílu TUV
+        daily_df['baseline_tuv_kwh'] = daily_df['energy_total_kwh'] * (tuv_percentage / 100)
+        daily_df['heating_kwh'] = daily_df['energy_total_kwh'] * (1 - tuv_percentage / 100)
+        baseline_tuv = daily_df['baseline_tuv_kwh'].mean()
+        notes.append(f"💧 Použit manuální podíl TUV: {tuv_percentage}% ({baseline_tuv:.2f} kWh/den)")
+    elif non_heating_months:
+        # Použij data z označených měsíců pro baseline TUV
+        daily_df['month'] = pd.to_datetime(daily_df['date']).dt.month
+        daily_df['year'] = pd.to_datetime(daily_df['date']).dt.year
+
+        # Filtruj pouze rok 2025 a označené měsíce
+        non_heating_mask = (
+            (daily_df['year'] == 2025) &
+            (daily_df['month'].isin(non_heating_months))
+        )
+
+        if non_heating_mask.sum() > 0:
+            baseline_tuv = daily_df.loc[non_heating_mask, 'energy_total_kwh'].mean()
+            daily_df = split_heating_and_tuv(daily_df, baseline_tuv_kwh=baseline_tuv)
+            notes.append(f"💧 Baseline TUV z měsíců bez topení: {baseline_tuv:.2f} kWh/den "
+                         f"(použito {non_heating_mask.sum()} dní)")
+        else:
+            # Nebyly nalezeny žádné dny v označených měsících
+            daily_df = split_heating_and_tuv(daily_df)
+            baseline_tuv = daily_df['baseline_tuv_kwh'].iloc[0]
+            notes.append("⚠ V datech nebyla data z označených měsíců - použit automatický odhad")
+    else:
+        # Standardní aproximace (10. percentil)
+        daily_df = split_heating_and_tuv(daily_df)
+        baseline_tuv = daily_df['baseline_tuv_kwh'].iloc[0]
+
+    return daily_df, hourly_df, float(baseline_tuv), warnings, notes
+
+
+def calibrate(
+    user_inputs: UserInputs,
+    daily_df: pd.DataFrame,
+    hourly_df: pd.DataFrame,
+    baseline_tuv: float,
+    should_stop: Optional[StopCheck] = None
+) -> CalibratedParameters:
+    """Etapa 4: kalibrace RC modelu (should_stop = zrušení, viz core/jobs.py)"""
+    return calibrate_model_simple(
+        daily_df,
+        hourly_df,
+        user_inputs.geometry.volume_m3,
+        user_inputs.geometry.area_m2,
+        average_indoor_temperature(user_inputs),
+        baseline_tuv,
+        mode=user_inputs.computation_mode.value,
+        apartment_id=user_inputs.apartment_id,
+        model_order=user_inputs.model_order.value,
+        should_stop=should_stop
+    )
+
+
+def evaluate_annual(
+    user_inputs: UserInputs,
+    calibrated: CalibratedParameters,
+    typical_year: pd.DataFrame,
+    n_days: int,
+    warnings: List[str]
+) -> Tuple[AnnualResults, List[str]]:
+    """
+    Etapa 5: roční potřeba tepla, primární energie, třída, kvalita a nejistota.
+
+    Returns:
+        (AnnualResults, návrhy zlepšení)
+    """
+    geometry = user_inputs.geometry
+    heating_system = user_inputs.heating_system
+    mode = user_inputs.computation_mode
+
+    annual_sim = simulate_annual_heating_demand(
+        calibrated,
+        typical_year,
+        geometry.volume_m3,
+        geometry.area_m2,
+        user_inputs.comfort_temperature
+    )
+    heating_demand_kwh = annual_sim['heating_demand_W'].sum() / 1000
+    heating_per_m2 = heating_demand_kwh / geometry.area_m2
+
+    eff_final = heating_system.efficiency_or_cop or heating_system.get_default_efficiency()[0]
+    primary = calculate_primary_energy(
+        heating_demand_kwh,
+        heating_system.system_type.value,
+        eff_final
+    )
+    primary_per_m2 = primary / geometry.area_m2
+
+    energy_class = classify_energy_label(heating_per_m2, primary_per_m2)
+    quality = assess_quality_level(mode, n_days, calibrated, warnings)
+
+    # Nejistota: Monte Carlo z kovariance kalibrace, jinak heuristika
+    class_probabilities = None
+    if calibrated.parameter_covariance is not None:
+        monte_carlo = monte_carlo_annual(
+            calibrated, typical_year, geometry.volume_m3, geometry.area_m2,
+            user_inputs.comfort_temperature,
+            system_type=heating_system.system_type.value, efficiency_or_cop=eff_final
+        )
+        lower, upper = monte_carlo.bounds()
+        class_probabilities = monte_carlo.class_probabilities()
+    else:
+        lower, upper = estimate_uncertainty_bounds(calibrated, heating_per_m2, warnings)
+
+    disclaimers = generate_disclaimers(quality, mode, n_days, warnings)
+    suggestions = suggest_improvements(quality, mode, n_days, calibrated)
+
+    annual_results = AnnualResults(
+        heating_demand_kwh_per_m2_year=heating_per_m2,
+        primary_energy_kwh_per_m2_year=primary_per_m2,
+        energy_class=energy_class,
+        quality_level=quality,
+        heating_demand_lower_bound=lower,
+        heating_demand_upper_bound=upper,
+        energy_class_probabilities=class_probabilities,
+        disclaimers=disclaimers
+    )
+    return annual_results, suggestions
+
+
+def run_pipeline(
+    user_inputs: UserInputs,
+    api_key: str,
+    cache: Optional[PipelineCache] = None,
+    progress: ProgressCallback = _no_progress,
+    runner: StageRunner = run_stage,
+    should_stop: Optional[StopCheck] = None
+) -> PipelineOutput:
+    """
+    Celý výpočet bytu s cache výsledků.
+
+    Počasí se získává vždy (jeho verze je součástí klíče); kalibrace a
+    roční simulace proběhnou jen při neshodě klíče.
+
+    Args:
+        user_inputs: validované vstupy
+        api_key: API klíč pro počasí
+        cache: cache celých výsledků (None = bez cache)
+        progress: callback průběhu progress(procenta, text)
+        runner: spouštění etap s klíčem etapy (viz run_stage)
+        should_stop: zrušení výpočtu - kontroluje se na každém kontrolním bodě
+            průběhu i během kalibrace (vyhodí core.jobs.ComputationCancelled)
+
+    Returns:
+        PipelineOutput (from_cache=True při zásahu cache)
+    """
+    def checkpoint(percent: int, message: str) -> None:
+        check_cancelled(should_stop)
+        progress(percent, message)
+    
+    checkpoint(10, "📡 Stahuji historická data o počasí...")
+    weather_df = runner('weather', stage_key('weather', user_inputs),
+                        fetch_weather, user_inputs, api_key)
+
+    checkpoint(25, "☀️ Vytvářím typický meteorologický rok...")
+    typical_year = runner('typical_year', stage_key('typical_year', user_inputs),
+                          fetch_typical_year, user_inputs, api_key)
+
+    key = None
+    if cache is not None:
+        key = pipeline_cache_key(user_inputs, weather_version(weather_df, typical_year))
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"✓ Výsledek z cache výpočtů ({key[:12]})")
+            progress(100, "✅ Výsledek načten z cache")
+            return cached
+
+    checkpoint(35, "🔧 Zpracovávám a zarovnávám data...")
+    prepare_key = stage_key('prepare', user_inputs, weather_version(weather_df))
+    daily_df, hourly_df, baseline_tuv, warnings, notes = runner(
+        'prepare', prepare_key, prepare_inputs, user_inputs, weather_df
+    )
+
+    checkpoint(55, "🎯 Kalibruji termický model...")
+    calibrate_key = stage_key('calibrate', user_inputs, prepare_key)
+    calibrated = runner('calibrate', calibrate_key,
+                        calibrate, user_inputs, daily_df, hourly_df, baseline_tuv, should_stop)
+
+    checkpoint(80, "📅 Simuluji roční potřebu tepla a nejistotu...")
+    annual_key = stage_key('annual', user_inputs, calibrate_key, weather_version(typical_year))
+    annual_results, suggestions = runner(
+        'annual', annual_key,
+        evaluate_annual, user_inputs, calibrated, typical_year, len(daily_df), warnings
+    )
+
+    output = PipelineOutput(
+        annual_results=annual_results,
+        calibrated=calibrated,
+        suggestions=suggestions,
+        warnings=warnings,
+        notes=notes
+    )
+    if cache is not None:
+        cache.put(key, output)
+
+    progress(100, "✅ Výpočet úspěšně dokončen!")
+    return output
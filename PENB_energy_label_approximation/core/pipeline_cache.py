@@ -0,0 +1,182 @@
+"""
+Cache celých výpočtů bytu adresovaná obsahem
+
+Klíč = SHA-256 z validovaných UserInputs, verze dat počasí (hash
+naměřeného počasí a typického roku) a verze kódu (hash zdrojů core/).
+Stejné vstupy nad stejnými daty a stejným kódem dají stejný klíč, takže
+opakovaný výpočet (rerun GUI, opakovaná dávka) vrátí uložený
+PipelineOutput okamžitě. Jakákoli změna vstupů, dat nebo kódu vede na
+nový klíč - staré položky se jen přestanou používat a vytlačí je LRU.
+
+Soubory: storage/pipeline_cache/<klíč>.json (zápis atomicky přes os.replace).
+Čas posledního použití = mtime souboru (při zásahu se obnoví), při
+překročení max_entries se mažou nejdéle nepoužité položky.
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core.config import STORAGE_DIR
+from core.data_models import PipelineOutput, UserInputs
+
+
+PIPELINE_CACHE_DIR = STORAGE_DIR / "pipeline_cache"
+PIPELINE_CACHE_MAX_ENTRIES = 256
+
+# Pole UserInputs, která výpočet neovlivňují (jen metadata výsledku)
+KEY_EXCLUDED_FIELDS = {'district'}
+
+# Pole UserInputs, na kterých závisí jednotlivé etapy výpočtu (viz core/pipeline.py);
+# 'period' = první a poslední den denních spotřeb. Klíč etapy navíc obsahuje
+# klíč/verzi dat předchozí etapy, takže změna vstupu přepočítá jen etapy,
+# které ho čtou, a etapy za nimi.
+STAGE_FIELDS = {
+    'weather': ('location', 'period'),
+    'typical_year': ('location',),
+    'prepare': ('daily_energy', 'comfort_temperature', 'avg_indoor_temp_c',
+                'tuv_percentage', 'non_heating_months'),
+    'calibrate': ('geometry', 'computation_mode', 'model_order', 'apartment_id'),
+    'annual': ('geometry', 'heating_system', 'comfort_temperature', 'computation_mode'),
+}
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash zdrojových souborů core/ (mění se s každou úpravou výpočtu)"""
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def weather_version(*weather_dfs: pd.DataFrame) -> str:
+    """
+    Verze dat počasí = hash časových razítek a číselných sloupců
+    (pořadí sloupců nehraje roli, textové sloupce jako source se ignorují).
+    """
+    digest = hashlib.sha256()
+    for df in weather_dfs:
+        timestamps = pd.to_datetime(df['timestamp']).to_numpy().astype('datetime64[s]')
+        digest.update(timestamps.view(np.int64).tobytes())
+        for column in sorted(df.columns):
+            if column != 'timestamp' and pd.api.types.is_numeric_dtype(df[column]):
+                digest.update(column.encode())
+                digest.update(np.ascontiguousarray(df[column].to_numpy(dtype=float)).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def pipeline_cache_key(user_inputs: UserInputs, weather_ver: str, code_ver: Optional[str] = None) -> str:
+    """
+    Klíč výpočtu (SHA-256 hex).
+
+    Args:
+        user_inputs: validované vstupy
+        weather_ver: verze dat počasí (viz weather_version)
+        code_ver: verze kódu (None = code_version())
+    """
+    digest = hashlib.sha256()
+    digest.update(user_inputs.model_dump_json(exclude=KEY_EXCLUDED_FIELDS).encode())
+    digest.update(weather_ver.encode())
+    digest.update((code_ver or code_version()).encode())
+    return digest.hexdigest()
+
+
+def stage_key(stage: str, user_inputs: UserInputs, *upstream: str) -> str:
+    """
+    Klíč jedné etapy výpočtu.
+
+    Args:
+        stage: název etapy (klíč STAGE_FIELDS)
+        user_inputs: validované vstupy (použijí se jen pole etapy)
+        *upstream: klíče předchozích etap / verze jejich dat
+
+    Returns:
+        SHA-256 hex (zkrácený na 32 znaků)
+    """
+    fields = set(STAGE_FIELDS[stage])
+    payload = user_inputs.model_dump(mode='json', include=fields - {'period'})
+    if 'period' in fields:
+        dates = [d.date for d in user_inputs.daily_energy]
+        payload['period'] = [min(dates).isoformat(), max(dates).isoformat()]
+
+    digest = hashlib.sha256(stage.encode())
+    digest.update(json.dumps(payload, sort_keys=True).encode())
+    for version in upstream:
+        digest.update(version.encode())
+    digest.update(code_version().encode())
+    return digest.hexdigest()[:32]
+
+
+class PipelineCache:
+    """
+    Adresář s výsledky výpočtů (jeden JSON na klíč), omezený LRU.
+    """
+
+    def __init__(self, root: Path = PIPELINE_CACHE_DIR, max_entries: int = PIPELINE_CACHE_MAX_ENTRIES):
+        self.root = Path(root)
+        self.max_entries = max_entries
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def __len__(self) -> int:
+        return len(list(self.root.glob("*.json"))) if self.root.exists() else 0
+
+    def get(self, key: str) -> Optional[PipelineOutput]:
+        """
+        Vrátí uložený výsledek (from_cache=True) a obnoví čas použití.
+        Vrací None, pokud položka neexistuje nebo je poškozená.
+        """
+        path = self._path(key)
+        if not path.exists():
+            return None
+
+        try:
+            output = PipelineOutput.model_validate_json(path.read_text(encoding='utf-8'))
+            os.utime(path)
+        except Exception as e:
+            print(f"Varování: Nelze načíst výsledek z cache {path.name}: {e}")
+            return None
+
+        output.from_cache = True
+        return output
+
+    def put(self, key: str, output: PipelineOutput) -> Path:
+        """Uloží výsledek a vytlačí nejdéle nepoužité položky nad max_entries"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+
+        tmp_path = path.with_name(f".{key}.{os.getpid()}.tmp.json")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(output.model_copy(update={'from_cache': False}).model_dump_json())
+        os.replace(tmp_path, path)
+
+        self.evict()
+        return path
+
+    def evict(self) -> int:
+        """Smaže nejdéle nepoužité položky nad max_entries, vrací jejich počet"""
+        entries = sorted(self.root.glob("*.json"), key=lambda p: p.stat().st_mtime_ns)
+        removed = 0
+        for path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def clear(self) -> int:
+        """Smaže celou cache, vrací počet smazaných položek"""
+        max_entries, self.max_entries = self.max_entries, 0
+        try:
+            return self.evict() if self.root.exists() else 0
+        finally:
+            self.max_entries = max_entries
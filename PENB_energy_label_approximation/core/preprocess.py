@@ -6,8 +6,15 @@ import numpy as np
 from typing import Tuple, List, Optional
 from datetime import datetime, timedelta
 
+from core.day_hour_matrix import DayHourMatrix
+from core.weather_schema import WEATHER_MEASUREMENTS
 
-def clean_weather_data(df: pd.DataFrame) -> pd.DataFrame:
+
+# Nejdelší mezera v datech o počasí, která se ještě interpoluje
+MAX_INTERPOLATED_GAP = pd.Timedelta(hours=3)
+
+
+def clean_weather_data(df: pd.DataFrame, freq: Optional[str] = 'h') -> pd.DataFrame:
     """
     Vyčistí a zkontroluje data o počasí.
     
@@ -16,6 +23,8 @@ def clean_weather_data(df: pd.DataFrame) -> pd.DataFrame:
     
     Args:
         df: DataFrame s počasím (timestamp, temp_out_c, ...)
+        freq: krok časové mřížky ('h', '15min', ...); None = zachovat
+            vlastní rozlišení dat (medián kroku, např. 10min meteostanice)
     
     Returns:
         Vyčištěný DataFrame - POUZE s daty která skutečně existují + krátké mezery
@@ -38,14 +47,21 @@ def clean_weather_data(df: pd.DataFrame) -> pd.DataFrame:
     # KRITICKÁ ZMĚNA: Resample POUZE tam kde data existují
     # NESMÍ interpolovat dlouhé mezery (>3h)
     
-    # Vytvoř kompletní hodinový index POUZE v rozsahu kde máme data
+    # Vytvoř kompletní index POUZE v rozsahu kde máme data
     min_time = df.index.min()
     max_time = df.index.max()
     
-    # Kompletní hodinový rozsah
-    full_hourly_range = pd.date_range(start=min_time, end=max_time, freq='h')
+    # Krok mřížky: zadaný, nebo vlastní rozlišení dat
+    if freq is None:
+        step = pd.Timedelta(df.index.to_series().diff().median()) if len(df) > 1 else pd.Timedelta(hours=1)
+    else:
+        step = pd.Timedelta(pd.tseries.frequencies.to_offset(freq))
+    max_gap_steps = max(1, int(MAX_INTERPOLATED_GAP / step))
+    
+    # Kompletní rozsah mřížky
+    full_hourly_range = pd.date_range(start=min_time, end=max_time, freq=step)
     
-    # Reindex - toto vytvoří NaN pro chybějící hodiny
+    # Reindex - toto vytvoří NaN pro chybějící kroky
     df = df.reindex(full_hourly_range)
     
     # KLÍČOVÉ: Detekuj dlouhé mezery PŘED interpolací
@@ -56,31 +72,33 @@ def clean_weather_data(df: pd.DataFrame) -> pd.DataFrame:
     missing_changes = is_missing != is_missing.shift()
     missing_groups = missing_changes.cumsum()
     
+    # Bool sloupec hned od začátku (objektový sloupec by ~ negoval na -1/-2)
+    df['long_gap'] = False
+    
     # Pro každou skupinu NaN zjisti délku
     for group_id in missing_groups[is_missing].unique():
         group_mask = (missing_groups == group_id) & is_missing
         gap_length = group_mask.sum()
         
         # Pokud je mezera > 3 hodiny, označ ji jako "dlouhá mezera" (neinterpolovat)
-        if gap_length > 3:
+        if gap_length > max_gap_steps:
             df.loc[group_mask, 'long_gap'] = True
     
     # KLÍČOVÉ: Interpoluj POUZE krátké mezery (max 3 hodiny)
     # limit_area='inside' zajistí že neinterpoluje na krajích datasetu
-    if 'long_gap' not in df.columns:
-        df['long_gap'] = False
-    df['long_gap'] = df['long_gap'].fillna(False)
-    
     # Interpoluj pouze tam, kde NENÍ dlouhá mezera
     mask_interpolate = is_missing & ~df['long_gap']
     
     if mask_interpolate.any():
-        # Interpoluj pouze označená místa
-        df_interpolated = df.interpolate(method='linear', limit=3, limit_area='inside')
+        # Interpoluj pouze označená místa a pouze měřené veličiny
+        # (kategorie source ani pomocné sloupce interpolovat nelze)
+        measurement_cols = [col for col in WEATHER_MEASUREMENTS if col in df.columns]
+        df_interpolated = df[measurement_cols].interpolate(
+            method='linear', limit=max_gap_steps, limit_area='inside'
+        )
         # Aplikuj interpolaci pouze na krátké mezery
-        for col in ['temp_out_c', 'humidity_pct', 'wind_mps', 'ghi_wm2']:
-            if col in df.columns:
-                df.loc[mask_interpolate, col] = df_interpolated.loc[mask_interpolate, col]
+        for col in measurement_cols:
+            df.loc[mask_interpolate, col] = df_interpolated.loc[mask_interpolate, col]
     
     # Označení mezer
     missing_count = df['temp_out_c'].isna().sum()
@@ -88,7 +106,7 @@ def clean_weather_data(df: pd.DataFrame) -> pd.DataFrame:
     
     if missing_count > 0:
         missing_pct = missing_count / total_count * 100
-        print(f"⚠ Chybí {missing_count} hodinových záznamů z {total_count} ({missing_pct:.1f}%)")
+        print(f"⚠ Chybí {missing_count} záznamů z {total_count} ({missing_pct:.1f}%)")
         print(f"  Tyto mezery NEBYLY interpolovány (>3h gap)")
     
     # Reset index
@@ -105,8 +123,8 @@ def clean_weather_data(df: pd.DataFrame) -> pd.DataFrame:
         df = df.drop(columns=['long_gap'])
     
     if rows_before != rows_after:
-        print(f"✓ Odstraněno {rows_before - rows_after} hodin s dlouhými mezerami")
-        print(f"  Zbývá {rows_after} hodin se skutečnými/interpolovanými daty")
+        print(f"✓ Odstraněno {rows_before - rows_after} záznamů s dlouhými mezerami")
+        print(f"  Zbývá {rows_after} záznamů se skutečnými/interpolovanými daty")
     
     # Kontrola rozsahu hodnot
     if len(df) > 0:
@@ -123,6 +141,11 @@ def align_daily_energy_to_hourly(
     """
     Zarovná denní spotřeby s hodinovými daty počasí.
     
+    Hodinová data se ořežou binárním vyhledáním (searchsorted) na seřazeném
+    sloupci timestamp místo filtrování maskou. Výsledky jsou kopie - pod
+    pandas < 3 (bez copy-on-write) by zápis do řezu iloc změnil vstup
+    volajícího nebo vyvolal SettingWithCopyWarning. Vstupní DataFrame se nemění.
+    
     Args:
         daily_energy_df: DataFrame s date, energy_total_kwh
         hourly_weather_df: DataFrame s timestamp, temp_out_c, ...
@@ -130,19 +153,25 @@ def align_daily_energy_to_hourly(
     Returns:
         (aligned_daily_df, aligned_hourly_df) - společné časové rozmezí
     """
-    # Ujisti se, že date je datetime
+    # Ujisti se, že date je datetime (bez změny vstupu volajícího)
     if not pd.api.types.is_datetime64_any_dtype(daily_energy_df['date']):
-        daily_energy_df['date'] = pd.to_datetime(daily_energy_df['date'])
+        daily_energy_df = daily_energy_df.assign(date=pd.to_datetime(daily_energy_df['date']))
     
     # Najdi společný rozsah
-    min_date = daily_energy_df['date'].min()
-    max_date = daily_energy_df['date'].max()
+    min_date = daily_energy_df['date'].min().normalize()
+    max_date = daily_energy_df['date'].max().normalize()
+    
+    # Binární vyhledání vyžaduje seřazená časová razítka
+    if not hourly_weather_df['timestamp'].is_monotonic_increasing:
+        hourly_weather_df = hourly_weather_df.sort_values('timestamp', kind='stable')
+    
+    timestamps = hourly_weather_df['timestamp']
+    first = timestamps.searchsorted(min_date, side='left')
+    stop = timestamps.searchsorted(max_date + pd.Timedelta(days=1), side='left')
     
     # Filtruj hodinová data na tento rozsah
-    hourly_weather_df = hourly_weather_df[
-        (hourly_weather_df['timestamp'].dt.date >= min_date.date()) &
-        (hourly_weather_df['timestamp'].dt.date <= max_date.date())
-    ].copy()
+    hourly_weather_df = hourly_weather_df.iloc[first:stop].copy()
+    daily_energy_df = daily_energy_df.copy()
     
     print(f"✓ Zarovnáno na období {min_date.date()} až {max_date.date()}")
     print(f"  - {len(daily_energy_df)} denních záznamů")
@@ -151,6 +180,33 @@ def align_daily_energy_to_hourly(
     return daily_energy_df, hourly_weather_df
 
 
+def to_day_hour_matrix(
+    hourly_df: pd.DataFrame,
+    column: str,
+    dates=None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Převede hodinovou řadu na matici (n_dní × 24) pro vektorové výpočty.
+    
+    Řádky odpovídají dnům v `dates` (např. daily_df['date'] po zarovnání),
+    sloupce hodinám 0-23. Více vzorků ve stejné hodině se zprůměruje,
+    chybějící hodiny (mezery, přechod na letní čas) jsou NaN.
+    
+    Args:
+        hourly_df: DataFrame s timestamp a sloupcem `column`
+        column: název sloupce s hodnotami
+        dates: dny pro řádky matice (None = všechny dny v hourly_df)
+    
+    Returns:
+        (matrix, dates, valid_mask) - matrix float64 (n_dní × 24),
+        dates datetime64[D], valid_mask bool (n_dní × 24)
+    
+    Viz core.day_hour_matrix.DayHourMatrix pro plnou reprezentaci.
+    """
+    matrix = DayHourMatrix.from_hourly(hourly_df, column, dates)
+    return matrix.values, matrix.dates, matrix.mask
+
+
 def create_hourly_indoor_temp(
     daily_avg_temp: float,
     hourly_weather_df: pd.DataFrame,
@@ -28,8 +28,12 @@ def assess_quality_level(
     # 1. Režim výpočtu
     if computation_mode == ComputationMode.ADVANCED:
         score += 30
+    elif computation_mode in (ComputationMode.MULTISTART, ComputationMode.BOOTSTRAP):
+        score += 25
     elif computation_mode == ComputationMode.STANDARD:
         score += 20
+    elif computation_mode == ComputationMode.FAST:
+        score += 15
     else:  # BASIC
         score += 5
     
@@ -63,7 +67,17 @@ def assess_quality_level(
     else:
         score += 2
     
-    # 5. Penalizace za varování
+    # 5. Intervaly spolehlivosti (pouze BOOTSTRAP): úzký interval H_total = určitelné
+    confidence = calibrated_params.confidence
+    if confidence is not None:
+        H_total = confidence.intervals['H_total_W_per_K']
+        width = confidence.relative_width('H_total_W_per_K', (H_total[0] + H_total[1]) / 2)
+        if width < 0.1:
+            score += 10
+        elif width > 0.3:
+            score -= 10
+    
+    # 6. Penalizace za varování
     score -= len(data_warnings) * 5
     
     score = max(0, score)  # minimálně 0
@@ -0,0 +1,506 @@
+"""
+Výpočetní jádro simulace 1R1C modelu
+
+Rekurze 1R1C modelu je v čase sekvenční. Krok je zapsán jako lineární
+rekurence
+
+    T[k+1] = α·T[k] + β·(H·T_out[k] + Q_in[k])
+
+kde (α, β) určuje diskretizace. Modely používají přesnou diskretizaci
+se vstupy konstantními během kroku (ZOH):
+
+    α = exp(-dt·H/C),  β = (1 - α)/H
+
+která je stabilní pro libovolný krok (0 < α < 1), takže lze simulovat
+i po 3 hodinách nebo po dnech. Explicitní Euler (α = 1 - dt·H/C,
+β = dt/C) je nestabilní pro dt > 2·C/H.
+
+Numba je závislost projektu: smyčka se JIT kompiluje a simulace, chyba
+teploty i denní součty energie se počítají v jednom průchodu. NumPy záloha
+(bez numby nebo s PENB_DISABLE_NUMBA=1) počítá rekurenci přes
+scipy.signal.lfilter (smyčka v C) a agregaci přes np.bincount - výsledky
+jsou shodné (až na zaokrouhlení). Výjimkou je termostat
+(rc_statespace.thermostat): nelineární regulaci nejde zapsat jako lineární
+filtr, záloha proto jde krok po kroku v Pythonu (~70 ms na rok proti
+~0.2 ms s numbou).
+
+Funkce nákladů kalibrace (score_streaming) nepotřebuje ani průběh T_in,
+ani denní součty: jde hodinu po hodině, drží běžící součet kvadrátů chyb
+a energii aktuálního dne, a při přechodu na další den den rovnou vyhodnotí
+proti pozorování. Paměť na jedno vyhodnocení je O(1) (numba), resp.
+O(velikost bloku) v NumPy verzi, která počítá po blocích hodin.
+
+Nerovnoměrný časový krok (15min měření, 10min meteostanice, mezery):
+koeficienty α[k], β[k] se spočtou vektorově pro všechny kroky
+(zoh_coefficient_arrays) a rekurence z[k] = a[k]·z[k-1] + b[k] se počítá
+po blocích přes kumulativní součiny (linear_recurrence) - bez smyčky
+v Pythonu přes jednotlivé kroky.
+
+Proměnná prostředí PENB_DISABLE_NUMBA=1 vynutí NumPy verzi.
+
+Benchmark: python -m core.rc_kernel
+"""
+import os
+import time
+from typing import Tuple
+
+import numpy as np
+from scipy.signal import lfilter
+
+
+# Velikost bloku hodin pro NumPy verzi score_streaming (omezuje paměť)
+CHUNK_HOURS = 24 * 7 * 8
+ENERGY_EPS_KWH = 1e-6  # ochrana před dělením nulou v relativní chybě energie
+# Útlum v rámci bloku linear_recurrence (exp(-200) drží 1/součin v rozsahu float64)
+RECURRENCE_LOG_DECAY = 200.0
+# Krok delší než GAP_FACTOR × medián kroku je mezera v datech
+GAP_FACTOR = 1.5
+
+try:
+    if os.getenv("PENB_DISABLE_NUMBA"):
+        raise ImportError("numba vypnuta přes PENB_DISABLE_NUMBA")
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+def euler_coefficients(H_total: float, C_th: float, dt_seconds: float = 3600) -> Tuple[float, float]:
+    """Koeficienty (α, β) explicitního Eulerova kroku"""
+    return 1.0 - dt_seconds * H_total / C_th, dt_seconds / C_th
+
+
+def zoh_coefficients(H_total: float, C_th: float, dt_seconds: float = 3600) -> Tuple[float, float]:
+    """Koeficienty (α, β) přesného kroku se vstupy konstantními během kroku"""
+    x = dt_seconds * H_total / C_th
+    if x < 1e-12:
+        return 1.0, dt_seconds / C_th  # bez ztrát: čistá akumulace
+    return float(np.exp(-x)), float(-np.expm1(-x) / H_total)
+
+
+def zoh_coefficient_arrays(
+    H_total: float,
+    C_th: float,
+    dt_seconds: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Koeficienty (α[k], β[k]) přesného kroku pro pole délek kroků"""
+    x = np.asarray(dt_seconds, dtype=float) * (H_total / C_th)
+    if H_total * 3600 / C_th < 1e-12:
+        return np.ones_like(x), np.asarray(dt_seconds, dtype=float) / C_th
+    return np.exp(-x), -np.expm1(-x) / H_total
+
+
+def step_seconds(timestamps) -> np.ndarray:
+    """
+    Délky kroků [s] z časových razítek: vzorek platí do dalšího vzorku.
+
+    Poslední vzorek převezme předchozí krok. Mezera v datech (krok delší
+    než GAP_FACTOR × medián) dostane délku mediánu - simuluje se jako
+    nespojitost, ne jako dlouhé držení posledního vstupu.
+
+    Returns:
+        (n,) délky kroků v sekundách
+    """
+    times = np.asarray(timestamps, dtype='datetime64[ns]')
+    if len(times) < 2:
+        return np.full(len(times), 3600.0)
+    dt = np.diff(times).astype('timedelta64[ns]').astype(np.int64) / 1e9
+    dt = np.append(dt, dt[-1])
+    nominal = float(np.median(dt))
+    return np.where(dt > GAP_FACTOR * nominal, nominal, dt)
+
+
+def uniform_step(dt_seconds: np.ndarray):
+    """Společná délka kroku, jsou-li všechny kroky stejné, jinak pole beze změny"""
+    dt_seconds = np.asarray(dt_seconds, dtype=float)
+    if len(dt_seconds) and np.all(dt_seconds == dt_seconds[0]):
+        return float(dt_seconds[0])
+    return dt_seconds
+
+
+def zoh_parameters(alpha: float, beta: float, dt_seconds: float = 3600) -> Tuple[float, float]:
+    """
+    Inverze zoh_coefficients: (H_total, C_th) z koeficientů kroku.
+
+    Raises:
+        ValueError: koeficienty neodpovídají stabilnímu RC členu (0 < α < 1, β > 0)
+    """
+    if not (0 < alpha < 1) or beta <= 0:
+        raise ValueError(f"Koeficienty kroku nejsou fyzikální (α={alpha:.4g}, β={beta:.4g})")
+    H_total = (1 - alpha) / beta
+    return H_total, -dt_seconds * H_total / np.log(alpha)
+
+
+# --- NumPy verze -------------------------------------------------------------
+
+def _simulate_numpy(alpha, beta, H_total, Q_const, T0, temp_out, q_in):
+    u = beta * (H_total * temp_out + q_in + Q_const)
+    T, _ = lfilter([1.0], [1.0, -alpha], u, zi=[alpha * T0])
+    return T
+
+
+def _simulate_score_numpy(alpha, beta, H_total, Q_const, T0, temp_out, q_in,
+                          temp_target, day_index, n_days):
+    T = _simulate_numpy(alpha, beta, H_total, Q_const, T0, temp_out, q_in)
+
+    sq = (T - temp_target) ** 2
+    valid = ~np.isnan(sq)
+
+    Q_needed = np.nan_to_num(H_total * np.maximum(T - temp_out, 0))
+    inside = day_index >= 0
+    daily_Wh = np.bincount(day_index[inside], weights=Q_needed[inside], minlength=n_days)
+
+    T_end = T[-1] if len(T) else T0
+    return T_end, sq[valid].sum(), int(valid.sum()), daily_Wh
+
+
+class _DayScore:
+    """Průběžné vyhodnocení dní pro NumPy verzi score_streaming"""
+
+    def __init__(self, observed_daily_kwh):
+        self.observed = observed_daily_kwh
+        self.sum_pct = 0.0
+        self.n_days = 0
+
+    def finalize(self, days, energy_Wh):
+        days = np.asarray(days)
+        inside = days >= 0
+        observed = self.observed[days[inside]]
+        simulated = np.asarray(energy_Wh)[inside] / 1000
+        has_obs = ~np.isnan(observed)
+        self.sum_pct += float(np.sum(
+            np.abs(observed[has_obs] - simulated[has_obs]) / (observed[has_obs] + ENERGY_EPS_KWH)
+        ))
+        self.n_days += int(has_obs.sum())
+
+
+def _score_streaming_numpy(alpha, beta, H_total, Q_const, T0, temp_out, q_in,
+                           temp_target, day_index, observed_daily_kwh, chunk_hours):
+    T_in = T0
+    sum_sq = 0.0
+    n_valid = 0
+    days = _DayScore(observed_daily_kwh)
+    carry_day, carry_Wh = -1, 0.0
+
+    for start in range(0, len(temp_out), chunk_hours):
+        stop = start + chunk_hours
+        T = _simulate_numpy(alpha, beta, H_total, Q_const, T_in,
+                            temp_out[start:stop], q_in[start:stop])
+        T_in = T[-1]
+
+        sq = (T - temp_target[start:stop]) ** 2
+        valid = ~np.isnan(sq)
+        sum_sq += sq[valid].sum()
+        n_valid += int(valid.sum())
+
+        # Energie po souvislých úsecích dní v bloku (hodiny mimo dny se vynechají)
+        chunk_days = day_index[start:stop]
+        inside = chunk_days >= 0
+        if not inside.any():
+            continue
+        chunk_days = chunk_days[inside]
+        Q_needed = np.nan_to_num(H_total * np.maximum(T[inside] - temp_out[start:stop][inside], 0))
+
+        run_starts = np.concatenate([[0], np.flatnonzero(np.diff(chunk_days)) + 1])
+        run_days = chunk_days[run_starts]
+        run_Wh = np.add.reduceat(Q_needed, run_starts)
+
+        # První úsek navazuje na rozpracovaný den z předchozího bloku
+        if run_days[0] == carry_day:
+            run_Wh[0] += carry_Wh
+        else:
+            days.finalize([carry_day], [carry_Wh])
+
+        # Všechny úseky kromě posledního jsou uzavřené dny
+        days.finalize(run_days[:-1], run_Wh[:-1])
+        carry_day, carry_Wh = int(run_days[-1]), float(run_Wh[-1])
+
+    days.finalize([carry_day], [carry_Wh])
+    return T_in, sum_sq, n_valid, days.sum_pct, days.n_days
+
+
+# --- Numba verze -------------------------------------------------------------
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _simulate_numba(alpha, beta, H_total, Q_const, T0, temp_out, q_in):
+        n = temp_out.shape[0]
+        T = np.empty(n)
+        T_in = T0
+        for k in range(n):
+            T_in = alpha * T_in + beta * (H_total * temp_out[k] + q_in[k] + Q_const)
+            T[k] = T_in
+        return T
+
+    @njit(cache=True)
+    def _simulate_score_numba(alpha, beta, H_total, Q_const, T0, temp_out, q_in,
+                              temp_target, day_index, n_days):
+        daily_Wh = np.zeros(n_days)
+        sum_sq = 0.0
+        n_valid = 0
+        T_in = T0
+        for k in range(temp_out.shape[0]):
+            T_in = alpha * T_in + beta * (H_total * temp_out[k] + q_in[k] + Q_const)
+
+            err = T_in - temp_target[k]
+            sq = err * err
+            if sq == sq:  # není NaN
+                sum_sq += sq
+                n_valid += 1
+
+            day = day_index[k]
+            if day >= 0:
+                Q_needed = H_total * (T_in - temp_out[k])
+                if Q_needed > 0.0:  # NaN i záporné hodnoty se přeskočí
+                    daily_Wh[day] += Q_needed
+        return T_in, sum_sq, n_valid, daily_Wh
+
+    @njit(cache=True)
+    def _score_streaming_numba(alpha, beta, H_total, Q_const, T0, temp_out, q_in,
+                               temp_target, day_index, observed_daily_kwh, eps):
+        sum_sq = 0.0
+        n_valid = 0
+        sum_pct = 0.0
+        n_days = 0
+        current_day = -1
+        day_Wh = 0.0
+        T_in = T0
+        for k in range(temp_out.shape[0]):
+            T_in = alpha * T_in + beta * (H_total * temp_out[k] + q_in[k] + Q_const)
+
+            err = T_in - temp_target[k]
+            sq = err * err
+            if sq == sq:  # není NaN
+                sum_sq += sq
+                n_valid += 1
+
+            day = day_index[k]
+            if day < 0:
+                continue
+            if day != current_day:
+                # Uzavři předchozí den
+                if current_day >= 0:
+                    observed = observed_daily_kwh[current_day]
+                    if observed == observed:
+                        sum_pct += abs(observed - day_Wh / 1000) / (observed + eps)
+                        n_days += 1
+                current_day = day
+                day_Wh = 0.0
+            Q_needed = H_total * (T_in - temp_out[k])
+            if Q_needed > 0.0:
+                day_Wh += Q_needed
+
+        if current_day >= 0:
+            observed = observed_daily_kwh[current_day]
+            if observed == observed:
+                sum_pct += abs(observed - day_Wh / 1000) / (observed + eps)
+                n_days += 1
+        return T_in, sum_sq, n_valid, sum_pct, n_days
+
+
+def _linear_recurrence_numpy(a, b, z0):
+    """
+    z[k] = a[k]·z[k-1] + b[k] po blocích: v bloku začínajícím s je
+    z[k] = P[k]·(z[s] + Σ b[j]/P[j]),  P[k] = Π a[s+1..k]
+    Bloky končí, než útlum P klesne pod exp(-RECURRENCE_LOG_DECAY).
+    """
+    n = len(a)
+    z = np.empty(n)
+    if n == 0:
+        return z
+    decay = -np.cumsum(np.log(np.maximum(a, 1e-300)))  # neklesající
+    s, previous = 0, float(z0)
+    while s < n:
+        z[s] = a[s] * previous + b[s]
+        e = max(int(np.searchsorted(decay, decay[s] + RECURRENCE_LOG_DECAY, side='right')), s + 1)
+        if e > s + 1:
+            P = np.exp(decay[s] - decay[s + 1:e])
+            z[s + 1:e] = P * (z[s] + np.cumsum(b[s + 1:e] / P))
+        previous = z[e - 1]
+        s = e
+    return z
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _linear_recurrence_numba(a, b, z0):
+        z = np.empty(len(a))
+        value = z0
+        for k in range(len(a)):
+            value = a[k] * value + b[k]
+            z[k] = value
+        return z
+
+
+def linear_recurrence(a, b, z0: float, use_numba=None) -> np.ndarray:
+    """
+    Lineární rekurence s proměnnými koeficienty z[k] = a[k]·z[k-1] + b[k].
+
+    Args:
+        a: (n,) koeficienty útlumu, 0 ≤ a ≤ 1 (např. α z přesného kroku)
+        b: (n,) buzení
+        z0: počáteční hodnota (z[-1])
+        use_numba: None = podle dostupnosti
+
+    Returns:
+        (n,) z[k]
+
+    Raises:
+        ValueError: některé a[k] je záporné (NumPy verze pracuje s log a)
+    """
+    a = np.ascontiguousarray(a, dtype=np.float64)
+    b = np.ascontiguousarray(b, dtype=np.float64)
+    if HAVE_NUMBA if use_numba is None else use_numba:
+        return _linear_recurrence_numba(a, b, float(z0))
+    if np.any(a < 0):
+        raise ValueError("linear_recurrence vyžaduje nezáporné koeficienty útlumu")
+    return _linear_recurrence_numpy(a, b, z0)
+
+
+def simulate_variable(alpha, beta, H_total, Q_const, T0, temp_out, q_in, use_numba=None) -> np.ndarray:
+    """
+    Simulace s proměnným krokem: alpha, beta jsou pole (viz zoh_coefficient_arrays),
+    ostatní argumenty jako simulate().
+    """
+    temp_out = np.asarray(temp_out, dtype=np.float64)
+    q_in = np.asarray(q_in, dtype=np.float64)
+    u = np.asarray(beta) * (H_total * temp_out + q_in + Q_const)
+    return linear_recurrence(alpha, u, T0, use_numba=use_numba)
+
+
+def simulate(alpha, beta, H_total, Q_const, T0, temp_out, q_in, use_numba=None) -> np.ndarray:
+    """
+    Simuluje průběh vnitřní teploty.
+
+    Args:
+        alpha, beta: koeficienty diskretizace
+        H_total: celkové tepelné ztráty W/K
+        Q_const: konstantní zisky W (interní)
+        T0: počáteční vnitřní teplota °C
+        temp_out: venkovní teplota po krocích
+        q_in: proměnné dodané teplo W po krocích (topení + slunce)
+        use_numba: None = podle dostupnosti
+
+    Returns:
+        T_in na konci každého kroku
+    """
+    temp_out = np.ascontiguousarray(temp_out, dtype=np.float64)
+    q_in = np.ascontiguousarray(q_in, dtype=np.float64)
+    if HAVE_NUMBA if use_numba is None else use_numba:
+        return _simulate_numba(float(alpha), float(beta), float(H_total), float(Q_const),
+                               float(T0), temp_out, q_in)
+    return _simulate_numpy(alpha, beta, H_total, Q_const, T0, temp_out, q_in)
+
+
+def simulate_and_score(alpha, beta, H_total, Q_const, T0, temp_out, q_in,
+                       temp_target, day_index, n_days, use_numba=None):
+    """
+    Simulace, chyba teploty a denní potřeba tepla v jednom průchodu.
+
+    Args:
+        temp_target: cílová vnitřní teplota po krocích (NaN = bez dat)
+        day_index: řádek dne pro každý krok (-1 = mimo dny)
+        n_days: počet dní
+        ostatní viz simulate()
+
+    Returns:
+        (T_in na konci, součet kvadrátů chyb teploty, počet platných kroků,
+         potřebné teplo po dnech ve Wh)
+    """
+    temp_out = np.ascontiguousarray(temp_out, dtype=np.float64)
+    q_in = np.ascontiguousarray(q_in, dtype=np.float64)
+    temp_target = np.ascontiguousarray(temp_target, dtype=np.float64)
+    day_index = np.ascontiguousarray(day_index, dtype=np.int64)
+
+    if HAVE_NUMBA if use_numba is None else use_numba:
+        T_end, sum_sq, n_valid, daily_Wh = _simulate_score_numba(
+            float(alpha), float(beta), float(H_total), float(Q_const), float(T0),
+            temp_out, q_in, temp_target, day_index, int(n_days)
+        )
+    else:
+        T_end, sum_sq, n_valid, daily_Wh = _simulate_score_numpy(
+            alpha, beta, H_total, Q_const, T0, temp_out, q_in,
+            temp_target, day_index, n_days
+        )
+    return float(T_end), float(sum_sq), int(n_valid), daily_Wh
+
+
+def score_streaming(alpha, beta, H_total, Q_const, T0, temp_out, q_in,
+                    temp_target, day_index, observed_daily_kwh,
+                    use_numba=None, chunk_hours: int = CHUNK_HOURS):
+    """
+    Součty chyb kalibrace v jednom průchodu bez hodinových mezivýsledků.
+
+    Hodiny každého dne musí být souvislé (day_index neklesá, hodiny mimo
+    dny s -1 mohou být kdekoliv) - den se vyhodnotí, jakmile skončí.
+
+    Args:
+        observed_daily_kwh: pozorovaná energie po dnech (NaN = bez pozorování)
+        chunk_hours: velikost bloku pro NumPy verzi
+        ostatní viz simulate_and_score()
+
+    Returns:
+        (T_in na konci, součet kvadrátů chyb teploty, počet platných hodin,
+         součet relativních chyb energie, počet vyhodnocených dní)
+    """
+    temp_out = np.ascontiguousarray(temp_out, dtype=np.float64)
+    q_in = np.ascontiguousarray(q_in, dtype=np.float64)
+    temp_target = np.ascontiguousarray(temp_target, dtype=np.float64)
+    day_index = np.ascontiguousarray(day_index, dtype=np.int64)
+    observed_daily_kwh = np.ascontiguousarray(observed_daily_kwh, dtype=np.float64)
+
+    if HAVE_NUMBA if use_numba is None else use_numba:
+        result = _score_streaming_numba(
+            float(alpha), float(beta), float(H_total), float(Q_const), float(T0),
+            temp_out, q_in, temp_target, day_index, observed_daily_kwh, ENERGY_EPS_KWH
+        )
+    else:
+        result = _score_streaming_numpy(
+            alpha, beta, H_total, Q_const, T0, temp_out, q_in,
+            temp_target, day_index, observed_daily_kwh, chunk_hours
+        )
+    T_end, sum_sq, n_valid, sum_pct, n_days = result
+    return float(T_end), float(sum_sq), int(n_valid), float(sum_pct), int(n_days)
+
+
+def days_are_contiguous(day_index: np.ndarray) -> bool:
+    """Jsou hodiny každého dne souvislé (předpoklad score_streaming)?"""
+    days = np.asarray(day_index)
+    days = days[days >= 0]
+    return bool(np.all(np.diff(days) >= 0))
+
+
+def benchmark(n_hours: int = 24 * 365 * 5, repeat: int = 5) -> dict:
+    """
+    Změří ns/hodinu funkce nákladů (score_streaming) pro NumPy
+    a (je-li dostupná) numba verzi.
+
+    Returns:
+        {'numpy': ns/h, 'numba': ns/h} (numba jen pokud je dostupná)
+    """
+    rng = np.random.default_rng(0)
+    temp_out = rng.normal(5, 5, n_hours)
+    q_in = rng.uniform(0, 3000, n_hours)
+    temp_target = np.full(n_hours, 21.0)
+    day_index = np.arange(n_hours) // 24
+    observed = rng.uniform(10, 40, int(day_index[-1]) + 1)
+    alpha, beta = zoh_coefficients(150.0, 2e7)
+
+    variants = [False] + ([True] if HAVE_NUMBA else [])
+    results = {}
+    for use_numba in variants:
+        args = (alpha, beta, 150.0, 200.0, 20.0, temp_out, q_in, temp_target, day_index, observed)
+        score_streaming(*args, use_numba=use_numba)  # kompilace / zahřátí
+        best = np.inf
+        for _ in range(repeat):
+            start = time.perf_counter()
+            score_streaming(*args, use_numba=use_numba)
+            best = min(best, time.perf_counter() - start)
+        results['numba' if use_numba else 'numpy'] = best / n_hours * 1e9
+    return results
+
+
+if __name__ == "__main__":
+    print(f"Benchmark simulace 1R1C (numba {'dostupná' if HAVE_NUMBA else 'nedostupná'})")
+    for name, ns_per_hour in benchmark().items():
+        print(f"  {name:6s}: {ns_per_hour:7.1f} ns/hodinu")
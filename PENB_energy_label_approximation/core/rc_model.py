@@ -5,15 +5,25 @@ Fyzikální model:
 - Jedna tepelná kapacita C_th reprezentující tepelnou setrvačnost budovy
 - Jeden tepelný odpor R = 1/H_env reprezentující tepelné ztráty obálkou
 - Větrací ztráty H_vent = rho * c_p * n * V
+
+Časový krok je přesné řešení rovnice při vstupech konstantních během
+kroku (ZOH, viz core.rc_kernel) - stabilní pro libovolné dt, takže pro
+rychlé orientační výpočty lze krok zvětšit (simulate_coarse). Krok může
+být i proměnný (pole dt, např. 15min nebo nepravidelná data).
 """
 import numpy as np
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
 import pandas as pd
 
+from core import rc_kernel
+from core.day_hour_matrix import DayHourMatrix
+from core.rc_kernel import zoh_coefficients, zoh_coefficient_arrays, step_seconds, uniform_step
+
 
 # Fyzikální konstanty
 RHO_AIR = 1.2  # kg/m³ (hustota vzduchu)
 CP_AIR = 1005  # J/(kg·K) (měrné teplo vzduchu)
+DEFAULT_SOLAR_APERTURE = 0.02  # typicky malé pro byty
 
 
 class RC1Model:
@@ -28,8 +38,14 @@ class RC1Model:
     - Q_heat = dodané teplo z topení [W]
     - Q_solar = sluneční zisky [W]
     - Q_internal = interní zisky (lidé, spotřebiče) [W]
+    
+    Vyšší řády (2R2C, 3R2C) se stejným rozhraním jsou v core.rc_statespace.
     """
     
+    ORDER = "1r1c"
+    N_STATES = 1
+    EXTRA_PARAMETERS: Tuple[str, ...] = ()
+    
     def __init__(
         self,
         H_env_W_per_K: float,
@@ -38,7 +54,7 @@ class RC1Model:
         C_th_J_per_K: float,
         area_m2: float,
         internal_gains_W_per_m2: float = 3.0,
-        solar_aperture: float = 0.02  # typicky malé pro byty
+        solar_aperture: float = DEFAULT_SOLAR_APERTURE
     ):
         """
         Args:
@@ -61,6 +77,9 @@ class RC1Model:
         # Vypočti H_vent
         self.H_vent = RHO_AIR * CP_AIR * self.n * self.V / 3600  # /3600 pro převod 1/h na 1/s
         self.H_total = self.H_env + self.H_vent
+        
+        # Koeficienty kroku podle dt (parametry instance se nemění)
+        self._coefficients = {}
     
     def simulate_step(
         self,
@@ -71,7 +90,7 @@ class RC1Model:
         dt_seconds: float = 3600
     ) -> float:
         """
-        Simuluj jeden časový krok (Euler forward).
+        Simuluj jeden časový krok (přesný krok ZOH).
         
         Args:
             T_in_prev: vnitřní teplota na začátku kroku [°C]
@@ -91,13 +110,10 @@ class RC1Model:
         
         # Tepelná bilance
         Q_in = Q_heat_W + Q_solar + Q_internal
-        Q_out = self.H_total * (T_in_prev - T_out)
-        
-        # dT/dt
-        dT_dt = (Q_in - Q_out) / self.C_th
         
-        # Nová teplota
-        T_in_new = T_in_prev + dT_dt * dt_seconds
+        # Nová teplota: exponenciální přiblížení k ustálenému stavu
+        alpha, beta = self.step_coefficients(dt_seconds)
+        T_in_new = alpha * T_in_prev + beta * (self.H_total * T_out + Q_in)
         
         return T_in_new
     
@@ -108,11 +124,12 @@ class RC1Model:
         Q_heat_column: str = 'heating_power_W'
     ) -> pd.DataFrame:
         """
-        Simuluj hodinový průběh.
+        Simuluj průběh po řádcích DataFrame (hodinových i jemnějších).
         
         Args:
             T_in_initial: počáteční vnitřní teplota
-            hourly_df: DataFrame s temp_out_c, heating_power_W, ghi_wm2
+            hourly_df: DataFrame s temp_out_c, heating_power_W, ghi_wm2;
+                pokud má timestamp, délky kroků se odvodí z něj (jinak 1 h)
             Q_heat_column: název sloupce s topným výkonem
         
         Returns:
@@ -120,25 +137,96 @@ class RC1Model:
         """
         df = hourly_df.copy()
         
-        T_in = T_in_initial
-        T_in_values = []
-        
-        for idx, row in df.iterrows():
-            T_out = row['temp_out_c']
-            heat_value = row.get(Q_heat_column, 0)
-            if isinstance(Q_heat_column, str) and Q_heat_column.lower().endswith('_kw'):
-                Q_heat = heat_value * 1000  # kW → W
-            else:
-                Q_heat = heat_value
-            GHI = row.get('ghi_wm2', 0)
-            
-            T_in = self.simulate_step(T_in, T_out, Q_heat, GHI, dt_seconds=3600)
-            T_in_values.append(T_in)
+        heat = df[Q_heat_column].to_numpy(dtype=float) if Q_heat_column in df.columns else np.zeros(len(df))
+        if isinstance(Q_heat_column, str) and Q_heat_column.lower().endswith('_kw'):
+            heat = heat * 1000  # kW → W
+        
+        T_in_values = self.simulate_arrays(
+            T_in_initial,
+            df['temp_out_c'].to_numpy(dtype=float),
+            heat,
+            df['ghi_wm2'].to_numpy(dtype=float) if 'ghi_wm2' in df.columns else None,
+            dt_seconds=uniform_step(step_seconds(df['timestamp'])) if 'timestamp' in df.columns else 3600
+        )
         
         df['T_in_simulated_c'] = T_in_values
         
         return df
     
+    def step_coefficients(self, dt_seconds: float = 3600) -> Tuple[float, float]:
+        """Koeficienty (α, β) kroku T' = α·T + β·(H·T_out + Q_in), uložené pro dt"""
+        if dt_seconds not in self._coefficients:
+            self._coefficients[dt_seconds] = zoh_coefficients(self.H_total, self.C_th, dt_seconds)
+        return self._coefficients[dt_seconds]
+    
+    def continuous_matrices(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stavový tvar dx/dt = A·x + B·u se vstupy u = [T_out, Q_air]
+        (Q_air = topení + slunce + interní zisky), viz core.rc_statespace.
+        """
+        A = np.array([[-self.H_total / self.C_th]])
+        B = np.array([[self.H_total / self.C_th, 1.0 / self.C_th]])
+        return A, B
+    
+    def loss_coefficients(self) -> Tuple[np.ndarray, float]:
+        """Tepelná ztráta ven = c·x + d·T_out [W]; vrací (c, d)"""
+        return np.array([self.H_total]), -self.H_total
+    
+    def solar_gains_W(self, ghi_wm2: np.ndarray) -> np.ndarray:
+        """Sluneční zisky [W] z globálního záření"""
+        return ghi_wm2 * self.A * self.solar_ap
+    
+    def simulate_arrays(
+        self,
+        T_in_initial: float,
+        temp_out: np.ndarray,
+        Q_heat_W: np.ndarray,
+        ghi_wm2: Optional[np.ndarray] = None,
+        dt_seconds: Union[float, np.ndarray] = 3600
+    ) -> np.ndarray:
+        """
+        Simuluj průběh nad poli (stejný krok jako simulate_step).
+        
+        Args:
+            dt_seconds: délka kroku, nebo pole délek jednotlivých kroků
+        
+        Returns:
+            T_in na konci každého kroku
+        """
+        q_in = np.asarray(Q_heat_W, dtype=float)
+        if ghi_wm2 is not None:
+            q_in = q_in + self.solar_gains_W(np.asarray(ghi_wm2, dtype=float))
+        
+        return self.simulate_states(
+            T_in_initial, temp_out, q_in + self.q_int * self.A, dt_seconds
+        )[:, 0]
+    
+    def simulate_states(
+        self,
+        T_initial: float,
+        temp_out: np.ndarray,
+        Q_air_W: np.ndarray,
+        dt_seconds: Union[float, np.ndarray] = 3600
+    ) -> np.ndarray:
+        """
+        Průběh stavu jako (t, 1) - rozhraní modelů core.rc_statespace;
+        Q_air_W zahrnuje topení, slunce i interní zisky.
+        """
+        if np.ndim(dt_seconds) > 0:
+            alpha, beta = zoh_coefficient_arrays(self.H_total, self.C_th, dt_seconds)
+            T = rc_kernel.simulate_variable(alpha, beta, self.H_total, 0.0,
+                                            T_initial, temp_out, Q_air_W)
+        else:
+            alpha, beta = self.step_coefficients(dt_seconds)
+            T = rc_kernel.simulate(alpha, beta, self.H_total, 0.0,
+                                   T_initial, temp_out, Q_air_W)
+        return T[:, None]
+    
+    def heat_loss_W(self, states: np.ndarray, temp_out: np.ndarray) -> np.ndarray:
+        """Tepelná ztráta ven [W] pro průběh stavů"""
+        c, d = self.loss_coefficients()
+        return states @ c + d * temp_out
+    
     def estimate_heating_demand(
         self,
         T_in_setpoint: float,
@@ -150,6 +238,8 @@ class RC1Model:
         
         Při ustáleném stavu: Q_heat = H_total * (T_in - T_out) - Q_solar - Q_internal
         
+        Argumenty mohou být i pole (celý rok najednou).
+        
         Returns:
             Potřebný výkon [W]
         """
@@ -158,33 +248,79 @@ class RC1Model:
         
         Q_heat = self.H_total * (T_in_setpoint - T_out) - Q_solar - Q_internal
         
-        return max(0, Q_heat)  # Nemůže být záporné (bez chlazení)
+        return np.maximum(0, Q_heat)  # Nemůže být záporné (bez chlazení)
+
+
+def simulate_coarse(
+    model,
+    T_in_initial: float,
+    hourly_df: pd.DataFrame,
+    step_hours: int = 3,
+    Q_heat_column: str = 'heating_power_W'
+) -> pd.DataFrame:
+    """
+    Rychlá simulace s hrubým krokem (např. 3 h nebo 24 h).
+    
+    Vstupy se zprůměrují po blocích step_hours hodin a model (libovolného
+    řádu se simulate_arrays) se simuluje s krokem step_hours·3600 s.
+    
+    Args:
+        model: RC model (RC1Model nebo model z core.rc_statespace)
+        T_in_initial: počáteční vnitřní teplota
+        hourly_df: hodinová data s timestamp, temp_out_c, (Q_heat_column, ghi_wm2)
+        step_hours: délka kroku v hodinách
+    
+    Returns:
+        DataFrame po krocích: timestamp (začátek kroku), průměrné vstupy
+        a T_in_simulated_c na konci kroku
+    """
+    columns = [c for c in ('temp_out_c', Q_heat_column, 'ghi_wm2') if c in hourly_df.columns]
+    blocks = np.arange(len(hourly_df)) // step_hours
+    coarse = hourly_df[columns].groupby(blocks).mean()
+    coarse.insert(0, 'timestamp', hourly_df['timestamp'].groupby(blocks).first().to_numpy())
+    
+    heat = coarse[Q_heat_column].to_numpy(dtype=float) if Q_heat_column in coarse else np.zeros(len(coarse))
+    coarse['T_in_simulated_c'] = model.simulate_arrays(
+        T_in_initial,
+        coarse['temp_out_c'].to_numpy(dtype=float),
+        heat,
+        coarse['ghi_wm2'].to_numpy(dtype=float) if 'ghi_wm2' in coarse else None,
+        dt_seconds=step_hours * 3600
+    )
+    return coarse.reset_index(drop=True)
 
 
 def estimate_initial_parameters(
     daily_energy_df: pd.DataFrame,
-    hourly_weather_df: pd.DataFrame,
+    hourly_weather_df: Union[pd.DataFrame, DayHourMatrix],
     volume_m3: float,
     avg_indoor_temp: float
 ) -> Tuple[float, float, float]:
     """
     Hrubý počáteční odhad parametrů pomocí lineární regrese.
     
+    Args:
+        daily_energy_df: denní data s date, heating_kwh
+        hourly_weather_df: hodinové počasí (DataFrame) nebo matice
+            den × hodina venkovní teploty (DayHourMatrix)
+        volume_m3: objem bytu
+        avg_indoor_temp: průměrná vnitřní teplota
+    
     Returns:
         (H_env_initial, infiltration_initial, C_th_initial)
     """
-    # Merge denní průměry
-    daily_avg = hourly_weather_df.groupby(
-        hourly_weather_df['timestamp'].dt.date
-    ).agg({
-        'temp_out_c': 'mean'
-    }).reset_index()
-    
-    daily_avg.columns = ['date', 'avg_temp_out']
+    # Denní průměry venkovní teploty = průměr řádků matice
+    if isinstance(hourly_weather_df, DayHourMatrix):
+        temp_matrix = hourly_weather_df
+    else:
+        temp_matrix = DayHourMatrix.from_hourly(hourly_weather_df, 'temp_out_c')
     
-    # Převeď date na datetime pro konzistentní merge
-    daily_avg['date'] = pd.to_datetime(daily_avg['date'])
+    daily_avg = pd.DataFrame({
+        'date': pd.to_datetime(temp_matrix.dates),
+        'avg_temp_out': temp_matrix.daily_mean()
+    }).dropna(subset=['avg_temp_out'])
     
+    daily_energy_df = daily_energy_df.assign(date=pd.to_datetime(daily_energy_df['date']))
     merged = daily_energy_df.merge(daily_avg, on='date', how='inner')
     
     # Delta teplota
@@ -0,0 +1,712 @@
+"""
+Rodina stavových RC modelů (1R1C, 2R2C, 3R2C) se společným výpočetním jádrem
+
+Jedna kapacita 1R1C nerozliší rychlou dynamiku vzduchu od pomalé
+akumulace v konstrukci. Modely vyššího řádu mají dva tepelné uzly:
+
+    2R2C:  T_out ──R_eo── [T_e, C_e] ──R_ie── [T_i, C_i] ──(větrání)── T_out
+    3R2C:  2R2C + přímá ztráta vzduch → venek (okna, R_w)
+
+Odpory obálky jsou parametrizované tak, že ustálená ztráta zůstane
+H_env (sériové R_ie + R_eo a paralelní R_w dají dohromady 1/H_env), takže
+H_env, infiltrace, C_th i interní zisky mají stejný význam jako u 1R1C.
+Navíc:
+    air_capacity_fraction  podíl C_th ve vzduchu a vybavení (C_i)
+    envelope_split         podíl odporu obálky mezi vzduchem a uzlem obálky
+    window_fraction        podíl H_env jdoucí přímo ven (pouze 3R2C)
+
+Všechny modely mají stavový tvar dx/dt = A·x + B·u se vstupy
+u = [T_out, Q_air] (Q_air = topení + slunce + interní zisky do vzduchu)
+a diskretizují se přesně (ZOH) maticovou exponenciálou:
+
+    expm([[A, B], [0, 0]]·dt) = [[A_d, B_d], [0, I]],  x[k+1] = A_d·x[k] + B_d·u[k]
+
+Jádro (propagate) počítá dávku modelů stejného řádu najednou. S numbou
+jde o JIT smyčku, bez ní se rekurence rozloží do vlastních módů A_d
+(RC sítě mají reálná kladná vlastní čísla) a každý mód se spočte přes
+scipy.signal.lfilter.
+
+Proměnný krok (pole dt): A = V·Λ·V⁻¹ se rozloží jednou, každý mód má
+útlum exp(λ·dt[k]) a buzení (exp(λ·dt[k]) - 1)/λ · (V⁻¹·B·u[k]) - obojí
+vektorově pro všechny kroky, rekurence přes rc_kernel.linear_recurrence.
+
+Roční simulace s termostatem (thermostat, simulate_thermostat): v každém
+kroku se dodá právě tolik tepla, aby vzduch na konci kroku dosáhl
+požadované teploty (volitelně omezeno výkonem otopné soustavy).
+
+Společné rozhraní (RC1Model i třídy zde): ORDER, N_STATES,
+EXTRA_PARAMETERS, H_total, continuous_matrices(), loss_coefficients(),
+simulate_arrays(), simulate_hourly(), estimate_heating_demand().
+
+Benchmark: python -m core.rc_statespace
+"""
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import expm
+from scipy.signal import lfilter
+
+from core import rc_kernel
+from core.data_models import CalibratedParameters
+from core.rc_model import RC1Model, RHO_AIR, CP_AIR, DEFAULT_SOLAR_APERTURE
+
+
+# Výchozí hodnoty a meze parametrů vyšších řádů (pro kalibraci)
+EXTRA_PARAMETER_DEFAULTS = {
+    'air_capacity_fraction': 0.1,
+    'envelope_split': 0.5,
+    'window_fraction': 0.2,
+}
+EXTRA_PARAMETER_BOUNDS = {
+    'air_capacity_fraction': (0.01, 0.5),
+    'envelope_split': (0.05, 0.95),
+    'window_fraction': (0.0, 0.6),
+}
+
+if rc_kernel.HAVE_NUMBA:
+    from numba import njit
+
+
+def discretize_zoh(
+    A: np.ndarray,
+    B: np.ndarray,
+    dt_seconds: float = 3600
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Přesná diskretizace (ZOH) stavového tvaru.
+
+    Args:
+        A: (..., n, n) matice systému
+        B: (..., n, m) matice vstupů
+        dt_seconds: časový krok
+
+    Returns:
+        (A_d, B_d) se stejnými rozměry jako (A, B)
+    """
+    A = np.asarray(A, dtype=float)
+    B = np.asarray(B, dtype=float)
+    n, m = B.shape[-2], B.shape[-1]
+
+    M = np.zeros(A.shape[:-2] + (n + m, n + m))
+    M[..., :n, :n] = A * dt_seconds
+    M[..., :n, n:] = B * dt_seconds
+    E = expm(M)
+    return E[..., :n, :n], E[..., :n, n:]
+
+
+# --- Výpočetní jádro ---------------------------------------------------------
+
+def _propagate_loop(A_d, drive, x0):
+    """Přímá rekurence (záloha pro nediagonalizovatelné A_d)"""
+    n_batch, n_steps, n_states = drive.shape
+    states = np.empty_like(drive)
+    x = x0.copy()
+    for k in range(n_steps):
+        x = np.einsum('bij,bj->bi', A_d, x) + drive[:, k]
+        states[:, k] = x
+    return states
+
+
+def _propagate_modal(A_d, drive, x0):
+    """Rekurence rozložená do vlastních módů, každý mód přes lfilter"""
+    eigenvalues, V = np.linalg.eig(A_d)
+    if np.abs(eigenvalues.imag).max() > 1e-12 or np.abs(V.imag).max() > 1e-12:
+        return _propagate_loop(A_d, drive, x0)
+    eigenvalues, V = eigenvalues.real, V.real
+    V_inv = np.linalg.inv(V)
+
+    modal_drive = np.einsum('bij,btj->bti', V_inv, drive)
+    modal_x0 = np.einsum('bij,bj->bi', V_inv, x0)
+    modes = np.empty_like(modal_drive)
+    for b in range(drive.shape[0]):
+        for i in range(drive.shape[2]):
+            lam = eigenvalues[b, i]
+            modes[b, :, i], _ = lfilter(
+                [1.0], [1.0, -lam], modal_drive[b, :, i], zi=[lam * modal_x0[b, i]]
+            )
+    return np.einsum('bij,btj->bti', V, modes)
+
+
+if rc_kernel.HAVE_NUMBA:
+    @njit(cache=True)
+    def _propagate_numba(A_d, drive, x0):
+        n_batch, n_steps, n_states = drive.shape
+        states = np.empty_like(drive)
+        x = np.empty(n_states)
+        x_new = np.empty(n_states)
+        for b in range(n_batch):
+            for i in range(n_states):
+                x[i] = x0[b, i]
+            for k in range(n_steps):
+                for i in range(n_states):
+                    acc = drive[b, k, i]
+                    for j in range(n_states):
+                        acc += A_d[b, i, j] * x[j]
+                    x_new[i] = acc
+                for i in range(n_states):
+                    x[i] = x_new[i]
+                    states[b, k, i] = x_new[i]
+        return states
+
+
+def propagate(
+    A_d: np.ndarray,
+    B_d: np.ndarray,
+    x0: np.ndarray,
+    inputs: np.ndarray,
+    use_numba: Optional[bool] = None
+) -> np.ndarray:
+    """
+    Dávková simulace x[k+1] = A_d·x[k] + B_d·u[k].
+
+    Args:
+        A_d: (b, n, n) diskrétní matice systému
+        B_d: (b, n, m) diskrétní matice vstupů
+        x0: (b, n) počáteční stavy
+        inputs: (t, m) vstupy společné všem modelům, nebo (b, t, m)
+        use_numba: None = automaticky
+
+    Returns:
+        (b, t, n) stavy na konci každého kroku
+    """
+    A_d = np.ascontiguousarray(A_d, dtype=float)
+    x0 = np.ascontiguousarray(x0, dtype=float)
+    inputs = np.asarray(inputs, dtype=float)
+    if inputs.ndim == 2:
+        drive = np.einsum('bnm,tm->btn', B_d, inputs)
+    else:
+        drive = np.einsum('bnm,btm->btn', B_d, inputs)
+
+    if rc_kernel.HAVE_NUMBA if use_numba is None else use_numba:
+        return _propagate_numba(A_d, np.ascontiguousarray(drive), x0)
+    return _propagate_modal(A_d, drive, x0)
+
+
+def _thermostat_loop(A_d, B_d, x0, inputs, T_setpoint, q_max):
+    """Termostat krok po kroku, vektorově přes dávku (záloha bez numby)"""
+    n_steps = inputs.shape[1]
+    states = np.empty((A_d.shape[0], n_steps, A_d.shape[1]))
+    heat = np.empty((A_d.shape[0], n_steps))
+    gain = B_d[:, :, 1]
+    x = x0.copy()
+    for k in range(n_steps):
+        x = np.einsum('bij,bj->bi', A_d, x) + np.einsum('bij,bj->bi', B_d, inputs[:, k])
+        q = np.clip((T_setpoint[:, k] - x[:, 0]) / gain[:, 0], 0.0, q_max)
+        x = x + gain * q[:, None]
+        states[:, k] = x
+        heat[:, k] = q
+    return states, heat
+
+
+if rc_kernel.HAVE_NUMBA:
+    @njit(cache=True)
+    def _thermostat_numba(A_d, B_d, x0, inputs, T_setpoint, q_max):
+        n_batch, n_states = x0.shape
+        n_steps = inputs.shape[1]
+        states = np.empty((n_batch, n_steps, n_states))
+        heat = np.empty((n_batch, n_steps))
+        x = np.empty(n_states)
+        x_new = np.empty(n_states)
+        for b in range(n_batch):
+            for i in range(n_states):
+                x[i] = x0[b, i]
+            for k in range(n_steps):
+                for i in range(n_states):
+                    acc = B_d[b, i, 0] * inputs[b, k, 0] + B_d[b, i, 1] * inputs[b, k, 1]
+                    for j in range(n_states):
+                        acc += A_d[b, i, j] * x[j]
+                    x_new[i] = acc
+                q = (T_setpoint[b, k] - x_new[0]) / B_d[b, 0, 1]
+                if q < 0.0:
+                    q = 0.0
+                elif q > q_max[b]:
+                    q = q_max[b]
+                for i in range(n_states):
+                    x[i] = x_new[i] + B_d[b, i, 1] * q
+                    states[b, k, i] = x[i]
+                heat[b, k] = q
+        return states, heat
+
+
+def thermostat(
+    A_d: np.ndarray,
+    B_d: np.ndarray,
+    x0: np.ndarray,
+    inputs: np.ndarray,
+    T_setpoint: np.ndarray,
+    q_max: np.ndarray,
+    use_numba: Optional[bool] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dávková simulace s ideálním termostatem (regulace na konec kroku).
+
+    V každém kroku se spočte volný průběh bez topení; chybí-li do
+    T_setpoint[b, k] na konci kroku, dodá se konstantní výkon
+    q = (T_setpoint - T_volná) / B_d[0, 1] oříznutý na <0, q_max>.
+    Regulace je nelineární (max/min), proto jde o sekvenční smyčku -
+    bez numby běží v Pythonu (~70 ms na rok 8760 h), s numbou ~0.2 ms.
+
+    Args:
+        A_d: (b, n, n) diskrétní matice systému
+        B_d: (b, n, 2) diskrétní matice vstupů [T_out, Q_air]
+        x0: (b, n) počáteční stavy
+        inputs: (b, t, 2) vstupy bez topení (T_out, zisky do vzduchu)
+        T_setpoint: (b, t) požadovaná teplota vzduchu
+        q_max: (b,) maximální výkon topení [W] (np.inf = neomezený)
+        use_numba: None = automaticky
+
+    Returns:
+        ((b, t, n) stavy, (b, t) výkon topení [W])
+    """
+    args = (
+        np.ascontiguousarray(A_d, dtype=float),
+        np.ascontiguousarray(B_d, dtype=float),
+        np.ascontiguousarray(x0, dtype=float),
+        np.ascontiguousarray(inputs, dtype=float),
+        np.ascontiguousarray(T_setpoint, dtype=float),
+        np.ascontiguousarray(q_max, dtype=float),
+    )
+    if rc_kernel.HAVE_NUMBA if use_numba is None else use_numba:
+        return _thermostat_numba(*args)
+    return _thermostat_loop(*args)
+
+
+# --- Modely ------------------------------------------------------------------
+
+class StateSpaceRCModel(ABC):
+    """
+    Společný základ modelů vyššího řádu (stav x[0] = teplota vzduchu).
+
+    Parametry obálky a zisků mají stejný význam jako u RC1Model; potomci
+    musí definovat continuous_matrices() a loss_coefficients() (abstraktní
+    třída, sama instancovat nejde).
+    """
+
+    ORDER = ""
+    N_STATES = 0
+    EXTRA_PARAMETERS: Tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        H_env_W_per_K: float,
+        infiltration_rate_per_h: float,
+        volume_m3: float,
+        C_th_J_per_K: float,
+        area_m2: float,
+        internal_gains_W_per_m2: float = 3.0,
+        solar_aperture: float = DEFAULT_SOLAR_APERTURE,
+        air_capacity_fraction: float = EXTRA_PARAMETER_DEFAULTS['air_capacity_fraction'],
+        envelope_split: float = EXTRA_PARAMETER_DEFAULTS['envelope_split']
+    ):
+        self.H_env = H_env_W_per_K
+        self.n = infiltration_rate_per_h
+        self.V = volume_m3
+        self.C_th = C_th_J_per_K
+        self.A = area_m2
+        self.q_int = internal_gains_W_per_m2
+        self.solar_ap = solar_aperture
+        self.air_capacity_fraction = air_capacity_fraction
+        self.envelope_split = envelope_split
+
+        self.H_vent = RHO_AIR * CP_AIR * self.n * self.V / 3600
+        self.H_total = self.H_env + self.H_vent
+
+        self.C_air = air_capacity_fraction * C_th_J_per_K
+        self.C_env = (1 - air_capacity_fraction) * C_th_J_per_K
+        self._discrete: Dict[float, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @abstractmethod
+    def continuous_matrices(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Spojité matice (A, B) tvaru (n, n) a (n, 2) pro vstupy [T_out, Q_air]"""
+
+    @abstractmethod
+    def loss_coefficients(self) -> Tuple[np.ndarray, float]:
+        """(c, d): tepelná ztráta ven = stavy @ c + d·T_out [W]"""
+
+    def discrete_matrices(self, dt_seconds: float = 3600) -> Tuple[np.ndarray, np.ndarray]:
+        """(A_d, B_d) pro krok dt (spočte se jednou pro každé dt)"""
+        if dt_seconds not in self._discrete:
+            self._discrete[dt_seconds] = discretize_zoh(*self.continuous_matrices(), dt_seconds)
+        return self._discrete[dt_seconds]
+
+    def solar_gains_W(self, ghi_wm2: np.ndarray) -> np.ndarray:
+        """Sluneční zisky [W] z globálního záření"""
+        return ghi_wm2 * self.A * self.solar_ap
+
+    def simulate_states(
+        self,
+        T_initial: float,
+        temp_out: np.ndarray,
+        Q_air_W: np.ndarray,
+        dt_seconds: Union[float, np.ndarray] = 3600
+    ) -> np.ndarray:
+        """
+        Průběh všech stavů; Q_air_W zahrnuje topení, slunce i interní zisky.
+
+        Args:
+            dt_seconds: délka kroku, nebo pole délek jednotlivých kroků
+
+        Returns:
+            (t, N_STATES) stavy na konci každého kroku (všechny uzly začínají na T_initial)
+        """
+        inputs = np.column_stack([temp_out, Q_air_W])
+        x0 = np.full(self.N_STATES, float(T_initial))
+        if np.ndim(dt_seconds) > 0:
+            return self._simulate_variable(x0, inputs, np.asarray(dt_seconds, dtype=float))
+
+        A_d, B_d = self.discrete_matrices(dt_seconds)
+        return propagate(A_d[None], B_d[None], x0[None], inputs)[0]
+
+    def _simulate_variable(self, x0: np.ndarray, inputs: np.ndarray, dt: np.ndarray) -> np.ndarray:
+        """Proměnný krok přes vlastní módy spojitého A"""
+        A, B = self.continuous_matrices()
+        eigenvalues, V = np.linalg.eig(A)
+        if np.abs(eigenvalues.imag).max() > 1e-12:
+            raise ValueError("Matice systému RC modelu má komplexní vlastní čísla")
+        eigenvalues, V = eigenvalues.real, V.real
+        V_inv = np.linalg.inv(V)
+
+        exponent = np.outer(dt, eigenvalues)
+        decay = np.exp(exponent)
+        drive = np.expm1(exponent) / eigenvalues * (inputs @ (V_inv @ B).T)
+        z0 = V_inv @ x0
+        modes = np.column_stack([
+            rc_kernel.linear_recurrence(decay[:, i], drive[:, i], z0[i])
+            for i in range(self.N_STATES)
+        ])
+        return modes @ V.T
+
+    def heat_loss_W(self, states: np.ndarray, temp_out: np.ndarray) -> np.ndarray:
+        """Tepelná ztráta ven [W] pro průběh stavů"""
+        c, d = self.loss_coefficients()
+        return states @ c + d * temp_out
+
+    def simulate_arrays(
+        self,
+        T_in_initial: float,
+        temp_out: np.ndarray,
+        Q_heat_W: np.ndarray,
+        ghi_wm2: Optional[np.ndarray] = None,
+        dt_seconds: Union[float, np.ndarray] = 3600
+    ) -> np.ndarray:
+        """
+        Simuluj průběh nad poli (stejné rozhraní jako RC1Model.simulate_arrays).
+
+        Returns:
+            Teplota vzduchu na konci každého kroku
+        """
+        q_air = np.asarray(Q_heat_W, dtype=float) + self.q_int * self.A
+        if ghi_wm2 is not None:
+            q_air = q_air + self.solar_gains_W(np.asarray(ghi_wm2, dtype=float))
+        temp_out = np.asarray(temp_out, dtype=float)
+        return self.simulate_states(T_in_initial, temp_out, q_air, dt_seconds)[:, 0]
+
+    def simulate_hourly(
+        self,
+        T_in_initial: float,
+        hourly_df: pd.DataFrame,
+        Q_heat_column: str = 'heating_power_W'
+    ) -> pd.DataFrame:
+        """Simuluj hodinový průběh (viz RC1Model.simulate_hourly)"""
+        df = hourly_df.copy()
+        heat = df[Q_heat_column].to_numpy(dtype=float) if Q_heat_column in df.columns else np.zeros(len(df))
+        if Q_heat_column.lower().endswith('_kw'):
+            heat = heat * 1000  # kW → W
+
+        df['T_in_simulated_c'] = self.simulate_arrays(
+            T_in_initial,
+            df['temp_out_c'].to_numpy(dtype=float),
+            heat,
+            df['ghi_wm2'].to_numpy(dtype=float) if 'ghi_wm2' in df.columns else None,
+            dt_seconds=(rc_kernel.uniform_step(rc_kernel.step_seconds(df['timestamp']))
+                        if 'timestamp' in df.columns else 3600)
+        )
+        return df
+
+    def estimate_heating_demand(self, T_in_setpoint, T_out, GHI_W_per_m2=0):
+        """Ustálená potřeba tepla [W] - shodná s 1R1C (ustálená ztráta je H_total)"""
+        Q_solar = GHI_W_per_m2 * self.A * self.solar_ap
+        Q_heat = self.H_total * (T_in_setpoint - T_out) - Q_solar - self.q_int * self.A
+        return np.maximum(0, Q_heat)
+
+
+class RC2R2CModel(StateSpaceRCModel):
+    """
+    2R2C: vzduch (C_i) a obálka (C_e) v sérii, větrání přímo ze vzduchu.
+
+    C_i·dT_i/dt = H_ie·(T_e - T_i) + H_vent·(T_out - T_i) + Q_air
+    C_e·dT_e/dt = H_ie·(T_i - T_e) + H_eo·(T_out - T_e)
+    """
+
+    ORDER = "2r2c"
+    N_STATES = 2
+    EXTRA_PARAMETERS = ('air_capacity_fraction', 'envelope_split')
+
+    def _opaque_conductance(self) -> float:
+        return self.H_env
+
+    def _conductances(self) -> Tuple[float, float, float]:
+        """(H_ie, H_eo, H_w): sériová obálka a přímá ztráta vzduchu"""
+        H_opaque = self._opaque_conductance()
+        H_ie = H_opaque / self.envelope_split
+        H_eo = H_opaque / (1 - self.envelope_split)
+        return H_ie, H_eo, self.H_env - H_opaque
+
+    def continuous_matrices(self) -> Tuple[np.ndarray, np.ndarray]:
+        H_ie, H_eo, H_w = self._conductances()
+        H_air_out = self.H_vent + H_w
+        A = np.array([
+            [-(H_ie + H_air_out) / self.C_air, H_ie / self.C_air],
+            [H_ie / self.C_env, -(H_ie + H_eo) / self.C_env]
+        ])
+        B = np.array([
+            [H_air_out / self.C_air, 1.0 / self.C_air],
+            [H_eo / self.C_env, 0.0]
+        ])
+        return A, B
+
+    def loss_coefficients(self) -> Tuple[np.ndarray, float]:
+        H_ie, H_eo, H_w = self._conductances()
+        H_air_out = self.H_vent + H_w
+        return np.array([H_air_out, H_eo]), -(H_air_out + H_eo)
+
+
+class RC3R2CModel(RC2R2CModel):
+    """
+    3R2C: 2R2C + přímá ztráta H_w = window_fraction·H_env ze vzduchu ven.
+
+    C_i·dT_i/dt = H_ie·(T_e - T_i) + (H_vent + H_w)·(T_out - T_i) + Q_air
+    """
+
+    ORDER = "3r2c"
+    EXTRA_PARAMETERS = ('air_capacity_fraction', 'envelope_split', 'window_fraction')
+
+    def __init__(self, *args,
+                 window_fraction: float = EXTRA_PARAMETER_DEFAULTS['window_fraction'],
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.window_fraction = window_fraction
+
+    def _opaque_conductance(self) -> float:
+        return (1 - self.window_fraction) * self.H_env
+
+
+MODEL_CLASSES = {
+    RC1Model.ORDER: RC1Model,
+    RC2R2CModel.ORDER: RC2R2CModel,
+    RC3R2CModel.ORDER: RC3R2CModel,
+}
+
+
+def get_model_class(model_order: str):
+    """
+    Třída modelu podle řádu ("1r1c", "2r2c", "3r2c").
+
+    Raises:
+        ValueError: neznámý řád modelu
+    """
+    model_order = getattr(model_order, 'value', model_order)
+    try:
+        return MODEL_CLASSES[model_order]
+    except KeyError:
+        raise ValueError(
+            f"Neznámý řád RC modelu '{model_order}' (podporované: {', '.join(MODEL_CLASSES)})"
+        )
+
+
+def build_rc_model(
+    model_order: str,
+    H_env_W_per_K: float,
+    infiltration_rate_per_h: float,
+    volume_m3: float,
+    C_th_J_per_K: float,
+    area_m2: float,
+    internal_gains_W_per_m2: float = 3.0,
+    **extra_parameters: float
+):
+    """RC model zadaného řádu; chybějící parametry vyššího řádu mají výchozí hodnoty"""
+    model_class = get_model_class(model_order)
+    extra = {name: extra_parameters.get(name, EXTRA_PARAMETER_DEFAULTS[name])
+             for name in model_class.EXTRA_PARAMETERS}
+    return model_class(
+        H_env_W_per_K, infiltration_rate_per_h, volume_m3, C_th_J_per_K, area_m2,
+        internal_gains_W_per_m2=internal_gains_W_per_m2, **extra
+    )
+
+
+def model_from_parameters(
+    params: CalibratedParameters,
+    volume_m3: float,
+    area_m2: float
+):
+    """RC model odpovídající kalibrovaným parametrům (včetně řádu)"""
+    model_class = get_model_class(params.model_order)
+    extra = {name: getattr(params, name) for name in model_class.EXTRA_PARAMETERS
+             if getattr(params, name) is not None}
+    return build_rc_model(
+        params.model_order,
+        params.H_env_W_per_K,
+        params.infiltration_rate_per_h,
+        volume_m3,
+        params.C_th_J_per_K,
+        area_m2,
+        params.internal_gains_W_per_m2,
+        **extra
+    )
+
+
+def simulate_batch(
+    models: Sequence,
+    T_initial: float,
+    temp_out: np.ndarray,
+    Q_air_W: np.ndarray,
+    dt_seconds: float = 3600
+) -> np.ndarray:
+    """
+    Simuluje více modelů stejného řádu najednou (např. varianty parametrů).
+
+    Args:
+        models: modely stejného řádu
+        T_initial: počáteční teplota všech uzlů
+        temp_out: (t,) venkovní teplota
+        Q_air_W: (t,) společné nebo (b, t) vlastní teplo do vzduchu vč. zisků
+
+    Returns:
+        (b, t, N_STATES) stavy
+    """
+    orders = {model.ORDER for model in models}
+    if len(orders) != 1:
+        raise ValueError(f"Dávka musí obsahovat modely jednoho řádu, má {sorted(orders)}")
+
+    matrices = [discretize_zoh(*model.continuous_matrices(), dt_seconds) for model in models]
+    A_d = np.stack([m[0] for m in matrices])
+    B_d = np.stack([m[1] for m in matrices])
+    x0 = np.full((len(models), models[0].N_STATES), float(T_initial))
+
+    temp_out = np.asarray(temp_out, dtype=float)
+    Q_air_W = np.asarray(Q_air_W, dtype=float)
+    if Q_air_W.ndim == 1:
+        inputs = np.column_stack([temp_out, Q_air_W])
+    else:
+        inputs = np.stack([np.broadcast_to(temp_out, Q_air_W.shape), Q_air_W], axis=-1)
+    return propagate(A_d, B_d, x0, inputs)
+
+
+def simulate_thermostat(
+    models,
+    T_initial: float,
+    temp_out: np.ndarray,
+    Q_free_W: np.ndarray,
+    T_setpoint: np.ndarray,
+    heater_power_W=None,
+    dt_seconds: float = 3600,
+    use_numba: Optional[bool] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dynamická simulace s termostatem pro jeden model nebo dávku modelů.
+
+    Args:
+        models: model nebo seznam modelů stejného řádu
+        T_initial: počáteční teplota všech uzlů (skalár nebo (b,))
+        temp_out: (t,) venkovní teplota
+        Q_free_W: (t,) společné nebo (b, t) vlastní zisky do vzduchu bez topení
+        T_setpoint: (t,) společná nebo (b, t) vlastní požadovaná vnitřní teplota
+        heater_power_W: výkon otopné soustavy (skalár nebo (b,)); None/np.inf = neomezený
+        dt_seconds: časový krok
+
+    Returns:
+        (T_air, Q_heat) - (t,) pro jeden model, jinak (b, t)
+    """
+    single = not isinstance(models, (list, tuple))
+    batch = [models] if single else list(models)
+    orders = {model.ORDER for model in batch}
+    if len(orders) != 1:
+        raise ValueError(f"Dávka musí obsahovat modely jednoho řádu, má {sorted(orders)}")
+
+    matrices = [discretize_zoh(*model.continuous_matrices(), dt_seconds) for model in batch]
+    A_d = np.stack([m[0] for m in matrices])
+    B_d = np.stack([m[1] for m in matrices])
+    x0 = np.repeat(np.broadcast_to(np.asarray(T_initial, dtype=float), (len(batch),))[:, None],
+                   batch[0].N_STATES, axis=1)
+
+    temp_out = np.asarray(temp_out, dtype=float)
+    Q_free_W = np.broadcast_to(np.asarray(Q_free_W, dtype=float), (len(batch), len(temp_out)))
+    inputs = np.stack([np.broadcast_to(temp_out, Q_free_W.shape), Q_free_W], axis=-1)
+    T_setpoint = np.broadcast_to(np.asarray(T_setpoint, dtype=float), Q_free_W.shape)
+    q_max = np.broadcast_to(np.inf if heater_power_W is None else heater_power_W,
+                            (len(batch),)).astype(float)
+
+    states, heat = thermostat(A_d, B_d, x0, inputs, T_setpoint, q_max, use_numba)
+    if single:
+        return states[0, :, 0], heat[0]
+    return states[:, :, 0], heat
+
+
+def benchmark(
+    n_hours: int = 24 * 365,
+    repeat: int = 3,
+    orders: Optional[List[str]] = None
+) -> Dict[str, float]:
+    """
+    Změří ns na simulovanou hodinu (simulate_arrays) pro každý řád modelu.
+
+    Returns:
+        {řád: ns/h}
+    """
+    rng = np.random.default_rng(0)
+    temp_out = rng.normal(5, 5, n_hours)
+    q_heat = rng.uniform(0, 3000, n_hours)
+    ghi = np.maximum(0, 300 * np.sin(np.arange(n_hours) * 2 * np.pi / 24))
+
+    results = {}
+    for order in orders or list(MODEL_CLASSES):
+        model = build_rc_model(order, 120.0, 0.5, 150.0, 2e7, 60.0)
+        model.simulate_arrays(20.0, temp_out, q_heat, ghi)  # kompilace / zahřátí
+        best = np.inf
+        for _ in range(repeat):
+            start = time.perf_counter()
+            model.simulate_arrays(20.0, temp_out, q_heat, ghi)
+            best = min(best, time.perf_counter() - start)
+        results[order] = best / n_hours * 1e9
+    return results
+
+
+def benchmark_thermostat(
+    n_hours: int = 24 * 365,
+    repeat: int = 3,
+    orders: Optional[List[str]] = None
+) -> Dict[str, float]:
+    """
+    Změří µs na roční simulaci s termostatem (simulate_thermostat) pro každý řád.
+
+    Returns:
+        {řád: µs/rok}
+    """
+    rng = np.random.default_rng(0)
+    temp_out = rng.normal(5, 5, n_hours)
+    q_free = np.full(n_hours, 180.0)
+    setpoint = np.where(np.arange(n_hours) % 24 < 6, 19.0, 21.0)
+
+    results = {}
+    for order in orders or list(MODEL_CLASSES):
+        model = build_rc_model(order, 120.0, 0.5, 150.0, 2e7, 60.0)
+        simulate_thermostat(model, 20.0, temp_out, q_free, setpoint)  # kompilace / zahřátí
+        best = np.inf
+        for _ in range(repeat):
+            start = time.perf_counter()
+            simulate_thermostat(model, 20.0, temp_out, q_free, setpoint)
+            best = min(best, time.perf_counter() - start)
+        results[order] = best * 1e6
+    return results
+
+
+if __name__ == "__main__":
+    print(f"Benchmark RC modelů (numba {'dostupná' if rc_kernel.HAVE_NUMBA else 'nedostupná'})")
+    for order, ns_per_hour in benchmark().items():
+        print(f"  {order}: {ns_per_hour:7.1f} ns/hodinu")
+    print("Roční simulace s termostatem")
+    for order, us_per_year in benchmark_thermostat().items():
+        print(f"  {order}: {us_per_year:7.1f} µs/rok")
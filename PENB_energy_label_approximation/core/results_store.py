@@ -0,0 +1,256 @@
+"""
+Sloupcové úložiště výsledků štítkování pro statistiky portfolia
+
+Každý výpočet (AnnualResults + kalibrované parametry + vstupy) se připíše
+jako jeden řádek do datasetu Parquet rozděleného podle data výpočtu:
+
+    storage/results/run_date=YYYY-MM-DD/part-<čas>-<id>.parquet
+
+Každé připsání je nový soubor (zápis atomicky přes os.replace, rozpracované
+soubory začínají tečkou a dataset je ignoruje), takže se existující data
+nikdy nepřepisují. Dotazy čtou přes pyarrow.dataset pouze potřebné sloupce
+a partice omezené filtrem na datum.
+"""
+import os
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from core.config import STORAGE_DIR
+from core.data_models import AnnualResults, CalibratedParameters, EnergyClass, UserInputs
+
+
+RESULTS_STORE_DIR = STORAGE_DIR / "results"
+
+CLASS_LABELS = [c.value for c in EnergyClass]
+
+# Schéma řádku (run_date je partice - je v cestě, ne v souboru)
+RESULT_SCHEMA = pa.schema([
+    ('run_id', pa.string()),
+    ('computation_date', pa.timestamp('us')),
+    ('apartment_id', pa.string()),
+    ('location', pa.string()),
+    ('district', pa.string()),
+    ('area_m2', pa.float64()),
+    ('volume_m3', pa.float64()),
+    ('system_type', pa.string()),
+    ('computation_mode', pa.string()),
+    ('model_order', pa.string()),
+    ('n_days', pa.int32()),
+    ('heating_demand_kwh_per_m2_year', pa.float64()),
+    ('primary_energy_kwh_per_m2_year', pa.float64()),
+    ('energy_class', pa.string()),
+    ('quality_level', pa.string()),
+    ('heating_demand_lower_bound', pa.float64()),
+    ('heating_demand_upper_bound', pa.float64()),
+    *[(f'class_probability_{c}', pa.float64()) for c in CLASS_LABELS],
+    ('H_env_W_per_K', pa.float64()),
+    ('infiltration_rate_per_h', pa.float64()),
+    ('C_th_J_per_K', pa.float64()),
+    ('baseline_TUV_kwh_per_day', pa.float64()),
+    ('internal_gains_W_per_m2', pa.float64()),
+    ('rmse_temperature_c', pa.float64()),
+    ('mape_energy_pct', pa.float64()),
+])
+RESULT_COLUMNS = RESULT_SCHEMA.names
+PARTITIONING = ds.partitioning(pa.schema([('run_date', pa.date32())]), flavor='hive')
+
+
+def result_record(
+    annual: AnnualResults,
+    calibrated: CalibratedParameters,
+    user_inputs: UserInputs,
+    run_id: Optional[str] = None
+) -> Dict:
+    """
+    Jeden řádek úložiště z výsledku výpočtu.
+
+    Returns:
+        slovník se sloupci RESULT_COLUMNS
+    """
+    probabilities = annual.energy_class_probabilities or {}
+    record = {
+        'run_id': run_id or uuid.uuid4().hex,
+        'computation_date': annual.computation_date,
+        'apartment_id': user_inputs.apartment_id,
+        'location': user_inputs.location,
+        'district': user_inputs.district,
+        'area_m2': user_inputs.geometry.area_m2,
+        'volume_m3': user_inputs.geometry.volume_m3,
+        'system_type': user_inputs.heating_system.system_type.value,
+        'computation_mode': user_inputs.computation_mode.value,
+        'model_order': calibrated.model_order.value,
+        'n_days': len(user_inputs.daily_energy),
+        'heating_demand_kwh_per_m2_year': annual.heating_demand_kwh_per_m2_year,
+        'primary_energy_kwh_per_m2_year': annual.primary_energy_kwh_per_m2_year,
+        'energy_class': annual.energy_class.value,
+        'quality_level': annual.quality_level.value,
+        'heating_demand_lower_bound': annual.heating_demand_lower_bound,
+        'heating_demand_upper_bound': annual.heating_demand_upper_bound,
+    }
+    for c in CLASS_LABELS:
+        record[f'class_probability_{c}'] = probabilities.get(c, np.nan if not probabilities else 0.0)
+    for name in ('H_env_W_per_K', 'infiltration_rate_per_h', 'C_th_J_per_K',
+                 'baseline_TUV_kwh_per_day', 'internal_gains_W_per_m2',
+                 'rmse_temperature_c', 'mape_energy_pct'):
+        record[name] = getattr(calibrated, name)
+    return record
+
+
+class ResultsStore:
+    """
+    Dataset výsledků štítkování (Parquet, partice podle data výpočtu).
+    """
+
+    def __init__(self, root: Path = RESULTS_STORE_DIR):
+        self.root = Path(root)
+
+    def append(self, records: Union[Dict, List[Dict], pd.DataFrame]) -> List[Path]:
+        """
+        Připíše výsledky (viz result_record). Řádky se rozdělí podle data
+        computation_date, každé datum = jeden nový soubor.
+
+        Returns:
+            Cesty k zapsaným souborům
+        """
+        if isinstance(records, dict):
+            records = [records]
+        df = pd.DataFrame(records)
+        if df.empty:
+            return []
+
+        missing = [c for c in RESULT_COLUMNS if c not in df.columns]
+        df = df.reindex(columns=RESULT_COLUMNS)
+        if 'run_id' in missing:
+            df['run_id'] = [uuid.uuid4().hex for _ in range(len(df))]
+        if 'computation_date' in missing:
+            df['computation_date'] = pd.Timestamp.now()
+        df['computation_date'] = pd.to_datetime(df['computation_date'])
+
+        paths = []
+        for run_date, group in df.groupby(df['computation_date'].dt.date):
+            table = pa.Table.from_pandas(group, schema=RESULT_SCHEMA, preserve_index=False)
+            partition = self.root / f"run_date={run_date.isoformat()}"
+            partition.mkdir(parents=True, exist_ok=True)
+
+            path = partition / f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+            tmp_path = partition / f".{path.name}.{os.getpid()}.tmp"
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+            paths.append(path)
+        return paths
+
+    def _dataset(self) -> Optional[ds.Dataset]:
+        if not self.root.exists():
+            return None
+        dataset = ds.dataset(self.root, schema=RESULT_SCHEMA.append(pa.field('run_date', pa.date32())),
+                             format='parquet', partitioning=PARTITIONING)
+        return dataset if dataset.files else None
+
+    def read(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[Dict] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        latest_only: bool = False
+    ) -> pd.DataFrame:
+        """
+        Načte výsledky.
+
+        Args:
+            columns: sloupce k načtení (None = všechny); čtou se jen tyto
+            filters: {sloupec: hodnota nebo seznam hodnot}
+            start_date, end_date: rozsah data výpočtu (včetně) - přeskočí partice
+            latest_only: pro byty s apartment_id jen poslední výpočet
+
+        Returns:
+            DataFrame (prázdný, pokud úložiště nic neobsahuje)
+        """
+        columns = list(columns) if columns is not None else RESULT_COLUMNS + ['run_date']
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=columns)
+
+        expression = None
+        conditions = []
+        for column, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(ds.field(column).isin(list(value)))
+            else:
+                conditions.append(ds.field(column) == value)
+        if start_date is not None:
+            conditions.append(ds.field('run_date') >= pa.scalar(start_date, pa.date32()))
+        if end_date is not None:
+            conditions.append(ds.field('run_date') <= pa.scalar(end_date, pa.date32()))
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        read_columns = list(columns)
+        if latest_only:
+            read_columns += [c for c in ('apartment_id', 'computation_date') if c not in read_columns]
+        df = dataset.to_table(columns=read_columns, filter=expression).to_pandas()
+
+        if latest_only and not df.empty:
+            df = df.sort_values('computation_date', kind='stable')
+            keep = df['apartment_id'].isna() | ~df.duplicated('apartment_id', keep='last')
+            df = df[keep].sort_index()
+        return df[columns].reset_index(drop=True)
+
+    def class_distribution(
+        self,
+        by: Optional[str] = 'district',
+        normalize: bool = True,
+        **query
+    ) -> pd.DataFrame:
+        """
+        Rozdělení energetických tříd (řádky = skupiny podle `by`, sloupce A-G).
+
+        Args:
+            by: sloupec skupin (None = celé portfolio)
+            normalize: podíly místo počtů
+            **query: parametry read() (filters, start_date, end_date, latest_only)
+        """
+        columns = ['energy_class'] + ([by] if by else [])
+        df = self.read(columns=columns, **query)
+        groups = df[by].fillna('(neuvedeno)') if by else pd.Series('portfolio', index=df.index)
+        table = pd.crosstab(groups, df['energy_class'], normalize='index' if normalize else False)
+        table = table.reindex(columns=CLASS_LABELS, fill_value=0)
+        table.index.name, table.columns.name = by, None
+        return table
+
+    def demand_percentiles(
+        self,
+        by: Optional[str] = 'district',
+        quantiles: Sequence[float] = (0.1, 0.5, 0.9),
+        value: str = 'heating_demand_kwh_per_m2_year',
+        **query
+    ) -> pd.DataFrame:
+        """
+        Percentily měrné potřeby (nebo jiného sloupce) po skupinách.
+
+        Returns:
+            DataFrame: řádky = skupiny, sloupce count a p10, p50, ...
+        """
+        columns = [value] + ([by] if by else [])
+        df = self.read(columns=columns, **query)
+        percentile_columns = [f"p{round(q * 100):g}" for q in quantiles]
+        if df.empty:
+            return pd.DataFrame(columns=['count'] + percentile_columns,
+                                index=pd.Index([], name=by))
+        groups = df[by].fillna('(neuvedeno)') if by else pd.Series('portfolio', index=df.index)
+        grouped = df[value].astype(float).groupby(groups)
+
+        table = grouped.quantile(list(quantiles)).unstack()
+        table.columns = percentile_columns
+        table.insert(0, 'count', grouped.size())
+        table.index.name = by
+        return table
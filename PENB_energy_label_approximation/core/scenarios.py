@@ -0,0 +1,136 @@
+"""
+Dávková simulace variant "co kdyby" nad jedním kalibrovaným modelem
+
+Každá varianta (Scenario) mění parametry modelu, požadovanou teplotu nebo
+zdroj tepla. Všechny varianty se simulují jedním voláním dynamické roční
+simulace s termostatem (rc_statespace.simulate_thermostat) jako 2-D pole
+(varianta × hodina) nad stejným typickým rokem. Výsledkem je přehledná
+tabulka, jeden řádek na variantu.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.data_models import CalibratedParameters, HeatingSystemInfo, Scenario, TemperatureProfile
+from core.metrics import classify_energy_labels
+from core.rc_statespace import build_rc_model, get_model_class, simulate_thermostat
+from core.simulate_year import calculate_primary_energy_array, setpoint_schedule
+
+
+# Sloupce výsledné tabulky (v tomto pořadí)
+SCENARIO_COLUMNS = [
+    'scenario', 'setpoint_delta_c', 'infiltration_factor', 'H_env_factor',
+    'internal_gains_factor', 'system_type', 'efficiency_or_cop',
+    'heating_kwh', 'heating_kwh_per_m2', 'primary_kwh', 'primary_kwh_per_m2',
+    'energy_class', 'heating_change_pct', 'unmet_hours',
+]
+
+
+def build_scenario_models(
+    calibrated_params: CalibratedParameters,
+    scenarios: List[Scenario],
+    geometry_volume_m3: float,
+    geometry_area_m2: float
+) -> list:
+    """RC modely (stejného řádu) s parametry upravenými podle variant"""
+    model_class = get_model_class(calibrated_params.model_order)
+    extra = {name: getattr(calibrated_params, name) for name in model_class.EXTRA_PARAMETERS
+             if getattr(calibrated_params, name) is not None}
+    return [
+        build_rc_model(
+            calibrated_params.model_order,
+            calibrated_params.H_env_W_per_K * scenario.H_env_factor,
+            calibrated_params.infiltration_rate_per_h * scenario.infiltration_factor,
+            geometry_volume_m3,
+            calibrated_params.C_th_J_per_K,
+            geometry_area_m2,
+            calibrated_params.internal_gains_W_per_m2 * scenario.internal_gains_factor,
+            **extra
+        )
+        for scenario in scenarios
+    ]
+
+
+def simulate_scenarios(
+    calibrated_params: CalibratedParameters,
+    scenarios: List[Scenario],
+    typical_year_weather: pd.DataFrame,
+    geometry_volume_m3: float,
+    geometry_area_m2: float,
+    comfort_profile: TemperatureProfile,
+    heating_system: HeatingSystemInfo,
+    heater_power_W: Optional[float] = None
+) -> pd.DataFrame:
+    """
+    Simuluje všechny varianty najednou nad stejným typickým rokem.
+    
+    Args:
+        calibrated_params: kalibrované parametry (výchozí stav)
+        scenarios: varianty; první slouží jako reference pro heating_change_pct
+        typical_year_weather: DataFrame s typickým rokem (timestamp, temp_out_c, ghi_wm2)
+        geometry_volume_m3: objem bytu
+        geometry_area_m2: plocha bytu
+        comfort_profile: výchozí teplotní profil (varianty ho posouvají)
+        heating_system: stávající zdroj tepla (pokud varianta neurčí jiný)
+        heater_power_W: stávající výkon otopné soustavy (None = neomezený)
+    
+    Returns:
+        DataFrame se sloupci SCENARIO_COLUMNS, jeden řádek na variantu
+    """
+    if not scenarios:
+        raise ValueError("Není zadána žádná varianta")
+    
+    print(f"\n=== Simulace {len(scenarios)} variant ===")
+    
+    models = build_scenario_models(calibrated_params, scenarios,
+                                   geometry_volume_m3, geometry_area_m2)
+    
+    temp_out = typical_year_weather['temp_out_c'].to_numpy(dtype=float)
+    ghi = (typical_year_weather['ghi_wm2'].to_numpy(dtype=float)
+           if 'ghi_wm2' in typical_year_weather.columns else np.zeros(len(temp_out)))
+    
+    # 2-D vstupy: varianta × hodina
+    base_setpoint = setpoint_schedule(typical_year_weather['timestamp'], comfort_profile)
+    delta = np.array([scenario.setpoint_delta_c for scenario in scenarios])
+    setpoint = base_setpoint[None, :] + delta[:, None]
+    q_free = np.stack([model.solar_gains_W(ghi) + model.q_int * model.A for model in models])
+    power = np.array([
+        scenario.heater_power_W or heater_power_W or np.inf for scenario in scenarios
+    ], dtype=float)
+    
+    T_in, Q_heat = simulate_thermostat(models, setpoint[:, 0], temp_out, q_free, setpoint, power)
+    
+    heating_kwh = Q_heat.sum(axis=1) / 1000
+    unmet_hours = np.count_nonzero(T_in < setpoint - 0.5, axis=1)
+    
+    systems = [scenario.heating_system or heating_system for scenario in scenarios]
+    results = pd.DataFrame({
+        'scenario': [scenario.name for scenario in scenarios],
+        'setpoint_delta_c': delta,
+        'infiltration_factor': [scenario.infiltration_factor for scenario in scenarios],
+        'H_env_factor': [scenario.H_env_factor for scenario in scenarios],
+        'internal_gains_factor': [scenario.internal_gains_factor for scenario in scenarios],
+        'system_type': [system.system_type.value for system in systems],
+        'efficiency_or_cop': [system.efficiency_or_cop or system.get_default_efficiency()[0]
+                              for system in systems],
+        'heating_kwh': heating_kwh,
+        'heating_kwh_per_m2': heating_kwh / geometry_area_m2,
+        'unmet_hours': unmet_hours.astype(int),
+    })
+    results['primary_kwh'] = calculate_primary_energy_array(
+        heating_kwh, results['system_type'], results['efficiency_or_cop']
+    )
+    results['primary_kwh_per_m2'] = results['primary_kwh'] / geometry_area_m2
+    results['energy_class'] = classify_energy_labels(
+        results['heating_kwh_per_m2'], results['primary_kwh_per_m2']
+    )
+    
+    reference = results['heating_kwh'].iloc[0]
+    results['heating_change_pct'] = (
+        (results['heating_kwh'] - reference) / reference * 100 if reference > 0 else 0.0
+    )
+    results = results[SCENARIO_COLUMNS]
+    
+    print(f"✓ Simulováno {len(results)} variant × {len(temp_out)} hodin")
+    return results
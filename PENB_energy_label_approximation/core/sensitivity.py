@@ -0,0 +1,284 @@
+"""
+Globální citlivostní analýza roční potřeby tepla a primární energie
+
+Které vstupy určují štítek bytu: geometrie (plocha, výška), požadované
+teploty, účinnost/COP zdroje a kalibrované parametry RC modelu. Každý
+faktor má rozsah (dolní, horní mez); výchozí rozsahy odvodí
+AnnualLabelModel.default_factors() - kalibrované parametry z kovariance
+kalibrace (±2σ), jinak ±20 %.
+
+Metody (čistě NumPy, bez SALib):
+    sobol_indices     - Saltelliho návrh (A, B, AB_i ze Sobolovy sekvence),
+                        indexy prvního řádu (Saltelli 2010) a totální (Jansen)
+    morris_screening  - elementární efekty po trajektoriích (μ, μ*, σ)
+
+Všechny body návrhu se vyhodnotí jako jedna dávka dynamické roční
+simulace s termostatem (rc_statespace.simulate_thermostat, po blocích
+SENSITIVITY_BATCH kvůli paměti) - desítky až stovky bodů na byt.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+from core.calibrator import PARAMETER_BOUNDS, extra_parameters, parameters_to_vector
+from core.data_models import CalibratedParameters, TemperatureProfile
+from core.rc_statespace import build_rc_model, simulate_thermostat
+from core.simulate_year import calculate_primary_energy
+
+
+# Velikost dávky simulace (paměť: dávka × hodiny × 8 B na pole)
+SENSITIVITY_BATCH = 250
+
+# Výstupy analýzy (sloupce AnnualLabelModel.evaluate)
+SENSITIVITY_OUTPUTS = ('heating_kwh_per_m2', 'primary_kwh_per_m2')
+
+# Relativní rozsahy výchozích faktorů
+GEOMETRY_SPREAD = 0.1           # plocha a výška ±10 %
+SETPOINT_SPREAD_C = 1.0         # požadované teploty ±1 °C
+EFFICIENCY_SPREAD = 0.15        # účinnost / COP ±15 %
+PARAMETER_SPREAD = 0.2          # kalibrované parametry bez kovariance ±20 %
+
+
+class AnnualLabelModel:
+    """
+    Roční potřeba tepla a primární energie bytu jako funkce faktorů.
+
+    Faktory (názvy sloupců matice X v evaluate):
+        area_m2, height_m, day_temp_c, night_temp_c, efficiency_or_cop,
+        H_env_W_per_K, infiltration_rate_per_h, C_th_J_per_K,
+        internal_gains_W_per_m2
+    Faktor, který v X chybí, zůstane na výchozí hodnotě.
+    """
+
+    def __init__(
+        self,
+        calibrated_params: CalibratedParameters,
+        typical_year_weather: pd.DataFrame,
+        area_m2: float,
+        height_m: float,
+        comfort_profile: TemperatureProfile,
+        system_type: str,
+        efficiency_or_cop: float
+    ):
+        self.calibrated = calibrated_params
+        self.order = calibrated_params.model_order.value
+        self.extra = extra_parameters(self.order, parameters_to_vector(calibrated_params))
+        self.temp_out = typical_year_weather['temp_out_c'].to_numpy(dtype=float)
+        self.ghi = (typical_year_weather['ghi_wm2'].to_numpy(dtype=float)
+                    if 'ghi_wm2' in typical_year_weather.columns else np.zeros(len(self.temp_out)))
+        hours = typical_year_weather['timestamp'].dt.hour.to_numpy()
+        self.is_day = (hours >= comfort_profile.day_start_hour) & (hours < comfort_profile.day_end_hour)
+        self.system_type = system_type
+
+        self.nominal = {
+            'area_m2': area_m2,
+            'height_m': height_m,
+            'day_temp_c': comfort_profile.day_temp_c,
+            'night_temp_c': comfort_profile.night_temp_c,
+            'efficiency_or_cop': efficiency_or_cop,
+            'H_env_W_per_K': calibrated_params.H_env_W_per_K,
+            'infiltration_rate_per_h': calibrated_params.infiltration_rate_per_h,
+            'C_th_J_per_K': calibrated_params.C_th_J_per_K,
+            'internal_gains_W_per_m2': calibrated_params.internal_gains_W_per_m2,
+        }
+
+    def default_factors(self) -> Dict[str, Tuple[float, float]]:
+        """Výchozí rozsahy všech faktorů {název: (dolní, horní)}"""
+        nominal = self.nominal
+        factors = {
+            'area_m2': _relative_range(nominal['area_m2'], GEOMETRY_SPREAD),
+            'height_m': _relative_range(nominal['height_m'], GEOMETRY_SPREAD),
+            'day_temp_c': (nominal['day_temp_c'] - SETPOINT_SPREAD_C,
+                           nominal['day_temp_c'] + SETPOINT_SPREAD_C),
+            'night_temp_c': (nominal['night_temp_c'] - SETPOINT_SPREAD_C,
+                             nominal['night_temp_c'] + SETPOINT_SPREAD_C),
+            'efficiency_or_cop': _relative_range(nominal['efficiency_or_cop'], EFFICIENCY_SPREAD),
+        }
+
+        # Kalibrované parametry: ±2σ z kovariance (v prostoru optimalizace), jinak ±20 %
+        x = parameters_to_vector(self.calibrated)[:len(PARAMETER_BOUNDS)]
+        if self.calibrated.parameter_covariance is not None:
+            std = np.sqrt(np.diag(self.calibrated.parameter_covariance))[:len(PARAMETER_BOUNDS)]
+        else:
+            std = np.abs(x) * PARAMETER_SPREAD / 2
+            std[2] = np.log(1 + PARAMETER_SPREAD) / 2  # log(C_th)
+        lower = np.maximum(x - 2 * std, [b[0] for b in PARAMETER_BOUNDS])
+        upper = np.minimum(x + 2 * std, [b[1] for b in PARAMETER_BOUNDS])
+        lower[2], upper[2] = np.exp(lower[2]), np.exp(upper[2])
+        for i, name in enumerate(['H_env_W_per_K', 'infiltration_rate_per_h',
+                                  'C_th_J_per_K', 'internal_gains_W_per_m2']):
+            factors[name] = (float(lower[i]), float(upper[i]))
+        return factors
+
+    def evaluate(self, X: np.ndarray, names: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Vyhodnotí body návrhu (jedna dávková simulace, po blocích).
+
+        Args:
+            X: (n, d) hodnoty faktorů ve fyzikálních jednotkách
+            names: názvy sloupců X
+
+        Returns:
+            {výstup: (n,) hodnoty} pro SENSITIVITY_OUTPUTS
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        unknown = set(names) - set(self.nominal)
+        if unknown:
+            raise ValueError(f"Neznámé faktory citlivostní analýzy: {sorted(unknown)}")
+        columns = {name: np.full(len(X), value) for name, value in self.nominal.items()}
+        columns.update({name: X[:, i] for i, name in enumerate(names)})
+
+        heating = np.empty(len(X))
+        for start in range(0, len(X), SENSITIVITY_BATCH):
+            rows = slice(start, start + SENSITIVITY_BATCH)
+            area = columns['area_m2'][rows]
+            models = [
+                build_rc_model(self.order, H, n, a * h, C, a, q, **self.extra)
+                for H, n, a, h, C, q in zip(
+                    columns['H_env_W_per_K'][rows], columns['infiltration_rate_per_h'][rows],
+                    area, columns['height_m'][rows], columns['C_th_J_per_K'][rows],
+                    columns['internal_gains_W_per_m2'][rows]
+                )
+            ]
+            setpoint = np.where(self.is_day[None, :], columns['day_temp_c'][rows, None],
+                                columns['night_temp_c'][rows, None])
+            q_free = np.stack([model.solar_gains_W(self.ghi) + model.q_int * model.A
+                               for model in models])
+            _, Q_heat = simulate_thermostat(models, setpoint[:, 0], self.temp_out, q_free, setpoint)
+            heating[rows] = Q_heat.sum(axis=1) / 1000 / area
+
+        primary = calculate_primary_energy(heating, self.system_type, columns['efficiency_or_cop'])
+        return {'heating_kwh_per_m2': heating, 'primary_kwh_per_m2': primary}
+
+
+def _relative_range(value: float, spread: float) -> Tuple[float, float]:
+    return (value * (1 - spread), value * (1 + spread))
+
+
+def _scale(unit: np.ndarray, factors: Dict[str, Tuple[float, float]]) -> np.ndarray:
+    """Body z jednotkové krychle → fyzikální jednotky faktorů"""
+    lower = np.array([bounds[0] for bounds in factors.values()])
+    upper = np.array([bounds[1] for bounds in factors.values()])
+    return lower + unit * (upper - lower)
+
+
+def saltelli_design(n_base: int, n_factors: int, seed: Optional[int] = 0) -> np.ndarray:
+    """
+    Saltelliho návrh v jednotkové krychli: bloky [A, B, AB_1, ..., AB_d].
+
+    Returns:
+        (n_base·(d + 2), d) body; AB_i = A se sloupcem i z B
+    """
+    base = qmc.Sobol(d=2 * n_factors, scramble=True, seed=seed).random(n_base)
+    A, B = base[:, :n_factors], base[:, n_factors:]
+    blocks = [A, B]
+    for i in range(n_factors):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        blocks.append(AB)
+    return np.vstack(blocks)
+
+
+def sobol_indices(
+    model: AnnualLabelModel,
+    factors: Optional[Dict[str, Tuple[float, float]]] = None,
+    n_base: int = 64,
+    seed: Optional[int] = 0
+) -> pd.DataFrame:
+    """
+    Sobolovy indexy prvního řádu (S1) a totální (ST) pro oba výstupy.
+
+    Args:
+        model: vyhodnocovaný model štítku
+        factors: {název: (dolní, horní)}; None = model.default_factors()
+        n_base: počet bodů základních matic A, B (simulací je n_base·(d + 2))
+        seed: seed Sobolovy sekvence
+
+    Returns:
+        DataFrame (output, factor, S1, ST)
+    """
+    factors = factors or model.default_factors()
+    names, d = list(factors), len(factors)
+    design = _scale(saltelli_design(n_base, d, seed), factors)
+    outputs = model.evaluate(design, names)
+
+    rows = []
+    for output, values in outputs.items():
+        blocks = values.reshape(d + 2, n_base)
+        f_A, f_B, f_AB = blocks[0], blocks[1], blocks[2:]
+        variance = np.var(np.concatenate([f_A, f_B]))
+        for i, name in enumerate(names):
+            if variance > 0:
+                first = np.mean(f_B * (f_AB[i] - f_A)) / variance
+                total = 0.5 * np.mean((f_A - f_AB[i]) ** 2) / variance
+            else:
+                first = total = 0.0
+            rows.append({'output': output, 'factor': name, 'S1': first, 'ST': total})
+    return pd.DataFrame(rows)
+
+
+def morris_design(
+    n_trajectories: int,
+    n_factors: int,
+    levels: int = 4,
+    seed: Optional[int] = 0
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Morrisovy trajektorie v jednotkové krychli (krok Δ = levels / (2·(levels - 1))).
+
+    Returns:
+        ((r·(d + 1), d) body, (r, d) pořadí měněných faktorů, Δ)
+    """
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(levels) / (levels - 1)
+    start_levels = grid[grid + delta <= 1 + 1e-12]
+
+    points, orders = [], []
+    for _ in range(n_trajectories):
+        x = rng.choice(start_levels, size=n_factors)
+        order = rng.permutation(n_factors)
+        trajectory = [x.copy()]
+        for i in order:
+            x[i] += delta
+            trajectory.append(x.copy())
+        points.append(np.array(trajectory))
+        orders.append(order)
+    return np.vstack(points), np.array(orders), delta
+
+
+def morris_screening(
+    model: AnnualLabelModel,
+    factors: Optional[Dict[str, Tuple[float, float]]] = None,
+    n_trajectories: int = 10,
+    levels: int = 4,
+    seed: Optional[int] = 0
+) -> pd.DataFrame:
+    """
+    Morrisův screening: elementární efekty ve fyzikálních jednotkách výstupu
+    na celý rozsah faktoru (μ, μ* = průměr |EE|, σ).
+
+    Returns:
+        DataFrame (output, factor, mu, mu_star, sigma)
+    """
+    factors = factors or model.default_factors()
+    names, d = list(factors), len(factors)
+    unit, orders, delta = morris_design(n_trajectories, d, levels, seed)
+    outputs = model.evaluate(_scale(unit, factors), names)
+
+    rows = []
+    for output, values in outputs.items():
+        steps = np.diff(values.reshape(n_trajectories, d + 1), axis=1) / delta
+        effects = np.empty((n_trajectories, d))
+        effects[np.arange(n_trajectories)[:, None], orders] = steps
+        for i, name in enumerate(names):
+            rows.append({
+                'output': output,
+                'factor': name,
+                'mu': float(effects[:, i].mean()),
+                'mu_star': float(np.abs(effects[:, i]).mean()),
+                'sigma': float(effects[:, i].std(ddof=1)) if n_trajectories > 1 else 0.0,
+            })
+    return pd.DataFrame(rows)
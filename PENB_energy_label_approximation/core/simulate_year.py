@@ -3,8 +3,20 @@ Simulace referenčního roku a výpočet roční potřeby tepla
 """
 import pandas as pd
 import numpy as np
-from core.rc_model import RC1Model
-from core.data_models import TemperatureProfile, CalibratedParameters
+from typing import Optional
+from core.config import default_label_tables
+from core.rc_statespace import model_from_parameters, simulate_thermostat
+from core.data_models import TemperatureProfile, CalibratedParameters, LabelTables
+
+
+def setpoint_schedule(timestamps: pd.Series, comfort_profile: TemperatureProfile) -> np.ndarray:
+    """Požadovaná teplota pro každou hodinu (denní období podle profilu)"""
+    hours = timestamps.dt.hour
+    return np.where(
+        (hours >= comfort_profile.day_start_hour) & (hours < comfort_profile.day_end_hour),
+        comfort_profile.day_temp_c,
+        comfort_profile.night_temp_c
+    )
 
 
 def simulate_annual_heating_demand(
@@ -12,10 +24,27 @@ def simulate_annual_heating_demand(
     typical_year_weather: pd.DataFrame,
     geometry_volume_m3: float,
     geometry_area_m2: float,
-    comfort_profile: TemperatureProfile
+    comfort_profile: TemperatureProfile,
+    method: str = "dynamic",
+    heater_power_W: Optional[float] = None
 ) -> pd.DataFrame:
     """
-    Simuluje roční potřebu tepla s kalibrovaným modelem.
+    Simuluje roční potřebu tepla s kalibrovaným modelem
+    (libovolného řádu, viz calibrated_params.model_order).
+    
+    Metody:
+        dynamic - RC dynamika s ideálním termostatem: teplo potřebné k
+                  dosažení požadované teploty na konci každé hodiny.
+                  Zohlední akumulaci (C_th), tedy úsporu nočního útlumu
+                  i dotápění ráno.
+        steady  - ustálený stav po hodinách (původní výpočet, bez C_th)
+    
+    Změna chování: výchozí metoda je nyní "dynamic" (dříve se vždy počítal
+    ustálený stav). Roční potřeba tepla se proto liší od starších výsledků -
+    typicky je nižší při nočním útlumu a s omezeným heater_power_W se část
+    tepla přesune do ranních hodin. Pro porovnání se staršími výpočty
+    použijte method="steady". Dynamická simulace vyžaduje pro rychlost numbu
+    (viz rc_statespace.thermostat), NumPy záloha trvá desítky ms na rok.
     
     Args:
         calibrated_params: kalibrované parametry
@@ -23,45 +52,43 @@ def simulate_annual_heating_demand(
         geometry_volume_m3: objem bytu
         geometry_area_m2: plocha bytu
         comfort_profile: požadovaný teplotní profil
+        method: "dynamic" nebo "steady"
+        heater_power_W: výkon otopné soustavy (jen dynamic); None = neomezený
     
     Returns:
         DataFrame s hodinovou simulací + sloupcem heating_demand_W
+        (dynamic navíc T_in_simulated_c)
     """
     print("\n=== Simulace referenčního roku ===")
     
     # Vytvoř model s kalibrovanými parametry
-    model = RC1Model(
-        H_env_W_per_K=calibrated_params.H_env_W_per_K,
-        infiltration_rate_per_h=calibrated_params.infiltration_rate_per_h,
-        volume_m3=geometry_volume_m3,
-        C_th_J_per_K=calibrated_params.C_th_J_per_K,
-        area_m2=geometry_area_m2,
-        internal_gains_W_per_m2=calibrated_params.internal_gains_W_per_m2
-    )
+    model = model_from_parameters(calibrated_params, geometry_volume_m3, geometry_area_m2)
     
     # Připrav teplotní profil (den/noc)
     df = typical_year_weather.copy()
-    
-    # Urči setpoint podle hodiny (6-22 = den, jinak noc)
-    hours = df['timestamp'].dt.hour
-    df['T_setpoint_c'] = np.where(
-        (hours >= 6) & (hours < 22),
-        comfort_profile.day_temp_c,
-        comfort_profile.night_temp_c
-    )
-    
-    # Pro každou hodinu vypočti potřebné teplo
-    heating_demands = []
-    
-    for idx, row in df.iterrows():
-        T_setpoint = row['T_setpoint_c']
-        T_out = row['temp_out_c']
-        GHI = row.get('ghi_wm2', 0)
+    df['T_setpoint_c'] = setpoint_schedule(df['timestamp'], comfort_profile)
+    
+    temp_out = df['temp_out_c'].to_numpy(dtype=float)
+    setpoint = df['T_setpoint_c'].to_numpy(dtype=float)
+    ghi = df['ghi_wm2'].to_numpy(dtype=float) if 'ghi_wm2' in df.columns else np.zeros(len(df))
+    
+    if method == "dynamic":
+        # Zisky bez topení; start na první požadované teplotě
+        q_free = model.solar_gains_W(ghi) + model.q_int * model.A
+        T_in, Q_heat = simulate_thermostat(
+            model, setpoint[0], temp_out, q_free, setpoint, heater_power_W
+        )
+        df['T_in_simulated_c'] = T_in
+        df['heating_demand_W'] = Q_heat
         
-        Q_heat_needed = model.estimate_heating_demand(T_setpoint, T_out, GHI)
-        heating_demands.append(Q_heat_needed)
-    
-    df['heating_demand_W'] = heating_demands
+        unmet = int(np.count_nonzero(T_in < setpoint - 0.5))
+        if unmet > 0:
+            print(f"⚠ Výkon topení nestačí v {unmet} hodinách (T_in < požadovaná - 0.5 °C)")
+    elif method == "steady":
+        # Potřebné teplo pro všechny hodiny najednou
+        df['heating_demand_W'] = model.estimate_heating_demand(setpoint, temp_out, ghi)
+    else:
+        raise ValueError(f"Neznámá metoda roční simulace: {method} (dynamic, steady)")
     
     # Statistika
     total_heating_Wh = df['heating_demand_W'].sum()
@@ -69,13 +96,58 @@ def simulate_annual_heating_demand(
     
     heating_per_m2 = total_heating_kWh / geometry_area_m2
     
-    print(f"✓ Roční simulace dokončena:")
+    print(f"✓ Roční simulace dokončena ({method}):")
     print(f"  - Celková potřeba tepla: {total_heating_kWh:.0f} kWh/rok")
     print(f"  - Měrná potřeba: {heating_per_m2:.1f} kWh/(m²·rok)")
     
     return df
 
 
+def calculate_primary_energy_array(
+    heating_demand_kwh_per_year,
+    system_types,
+    efficiency_or_cop=None,
+    tables: Optional[LabelTables] = None
+) -> np.ndarray:
+    """
+    Primární energie pro pole bytů (portfolio) jedním výpočtem.
+    
+    Zdroj tepla se převede na index v tables.system_carriers
+    (pd.Index.get_indexer, neznámý = -1) a faktor nosiče i výchozí účinnost
+    se vezmou z tabulek podle tohoto kódu. Neznámý zdroj: potřeba tepla ×
+    tables.unknown_system_factor (bez účinnosti).
+    
+    Args:
+        heating_demand_kwh_per_year: potřeba tepla (skalár nebo pole)
+        system_types: typ zdroje pro každý byt (řetězce, HeatingSystemType nebo Categorical)
+        efficiency_or_cop: účinnost/COP (skalár nebo pole; None/NaN = výchozí ze zdroje)
+        tables: tabulky faktorů (None = výchozí, viz config.load_label_tables)
+    
+    Returns:
+        Primární energie kWh/rok, tvar vstupu
+    """
+    tables = tables or default_label_tables()
+    
+    heating = np.asarray(heating_demand_kwh_per_year, dtype=float)
+    systems = list(tables.system_carriers)
+    types = np.asarray(system_types, dtype=object).ravel()
+    types = np.array([getattr(t, 'value', t) for t in types], dtype=object)
+    codes = pd.Index(systems).get_indexer(types)
+    codes = np.broadcast_to(codes.reshape(np.shape(system_types)), heating.shape)
+    
+    # Tabulky podle kódu zdroje; poslední řádek (-1) = neznámý zdroj
+    factor = np.array([tables.primary_energy_factors[tables.system_carriers[s]] for s in systems]
+                      + [tables.unknown_system_factor])
+    default_eff = np.array([tables.default_efficiency.get(s, 1.0) for s in systems] + [1.0])
+    
+    efficiency = (np.full(heating.shape, np.nan) if efficiency_or_cop is None
+                  else np.broadcast_to(np.asarray(efficiency_or_cop, dtype=float), heating.shape))
+    efficiency = np.where(np.isnan(efficiency), default_eff[codes], efficiency)
+    efficiency = np.where(codes < 0, 1.0, efficiency)
+    
+    return heating / efficiency * factor[codes]
+
+
 def calculate_primary_energy(
     heating_demand_kwh_per_year: float,
     system_type: str,
@@ -86,42 +158,25 @@ def calculate_primary_energy(
     Vypočítá orientační primární energii.
     
     Args:
-        heating_demand_kwh_per_year: roční potřeba tepla
+        heating_demand_kwh_per_year: roční potřeba tepla (skalár nebo pole)
         system_type: typ systému ("condensing_boiler", "heat_pump_air", ...)
-        efficiency_or_cop: účinnost nebo COP
-        primary_energy_factors: faktory primární energie
+        efficiency_or_cop: účinnost nebo COP (skalár nebo pole)
+        primary_energy_factors: faktory primární energie (None = z tabulek štítku)
     
     Returns:
         Primární energie kWh/rok
     """
-    if primary_energy_factors is None:
-        # Výchozí faktory (ČR orientačně)
-        primary_energy_factors = {
-            'electricity': 3.0,  # elektřina
-            'natural_gas': 1.1,  # zemní plyn
-        }
-    
-    # Podle typu systému
-    if system_type in ['condensing_boiler']:
-        # Plynový kotel
-        fuel_consumption = heating_demand_kwh_per_year / efficiency_or_cop
-        primary_energy = fuel_consumption * primary_energy_factors['natural_gas']
-    
-    elif system_type in ['heat_pump_air', 'heat_pump_water']:
-        # Tepelné čerpadlo
-        electricity_consumption = heating_demand_kwh_per_year / efficiency_or_cop
-        primary_energy = electricity_consumption * primary_energy_factors['electricity']
-    
-    elif system_type == 'direct_electric':
-        # Přímotop
-        electricity_consumption = heating_demand_kwh_per_year / efficiency_or_cop
-        primary_energy = electricity_consumption * primary_energy_factors['electricity']
-    
-    else:
-        # Neznámý systém - použij průměr
-        primary_energy = heating_demand_kwh_per_year * 2.0
-    
-    return primary_energy
+    tables = None
+    if primary_energy_factors is not None:
+        defaults = default_label_tables()
+        tables = defaults.model_copy(update={
+            'primary_energy_factors': {**defaults.primary_energy_factors, **primary_energy_factors}
+        })
+    
+    primary = calculate_primary_energy_array(
+        heating_demand_kwh_per_year, system_type, efficiency_or_cop, tables
+    )
+    return float(primary) if primary.ndim == 0 else primary
 
 
 def estimate_uncertainty_bounds(
@@ -0,0 +1,159 @@
+"""
+Šíření nejistoty parametrů do roční potřeby tepla metodou Monte Carlo
+
+Vzorky vektoru parametrů [H_env, n, log(C_th), q_int, ...] se táhnou z
+normálního rozdělení kolem kalibrovaného optima s kovariancí z kalibrace
+(CalibratedParameters.parameter_covariance, viz
+calibrator.parameter_covariance). Všechny vzorky se simulují dávkově
+dynamickou roční simulací s termostatem (rc_statespace.simulate_thermostat)
+nad stejným typickým rokem. Výsledkem jsou empirické kvantily měrné
+potřeby tepla a pravděpodobnosti energetických tříd.
+
+Náhrada heuristiky simulate_year.estimate_uncertainty_bounds (MAPE +
+5 % za varování), pokud kalibrace kovarianci má.
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from core.calibrator import extra_parameters, parameter_bounds, parameters_to_vector
+from core.data_models import CalibratedParameters, TemperatureProfile
+from core.metrics import classify_energy_labels
+from core.rc_statespace import build_rc_model, simulate_thermostat
+from core.simulate_year import calculate_primary_energy, setpoint_schedule
+
+
+# Výchozí počet vzorků a velikost dávky (paměť: dávka × hodiny × 8 B na pole)
+MONTE_CARLO_SAMPLES = 1000
+MONTE_CARLO_BATCH = 250
+
+
+class MonteCarloResult:
+    """
+    Výsledek Monte Carlo simulace roční potřeby tepla.
+
+    Attributes:
+        heating_kwh_per_m2: (n,) měrná potřeba tepla jednotlivých vzorků
+        primary_kwh_per_m2: (n,) primární energie (None bez zdroje tepla)
+        energy_classes: (n,) třída každého vzorku
+    """
+
+    def __init__(self, heating_kwh_per_m2: np.ndarray,
+                 primary_kwh_per_m2: Optional[np.ndarray], energy_classes: np.ndarray):
+        self.heating_kwh_per_m2 = heating_kwh_per_m2
+        self.primary_kwh_per_m2 = primary_kwh_per_m2
+        self.energy_classes = energy_classes
+
+    @property
+    def n_samples(self) -> int:
+        return len(self.heating_kwh_per_m2)
+
+    def quantiles(self, q: Sequence[float] = (0.05, 0.5, 0.95)) -> Dict[float, float]:
+        """Empirické kvantily měrné potřeby tepla {kvantil: kWh/(m²·rok)}"""
+        values = np.quantile(self.heating_kwh_per_m2, q)
+        return {float(level): float(value) for level, value in zip(q, values)}
+
+    def bounds(self, lower: float = 0.05, upper: float = 0.95) -> tuple[float, float]:
+        """Interval spolehlivosti (lower, upper) v kWh/m²/rok"""
+        values = self.quantiles((lower, upper))
+        return values[lower], values[upper]
+
+    def class_probabilities(self) -> Dict[str, float]:
+        """Podíl vzorků v jednotlivých třídách {třída: pravděpodobnost}"""
+        classes, counts = np.unique(self.energy_classes, return_counts=True)
+        return {str(c): float(n) / self.n_samples for c, n in zip(classes, counts)}
+
+
+def sample_parameter_vectors(
+    calibrated_params: CalibratedParameters,
+    n_samples: int = MONTE_CARLO_SAMPLES,
+    seed: Optional[int] = 0
+) -> np.ndarray:
+    """
+    Vzorky vektoru parametrů z N(optimum, kovariance), oříznuté na meze kalibrace.
+
+    Raises:
+        ValueError: pokud kalibrace nemá kovarianci parametrů
+    """
+    if calibrated_params.parameter_covariance is None:
+        raise ValueError("Kalibrace nemá kovarianci parametrů (režim BASIC nebo starší záznam)")
+
+    mean = parameters_to_vector(calibrated_params)
+    covariance = np.asarray(calibrated_params.parameter_covariance, dtype=float)
+    if covariance.shape != (len(mean), len(mean)):
+        raise ValueError(f"Kovariance má rozměr {covariance.shape}, očekáván {(len(mean), len(mean))}")
+
+    bounds = parameter_bounds(calibrated_params.model_order)
+    rng = np.random.default_rng(seed)
+    samples = rng.multivariate_normal(mean, covariance, size=n_samples)
+    return np.clip(samples, [b[0] for b in bounds], [b[1] for b in bounds])
+
+
+def monte_carlo_annual(
+    calibrated_params: CalibratedParameters,
+    typical_year_weather: pd.DataFrame,
+    geometry_volume_m3: float,
+    geometry_area_m2: float,
+    comfort_profile: TemperatureProfile,
+    n_samples: int = MONTE_CARLO_SAMPLES,
+    system_type: Optional[str] = None,
+    efficiency_or_cop: Optional[float] = None,
+    heater_power_W: Optional[float] = None,
+    seed: Optional[int] = 0
+) -> MonteCarloResult:
+    """
+    Monte Carlo roční simulace pro vzorky parametrů z kalibrace.
+
+    Args:
+        calibrated_params: kalibrované parametry s parameter_covariance
+        typical_year_weather: DataFrame s typickým rokem (timestamp, temp_out_c, ghi_wm2)
+        geometry_volume_m3: objem bytu
+        geometry_area_m2: plocha bytu
+        comfort_profile: požadovaný teplotní profil
+        n_samples: počet vzorků
+        system_type, efficiency_or_cop: zdroj tepla - pokud je zadán, třídy
+            se určují z primární energie, jinak z potřeby tepla
+        heater_power_W: výkon otopné soustavy (None = neomezený)
+        seed: semínko generátoru (None = náhodné)
+
+    Returns:
+        MonteCarloResult
+    """
+    order = calibrated_params.model_order.value
+    vectors = sample_parameter_vectors(calibrated_params, n_samples, seed)
+
+    temp_out = typical_year_weather['temp_out_c'].to_numpy(dtype=float)
+    ghi = (typical_year_weather['ghi_wm2'].to_numpy(dtype=float)
+           if 'ghi_wm2' in typical_year_weather.columns else np.zeros(len(temp_out)))
+    setpoint = setpoint_schedule(typical_year_weather['timestamp'], comfort_profile)
+
+    heating_kwh = np.empty(n_samples)
+    for start in range(0, n_samples, MONTE_CARLO_BATCH):
+        batch = vectors[start:start + MONTE_CARLO_BATCH]
+        models = [
+            build_rc_model(order, x[0], x[1], geometry_volume_m3, np.exp(x[2]),
+                           geometry_area_m2, x[3], **extra_parameters(order, x))
+            for x in batch
+        ]
+        # Sluneční zisky nezávisí na vzorku, interní ano
+        q_free = models[0].solar_gains_W(ghi)[None, :] + batch[:, 3, None] * geometry_area_m2
+        _, Q_heat = simulate_thermostat(models, setpoint[0], temp_out, q_free, setpoint,
+                                        heater_power_W)
+        heating_kwh[start:start + len(batch)] = Q_heat.sum(axis=1) / 1000
+
+    heating_per_m2 = heating_kwh / geometry_area_m2
+    primary_per_m2 = None
+    if system_type is not None:
+        primary_per_m2 = calculate_primary_energy(
+            heating_kwh, system_type, efficiency_or_cop
+        ) / geometry_area_m2
+        classes = classify_energy_labels(heating_per_m2, primary_per_m2)
+    else:
+        classes = classify_energy_labels(heating_per_m2, None, use_primary=False)
+
+    result = MonteCarloResult(heating_per_m2, primary_per_m2, classes)
+    lower, upper = result.bounds()
+    print(f"✓ Monte Carlo ({n_samples} vzorků): potřeba tepla "
+          f"{lower:.1f} - {upper:.1f} kWh/(m²·rok) (5 - 95 %)")
+    return result
@@ -8,6 +8,8 @@ import pandas as pd
 import numpy as np
 import geocoder
 
+from core.weather_schema import make_weather_frame, to_weather_frame, concat_weather_frames
+
 
 def detect_location() -> Tuple[str, float, float]:
     """
@@ -81,7 +83,8 @@ def fetch_hourly_weather(
         use_openmeteo_fallback: Použít Open-Meteo pro stará data (default: True)
     
     Returns:
-        DataFrame s sloupci: timestamp, temp_out_c, humidity_pct, wind_mps, ghi_wm2
+        DataFrame podle schématu core.weather_schema: timestamp, temp_out_c,
+        ghi_wm2, wind_mps, humidity_pct, source
     """
     if not api_key:
         raise ValueError("API klíč pro weatherapi.com není nastaven!")
@@ -90,6 +93,7 @@ def fetch_hourly_weather(
     print(f"   Období: {start_date} až {end_date}")
     
     all_data = []
+    frames = []
     current_date = start_date
     today = date.today()
     days_back = (today - start_date).days
@@ -174,19 +178,8 @@ def fetch_hourly_weather(
                     old_dates[-1]
                 )
                 
-                # Přidej source flag
-                df_openmeteo['source'] = 'Open-Meteo'
-                
-                # Konverze na list of dicts pro konzistenci
-                for _, row in df_openmeteo.iterrows():
-                    all_data.append({
-                        'timestamp': row['timestamp'],
-                        'temp_out_c': row['temp_out_c'],
-                        'humidity_pct': row['humidity_pct'],
-                        'wind_mps': row['wind_mps'],
-                        'ghi_wm2': row['ghi_wm2'],
-                        'source': 'Open-Meteo'
-                    })
+                # DataFrame už odpovídá schématu (source = Open-Meteo)
+                frames.append(df_openmeteo)
                 
                 print(f"  ✅ Open-Meteo: {len(df_openmeteo)} hodin")
                 
@@ -221,7 +214,10 @@ def fetch_hourly_weather(
     
     # Vyhodnocení výsledků
     print(f"\n{'='*70}")
-    if not all_data:
+    if all_data:
+        frames.append(to_weather_frame(pd.DataFrame(all_data)))
+    
+    if not frames:
         raise ValueError(
             "Nepodařilo se získat žádná data!\n"
             "Zkontrolujte:\n"
@@ -230,14 +226,13 @@ def fetch_hourly_weather(
             "3. Lokace je platná"
         )
     
-    df = pd.DataFrame(all_data)
-    df = df.sort_values('timestamp').reset_index(drop=True)
+    df = concat_weather_frames(frames)
     
     # Statistiky podle zdrojů
     if 'source' in df.columns:
         sources = df['source'].value_counts()
         print(f"📊 VÝSLEDKY PODLE ZDROJŮ:")
-        for source, count in sources.items():
+        for source, count in sources[sources > 0].items():
             hours = count
             days = hours / 24
             print(f"  • {source}: {hours} hodin ({days:.1f} dní)")
@@ -255,7 +250,7 @@ def fetch_hourly_weather(
     
     print(f"{'='*70}\n")
     
-    return df.drop('source', axis=1) if 'source' in df.columns else df
+    return df
 
 
 def _generate_synthetic_day_weather(
@@ -300,8 +295,6 @@ def _generate_synthetic_day_weather(
         synthetic_hours.append({
             'timestamp': timestamp,
             'temp_out_c': temp,
-            'humidity_pct': 70.0,
-            'wind_mps': 2.0,
             'ghi_wm2': max(0, ghi)
         })
     
@@ -322,7 +315,7 @@ def fetch_forecast_weather(
         api_key: API klíč
     
     Returns:
-        DataFrame s hodinovými daty
+        DataFrame s hodinovými daty podle schématu core.weather_schema
     """
     if not api_key:
         raise ValueError("API klíč není nastaven!")
@@ -352,8 +345,7 @@ def fetch_forecast_weather(
                 'ghi_wm2': hour.get('uv', 0) * 25
             })
     
-    df = pd.DataFrame(all_data)
-    return df
+    return to_weather_frame(pd.DataFrame(all_data), source='WeatherAPI')
 
 
 def create_typical_year_weather(location: str, api_key: str) -> pd.DataFrame:
@@ -392,36 +384,30 @@ def create_typical_year_weather(location: str, api_key: str) -> pd.DataFrame:
     except:
         avg_temp = 10  # Střední Evropa default
     
-    # Vytvoř hodinová data pro rok
-    start = datetime(2024, 1, 1, 0, 0, 0)
-    hours = []
-    
-    for h in range(8760):  # 365 * 24
-        timestamp = start + timedelta(hours=h)
-        day_of_year = timestamp.timetuple().tm_yday
-        hour_of_day = timestamp.hour
-        
-        # Sinusoida - roční variace
-        temp_seasonal = avg_temp + 10 * np.sin(2 * np.pi * (day_of_year - 80) / 365)
-        
-        # Denní variace
-        temp_daily = temp_seasonal + 3 * np.sin(2 * np.pi * (hour_of_day - 6) / 24)
-        
-        # Sluneční záření (hrubý odhad)
-        if 6 <= hour_of_day <= 18:
-            ghi = 500 * np.sin(np.pi * (hour_of_day - 6) / 12) * (1 + 0.5 * np.sin(2 * np.pi * day_of_year / 365))
-        else:
-            ghi = 0
-        
-        hours.append({
-            'timestamp': timestamp,
-            'temp_out_c': temp_daily,
-            'humidity_pct': 70.0,
-            'wind_mps': 2.5,
-            'ghi_wm2': max(0, ghi)
-        })
-    
-    df = pd.DataFrame(hours)
+    # Vytvoř hodinová data pro rok (365 * 24 = 8760 hodin)
+    timestamps = pd.date_range(datetime(2024, 1, 1), periods=8760, freq='h')
+    day_of_year = timestamps.dayofyear.to_numpy()
+    hour_of_day = timestamps.hour.to_numpy()
+    
+    # Sinusoida - roční variace
+    temp_seasonal = avg_temp + 10 * np.sin(2 * np.pi * (day_of_year - 80) / 365)
+    
+    # Denní variace
+    temp_daily = temp_seasonal + 3 * np.sin(2 * np.pi * (hour_of_day - 6) / 24)
+    
+    # Sluneční záření (hrubý odhad)
+    ghi = np.where(
+        (hour_of_day >= 6) & (hour_of_day <= 18),
+        500 * np.sin(np.pi * (hour_of_day - 6) / 12) * (1 + 0.5 * np.sin(2 * np.pi * day_of_year / 365)),
+        0.0
+    )
+    
+    df = make_weather_frame(
+        timestamps,
+        temp_daily,
+        ghi_wm2=np.maximum(ghi, 0),
+        source='Typical'
+    )
     print(f"✓ Vytvořen typický rok: {len(df)} hodin")
     
     return df
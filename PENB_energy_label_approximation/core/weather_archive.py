@@ -0,0 +1,296 @@
+"""
+Paměťově mapovaný archiv hodinového počasí pro dávkové zpracování
+
+Každá buňka souřadnicové mřížky (výchozí 0.1° ~ 11 km) má:
+- <klíč>.<verze>.npy: matice float32 (n_hodin × n_veličin), řádek i = start + i hodin
+- <klíč>.json: metadata (start, seznam veličin, aktuální datový soubor)
+
+Zápis nové verze přepne pouze <klíč>.json (atomický os.replace), takže
+čtenář vždy vidí konzistentní dvojici metadata + data. Předchozí verze .npy
+se maže až při dalším zápisu (čtenář, který právě načetl stará metadata,
+ji ještě otevře); pokud by přesto zmizela, open() metadata načte znovu.
+
+Procesy v poolu otevírají .npy pouze pro čtení přes np.load(mmap_mode='r'),
+takže data pro stejné město sdílejí přes page cache bez kopírování.
+Výřez [start_date, end_date] je díky hodinovému offsetu O(1) pohled (view).
+"""
+import json
+import os
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import STORAGE_DIR
+from core.weather_schema import (
+    WEATHER_MEASUREMENTS, MEASUREMENT_DTYPE, to_weather_frame
+)
+
+
+ARCHIVE_DIR = STORAGE_DIR / "weather_archive"
+CELL_SIZE_DEG = 0.1
+
+ONE_HOUR = np.timedelta64(1, 'h')
+OPEN_RETRIES = 3
+
+
+class ArchivedCell:
+    """
+    Jedna buňka archivu otevřená pouze pro čtení.
+
+    Atributy:
+        start: první hodina (np.datetime64[h])
+        fields: názvy veličin ve sloupcích matice
+        data: np.memmap (n_hodin × n_veličin) float32, read-only
+    """
+
+    def __init__(self, data: np.ndarray, start: np.datetime64, fields: List[str]):
+        self.data = data
+        self.start = np.datetime64(start, 'h')
+        self.fields = list(fields)
+
+    @property
+    def n_hours(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def end(self) -> np.datetime64:
+        """Poslední hodina v archivu (včetně)"""
+        return self.start + (self.n_hours - 1) * ONE_HOUR
+
+    def offset(self, timestamp) -> int:
+        """Hodinový offset časového razítka od začátku buňky"""
+        hour = np.datetime64(pd.Timestamp(timestamp).floor('h').to_datetime64(), 'h')
+        return int((hour - self.start) / ONE_HOUR)
+
+    def covers(self, start_date: date, end_date: date) -> bool:
+        """Pokrývá buňka celé dny start_date až end_date?"""
+        first = self.offset(pd.Timestamp(start_date))
+        last = self.offset(pd.Timestamp(end_date) + timedelta(hours=23))
+        return first >= 0 and last < self.n_hours
+
+    def slice_array(self, start_date: date, end_date: date) -> Tuple[np.ndarray, np.datetime64]:
+        """
+        Vrátí pohled na hodiny celých dnů start_date až end_date.
+
+        Returns:
+            (view, first_hour) - view je read-only řez memmapy, bez kopie
+
+        Raises:
+            ValueError: období přesahuje rozsah buňky (start až end)
+        """
+        if not self.covers(start_date, end_date):
+            raise ValueError(
+                f"Období {start_date} až {end_date} není celé v archivu "
+                f"(buňka pokrývá {self.start} až {self.end})"
+            )
+        first = self.offset(pd.Timestamp(start_date))
+        stop = self.offset(pd.Timestamp(end_date) + timedelta(days=1))
+        return self.data[first:stop], self.start + first * ONE_HOUR
+
+    def to_frame(self, start_date: date, end_date: date) -> pd.DataFrame:
+        """
+        Vrátí DataFrame pro období; sloupce veličin jsou pohledy do memmapy.
+
+        Chybějící hodiny jsou NaN - zpracuje je clean_weather_data().
+        """
+        view, first_hour = self.slice_array(start_date, end_date)
+        df = pd.DataFrame(view, columns=self.fields, copy=False)
+        timestamps = pd.date_range(
+            pd.Timestamp(first_hour), periods=len(view), freq='h'
+        ).astype('datetime64[ns]')
+        df.insert(0, 'timestamp', timestamps)
+        return df
+
+
+class WeatherArchive:
+    """
+    Adresář s paměťově mapovanými buňkami počasí.
+
+    Instance je levně picklovatelná (otevřené memmapy se nepřenáší),
+    každý proces si buňky otevírá sám a drží je v lokální cache.
+    """
+
+    def __init__(self, root: Path = ARCHIVE_DIR, cell_size_deg: float = CELL_SIZE_DEG):
+        self.root = Path(root)
+        self.cell_size_deg = cell_size_deg
+        self._open_cells: Dict[str, Tuple[str, ArchivedCell]] = {}
+
+    def __getstate__(self):
+        return {'root': self.root, 'cell_size_deg': self.cell_size_deg}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def cell_key(self, latitude: float, longitude: float) -> str:
+        """Klíč buňky mřížky, např. 'N50.1_E14.4'"""
+        lat = round(round(latitude / self.cell_size_deg) * self.cell_size_deg, 4)
+        lon = round(round(longitude / self.cell_size_deg) * self.cell_size_deg, 4)
+        return f"{'N' if lat >= 0 else 'S'}{abs(lat):g}_{'E' if lon >= 0 else 'W'}{abs(lon):g}"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def _data_versions(self, key: str) -> List[Path]:
+        """Všechny datové soubory buňky (<klíč>.<ns>.<pid>.npy)"""
+        versions = []
+        for path in self.root.glob(f"{key}.*.npy"):
+            parts = path.name[len(key) + 1:-len('.npy')].split('.')
+            if len(parts) == 2 and all(part.isdigit() for part in parts):
+                versions.append(path)
+        return versions
+
+    def _load_data(self, path: Path) -> np.ndarray:
+        """Načte datový soubor buňky pouze pro čtení (memmap)"""
+        return np.load(path, mmap_mode='r')
+
+    def open(self, latitude: float, longitude: float) -> Optional[ArchivedCell]:
+        """
+        Otevře buňku pouze pro čtení (memmap). Vrací None, pokud neexistuje.
+
+        Po přepsání buňky jiným procesem se automaticky otevře nová verze.
+        Zmizí-li datový soubor mezi čtením metadat a otevřením (souběžné
+        zápisy), metadata se načtou znovu (až OPEN_RETRIES pokusů).
+        """
+        key = self.cell_key(latitude, longitude)
+        meta_path = self._meta_path(key)
+
+        if not meta_path.exists():
+            return None
+
+        for attempt in range(OPEN_RETRIES):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            version = meta['data_file']
+            cached = self._open_cells.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            try:
+                data = self._load_data(self.root / version)
+            except FileNotFoundError:
+                if attempt == OPEN_RETRIES - 1:
+                    raise
+                continue
+
+            cell = ArchivedCell(data, np.datetime64(meta['start'], 'h'), meta['fields'])
+            self._open_cells[key] = (version, cell)
+            return cell
+
+    def slice(
+        self,
+        latitude: float,
+        longitude: float,
+        start_date: date,
+        end_date: date
+    ) -> pd.DataFrame:
+        """
+        Vrátí hodinové počasí pro celé dny start_date až end_date (pohled).
+
+        Raises:
+            KeyError: buňka v archivu není
+        """
+        cell = self.open(latitude, longitude)
+        if cell is None:
+            raise KeyError(f"Buňka {self.cell_key(latitude, longitude)} není v archivu")
+        return cell.to_frame(start_date, end_date)
+
+    def write(self, latitude: float, longitude: float, weather_df: pd.DataFrame) -> Path:
+        """
+        Uloží (sloučí) hodinová data do buňky archivu.
+
+        Nová data přepisují stávající hodnoty, chybějící hodiny jsou NaN.
+        Zápis je atomický (os.replace metadat), čtenáři s otevřenou memmapou
+        dál vidí předchozí verzi. Ta zůstane na disku do dalšího zápisu,
+        smažou se jen starší verze.
+
+        Returns:
+            Cesta k .npy souboru nové verze buňky
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        key = self.cell_key(latitude, longitude)
+        meta_path = self._meta_path(key)
+
+        new = to_weather_frame(weather_df)
+        hours = new['timestamp'].dt.floor('h').to_numpy().astype('datetime64[h]')
+        new_fields = [col for col in WEATHER_MEASUREMENTS if col in new.columns]
+
+        existing = self.open(latitude, longitude)
+        if existing is not None:
+            fields = existing.fields + [f for f in new_fields if f not in existing.fields]
+            start = min(existing.start, hours.min())
+            end = max(existing.end, hours.max())
+        else:
+            fields = new_fields
+            start, end = hours.min(), hours.max()
+
+        n_hours = int((end - start) / ONE_HOUR) + 1
+        merged = np.full((n_hours, len(fields)), np.nan, dtype=MEASUREMENT_DTYPE)
+
+        if existing is not None:
+            offset = int((existing.start - start) / ONE_HOUR)
+            for j, field in enumerate(existing.fields):
+                merged[offset:offset + existing.n_hours, fields.index(field)] = existing.data[:, j]
+
+        rows = ((hours - start) / ONE_HOUR).astype(np.int64)
+        for field in new_fields:
+            merged[rows, fields.index(field)] = new[field].to_numpy()
+
+        data_path = self.root / f"{key}.{time.time_ns()}.{os.getpid()}.npy"
+        np.save(data_path, merged)
+
+        meta = {
+            'start': str(start),
+            'fields': fields,
+            'n_hours': n_hours,
+            'cell': key,
+            'cell_size_deg': self.cell_size_deg,
+            'data_file': data_path.name,
+        }
+
+        tmp_meta = meta_path.with_name(f".{key}.{os.getpid()}.tmp.json")
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_meta, meta_path)
+
+        # Předchozí verzi nech čtenářům, smaž jen starší
+        # (na Windows může být ještě namapovaná - pak zůstane)
+        keep = {data_path.name}
+        if existing is not None:
+            keep.add(self._open_cells.pop(key)[0])
+            del existing
+        for old_path in self._data_versions(key):
+            if old_path.name not in keep:
+                try:
+                    old_path.unlink()
+                except OSError:
+                    pass
+        print(f"✓ Archiv počasí: {key} ({n_hours} hodin, {', '.join(fields)})")
+
+        return data_path
+
+    def ensure(
+        self,
+        latitude: float,
+        longitude: float,
+        start_date: date,
+        end_date: date,
+        fetch: Callable[[date, date], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """
+        Vrátí výřez z archivu; pokud období chybí, stáhne ho přes fetch a uloží.
+
+        Typicky volá rodičovský proces před spuštěním poolu, workery
+        pak používají pouze slice().
+
+        Args:
+            fetch: funkce (start_date, end_date) -> DataFrame s počasím
+        """
+        cell = self.open(latitude, longitude)
+        if cell is None or not cell.covers(start_date, end_date):
+            self.write(latitude, longitude, fetch(start_date, end_date))
+        return self.slice(latitude, longitude, start_date, end_date)
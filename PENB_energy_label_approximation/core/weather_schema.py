@@ -0,0 +1,148 @@
+"""
+Deklarované schéma hodinových dat o počasí
+
+Všechny zdroje počasí (WeatherAPI, Open-Meteo, syntetická data, typický rok)
+vytvářejí DataFrame přes make_weather_frame(), takže mají stejné typy sloupců:
+- timestamp: datetime64[ns]
+- měření (temp_out_c, ghi_wm2, wind_mps, humidity_pct): float32
+- source: kategorie s pevným výčtem zdrojů
+
+Konstantní "výplňové" sloupce (např. humidity_pct=70.0) se nevytvářejí -
+chybějící veličina v DataFrame jednoduše není.
+"""
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Měřené veličiny a jejich pořadí ve výstupním DataFrame
+WEATHER_MEASUREMENTS = ['temp_out_c', 'ghi_wm2', 'wind_mps', 'humidity_pct']
+REQUIRED_MEASUREMENTS = ['temp_out_c']
+MEASUREMENT_DTYPE = np.float32
+TIMESTAMP_DTYPE = 'datetime64[ns]'
+
+# Pevný výčet zdrojů - stejné kategorie zajistí, že pd.concat zachová dtype
+WEATHER_SOURCES = ['WeatherAPI', 'Open-Meteo', 'Synthetic', 'Typical']
+SOURCE_DTYPE = pd.CategoricalDtype(categories=WEATHER_SOURCES)
+
+
+def make_weather_frame(
+    timestamp,
+    temp_out_c,
+    ghi_wm2=None,
+    wind_mps=None,
+    humidity_pct=None,
+    source=None
+) -> pd.DataFrame:
+    """
+    Vytvoří DataFrame s počasím podle deklarovaného schématu.
+
+    Args:
+        timestamp: časová razítka (array-like)
+        temp_out_c: venkovní teplota °C (array-like)
+        ghi_wm2: globální sluneční záření W/m² (volitelné, array-like)
+        wind_mps: rychlost větru m/s (volitelné, array-like)
+        humidity_pct: relativní vlhkost % (volitelné, array-like)
+        source: zdroj dat - jeden z WEATHER_SOURCES nebo array-like
+
+    Returns:
+        DataFrame seřazený podle timestamp s RangeIndexem
+
+    Raises:
+        ValueError: neznámý zdroj, nesouhlasící délky nebo skalární měření
+    """
+    timestamps = pd.to_datetime(pd.Series(timestamp)).astype(TIMESTAMP_DTYPE)
+    n = len(timestamps)
+
+    measurements = {
+        'temp_out_c': temp_out_c,
+        'ghi_wm2': ghi_wm2,
+        'wind_mps': wind_mps,
+        'humidity_pct': humidity_pct,
+    }
+
+    columns = {'timestamp': timestamps.to_numpy()}
+
+    for name in WEATHER_MEASUREMENTS:
+        values = measurements[name]
+        if values is None:
+            continue
+        if np.ndim(values) == 0:
+            raise ValueError(
+                f"Sloupec '{name}' musí být pole hodnot - konstantní sloupce "
+                f"nejsou ve schématu počasí povoleny"
+            )
+        array = np.asarray(values, dtype=MEASUREMENT_DTYPE)
+        if len(array) != n:
+            raise ValueError(
+                f"Sloupec '{name}' má {len(array)} hodnot, timestamp má {n}"
+            )
+        columns[name] = array
+
+    if source is not None:
+        if np.ndim(source) == 0:
+            source = [source] * n
+        source = np.asarray(source, dtype=object)
+        unknown = pd.notna(source) & ~np.isin(source, WEATHER_SOURCES)
+        if unknown.any():
+            raise ValueError(
+                f"Neznámý zdroj počasí: {sorted(set(source[unknown]))}. "
+                f"Povolené zdroje: {WEATHER_SOURCES}"
+            )
+        columns['source'] = pd.Categorical(source, dtype=SOURCE_DTYPE)
+
+    df = pd.DataFrame(columns)
+
+    if not df['timestamp'].is_monotonic_increasing:
+        df = df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+    return df
+
+
+def to_weather_frame(df: pd.DataFrame, source: Optional[str] = None) -> pd.DataFrame:
+    """
+    Převede libovolný DataFrame s počasím na deklarované schéma.
+
+    Sloupce mimo schéma se zahodí, chybějící volitelné veličiny se nedoplňují.
+
+    Args:
+        df: DataFrame se sloupci timestamp, temp_out_c, ...
+        source: zdroj dat (přepíše případný sloupec source)
+
+    Returns:
+        DataFrame podle schématu
+    """
+    missing = [col for col in ['timestamp'] + REQUIRED_MEASUREMENTS if col not in df.columns]
+    if missing:
+        raise ValueError(f"V datech o počasí chybí sloupce: {missing}")
+
+    if source is None and 'source' in df.columns:
+        source = df['source'].astype(object).to_numpy()
+
+    return make_weather_frame(
+        df['timestamp'],
+        df['temp_out_c'],
+        ghi_wm2=df['ghi_wm2'] if 'ghi_wm2' in df.columns else None,
+        wind_mps=df['wind_mps'] if 'wind_mps' in df.columns else None,
+        humidity_pct=df['humidity_pct'] if 'humidity_pct' in df.columns else None,
+        source=source
+    )
+
+
+def concat_weather_frames(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Spojí více DataFrame s počasím a znovu vynutí schéma.
+
+    Args:
+        frames: DataFrame vytvořené přes make_weather_frame()
+
+    Returns:
+        Jeden DataFrame seřazený podle timestamp
+    """
+    frames: List[pd.DataFrame] = [f for f in frames if f is not None and len(f) > 0]
+    if not frames:
+        raise ValueError("Nejsou k dispozici žádná data o počasí ke spojení")
+
+    combined = pd.concat(frames, ignore_index=True)
+    return to_weather_frame(combined)
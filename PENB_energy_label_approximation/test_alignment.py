@@ -0,0 +1,86 @@
+"""
+Test zarovnání denních spotřeb s hodinovým počasím (core/preprocess.py)
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from core.preprocess import align_daily_energy_to_hourly, to_day_hour_matrix
+
+
+def _hourly(start, days):
+    timestamps = pd.date_range(start, periods=days * 24, freq='h')
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'temp_out_c': np.arange(days * 24, dtype=float)
+    })
+
+
+def test_alignment_returns_copies():
+    """Výsledek jsou kopie - zápis do nich ani zarovnání nezmění vstup volajícího"""
+    print("\n=== Test 1: Zarovnání ===")
+
+    daily = pd.DataFrame({
+        'date': [date(2024, 1, 2), date(2024, 1, 3)],
+        'energy_total_kwh': [10.0, 12.0]
+    })
+    daily_before = daily.copy()
+    hourly = _hourly('2024-01-01', 5)
+
+    daily_aligned, hourly_aligned = align_daily_energy_to_hourly(daily, hourly)
+
+    assert daily.equals(daily_before), "Vstupní daily_df byl změněn"
+    assert pd.api.types.is_datetime64_any_dtype(daily_aligned['date'])
+    assert len(hourly_aligned) == 48
+    assert hourly_aligned['timestamp'].iloc[0] == pd.Timestamp('2024-01-02')
+    assert hourly_aligned['timestamp'].iloc[-1] == pd.Timestamp('2024-01-03 23:00')
+    assert not np.shares_memory(
+        hourly_aligned['temp_out_c'].to_numpy(), hourly['temp_out_c'].to_numpy()
+    )
+
+    hourly_aligned.loc[hourly_aligned.index[0], 'temp_out_c'] = -99.0
+    daily_aligned.loc[0, 'energy_total_kwh'] = -1.0
+    assert hourly['temp_out_c'].iloc[24] == 24.0
+    assert daily.equals(daily_before)
+    print(f"✓ {len(hourly_aligned)} hodin, vstup beze změny")
+
+
+def test_alignment_unsorted_input():
+    """Neseřazená hodinová data se před vyhledáním seřadí"""
+    print("\n=== Test 2: Neseřazený vstup ===")
+
+    daily = pd.DataFrame({'date': pd.to_datetime(['2024-01-02']), 'energy_total_kwh': [5.0]})
+    hourly = _hourly('2024-01-01', 3).sample(frac=1.0, random_state=0)
+
+    _, hourly_aligned = align_daily_energy_to_hourly(daily, hourly)
+
+    assert len(hourly_aligned) == 24
+    assert hourly_aligned['timestamp'].is_monotonic_increasing
+    print(f"✓ {len(hourly_aligned)} hodin po seřazení")
+
+
+def test_day_hour_matrix():
+    """Matice (n_dní × 24) s maskou chybějících hodin"""
+    print("\n=== Test 3: Matice den × hodina ===")
+
+    hourly = _hourly('2024-01-01', 3).drop(index=[5, 30])
+    matrix, dates, mask = to_day_hour_matrix(
+        hourly, 'temp_out_c', pd.to_datetime(['2024-01-01', '2024-01-02'])
+    )
+
+    assert matrix.shape == (2, 24)
+    assert list(dates.astype(str)) == ['2024-01-01', '2024-01-02']
+    assert not mask[0, 5] and not mask[1, 6]
+    assert mask.sum() == 46
+    assert np.isnan(matrix[0, 5])
+    assert matrix[1, 0] == 24.0
+    assert np.allclose(np.nansum(matrix, axis=1), [sum(range(24)) - 5, sum(range(24, 48)) - 30])
+    print(f"✓ Matice {matrix.shape}, platných hodin: {mask.sum()}")
+
+
+if __name__ == "__main__":
+    test_alignment_returns_copies()
+    test_alignment_unsorted_input()
+    test_day_hour_matrix()
+    print("\n✅ Všechny testy zarovnání prošly")
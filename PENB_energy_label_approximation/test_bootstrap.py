@@ -0,0 +1,99 @@
+"""
+Test blokového bootstrapu intervalů spolehlivosti (core/bootstrap.py)
+"""
+import multiprocessing
+
+import numpy as np
+
+from core.bootstrap import block_bootstrap_weights, bootstrap_confidence, bootstrap_parameters
+from core.calibrator import (CalibrationObjective, calibrate_model_simple, parameter_bounds,
+                             prepare_calibration_hours)
+from core.data_models import ComputationMode, QualityLevel
+from core.quality_flags import assess_quality_level
+from tests_support import synthetic_inputs
+
+
+def _objective(days=14):
+    daily, hourly = synthetic_inputs(days=days)
+    hours = prepare_calibration_hours(daily, hourly, 21.0)
+    return CalibrationObjective(daily, hours, 150.0, 60.0)
+
+
+def test_block_weights_and_weighted_objective():
+    """Váhy bloků sečtou na počet dní; vážená funkce nákladů = vážený průměr chyb"""
+    print("\n=== Test 1: Váhy dní ===")
+
+    rng = np.random.default_rng(0)
+    for n_days, block in ((14, 3), (10, 1), (5, 7)):
+        weights = block_bootstrap_weights(n_days, block, rng)
+        assert len(weights) == n_days and weights.sum() == n_days and (weights >= 0).all()
+
+    objective = _objective()
+    params = [110.0, 0.4, np.log(2.5e7), 2.0]
+    unweighted = objective.evaluate(params)
+
+    objective.day_weights = np.ones(objective.layout.n_days)
+    assert np.allclose(objective.evaluate(params), unweighted)
+
+    weights = block_bootstrap_weights(objective.layout.n_days, 3, rng)
+    objective.day_weights = weights
+    residuals = np.abs(objective.energy_residuals(params))
+    observed_weights = weights[objective.has_observation]
+    expected_mape = observed_weights @ residuals / observed_weights.sum() * 100
+    assert np.isclose(objective.evaluate(params)[1], expected_mape)
+    print(f"✓ MAPE {unweighted[1]:.2f} % → převzorkováno {expected_mape:.2f} %")
+
+
+def test_parallel_replicates_match_sequential():
+    """Replikace v procesech = sekvenčně; nulový rozpočet = žádné intervaly"""
+    print("\n=== Test 2: Paralelní replikace ===")
+
+    objective = _objective()
+    bounds = parameter_bounds()
+    x_opt = np.array([110.0, 0.4, np.log(2.5e7), 2.0])
+
+    sequential = bootstrap_parameters(objective, x_opt, bounds, n_replicates=4, max_workers=1)
+    parallel = bootstrap_parameters(objective, x_opt, bounds, n_replicates=4, max_workers=2)
+    assert sequential.shape == (4, 4)
+    # as_completed vrací v pořadí dokončení
+    assert np.allclose(np.sort(parallel, axis=0), np.sort(sequential, axis=0))
+
+    assert bootstrap_confidence(objective, x_opt, bounds, n_replicates=10, time_budget_s=0.0) is None
+
+    # Po vyčerpání rozpočtu nesmí rozběhnuté replikace dál běžet v procesech
+    expired = bootstrap_parameters(objective, x_opt, bounds, n_replicates=10,
+                                   time_budget_s=0.0, max_workers=2)
+    assert len(expired) < 10
+    assert not multiprocessing.active_children()
+    print(f"✓ {len(parallel)} replikace shodné")
+
+
+def test_bootstrap_mode_reports_intervals():
+    """Režim BOOTSTRAP: intervaly obsahují bodový odhad, kvalita je zohlední"""
+    print("\n=== Test 3: Režim BOOTSTRAP ===")
+
+    daily, hourly = synthetic_inputs(days=14)
+    calibrated = calibrate_model_simple(daily, hourly, 150.0, 60.0, 21.0, 0.0,
+                                        mode="bootstrap", bootstrap_replicates=12)
+    confidence = calibrated.confidence
+
+    assert confidence is not None and confidence.n_replicates == 12
+    names = confidence.parameter_names
+    assert names[:4] == ['H_env_W_per_K', 'infiltration_rate_per_h', 'C_th_J_per_K',
+                         'internal_gains_W_per_m2'] and names[-1] == 'H_total_W_per_K'
+    lower, upper = confidence.intervals['H_total_W_per_K']
+    assert lower < 120.0 * 1.1 and upper > 120.0 * 0.9 and lower <= upper
+    correlation = np.array(confidence.correlation)
+    assert correlation.shape == (len(names), len(names)) and np.allclose(correlation, correlation.T)
+
+    quality = assess_quality_level(ComputationMode.BOOTSTRAP, 14, calibrated, [])
+    assert quality in (QualityLevel.MEDIUM, QualityLevel.HIGH)
+    print(f"✓ H_total {lower:.1f} – {upper:.1f} W/K ({confidence.confidence_level:.0%}), "
+          f"kvalita {quality.value}")
+
+
+if __name__ == "__main__":
+    test_block_weights_and_weighted_objective()
+    test_parallel_replicates_match_sequential()
+    test_bootstrap_mode_reports_intervals()
+    print("\n✅ Všechny testy bootstrapu prošly")
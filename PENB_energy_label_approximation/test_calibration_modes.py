@@ -0,0 +1,111 @@
+"""
+Test režimů kalibrace (core/calibrator.py) na syntetických datech
+"""
+import multiprocessing
+
+import numpy as np
+
+from scipy.optimize import OptimizeResult
+
+from core.calibrator import (
+    calibrate_model_simple, latin_hypercube_starts, run_multistart,
+    ConvergenceMonitor, DE_MAXITER
+)
+from tests_support import synthetic_inputs
+
+
+def test_lhs_starts_cover_bounds():
+    """LHS starty leží v mezích a první start je počáteční odhad"""
+    print("\n=== Test 1: LHS starty ===")
+
+    bounds = [(10, 1000), (0.05, 2.0), (np.log(1e5), np.log(1e8)), (0, 10)]
+    x0 = [150.0, 0.5, np.log(1e7), 3.0]
+    starts = latin_hypercube_starts(bounds, 6, x0=x0)
+
+    lower = np.array([b[0] for b in bounds])
+    upper = np.array([b[1] for b in bounds])
+    assert starts.shape == (6, 4)
+    assert np.allclose(starts[0], x0)
+    assert np.all((starts >= lower) & (starts <= upper))
+    # Každá dimenze má v LHS jeden bod v každé z n vrstev
+    strata = np.floor((starts[1:] - lower) / (upper - lower) * 6).astype(int)
+    assert len(set(strata[:, 0])) == 5
+    print(f"✓ {len(starts)} startů v mezích")
+
+
+def test_multistart_early_stop():
+    """Po shodě n_agree běhů se zbývající starty nespouští"""
+    print("\n=== Test 2: Předčasné ukončení ===")
+
+    def quadratic(x):
+        return float(np.sum((np.asarray(x) - 0.3) ** 2))
+
+    bounds = [(0.0, 1.0), (0.0, 1.0)]
+    result = run_multistart(quadratic, [0.5, 0.5], bounds, n_starts=8, n_agree=3, max_workers=1)
+
+    assert np.allclose(result.x, 0.3, atol=1e-4)
+    assert result.nit == 3, f"Očekávány 3 dokončené starty, je {result.nit}"
+    print(f"✓ Optimum {result.x}, dokončeno {result.nit} startů")
+
+
+def test_multistart_calibration_parallel():
+    """MULTISTART v procesech najde alespoň stejně dobré řešení jako STANDARD"""
+    print("\n=== Test 3: Kalibrace MULTISTART ===")
+
+    daily, hourly = synthetic_inputs()
+
+    standard = calibrate_model_simple(daily, hourly, 150.0, 60.0, 21.0, 0.0, mode="standard")
+    multistart = calibrate_model_simple(daily, hourly, 150.0, 60.0, 21.0, 0.0, mode="multistart",
+                                        max_workers=2)
+
+    standard_cost = standard.rmse_temperature_c * 10 + standard.mape_energy_pct
+    multistart_cost = multistart.rmse_temperature_c * 10 + multistart.mape_energy_pct
+    assert multistart_cost <= standard_cost + 1e-6
+    assert not multiprocessing.active_children(), "Po shodě startů nesmí běžet žádný worker"
+    print(f"✓ Cost MULTISTART {multistart_cost:.3f} ≤ STANDARD {standard_cost:.3f}")
+
+
+def test_convergence_monitor_stops_on_stall():
+    """Callback ukončí optimalizaci po `patience` generacích stagnace"""
+    print("\n=== Test 4: Kritérium stagnace ===")
+
+    monitor = ConvergenceMonitor(rtol=1e-3, patience=3)
+    costs = [10.0, 5.0, 4.0, 3.9999, 3.9999, 3.9999, 3.9999]
+    stops = [
+        monitor(OptimizeResult(fun=cost, population_energies=np.array([cost, cost + 1.0])))
+        for cost in costs
+    ]
+
+    assert stops == [False, False, False, False, False, True, True]
+    assert stops.index(True) == 5
+    assert monitor.stopped_early
+    assert np.allclose(monitor.population_spread, 0.5)
+    print(f"✓ Ukončeno v generaci {stops.index(True) + 1}")
+
+
+def test_advanced_reports_trace():
+    """ADVANCED vrátí průběh optimalizace v CalibratedParameters"""
+    print("\n=== Test 5: Průběh ADVANCED ===")
+
+    daily, hourly = synthetic_inputs(days=10)
+
+    calibrated = calibrate_model_simple(daily, hourly, 150.0, 60.0, 21.0, 0.0, mode="advanced",
+                                        max_workers=1)
+    trace = calibrated.trace
+
+    assert trace is not None
+    assert trace.generations == len(trace.best_cost) == len(trace.population_spread)
+    assert trace.generations <= DE_MAXITER
+    assert all(a >= b for a, b in zip(trace.best_cost, trace.best_cost[1:]))
+    assert trace.n_evaluations > 0
+    print(f"✓ {trace.generations} generací, {trace.n_evaluations} vyhodnocení, "
+          f"stagnace: {trace.stopped_early}")
+
+
+if __name__ == "__main__":
+    test_lhs_starts_cover_bounds()
+    test_multistart_early_stop()
+    test_multistart_calibration_parallel()
+    test_convergence_monitor_stops_on_stall()
+    test_advanced_reports_trace()
+    print("\n✅ Všechny testy režimů kalibrace prošly")
@@ -0,0 +1,105 @@
+"""
+Test matice den × hodina (core/day_hour_matrix.py) a jejího použití
+v rozkladu denní energie a počátečním odhadu parametrů
+"""
+import numpy as np
+import pandas as pd
+
+from core.day_hour_matrix import DayHourMatrix
+from core.baseline_split import distribute_daily_heating_to_hours
+from core.rc_model import estimate_initial_parameters
+
+
+def _hourly(days=5, drop=()):
+    rng = np.random.default_rng(1)
+    timestamps = pd.date_range('2024-01-01', periods=days * 24, freq='h')
+    df = pd.DataFrame({
+        'timestamp': timestamps,
+        'temp_out_c': 3 + 4 * np.sin(np.arange(days * 24) * 2 * np.pi / 24) + rng.normal(0, 1, days * 24)
+    })
+    return df.drop(index=list(drop)).reset_index(drop=True)
+
+
+def _daily(days=5):
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=days, freq='D'),
+        'heating_kwh': 15.0 + np.arange(days)
+    })
+
+
+def test_matrix_aggregations():
+    """Denní součet = součet řádku, podíly = normalizace řádku"""
+    print("\n=== Test 1: Agregace ===")
+
+    hourly = _hourly(drop=[3, 40])
+    matrix = DayHourMatrix.from_hourly(hourly, 'temp_out_c')
+
+    by_date = hourly.groupby(hourly['timestamp'].dt.normalize())['temp_out_c']
+    assert matrix.shape == (5, 24)
+    assert matrix.mask.sum() == len(hourly)
+    assert np.allclose(matrix.daily_sum(), by_date.sum().to_numpy())
+    assert np.allclose(matrix.daily_mean(), by_date.mean().to_numpy())
+
+    shares = matrix.row_shares()
+    assert np.allclose(shares.daily_sum(), 1.0)
+    assert np.allclose(matrix.to_hourly(), hourly['temp_out_c'].to_numpy())
+    print(f"✓ Matice {matrix.shape}, {matrix.mask.sum()} platných hodin")
+
+
+def test_row_normalize_zero_day():
+    """Den bez potřeby topení se rozdělí rovnoměrně"""
+    print("\n=== Test 2: Nulový den ===")
+
+    hourly = _hourly(days=2)
+    matrix = DayHourMatrix.from_hourly(hourly, 'temp_out_c')
+    delta = np.where(hourly['timestamp'] < '2024-01-02', 0.0, 1.0 + np.arange(48))
+
+    shares = matrix.row_normalize(delta)
+    assert np.allclose(shares[:24], 1 / 24)
+    assert np.isclose(shares[24:].sum(), 1.0)
+    print("✓ Rovnoměrné rozdělení dne s nulovou potřebou")
+
+
+def test_distribute_matches_groupby():
+    """Rozklad denní energie odpovídá původnímu groupby výpočtu"""
+    print("\n=== Test 3: Rozklad denní energie ===")
+
+    hourly = _hourly(drop=[10, 11])
+    daily = _daily()
+    result = distribute_daily_heating_to_hours(daily, hourly, indoor_temp_c=21.0)
+
+    delta = np.maximum(21.0 - hourly['temp_out_c'], 0)
+    day = hourly['timestamp'].dt.normalize()
+    expected = delta / delta.groupby(day).transform('sum') * day.map(
+        daily.set_index('date')['heating_kwh']
+    )
+
+    assert np.allclose(result['heating_energy_kwh'].to_numpy(), expected.to_numpy())
+    assert np.allclose(
+        result.groupby(day)['heating_energy_kwh'].sum().to_numpy(),
+        daily['heating_kwh'].to_numpy()
+    )
+    print(f"✓ {len(result)} hodin, součty dní sedí")
+
+
+def test_initial_parameters_accept_matrix():
+    """estimate_initial_parameters přijme DataFrame i DayHourMatrix"""
+    print("\n=== Test 4: Počáteční odhad ===")
+
+    hourly = _hourly()
+    daily = _daily()
+    matrix = DayHourMatrix.from_hourly(hourly, 'temp_out_c')
+
+    from_frame = estimate_initial_parameters(daily, hourly, 189.0, 21.0)
+    from_matrix = estimate_initial_parameters(daily, matrix, 189.0, 21.0)
+
+    assert np.allclose(from_frame, from_matrix)
+    print(f"✓ H_env={from_frame[0]:.1f} W/K z obou reprezentací")
+
+
+if __name__ == "__main__":
+    test_matrix_aggregations()
+    test_row_normalize_zero_day()
+    test_distribute_matches_groupby()
+    test_initial_parameters_accept_matrix()
+    print("\n✅ Všechny testy matice den × hodina prošly")
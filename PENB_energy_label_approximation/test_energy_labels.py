@@ -0,0 +1,105 @@
+"""
+Test vektorové klasifikace energetických tříd a primární energie portfolia
+"""
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.config import load_label_tables
+from core.data_models import LabelTables
+from core.metrics import classify_energy_label, classify_energy_labels, classify_portfolio
+from core.simulate_year import calculate_primary_energy, calculate_primary_energy_array
+
+
+def test_thresholds_and_boundaries():
+    """Hranice tříd: hodnota na hranici patří do horší třídy (jako původní if-ladder)"""
+    print("\n=== Test 1: Hranice tříd ===")
+
+    primary = np.array([0, 49.9, 50, 74.9, 75, 110, 149, 150, 200, 269.9, 270, 1e4])
+    expected = list("AABBCDDEFFGG")
+    assert list(classify_energy_labels(None, primary)) == expected
+    assert [classify_energy_label(0.0, p).value for p in primary] == expected
+
+    heating = np.array([29.9, 30, 50, 75, 100, 130, 180])
+    assert list(classify_energy_labels(heating, None, use_primary=False)) == list("ABCDEFG")
+    print("✓ Primární i potřeba tepla, skalár = pole")
+
+
+def test_primary_energy_array_matches_scalar():
+    """Pole zdrojů/účinností = skalární výpočet, včetně neznámého zdroje a chybějící účinnosti"""
+    print("\n=== Test 2: Primární energie pole ===")
+
+    systems = ['gas_boiler', 'condensing_boiler', 'heat_pump_air', 'electric_direct',
+               'district_heating', 'unknown', 'fireplace']
+    heating = np.linspace(3000, 9000, len(systems))
+    efficiency = np.array([0.85, np.nan, 3.2, 1.0, np.nan, 0.9, 0.7])
+
+    result = calculate_primary_energy_array(heating, systems, efficiency)
+    defaults = calculate_primary_energy_array(heating, systems)
+    for k, system in enumerate(systems):
+        eff = efficiency[k] if not np.isnan(efficiency[k]) else None
+        scalar = calculate_primary_energy(heating[k], system, eff)
+        assert np.isclose(result[k], scalar), (system, result[k], scalar)
+    # Neznámý zdroj: faktor 2.0 bez účinnosti
+    assert np.isclose(result[-1], heating[-1] * 2.0)
+    assert np.isclose(defaults[1], result[1]) and np.isclose(defaults[4], result[4])
+    print("✓ Shoda se skalárním výpočtem")
+
+
+def test_portfolio_classification():
+    """100 000 bytů jedním voláním, shoda se skalární klasifikací na vzorku"""
+    print("\n=== Test 3: Portfolio ===")
+
+    rng = np.random.default_rng(0)
+    n = 100_000
+    portfolio = pd.DataFrame({
+        'heating_kwh_per_m2': rng.uniform(20, 300, n),
+        'system_type': rng.choice(['gas_boiler', 'heat_pump_air', 'district_heating'], n),
+        'efficiency_or_cop': rng.choice([np.nan, 0.9, 3.0], n),
+    })
+
+    start = time.perf_counter()
+    classified = classify_portfolio(portfolio)
+    elapsed = time.perf_counter() - start
+    assert len(classified) == n and classified['energy_class'].isin(list("ABCDEFG")).all()
+
+    for row in classified.sample(200, random_state=0).itertuples():
+        eff = None if np.isnan(row.efficiency_or_cop) else row.efficiency_or_cop
+        primary = calculate_primary_energy(row.heating_kwh_per_m2, row.system_type, eff)
+        assert np.isclose(row.primary_kwh_per_m2, primary)
+        assert row.energy_class == classify_energy_label(0.0, primary).value
+    print(f"✓ {n} bytů za {elapsed * 1000:.0f} ms")
+    assert elapsed < 5.0
+
+
+def test_custom_tables():
+    """Vlastní tabulky ze souboru, validace hranic"""
+    print("\n=== Test 4: Vlastní tabulky ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "label_tables.json"
+        path.write_text(json.dumps({'primary_thresholds': [10, 20, 30, 40, 50, 60]}),
+                        encoding='utf-8')
+        tables = load_label_tables(path)
+    assert tables.heating_thresholds == LabelTables().heating_thresholds
+    assert list(classify_energy_labels(None, [5, 25, 65], tables=tables)) == ['A', 'C', 'G']
+    assert load_label_tables(Path("/neexistuje/label_tables.json")) == LabelTables()
+
+    try:
+        LabelTables(primary_thresholds=[50, 40, 110, 150, 200, 270])
+        assert False, "Neklesající hranice musí selhat"
+    except ValueError:
+        pass
+    print("✓ Načtení ze souboru i odmítnutí neplatných hranic")
+
+
+if __name__ == "__main__":
+    test_thresholds_and_boundaries()
+    test_primary_energy_array_matches_scalar()
+    test_portfolio_classification()
+    test_custom_tables()
+    print("\n✅ Všechny testy energetických tříd prošly")
@@ -0,0 +1,125 @@
+"""
+Test inkrementální kalibrace (core/incremental_calibration.py)
+"""
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.calibrator import (
+    CalibrationObjective, calibrate_model_simple, prepare_calibration_hours
+)
+from core.incremental_calibration import (
+    INCREMENTAL_MAX_HISTORY_DAYS, calibrate_incremental, history_weight, merge_states
+)
+from core.parameter_store import ParameterStore
+from tests_support import synthetic_inputs
+
+
+def _split(daily, hourly, n_days):
+    """Prvních n_days dní a zbytek"""
+    cut = pd.Timestamp(daily['date'].iloc[n_days])
+    return (
+        (daily[daily['date'] < cut], hourly[hourly['timestamp'] < cut]),
+        (daily[daily['date'] >= cut], hourly[hourly['timestamp'] >= cut])
+    )
+
+
+def test_state_continuation_matches_full_window():
+    """Simulace okna od uloženého stavu = simulace celé historie"""
+    print("\n=== Test 1: Navázání stavu ===")
+
+    daily, hourly = synthetic_inputs(days=9)
+    (old_daily, old_hourly), (new_daily, new_hourly) = _split(daily, hourly, 7)
+    params = [120.0, 0.4, np.log(2e7), 3.0]
+
+    def objective(d, h, initial=None):
+        return CalibrationObjective(d, prepare_calibration_hours(d, h, 21.0), 150.0, 60.0,
+                                    initial_indoor_temp=initial)
+
+    full = objective(daily, hourly).end_state(params)
+    first = objective(old_daily, old_hourly).end_state(params)
+    second = objective(new_daily, new_hourly, first.T_in_end_c).end_state(params)
+    merged = merge_states(first, second)
+
+    assert merged.end_timestamp == full.end_timestamp
+    assert np.isclose(merged.T_in_end_c, full.T_in_end_c)
+    assert merged.n_energy_days == full.n_energy_days == 9
+    assert np.isclose(merged.sum_sq_temp_error, full.sum_sq_temp_error)
+    assert np.isclose(merged.sum_pct_energy_error, full.sum_pct_energy_error)
+    print(f"✓ T_in na konci {merged.T_in_end_c:.3f} °C v obou případech")
+
+
+def test_incremental_update():
+    """Nové dny zpřesní uloženou kalibraci a posunou stav"""
+    print("\n=== Test 2: Inkrementální krok ===")
+
+    daily, hourly = synthetic_inputs(days=10)
+    (old_daily, old_hourly), (new_daily, new_hourly) = _split(daily, hourly, 8)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParameterStore(Path(tmp))
+
+        with pytest.raises(ValueError):
+            calibrate_incremental("B7", new_daily, new_hourly, 150.0, 60.0, 21.0, store=store)
+
+        full = calibrate_model_simple(old_daily, old_hourly, 150.0, 60.0, 21.0, 0.0,
+                                      mode="standard", apartment_id="B7", store=store)
+        before = store.load("B7").state
+        updated = calibrate_incremental("B7", daily, hourly, 150.0, 60.0, 21.0, store=store)
+        stored = store.load("B7")
+
+        assert stored.parameters == updated
+        assert stored.state.n_energy_days == 10
+        assert stored.state.end_timestamp == hourly['timestamp'].iloc[-1]
+        assert abs(updated.H_env_W_per_K - full.H_env_W_per_K) < 0.2 * full.H_env_W_per_K
+        assert updated.parameter_covariance == full.parameter_covariance
+        assert updated.confidence == full.confidence
+
+
+        # RMSE je metrika nového okna, ne součet přes historii
+        window_hours = stored.state.n_temp_hours - before.n_temp_hours
+        window_sq = stored.state.sum_sq_temp_error - before.sum_sq_temp_error
+        assert window_hours > 0
+        assert np.isclose(updated.rmse_temperature_c, np.sqrt(window_sq / window_hours))
+
+        # Opakované volání bez nových dní nic nepřepočítá
+        assert calibrate_incremental("B7", daily, hourly, 150.0, 60.0, 21.0, store=store) == updated
+    print(f"✓ H_env {full.H_env_W_per_K:.1f} → {updated.H_env_W_per_K:.1f} W/K")
+
+
+def test_history_weight_is_capped():
+    """Váha vazby na historii neroste nad INCREMENTAL_MAX_HISTORY_DAYS"""
+    print("\n=== Test 3: Strop váhy historie ===")
+
+    cap = INCREMENTAL_MAX_HISTORY_DAYS
+    assert history_weight(100, 2) == 50.0
+    assert history_weight(3650, 2) == history_weight(cap, 2) == cap / 2
+    assert history_weight(3650, 2, max_history_days=730) == 365.0
+    assert history_weight(30, 0) == 30.0
+
+    daily, hourly = synthetic_inputs(days=10)
+    (old_daily, old_hourly), _ = _split(daily, hourly, 8)
+
+    def refine(n_energy_days):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ParameterStore(Path(tmp))
+            calibrate_model_simple(old_daily, old_hourly, 150.0, 60.0, 21.0, 0.0,
+                                   mode="fast", apartment_id="B8", store=store)
+            stored = store.load("B8")
+            state = stored.state.model_copy(update={'n_energy_days': n_energy_days})
+            store.save("B8", stored.parameters, stored.data_hash, stored.mode, state=state)
+            return calibrate_incremental("B8", daily, hourly, 150.0, 60.0, 21.0, store=store)
+
+    # Historie 10 let váží stejně jako historie na stropu
+    assert refine(3650).H_env_W_per_K == refine(cap).H_env_W_per_K
+    print(f"✓ Váha {history_weight(3650, 2):.1f} místo {3650 / 2:.1f}")
+
+
+if __name__ == "__main__":
+    test_state_continuation_matches_full_window()
+    test_incremental_update()
+    test_history_weight_is_capped()
+    print("\n✅ Všechny testy inkrementální kalibrace prošly")
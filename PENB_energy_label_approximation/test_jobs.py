@@ -0,0 +1,165 @@
+"""
+Test výpočtů na pozadí (core/jobs.py) a zrušení běžící kalibrace
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core import pipeline
+from core.calibrator import calibrate_model_simple, run_multistart
+from core.data_models import JobStatus
+from core.jobs import ComputationCancelled, JobManager, stop_process_pool
+from tests_support import apartment_inputs, synthetic_inputs, typical_year_weather
+
+
+def test_progress_events_and_failures():
+    """Události průběhu v pořadí, výsledek, chyba a zrušení čekající úlohy"""
+    print("\n=== Test 1: Fronta úloh ===")
+
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+
+    def work(progress, should_stop):
+        for percent in (10, 50, 100):
+            progress(percent, f"krok {percent}")
+        release.wait(5)
+        return 42
+
+    def fail(progress, should_stop):
+        raise ValueError("chybná data")
+
+    try:
+        job = manager.submit(work)
+        failing = manager.submit(fail)
+        queued = manager.submit(work)
+        assert manager.active_jobs() == 3
+
+        queued.cancel()                       # ještě nezačala - zruší se hned
+        assert queued.status == JobStatus.CANCELLED
+
+        release.set()
+        assert job.wait(5) and failing.wait(5)
+        assert [e.percent for e in job.poll()] == [10, 50, 100] and job.poll() == []
+        assert job.status == JobStatus.DONE and job.result == 42 and job.progress == 100
+        assert failing.status == JobStatus.FAILED and isinstance(failing.error, ValueError)
+
+        manager.forget(job.job_id)
+        assert manager.get(job.job_id) is None and manager.active_jobs() == 0
+    finally:
+        manager.shutdown()
+    print("✓ Průběh, výsledek, chyba i zrušení ve frontě")
+
+
+def test_calibration_stops_promptly():
+    """Kalibrace kontroluje zrušení při vyhodnocení funkce nákladů"""
+    print("\n=== Test 2: Zrušení kalibrace ===")
+
+    daily, hourly = synthetic_inputs(days=14)
+    for mode in ("standard", "advanced", "multistart"):
+        checks = []
+
+        def should_stop():
+            checks.append(1)
+            return len(checks) > 20
+
+        try:
+            calibrate_model_simple(daily, hourly, 150.0, 60.0, 21.0, 0.0, mode=mode,
+                                   should_stop=should_stop, max_workers=1)
+            assert False, f"{mode}: kalibrace měla být zrušena"
+        except ComputationCancelled:
+            pass
+        assert len(checks) == 21, (mode, len(checks))
+    print("✓ STANDARD, ADVANCED i MULTISTART zrušeny hned po požadavku")
+
+
+def test_cancel_pipeline_job():
+    """Zrušení úlohy během etapy ukončí výpočet na nejbližším kontrolním bodě"""
+    print("\n=== Test 3: Zrušení úlohy výpočtu ===")
+
+    daily, hourly = synthetic_inputs(days=7)
+    in_stage, release, prepared = threading.Event(), threading.Event(), []
+
+    def runner(stage, key, fn, *args):
+        # Počasí ze syntetických dat, etapa typického roku čeká na zrušení
+        if stage == 'weather':
+            return hourly.copy()
+        if stage == 'typical_year':
+            in_stage.set()
+            release.wait(5)
+            return typical_year_weather()
+        if stage == 'prepare':
+            prepared.append(1)
+        return fn(*args)
+
+    manager = JobManager(max_workers=1)
+    try:
+        job = manager.submit(
+            lambda progress, should_stop: pipeline.run_pipeline(
+                apartment_inputs(daily), "key", progress=progress,
+                runner=runner, should_stop=should_stop
+            )
+        )
+        assert in_stage.wait(5)
+        job.cancel()
+        release.set()
+        assert job.wait(5) and job.status == JobStatus.CANCELLED
+        assert not prepared
+        assert [e.percent for e in job.poll()] == [10, 25]
+    finally:
+        manager.shutdown()
+    print("✓ Úloha zrušena před zpracováním dat")
+
+
+class _SlowQuadratic:
+    """Picklovatelná funkce nákladů, jedno vyhodnocení trvá 200 ms"""
+
+    def __call__(self, x):
+        time.sleep(0.2)
+        return float(sum((xi - 0.3) ** 2 for xi in x))
+
+
+def test_cancel_parallel_multistart():
+    """Zrušení se projeví i během čekání na běžící starty v procesech"""
+    print("\n=== Test 5: Zrušení paralelního MULTISTART ===")
+
+    started = time.monotonic()
+    try:
+        run_multistart(_SlowQuadratic(), [0.9, 0.9], [(0.0, 1.0), (0.0, 1.0)],
+                       n_starts=4, max_workers=2,
+                       should_stop=lambda: time.monotonic() - started > 0.3)
+    except ComputationCancelled:
+        elapsed = time.monotonic() - started
+    else:
+        raise AssertionError("MULTISTART měl být zrušen")
+
+    assert elapsed < 1.5, elapsed
+    assert not multiprocessing.active_children()
+    print(f"✓ Zrušeno po {elapsed:.2f} s, procesy ukončeny")
+
+
+def test_stop_process_pool_terminates_workers():
+    """Běžící úlohy v procesech se po předčasném konci ukončí, nedoběhnou"""
+    print("\n=== Test 4: Ukončení poolu procesů ===")
+
+    executor = ProcessPoolExecutor(max_workers=2)
+    futures = [executor.submit(time.sleep, 30) for _ in range(4)]
+    while not any(future.running() for future in futures):
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    stop_process_pool(executor)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 5, elapsed
+    assert not multiprocessing.active_children()
+    print(f"✓ Pool ukončen za {elapsed:.2f} s, žádné procesy nezůstaly")
+
+
+if __name__ == "__main__":
+    test_progress_events_and_failures()
+    test_calibration_stops_promptly()
+    test_cancel_pipeline_job()
+    test_stop_process_pool_terminates_workers()
+    test_cancel_parallel_multistart()
+    print("\n✅ Všechny testy výpočtů na pozadí prošly")
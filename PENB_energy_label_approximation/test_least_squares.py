@@ -0,0 +1,118 @@
+"""
+Test kalibrace nejmenšími čtverci (core/least_squares.py)
+"""
+import numpy as np
+import pandas as pd
+
+from core.calibrator import (calibrate_model_simple, least_squares_covariance,
+                             parameter_bounds, PRIOR_STD_FRACTION)
+from core.least_squares import fit_arx, fit_steady_state, fit_rc_least_squares
+from core.rc_model import RC1Model
+from tests_support import synthetic_inputs
+
+
+def _simulated_hours(days=10, noise_c=0.0):
+    """Hodinová data ze simulace 1R1C s měřenou T_in"""
+    rng = np.random.default_rng(5)
+    model = RC1Model(H_env_W_per_K=95.0, infiltration_rate_per_h=0.5, volume_m3=150.0,
+                     C_th_J_per_K=1.2e7, area_m2=55.0, internal_gains_W_per_m2=3.5)
+    n = days * 24
+    hours = np.arange(n)
+    temp_out = 3 + 5 * np.sin(hours * 2 * np.pi / 24)
+    ghi = np.maximum(0, 350 * np.sin((hours % 24 - 6) * np.pi / 12))
+    power = rng.uniform(0, 3500, n)
+
+    T_in = np.empty(n)
+    T_in[0] = 20.0
+    for k in range(n - 1):
+        T_in[k + 1] = model.simulate_step(T_in[k], temp_out[k], power[k], ghi[k])
+
+    hourly = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='h'),
+        'temp_out_c': temp_out,
+        'ghi_wm2': ghi,
+        'heating_power_W': power,
+        'temp_in_c': T_in + rng.normal(0, noise_c, n)
+    })
+    return model, hourly
+
+
+def test_arx_exact_recovery():
+    """ARX fit na bezšumových datech vrátí přesné parametry modelu"""
+    print("\n=== Test 1: ARX ===")
+
+    model, hourly = _simulated_hours()
+    fit = fit_arx(hourly)
+
+    assert fit.method == "arx"
+    assert np.isclose(fit.H_total_W_per_K, model.H_total, rtol=1e-6)
+    assert np.isclose(fit.C_th_J_per_K, model.C_th, rtol=1e-6)
+    assert np.isclose(fit.Q_internal_W, model.q_int * model.A, rtol=1e-6)
+    assert np.isclose(fit.solar_aperture_m2, model.solar_ap * model.A, rtol=1e-6)
+    print(f"✓ H_total={fit.H_total_W_per_K:.2f} W/K, C_th={fit.C_th_J_per_K/1e6:.2f} MJ/K")
+
+
+def test_arx_covariance_with_noise():
+    """Se šumem měření je skutečná hodnota v rozsahu ±4σ odhadu"""
+    print("\n=== Test 2: Kovariance ===")
+
+    model, hourly = _simulated_hours(days=28, noise_c=0.02)
+    fit = fit_arx(hourly)
+
+    assert fit.H_total_std > 0 and fit.C_th_std > 0
+    assert abs(fit.C_th_J_per_K - model.C_th) < 4 * fit.C_th_std
+
+    # Delta metoda přes gradienty = směrodatné chyby fitu
+    physical = fit.covariance(['H_total', 'C_th', 'Q_internal_W'])
+    assert np.isclose(np.sqrt(physical[0, 0]), fit.H_total_std)
+    assert np.isclose(np.sqrt(physical[1, 1]), fit.C_th_std)
+    assert abs(fit.Q_internal_W - model.q_int * model.A) < 4 * np.sqrt(physical[2, 2])
+    print(f"✓ C_th = {fit.C_th_J_per_K/1e6:.2f} ± {fit.C_th_std/1e6:.2f} MJ/K "
+          f"(skutečná {model.C_th/1e6:.2f})")
+
+
+def test_constant_indoor_falls_back_to_steady_state():
+    """Konstantní T_in → denní ustálená bilance"""
+    print("\n=== Test 3: Denní bilance ===")
+
+    daily, hourly = synthetic_inputs(days=14)
+    hours = hourly.assign(temp_in_c=21.0, heating_power_W=500.0)
+
+    fit = fit_rc_least_squares(daily, hours, 21.0)
+    direct = fit_steady_state(daily, hourly, 21.0)
+
+    assert fit.method == "steady_state"
+    assert fit.C_th_J_per_K is None
+    assert np.isclose(fit.H_total_W_per_K, direct.H_total_W_per_K)
+    # Data generována s H = 120 W/K bez zisků
+    assert abs(fit.H_total_W_per_K - 120.0) < 4 * fit.H_total_std + 5
+    print(f"✓ H_total = {fit.H_total_W_per_K:.1f} ± {fit.H_total_std:.1f} W/K")
+
+
+def test_fast_mode():
+    """Režim FAST vrátí kalibrované parametry bez optimalizace"""
+    print("\n=== Test 4: Režim FAST ===")
+
+    daily, hourly = synthetic_inputs(days=14)
+    calibrated = calibrate_model_simple(daily, hourly, 150.0, 60.0, 21.0, 0.0, mode="fast")
+
+    assert 10 <= calibrated.H_env_W_per_K <= 1000
+    assert calibrated.mape_energy_pct < 10
+
+    # Kovariance z lstsq (delta metoda), ne z konečných diferencí simulací
+    bounds = parameter_bounds()
+    fit = fit_steady_state(daily, hourly, 21.0)
+    covariance = np.array(calibrated.parameter_covariance)
+    assert np.allclose(covariance, least_squares_covariance(fit, 60.0, bounds))
+    assert np.isclose(np.sqrt(covariance[0, 0]), fit.H_total_std)
+    prior = PRIOR_STD_FRACTION * (bounds[2][1] - bounds[2][0])
+    assert np.isclose(covariance[2, 2], prior ** 2)   # C_th denní bilance neurčí
+    print(f"✓ H_env = {calibrated.H_env_W_per_K:.1f} W/K, MAPE {calibrated.mape_energy_pct:.1f} %")
+
+
+if __name__ == "__main__":
+    test_arx_exact_recovery()
+    test_arx_covariance_with_noise()
+    test_constant_indoor_falls_back_to_steady_state()
+    test_fast_mode()
+    print("\n✅ Všechny testy nejmenších čtverců prošly")
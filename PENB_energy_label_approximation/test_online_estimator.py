@@ -0,0 +1,88 @@
+"""
+Test online odhadu parametrů RC modelu (core/online_estimator.py)
+"""
+import numpy as np
+
+from core.online_estimator import OnlineRCEstimator, RecursiveLeastSquares
+from core.rc_model import RC1Model
+
+
+def test_hourly_recovers_rc_parameters():
+    """Hodinové aktualizace ze simulovaného 1R1C obnoví H_total, C_th i zisky"""
+    print("\n=== Test 1: Hodinová forma ===")
+
+    rng = np.random.default_rng(0)
+    model = RC1Model(H_env_W_per_K=110.0, infiltration_rate_per_h=0.4, volume_m3=160.0,
+                     C_th_J_per_K=1.5e7, area_m2=60.0, internal_gains_W_per_m2=4.0)
+    estimator = OnlineRCEstimator(area_m2=60.0, forgetting=1.0)
+
+    T_in = 20.0
+    for hour in range(24 * 14):
+        T_out = 2 + 5 * np.sin(hour * 2 * np.pi / 24)
+        Q_heat = rng.uniform(0, 4000)
+        ghi = max(0.0, 400 * np.sin((hour % 24 - 6) * np.pi / 12))
+        T_next = model.simulate_step(T_in, T_out, Q_heat, ghi)
+        estimator.update_hour(T_in, T_next, T_out, Q_heat, ghi)
+        T_in = T_next
+
+    estimate = estimator.estimate()
+    assert np.isclose(estimate.H_total_W_per_K, model.H_total, rtol=1e-3)
+    assert np.isclose(estimate.C_th_J_per_K, model.C_th, rtol=1e-3)
+    assert np.isclose(estimate.internal_gains_W_per_m2, 4.0, rtol=1e-2)
+    assert np.isclose(estimate.solar_aperture, 0.02, rtol=1e-2)
+    print(f"✓ H_total={estimate.H_total_W_per_K:.1f} W/K, C_th={estimate.C_th_J_per_K/1e6:.2f} MJ/K")
+
+
+def test_daily_steady_state():
+    """Denní aktualizace odhadnou H_total z denní spotřeby"""
+    print("\n=== Test 2: Denní forma ===")
+
+    rng = np.random.default_rng(1)
+    estimator = OnlineRCEstimator(area_m2=60.0, forgetting=1.0)
+    H_total, Q_int = 150.0, 240.0
+
+    # Bez aktualizací není odhad, jen počáteční hodnota
+    assert estimator.estimate() is None
+
+    for _ in range(60):
+        temp_out = rng.uniform(-8, 12)
+        ghi = rng.uniform(20, 120)
+        power = H_total * (21.0 - temp_out) - 1.2 * ghi - Q_int + rng.normal(0, 20)
+        estimator.update_day(power * 24 / 1000, temp_out, 21.0, ghi)
+
+    estimate = estimator.estimate()
+    assert estimate.n_daily_updates == 60
+    assert estimate.C_th_J_per_K is None
+    assert abs(estimate.H_total_W_per_K - H_total) < 5.0
+    print(f"✓ H_total={estimate.H_total_W_per_K:.1f} W/K po {estimate.n_daily_updates} dnech")
+
+
+def test_batch_matches_single_series():
+    """Vektorová aktualizace více bytů = samostatné odhady"""
+    print("\n=== Test 3: Více bytů najednou ===")
+
+    rng = np.random.default_rng(2)
+    phi = rng.normal(size=(50, 3, 2))
+    y = rng.normal(size=(50, 3))
+    y[10, 1] = np.nan  # chybějící pozorování bytu 1
+
+    batch = RecursiveLeastSquares(2, n_series=3, forgetting=0.98)
+    singles = [RecursiveLeastSquares(2, forgetting=0.98) for _ in range(3)]
+
+    for k in range(50):
+        batch.update(phi[k], y[k])
+        for i, single in enumerate(singles):
+            single.update(phi[k, i], y[k, i])
+
+    for i, single in enumerate(singles):
+        assert np.allclose(batch.theta[i], single.theta[0])
+        assert np.allclose(batch.P[i], single.P[0])
+    assert list(batch.n_updates) == [50, 49, 50]
+    print("✓ Odhady 3 bytů shodné s jednotlivými")
+
+
+if __name__ == "__main__":
+    test_hourly_recovers_rc_parameters()
+    test_daily_steady_state()
+    test_batch_matches_single_series()
+    print("\n✅ Všechny testy online odhadu prošly")
@@ -0,0 +1,145 @@
+"""
+Test úložiště kalibrací a teplého startu (core/parameter_store.py)
+"""
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from core.calibrator import (
+    calibrate_model_simple, parameters_to_vector, warm_start_population
+)
+from core.parameter_store import ParameterStore, calibration_data_hash
+from tests_support import sample_parameters, synthetic_inputs
+
+
+def test_store_roundtrip_and_hash():
+    """Uložení/načtení kalibrace a citlivost hashe na data"""
+    print("\n=== Test 1: Úložiště a hash ===")
+
+    daily, hourly = synthetic_inputs(days=7)
+    data_hash = calibration_data_hash(daily, hourly, 150.0, 60.0, 21.0, 0.0)
+
+    changed = daily.copy()
+    changed.loc[3, 'heating_kwh'] += 0.1
+    assert calibration_data_hash(changed, hourly, 150.0, 60.0, 21.0, 0.0) != data_hash
+    assert calibration_data_hash(daily, hourly, 150.0, 60.0, 21.5, 0.0) != data_hash
+    assert calibration_data_hash(daily, hourly.assign(ghi_wm2=hourly['ghi_wm2'] * 1.5),
+                                 150.0, 60.0, 21.0, 0.0) != data_hash
+    assert calibration_data_hash(daily, hourly.drop(columns='ghi_wm2'),
+                                 150.0, 60.0, 21.0, 0.0) != data_hash
+    assert calibration_data_hash(daily.copy(), hourly.copy(), 150, 60, 21, 0) == data_hash
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParameterStore(Path(tmp))
+        assert store.load("byt 12/3") is None
+
+        store.save("byt 12/3", sample_parameters(), data_hash, "standard")
+        loaded = store.load("byt 12/3")
+
+        assert loaded.data_hash == data_hash
+        assert loaded.parameters == sample_parameters()
+
+        # ID, která se liší jen znaky mimo [\w.-], nesdílí soubor
+        assert store.load("byt_12_3") is None
+        store.save("byt_12_3", sample_parameters(), "jiný hash", "standard")
+        assert store.load("byt 12/3").data_hash == data_hash
+        assert store.load("byt_12_3").data_hash == "jiný hash"
+
+        # Soubor s cizím ID (přejmenovaný, kolize) se nenačte
+        os.replace(store._path("byt 12/3"), store._path("byt_12_3"))
+        assert store.load("byt_12_3") is None
+    print("✓ Kalibrace uložena a načtena")
+
+
+def test_warm_start_population():
+    """Populace DE obsahuje předchozí řešení a leží v mezích"""
+    print("\n=== Test 2: Teplá populace ===")
+
+    bounds = [(10, 1000), (0.05, 2.0), (np.log(1e5), np.log(1e8)), (0, 10)]
+    x_warm = parameters_to_vector(sample_parameters())
+    population = warm_start_population(x_warm, bounds, popsize=10)
+
+    lower = np.array([b[0] for b in bounds])
+    upper = np.array([b[1] for b in bounds])
+    assert population.shape == (40, 4)
+    assert np.allclose(population[0], x_warm)
+    assert np.all((population >= lower) & (population <= upper))
+    near = np.abs(population[:20, 0] - x_warm[0]) < 0.2 * (upper[0] - lower[0])
+    assert near.all()
+    print(f"✓ Populace {population.shape}, prvních 20 kolem teplého startu")
+
+
+def test_calibration_skipped_when_unchanged():
+    """Druhá kalibrace se stejnými daty vrátí uložené parametry"""
+    print("\n=== Test 3: Přeskočení kalibrace ===")
+
+    daily, hourly = synthetic_inputs(days=7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParameterStore(Path(tmp))
+        args = (daily, hourly, 150.0, 60.0, 21.0, 0.0)
+
+        first = calibrate_model_simple(*args, mode="standard", apartment_id="A1", store=store)
+        stored = store.load("A1")
+        second = calibrate_model_simple(*args, mode="standard", apartment_id="A1", store=store)
+
+        assert second == first
+        assert store.load("A1").calibrated_at == stored.calibrated_at
+
+        # Nová data → kalibrace proběhne s teplým startem a přepíše uložení
+        more_daily, more_hourly = synthetic_inputs(days=9)
+        third = calibrate_model_simple(more_daily, more_hourly, 150.0, 60.0, 21.0, 0.0,
+                                       mode="standard", apartment_id="A1", store=store)
+        assert store.load("A1").parameters == third
+        assert store.load("A1").data_hash != stored.data_hash
+    print("✓ Nezměněná data přeskočena, nová data překalibrována")
+
+
+def test_fast_mode_ignores_stale_calibration():
+    """FAST s uloženou kalibrací a změněnými daty vrátí nejmenší čtverce, ne uložené parametry"""
+    print("\n=== Test 4: FAST s uloženou kalibrací ===")
+
+    daily, hourly = synthetic_inputs(days=7)
+    args = (daily, hourly, 150.0, 60.0, 21.0, 0.0)
+    expected = calibrate_model_simple(*args, mode="fast")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParameterStore(Path(tmp))
+        store.save("A1", sample_parameters(H_env=500.0), "jina-data", "fast")
+
+        fast = calibrate_model_simple(*args, mode="fast", apartment_id="A1", store=store)
+        assert fast.H_env_W_per_K == expected.H_env_W_per_K != 500.0
+        assert np.allclose(parameters_to_vector(fast), parameters_to_vector(expected))
+    print(f"✓ H_env = {fast.H_env_W_per_K:.1f} W/K (uloženo 500.0)")
+
+
+def test_irradiance_change_invalidates_calibration():
+    """Změna pouze slunečního záření nesmí vrátit uloženou kalibraci"""
+    print("\n=== Test 5: Změna GHI ===")
+
+    daily, hourly = synthetic_inputs(days=7)
+    day = np.arange(len(hourly)) // 24
+    brighter = hourly.assign(ghi_wm2=hourly['ghi_wm2'] * (1.5 + np.sin(day)))
+    expected = calibrate_model_simple(daily, brighter, 150.0, 60.0, 21.0, 0.0, mode="fast")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParameterStore(Path(tmp))
+        first = calibrate_model_simple(daily, hourly, 150.0, 60.0, 21.0, 0.0,
+                                       mode="fast", apartment_id="A1", store=store)
+        second = calibrate_model_simple(daily, brighter, 150.0, 60.0, 21.0, 0.0,
+                                        mode="fast", apartment_id="A1", store=store)
+
+    assert second.H_env_W_per_K != first.H_env_W_per_K
+    assert np.allclose(parameters_to_vector(second), parameters_to_vector(expected))
+    print(f"✓ H_env {first.H_env_W_per_K:.1f} → {second.H_env_W_per_K:.1f} W/K po změně GHI")
+
+
+if __name__ == "__main__":
+    test_store_roundtrip_and_hash()
+    test_warm_start_population()
+    test_calibration_skipped_when_unchanged()
+    test_fast_mode_ignores_stale_calibration()
+    test_irradiance_change_invalidates_calibration()
+    print("\n✅ Všechny testy úložiště kalibrací prošly")
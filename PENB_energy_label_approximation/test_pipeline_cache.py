@@ -0,0 +1,153 @@
+"""
+Test cache celých výpočtů (core/pipeline_cache.py, core/pipeline.py)
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from core import pipeline
+from core.data_models import HeatingSystemInfo, HeatingSystemType
+from core.pipeline_cache import PipelineCache, pipeline_cache_key, stage_key, weather_version
+from tests_support import apartment_inputs, synthetic_inputs, typical_year_weather
+
+
+def _offline_runner(hourly, runner=pipeline.run_stage):
+    """StageRunner, který místo stahování počasí vrátí syntetická data"""
+    offline = {
+        'weather': lambda user_inputs, api_key: hourly.copy(),
+        'typical_year': lambda user_inputs, api_key: typical_year_weather(),
+    }
+
+    def run(stage, key, fn, *args):
+        return runner(stage, key, offline.get(stage, fn), *args)
+    return run
+
+
+def test_cache_key_and_lru():
+    """Klíč závisí na vstupech, počasí a kódu; LRU vytlačí nejdéle nepoužitou položku"""
+    print("\n=== Test 1: Klíč a LRU ===")
+
+    daily, hourly = synthetic_inputs(days=7)
+    inputs = apartment_inputs(daily)
+    weather = weather_version(hourly, typical_year_weather())
+    key = pipeline_cache_key(inputs, weather)
+
+    assert pipeline_cache_key(apartment_inputs(daily), weather) == key
+    assert pipeline_cache_key(apartment_inputs(daily, district="Praha 6"), weather) == key
+    assert pipeline_cache_key(apartment_inputs(daily, tuv_percentage=20.0), weather) != key
+    assert pipeline_cache_key(inputs, weather, code_ver="jiny-kod") != key
+
+    changed = hourly.copy()
+    changed.loc[5, 'temp_out_c'] += 0.1
+    assert weather_version(changed, typical_year_weather()) != weather
+    assert weather_version(hourly[['ghi_wm2', 'timestamp', 'temp_out_c']], typical_year_weather()) == weather
+
+    output = pipeline.PipelineOutput.model_validate({
+        'annual_results': {'heating_demand_kwh_per_m2_year': 80.0,
+                           'primary_energy_kwh_per_m2_year': 90.0,
+                           'energy_class': 'C', 'quality_level': 'medium'},
+        'calibrated': {'H_env_W_per_K': 100.0, 'infiltration_rate_per_h': 0.5,
+                       'C_th_J_per_K': 2e7, 'baseline_TUV_kwh_per_day': 2.0,
+                       'internal_gains_W_per_m2': 3.0, 'rmse_temperature_c': 0.2,
+                       'mape_energy_pct': 4.0},
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PipelineCache(Path(tmp), max_entries=2)
+        assert cache.get("a") is None
+        for name in ("a", "b"):
+            cache.put(name, output)
+            time.sleep(0.02)
+        assert cache.get("a").from_cache          # "a" je teď nejčerstvější
+        time.sleep(0.02)
+        cache.put("c", output)
+        assert len(cache) == 2 and cache.get("b") is None
+        assert cache.get("a") == output.model_copy(update={'from_cache': True})
+        assert cache.clear() == 2 and len(cache) == 0
+    print("✓ Stabilní klíč, LRU vytlačení")
+
+
+def test_pipeline_returns_cached_result():
+    """Druhý běh se stejnými vstupy a počasím přeskočí kalibraci i simulaci"""
+    print("\n=== Test 2: Celý výpočet s cache ===")
+
+    daily, hourly = synthetic_inputs(days=7)
+    calls = []
+
+    def counting(stage, key, fn, *args):
+        if stage == 'calibrate':
+            calls.append(1)
+        return fn(*args)
+    runner = _offline_runner(hourly, counting)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PipelineCache(Path(tmp))
+        progress = []
+
+        start = time.perf_counter()
+        first = pipeline.run_pipeline(apartment_inputs(daily), "key", cache,
+                                      progress=lambda p, text: progress.append(p),
+                                      runner=runner)
+        computed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        second = pipeline.run_pipeline(apartment_inputs(daily, district="Praha 6"), "key", cache,
+                                       runner=runner)
+        cached = time.perf_counter() - start
+
+        assert not first.from_cache and second.from_cache and len(calls) == 1
+        assert second.annual_results == first.annual_results
+        assert second.calibrated == first.calibrated
+        assert progress == sorted(progress) and progress[-1] == 100
+
+        pipeline.run_pipeline(apartment_inputs(daily, tuv_percentage=10.0), "key", cache,
+                              runner=runner)
+        assert len(calls) == 2 and len(cache) == 2
+    print(f"✓ Výpočet {computed:.2f} s, z cache {cached * 1000:.0f} ms")
+
+
+def test_stage_keys_rerun_only_affected_stages():
+    """Změna zdroje tepla přepočítá jen roční etapu, změna TUV i kalibraci"""
+    print("\n=== Test 3: Cache jednotlivých etap ===")
+
+    daily, hourly = synthetic_inputs(days=7)
+    inputs = apartment_inputs(daily)
+    heat_pump = apartment_inputs(daily, heating_system=HeatingSystemInfo(
+        system_type=HeatingSystemType.HEAT_PUMP_AIR))
+    manual_tuv = apartment_inputs(daily, tuv_percentage=15.0)
+
+    for stage in ('weather', 'typical_year', 'prepare', 'calibrate'):
+        assert stage_key(stage, heat_pump) == stage_key(stage, inputs)
+    assert stage_key('annual', heat_pump) != stage_key('annual', inputs)
+    assert stage_key('weather', manual_tuv) == stage_key('weather', inputs)
+    assert stage_key('prepare', manual_tuv) != stage_key('prepare', inputs)
+    assert stage_key('prepare', inputs, "v1") != stage_key('prepare', inputs, "v2")
+
+    memo, executed = {}, []
+
+    def memoized(stage, key, fn, *args):
+        if (stage, key) not in memo:
+            executed.append(stage)
+            memo[(stage, key)] = fn(*args)
+        return memo[(stage, key)]
+    runner = _offline_runner(hourly, memoized)
+
+    first = pipeline.run_pipeline(inputs, "key", runner=runner)
+    assert executed == ['weather', 'typical_year', 'prepare', 'calibrate', 'annual']
+
+    executed.clear()
+    second = pipeline.run_pipeline(heat_pump, "key", runner=runner)
+    assert executed == ['annual']
+    assert second.calibrated == first.calibrated
+    assert second.annual_results.primary_energy_kwh_per_m2_year < first.annual_results.primary_energy_kwh_per_m2_year
+
+    executed.clear()
+    pipeline.run_pipeline(manual_tuv, "key", runner=runner)
+    assert executed == ['prepare', 'calibrate', 'annual']
+    print("✓ Přepočítány jen etapy se změněnými vstupy")
+
+
+if __name__ == "__main__":
+    test_cache_key_and_lru()
+    test_pipeline_returns_cached_result()
+    test_stage_keys_rerun_only_affected_stages()
+    print("\n✅ Všechny testy cache výpočtů prošly")
@@ -0,0 +1,214 @@
+"""
+Test výpočetního jádra simulace (core/rc_kernel.py)
+"""
+import numpy as np
+import pandas as pd
+
+from core import rc_kernel
+from core.calibrator import CalibrationObjective, prepare_calibration_hours
+from core.rc_model import RC1Model, simulate_coarse
+from core.rc_statespace import discretize_zoh
+from tests_support import synthetic_inputs
+
+
+def _inputs(n=24 * 20, seed=0):
+    rng = np.random.default_rng(seed)
+    temp_out = rng.normal(4, 5, n)
+    q_in = rng.uniform(0, 2500, n)
+    temp_target = np.where(rng.random(n) < 0.1, np.nan, 21.0)
+    day_index = np.arange(n) // 24
+    day_index[:5] = -1
+    return temp_out, q_in, temp_target, day_index, int(day_index.max()) + 1
+
+
+def _reference_loop(model, T0, temp_out, q_heat, ghi):
+    T, out = T0, []
+    for k in range(len(temp_out)):
+        T = model.simulate_step(T, temp_out[k], q_heat[k], ghi[k])
+        out.append(T)
+    return np.array(out)
+
+
+def test_kernel_matches_simulate_step():
+    """Jádro dává stejný průběh jako krok po kroku simulate_step"""
+    print("\n=== Test 1: Shoda se simulate_step ===")
+
+    model = RC1Model(120.0, 0.5, 160.0, 1.8e7, 60.0, internal_gains_W_per_m2=3.0)
+    temp_out, q_in, _, _, _ = _inputs()
+    ghi = np.maximum(0, 300 * np.sin(np.arange(len(temp_out)) * 2 * np.pi / 24))
+
+    reference = _reference_loop(model, 20.0, temp_out, q_in, ghi)
+    vectorized = model.simulate_arrays(20.0, temp_out, q_in, ghi)
+    frame = model.simulate_hourly(20.0, pd.DataFrame({
+        'temp_out_c': temp_out, 'heating_power_W': q_in, 'ghi_wm2': ghi
+    }))
+
+    assert np.allclose(vectorized, reference, rtol=1e-12, atol=1e-9)
+    assert np.allclose(frame['T_in_simulated_c'].to_numpy(), reference, rtol=1e-12, atol=1e-9)
+    print(f"✓ {len(reference)} hodin, max. odchylka {np.abs(vectorized - reference).max():.2e} °C")
+
+
+def test_numba_and_numpy_agree():
+    """NumPy a numba verze fúzovaného jádra dávají shodné výsledky"""
+    print("\n=== Test 2: NumPy vs. numba ===")
+
+    temp_out, q_in, temp_target, day_index, n_days = _inputs()
+    alpha, beta = rc_kernel.euler_coefficients(150.0, 2e7)
+    args = (alpha, beta, 150.0, 180.0, 20.0, temp_out, q_in, temp_target, day_index, n_days)
+
+    T_end, sum_sq, n_valid, daily = rc_kernel.simulate_and_score(*args, use_numba=False)
+
+    T = rc_kernel.simulate(alpha, beta, 150.0, 180.0, 20.0, temp_out, q_in, use_numba=False)
+    sq = (T - temp_target) ** 2
+    assert np.isclose(T_end, T[-1])
+    assert np.isclose(sum_sq, np.nansum(sq)) and n_valid == np.count_nonzero(~np.isnan(sq))
+    expected_daily = np.bincount(day_index[day_index >= 0],
+                                 weights=(150.0 * np.maximum(T - temp_out, 0))[day_index >= 0])
+    assert np.allclose(daily, expected_daily)
+
+    if rc_kernel.HAVE_NUMBA:
+        jit = rc_kernel.simulate_and_score(*args, use_numba=True)
+        assert np.isclose(jit[0], T_end, rtol=1e-12)
+        assert np.isclose(jit[1], sum_sq, rtol=1e-12) and jit[2] == n_valid
+        assert np.allclose(jit[3], daily, rtol=1e-12)
+        print("✓ numba a NumPy shodné")
+    else:
+        print("✓ NumPy verze ověřena (numba není k dispozici)")
+
+
+def test_objective_matches_reference():
+    """CalibrationObjective přes jádro = původní výpočet přes simulate_step"""
+    print("\n=== Test 3: Funkce nákladů ===")
+
+    daily, hourly = synthetic_inputs(days=7)
+    hours = prepare_calibration_hours(daily, hourly, 21.0)
+    objective = CalibrationObjective(daily, hours, 150.0, 60.0)
+    params = [110.0, 0.4, np.log(2.5e7), 2.0]
+
+    model = objective.build_model(params)
+    T = _reference_loop(model, 21.0, hours['temp_out_c'].to_numpy(),
+                        hours['heating_power_W'].to_numpy(), np.zeros(len(hours)))
+    rmse = np.sqrt(np.nanmean((T - 21.0) ** 2))
+    energy = (pd.Series(model.H_total * np.maximum(T - hours['temp_out_c'].to_numpy(), 0))
+              .groupby(hours['timestamp'].dt.normalize().to_numpy()).sum().to_numpy() / 1000)
+    mape = np.mean(np.abs(daily['heating_kwh'].to_numpy() - energy) /
+                   (daily['heating_kwh'].to_numpy() + 1e-6)) * 100
+
+    assert np.allclose(objective.evaluate(params), (rmse, mape))
+    print(f"✓ RMSE {rmse:.3f} °C, MAPE {mape:.2f} %")
+
+
+def test_streaming_score_matches_fused_kernel():
+    """Průběžné skóre (po blocích i v numba) = součty ze simulate_and_score"""
+    print("\n=== Test 4: Průběžné skóre ===")
+
+    temp_out, q_in, temp_target, day_index, n_days = _inputs()
+    day_index[100:110] = -1  # hodiny bez dne uvnitř dat
+    observed = np.random.default_rng(3).uniform(5, 40, n_days)
+    observed[4] = np.nan
+    alpha, beta = rc_kernel.euler_coefficients(150.0, 2e7)
+    args = (alpha, beta, 150.0, 180.0, 20.0, temp_out, q_in, temp_target, day_index)
+
+    T_end, sum_sq, n_valid, daily = rc_kernel.simulate_and_score(*args, n_days, use_numba=False)
+    has_obs = ~np.isnan(observed)
+    pct = np.abs(observed[has_obs] - daily[has_obs] / 1000) / (observed[has_obs] + 1e-6)
+    expected = (T_end, sum_sq, n_valid, pct.sum(), len(pct))
+
+    variants = [dict(use_numba=False), dict(use_numba=False, chunk_hours=10)]
+    if rc_kernel.HAVE_NUMBA:
+        variants.append(dict(use_numba=True))
+    for options in variants:
+        result = rc_kernel.score_streaming(*args, observed, **options)
+        assert np.allclose(result[:4], expected[:4], rtol=1e-12)
+        assert result[2] == n_valid and result[4] == len(pct)
+    print(f"✓ {len(variants)} varianty shodné, {len(pct)} dní s pozorováním")
+
+
+def test_streaming_memory_is_bounded():
+    """Paměť NumPy varianty neroste s délkou dat (jen bloky CHUNK_HOURS)"""
+    print("\n=== Test 5: Paměť ===")
+    import tracemalloc
+
+    n = 24 * 365 * 4
+    rng = np.random.default_rng(4)
+    temp_out, q_in = rng.normal(4, 5, n), rng.uniform(0, 2500, n)
+    temp_target, day_index = np.full(n, 21.0), np.arange(n) // 24
+    observed = rng.uniform(5, 40, n // 24)
+    alpha, beta = rc_kernel.euler_coefficients(150.0, 2e7)
+
+    tracemalloc.start()
+    rc_kernel.score_streaming(alpha, beta, 150.0, 180.0, 20.0, temp_out, q_in,
+                              temp_target, day_index, observed, use_numba=False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Jedno hodinové pole float64 má n·8 B; blokový průchod musí být výrazně pod tím
+    assert peak < n * 8 / 2, peak
+    print(f"✓ Špička {peak / 1024:.0f} kB pro {n} hodin (vstupy {n * 8 / 1024:.0f} kB/pole)")
+
+
+def test_zoh_step_is_stable_and_exact():
+    """Krok ZOH je stabilní i pro C/H << dt a shoduje se s maticovou exponenciálou"""
+    print("\n=== Test 6: Přesná diskretizace ===")
+
+    # Časová konstanta C/H ≈ 7 min: Euler s hodinovým krokem diverguje
+    model = RC1Model(200.0, 0.5, 150.0, 1e5, 60.0)
+    alpha_euler, _ = rc_kernel.euler_coefficients(model.H_total, model.C_th)
+    assert abs(alpha_euler) > 1
+
+    temp_out = np.full(48, 0.0)
+    T = model.simulate_arrays(20.0, temp_out, np.full(48, 3000.0))
+    steady = (3000.0 + model.q_int * model.A) / model.H_total
+    assert np.all(np.isfinite(T)) and np.isclose(T[-1], steady)
+
+    A_d, B_d = discretize_zoh(*model.continuous_matrices(), 3 * 3600)
+    alpha, beta = model.step_coefficients(3 * 3600)
+    assert np.isclose(A_d[0, 0], alpha) and np.isclose(B_d[0, 1], beta)
+    assert model.step_coefficients(3 * 3600) is model.step_coefficients(3 * 3600)
+    print(f"✓ α_Euler = {alpha_euler:.1f}, ZOH konverguje k {steady:.2f} °C")
+
+
+def test_coarse_steps_track_hourly():
+    """Krok 3 h a 24 h sleduje hodinovou simulaci pomalu se měnících vstupů"""
+    print("\n=== Test 7: Hrubý krok ===")
+
+    n = 24 * 30
+    hours = np.arange(n)
+    hourly = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='h'),
+        'temp_out_c': 2 + 6 * np.sin(hours * 2 * np.pi / (24 * 10)),
+        'heating_power_W': np.full(n, 1500.0),
+    })
+    model = RC1Model(120.0, 0.5, 150.0, 3e7, 60.0)
+    hourly_T = model.simulate_hourly(20.0, hourly)['T_in_simulated_c'].to_numpy()
+
+    for step_hours in (3, 24):
+        coarse = simulate_coarse(model, 20.0, hourly, step_hours)
+        assert len(coarse) == n // step_hours
+        reference = hourly_T[step_hours - 1::step_hours]
+        error = np.abs(coarse['T_in_simulated_c'].to_numpy() - reference).max()
+        assert error < 0.5, error
+        print(f"✓ krok {step_hours} h: {len(coarse)} kroků, max. odchylka {error:.3f} °C")
+
+
+def test_benchmark_reports_ns_per_hour():
+    """Benchmark vrací ns/hodinu pro dostupné varianty"""
+    print("\n=== Test 8: Benchmark ===")
+
+    results = rc_kernel.benchmark(n_hours=24 * 30, repeat=1)
+    assert 'numpy' in results and results['numpy'] > 0
+    assert ('numba' in results) == rc_kernel.HAVE_NUMBA
+    for name, value in results.items():
+        print(f"✓ {name}: {value:.1f} ns/hodinu")
+
+
+if __name__ == "__main__":
+    test_kernel_matches_simulate_step()
+    test_numba_and_numpy_agree()
+    test_objective_matches_reference()
+    test_streaming_score_matches_fused_kernel()
+    test_streaming_memory_is_bounded()
+    test_zoh_step_is_stable_and_exact()
+    test_coarse_steps_track_hourly()
+    test_benchmark_reports_ns_per_hour()
+    print("\n✅ Všechny testy výpočetního jádra prošly")
@@ -0,0 +1,199 @@
+"""
+Test stavových RC modelů vyššího řádu (core/rc_statespace.py)
+"""
+import numpy as np
+import pandas as pd
+
+from core import rc_kernel, rc_statespace
+from core.calibrator import calibrate_model_simple
+from core.data_models import CalibratedParameters, TemperatureProfile
+from core.rc_statespace import (build_rc_model, discretize_zoh, propagate, simulate_batch,
+                                simulate_thermostat)
+from core.simulate_year import simulate_annual_heating_demand
+from tests_support import synthetic_inputs
+
+
+def _inputs(n=24 * 10, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(3, 4, n), rng.uniform(0, 3000, n)
+
+
+def test_zoh_matches_fine_integration():
+    """ZOH diskretizace = Euler s velmi jemným krokem; ustálená ztráta = H_total"""
+    print("\n=== Test 1: Diskretizace ===")
+
+    for order in ("2r2c", "3r2c"):
+        model = build_rc_model(order, 120.0, 0.5, 150.0, 2e7, 60.0, 3.0)
+        A, B = model.continuous_matrices()
+        temp_out, q_air = _inputs(n=48)
+
+        x, reference = np.full(2, 20.0), []
+        for k in range(len(temp_out)):
+            for _ in range(600):  # krok 6 s
+                x = x + (A @ x + B @ [temp_out[k], q_air[k]]) * 6.0
+            reference.append(x.copy())
+        states = model.simulate_states(20.0, temp_out, q_air)
+        assert np.allclose(states, reference, atol=1e-2)
+
+        # Ustálený stav: ztráta ven = H_total·(T_i - T_out) = dodané teplo
+        steady = np.linalg.solve(A, -B @ [0.0, 1000.0])
+        assert np.isclose(model.heat_loss_W(steady[None], np.zeros(1))[0], 1000.0)
+        assert np.isclose(steady[0] * model.H_total, 1000.0)
+        print(f"✓ {order}: max. odchylka {np.abs(states - reference).max():.1e} °C")
+
+    # 1R1C ve stavovém tvaru: ZOH = exp(-dt·H/C)
+    rc1 = build_rc_model("1r1c", 120.0, 0.5, 150.0, 2e7, 60.0)
+    A_d, _ = discretize_zoh(*rc1.continuous_matrices())
+    assert np.isclose(A_d[0, 0], np.exp(-3600 * rc1.H_total / rc1.C_th))
+
+    # Základní třída je abstraktní
+    try:
+        rc_statespace.StateSpaceRCModel(120.0, 0.5, 150.0, 2e7, 60.0)
+    except TypeError:
+        print("✓ StateSpaceRCModel bez matic nejde instancovat")
+    else:
+        raise AssertionError("StateSpaceRCModel musí být abstraktní")
+
+
+def test_batch_engine_variants_agree():
+    """Dávka = jednotlivé simulace; numba a modální NumPy verze shodné"""
+    print("\n=== Test 2: Dávkové jádro ===")
+
+    temp_out, q_air = _inputs()
+    models = [build_rc_model("3r2c", H, 0.4, 150.0, C, 60.0, window_fraction=w)
+              for H, C, w in [(80.0, 1e7, 0.1), (150.0, 3e7, 0.3), (300.0, 5e6, 0.0)]]
+
+    batch = simulate_batch(models, 20.0, temp_out, q_air)
+    for b, model in enumerate(models):
+        assert np.allclose(batch[b], model.simulate_states(20.0, temp_out, q_air))
+
+    A_d = np.stack([m.discrete_matrices()[0] for m in models])
+    B_d = np.stack([m.discrete_matrices()[1] for m in models])
+    x0 = np.full((3, 2), 20.0)
+    inputs = np.column_stack([temp_out, q_air])
+    modal = propagate(A_d, B_d, x0, inputs, use_numba=False)
+    loop = rc_statespace._propagate_loop(A_d, np.einsum('bnm,tm->btn', B_d, inputs), x0)
+    assert np.allclose(modal, loop, rtol=1e-10)
+    if rc_kernel.HAVE_NUMBA:
+        assert np.allclose(propagate(A_d, B_d, x0, inputs, use_numba=True), loop, rtol=1e-12)
+
+    # Bez oken je 3R2C totožný s 2R2C
+    rc2 = build_rc_model("2r2c", 300.0, 0.4, 150.0, 5e6, 60.0)
+    assert np.allclose(batch[2], rc2.simulate_states(20.0, temp_out, q_air))
+    print(f"✓ {len(models)} modely v dávce, {batch.shape[1]} hodin")
+
+
+def test_calibration_and_annual_with_2r2c():
+    """Kalibrace i roční simulace přijímají model 2R2C"""
+    print("\n=== Test 3: Kalibrace 2R2C ===")
+
+    daily, hourly = synthetic_inputs(days=10)
+    calibrated = calibrate_model_simple(daily, hourly, 150.0, 60.0, 21.0, 0.0,
+                                        mode="standard", model_order="2r2c")
+
+    assert calibrated.model_order.value == "2r2c"
+    assert 0.01 <= calibrated.air_capacity_fraction <= 0.5
+    assert 0.05 <= calibrated.envelope_split <= 0.95
+    assert calibrated.window_fraction is None
+    assert calibrated.mape_energy_pct < 20
+
+    year = pd.DataFrame({
+        'timestamp': pd.date_range('2023-01-01', periods=24 * 365, freq='h'),
+        'temp_out_c': 8 - 10 * np.cos(np.arange(24 * 365) * 2 * np.pi / (24 * 365)),
+    })
+    annual = simulate_annual_heating_demand(calibrated, year, 150.0, 60.0, TemperatureProfile())
+    assert annual['heating_demand_W'].sum() > 0
+    print(f"✓ MAPE {calibrated.mape_energy_pct:.1f} %, "
+          f"roční potřeba {annual['heating_demand_W'].sum() / 1000:.0f} kWh")
+
+
+def _year(n=24 * 365):
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2023-01-01', periods=n, freq='h'),
+        'temp_out_c': 8 - 10 * np.cos(np.arange(n) * 2 * np.pi / (24 * 365)),
+    })
+
+
+def test_thermostat_matches_steady_state_and_variants():
+    """Termostat: konstantní požadavek = ustálený stav, numba = NumPy, limit výkonu"""
+    print("\n=== Test 4: Termostat ===")
+
+    n = 24 * 20
+    temp_out = np.full(n, -5.0)
+    setpoint = np.full(n, 21.0)
+    for order in ("1r1c", "2r2c", "3r2c"):
+        model = build_rc_model(order, 120.0, 0.5, 150.0, 2e7, 60.0)
+        q_free = np.full(n, model.q_int * model.A)
+        T, Q = simulate_thermostat(model, 21.0, temp_out, q_free, setpoint)
+        steady = model.estimate_heating_demand(21.0, -5.0)
+        assert np.allclose(T, 21.0) and np.isclose(Q[-1], steady, rtol=1e-3)
+
+        # Sekvenční NumPy záloha a numba dávají totéž
+        models = [model, build_rc_model(order, 200.0, 0.3, 150.0, 5e6, 60.0)]
+        setback = np.where(np.arange(n) % 24 < 6, 17.0, 21.0)
+        reference = simulate_thermostat(models, 20.0, temp_out, q_free, setback, use_numba=False)
+        if rc_kernel.HAVE_NUMBA:
+            jit = simulate_thermostat(models, 20.0, temp_out, q_free, setback, use_numba=True)
+            assert np.allclose(jit[0], reference[0]) and np.allclose(jit[1], reference[1])
+        assert np.allclose(reference[1][0], simulate_thermostat(model, 20.0, temp_out, q_free, setback)[1])
+
+        # Omezený výkon: topí naplno a teplota nedosáhne požadavku
+        T_lim, Q_lim = simulate_thermostat(model, 21.0, temp_out, q_free, setpoint,
+                                           heater_power_W=0.5 * steady)
+        assert Q_lim.max() <= 0.5 * steady + 1e-9 and T_lim[-1] < 20.0
+        print(f"✓ {order}: ustálený výkon {Q[-1]:.0f} W, s limitem T_in → {T_lim[-1]:.1f} °C")
+
+
+def test_dynamic_annual_night_setback():
+    """Dynamická roční simulace: bez útlumu ≈ ustálený stav, noční útlum šetří"""
+    print("\n=== Test 5: Roční simulace s útlumem ===")
+
+    params = CalibratedParameters(
+        H_env_W_per_K=120.0, infiltration_rate_per_h=0.5, C_th_J_per_K=3e7,
+        baseline_TUV_kwh_per_day=0.0, internal_gains_W_per_m2=3.0,
+        rmse_temperature_c=0.0, mape_energy_pct=0.0, model_order="2r2c"
+    )
+    year = _year()
+    constant = TemperatureProfile(day_temp_c=21.0, night_temp_c=21.0)
+    setback = TemperatureProfile(day_temp_c=21.0, night_temp_c=17.0)
+
+    totals = {}
+    for name, profile, method in (("steady", constant, "steady"), ("dynamic", constant, "dynamic"),
+                                  ("setback_steady", setback, "steady"),
+                                  ("setback", setback, "dynamic")):
+        annual = simulate_annual_heating_demand(params, year, 150.0, 60.0, profile, method=method)
+        totals[name] = annual['heating_demand_W'].sum() / 1000
+
+    # Letní hodiny s přebytkem zisků: dynamika využije akumulaci, ustálený stav ne
+    assert totals["dynamic"] <= totals["steady"] * 1.01
+    assert totals["setback"] < totals["dynamic"]
+    # Ustálený výpočet útlum přeceňuje (budova nestihne vychladnout)
+    assert totals["setback_steady"] < totals["setback"]
+    print(f"✓ bez útlumu {totals['dynamic']:.0f} kWh (ustálený {totals['steady']:.0f}), "
+          f"s útlumem {totals['setback']:.0f} kWh (ustálený {totals['setback_steady']:.0f})")
+
+
+def test_benchmark_per_order():
+    """Benchmark vrací ns/hodinu pro každý řád modelu a µs na rok s termostatem"""
+    print("\n=== Test 6: Benchmark ===")
+
+    results = rc_statespace.benchmark(n_hours=24 * 30, repeat=1)
+    assert set(results) == {"1r1c", "2r2c", "3r2c"}
+    for order, value in results.items():
+        assert value > 0
+        print(f"✓ {order}: {value:.1f} ns/hodinu")
+
+    for order, value in rc_statespace.benchmark_thermostat(repeat=3).items():
+        if rc_kernel.HAVE_NUMBA:
+            assert value < 2000, value  # celý rok pod ~1 ms na byt
+        print(f"✓ {order}: {value:.0f} µs/rok s termostatem")
+
+
+if __name__ == "__main__":
+    test_zoh_matches_fine_integration()
+    test_batch_engine_variants_agree()
+    test_calibration_and_annual_with_2r2c()
+    test_thermostat_matches_steady_state_and_variants()
+    test_dynamic_annual_night_setback()
+    test_benchmark_per_order()
+    print("\n✅ Všechny testy stavových RC modelů prošly")
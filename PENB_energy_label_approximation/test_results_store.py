@@ -0,0 +1,122 @@
+"""
+Test sloupcového úložiště výsledků (core/results_store.py)
+"""
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.data_models import (
+    AnnualResults, ApartmentGeometry, DailyEnergyData,
+    EnergyClass, HeatingSystemInfo, HeatingSystemType, QualityLevel, UserInputs
+)
+from core.results_store import RESULT_COLUMNS, ResultsStore, result_record
+from tests_support import sample_parameters
+
+
+def _inputs(apartment_id="byt 1", district="Praha 6"):
+    return UserInputs(
+        apartment_id=apartment_id,
+        district=district,
+        geometry=ApartmentGeometry(area_m2=60.0, height_m=2.7),
+        heating_system=HeatingSystemInfo(system_type=HeatingSystemType.CONDENSING_BOILER),
+        location="Praha",
+        daily_energy=[DailyEnergyData(date=date(2024, 1, 1) + timedelta(days=k),
+                                      energy_total_kwh=30.0) for k in range(7)]
+    )
+
+
+def _annual(heating, when, probabilities=None):
+    return AnnualResults(
+        heating_demand_kwh_per_m2_year=heating,
+        primary_energy_kwh_per_m2_year=heating * 1.1,
+        energy_class=EnergyClass.D,
+        quality_level=QualityLevel.MEDIUM,
+        heating_demand_lower_bound=heating * 0.9,
+        heating_demand_upper_bound=heating * 1.1,
+        energy_class_probabilities=probabilities,
+        computation_date=when
+    )
+
+
+def test_append_and_read_partitions():
+    """Záznam výpočtu se zapíše do partice podle data a čte se po sloupcích"""
+    print("\n=== Test 1: Zápis a čtení ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(Path(tmp))
+        assert store.read().empty
+        empty = store.demand_percentiles()
+        assert empty.empty and list(empty.columns) == ['count', 'p10', 'p50', 'p90']
+
+        first = result_record(_annual(120.0, datetime(2024, 3, 1, 10)), sample_parameters(), _inputs())
+        second = result_record(_annual(110.0, datetime(2024, 4, 1, 10), {'C': 0.25, 'D': 0.75}),
+                               sample_parameters(130.0), _inputs())
+        store.append(first)
+        store.append([second])
+        assert sorted(p.name for p in Path(tmp).iterdir()) == [
+            'run_date=2024-03-01', 'run_date=2024-04-01'
+        ]
+
+        df = store.read()
+        assert list(df.columns) == RESULT_COLUMNS + ['run_date'] and len(df) == 2
+        row = df.sort_values('computation_date').iloc[1]
+        assert row['H_env_W_per_K'] == 130.0 and row['class_probability_D'] == 0.75
+        assert row['class_probability_A'] == 0.0
+        assert np.isnan(df.sort_values('computation_date').iloc[0]['class_probability_A'])
+
+        april = store.read(columns=['heating_demand_kwh_per_m2_year'], start_date=date(2024, 3, 15))
+        assert list(april.columns) == ['heating_demand_kwh_per_m2_year']
+        assert april.iloc[0, 0] == 110.0
+
+        latest = store.read(columns=['heating_demand_kwh_per_m2_year'], latest_only=True)
+        assert latest['heating_demand_kwh_per_m2_year'].tolist() == [110.0]
+    print("✓ Partice podle data, projekce sloupců, poslední výpočet bytu")
+
+
+def test_portfolio_queries():
+    """Rozdělení tříd a percentily potřeby po městských částech"""
+    print("\n=== Test 2: Dotazy nad portfoliem ===")
+
+    rng = np.random.default_rng(0)
+    n = 3000
+    portfolio = pd.DataFrame({
+        'apartment_id': [f"byt {k}" for k in range(n)],
+        'district': rng.choice(['Praha 2', 'Praha 6', None], n),
+        'heating_demand_kwh_per_m2_year': rng.uniform(20, 250, n),
+        'energy_class': rng.choice(list("ABCDEFG"), n),
+        'computation_date': pd.Timestamp('2024-05-01') + pd.to_timedelta(rng.integers(0, 3, n), 'D'),
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(Path(tmp))
+        for start in range(0, n, 1000):
+            store.append(portfolio.iloc[start:start + 1000])
+
+        shares = store.class_distribution()
+        assert np.allclose(shares.sum(axis=1), 1.0) and list(shares.columns) == list("ABCDEFG")
+        counts = store.class_distribution(normalize=False, filters={'district': 'Praha 2'})
+        expected = portfolio.loc[portfolio['district'] == 'Praha 2', 'energy_class'].value_counts()
+        assert counts.loc['Praha 2'].to_dict() == expected.reindex(list("ABCDEFG"), fill_value=0).to_dict()
+
+        percentiles = store.demand_percentiles()
+        no_match = store.demand_percentiles(filters={'district': 'Z'})
+        assert no_match.empty and list(no_match.columns) == list(percentiles.columns)
+        assert store.class_distribution(filters={'district': 'Z'}).empty
+        assert set(percentiles.index) == {'Praha 2', 'Praha 6', '(neuvedeno)'}
+        assert percentiles['count'].sum() == n
+        praha6 = portfolio.loc[portfolio['district'] == 'Praha 6', 'heating_demand_kwh_per_m2_year']
+        assert np.isclose(percentiles.loc['Praha 6', 'p50'], praha6.median())
+
+        one_day = store.demand_percentiles(by=None, start_date=date(2024, 5, 2), end_date=date(2024, 5, 2))
+        assert one_day['count'].iloc[0] == (portfolio['computation_date'].dt.day == 2).sum()
+    print(f"✓ {n} bytů: třídy a percentily podle částí")
+    print(percentiles.round(1))
+
+
+if __name__ == "__main__":
+    test_append_and_read_partitions()
+    test_portfolio_queries()
+    print("\n✅ Všechny testy úložiště výsledků prošly")
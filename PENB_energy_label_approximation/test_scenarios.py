@@ -0,0 +1,83 @@
+"""
+Test dávkové simulace variant (core/scenarios.py)
+"""
+import numpy as np
+import pandas as pd
+
+from core.data_models import (CalibratedParameters, HeatingSystemInfo, HeatingSystemType,
+                              Scenario, TemperatureProfile)
+from core.scenarios import SCENARIO_COLUMNS, simulate_scenarios
+from core.simulate_year import calculate_primary_energy, simulate_annual_heating_demand
+
+
+def _setup(model_order="1r1c"):
+    n = 24 * 365
+    year = pd.DataFrame({
+        'timestamp': pd.date_range('2023-01-01', periods=n, freq='h'),
+        'temp_out_c': 8 - 10 * np.cos(np.arange(n) * 2 * np.pi / n),
+        'ghi_wm2': np.maximum(0, 400 * np.sin((np.arange(n) % 24 - 6) * np.pi / 12)),
+    })
+    params = CalibratedParameters(
+        H_env_W_per_K=110.0, infiltration_rate_per_h=0.5, C_th_J_per_K=2.5e7,
+        baseline_TUV_kwh_per_day=0.0, internal_gains_W_per_m2=3.0,
+        rmse_temperature_c=0.2, mape_energy_pct=5.0, model_order=model_order
+    )
+    gas = HeatingSystemInfo(system_type=HeatingSystemType.CONDENSING_BOILER, efficiency_or_cop=0.9)
+    return year, params, gas
+
+
+def test_reference_scenario_matches_annual_simulation():
+    """Výchozí varianta = simulate_annual_heating_demand + calculate_primary_energy"""
+    print("\n=== Test 1: Výchozí varianta ===")
+
+    year, params, gas = _setup()
+    profile = TemperatureProfile()
+    results = simulate_scenarios(params, [Scenario(name="výchozí")], year, 150.0, 60.0, profile, gas)
+
+    annual = simulate_annual_heating_demand(params, year, 150.0, 60.0, profile)
+    heating_kwh = annual['heating_demand_W'].sum() / 1000
+    row = results.iloc[0]
+
+    assert list(results.columns) == SCENARIO_COLUMNS
+    assert np.isclose(row['heating_kwh'], heating_kwh)
+    assert np.isclose(row['primary_kwh'], calculate_primary_energy(heating_kwh, "condensing_boiler", 0.9))
+    assert row['heating_change_pct'] == 0.0 and row['unmet_hours'] == 0
+    print(f"✓ {heating_kwh:.0f} kWh/rok, třída {row['energy_class']}")
+
+
+def test_what_if_scenarios_in_one_batch():
+    """Varianty v jedné dávce = každá zvlášť; směr změn odpovídá fyzice"""
+    print("\n=== Test 2: Varianty ===")
+
+    year, params, gas = _setup("2r2c")
+    profile = TemperatureProfile()
+    heat_pump = HeatingSystemInfo(system_type=HeatingSystemType.HEAT_PUMP_AIR, efficiency_or_cop=3.2)
+    scenarios = [
+        Scenario(name="výchozí"),
+        Scenario(name="-1 °C", setpoint_delta_c=-1.0),
+        Scenario(name="poloviční infiltrace", infiltration_factor=0.5),
+        Scenario(name="tepelné čerpadlo", heating_system=heat_pump),
+        Scenario(name="slabý zdroj", heater_power_W=1000.0),
+    ]
+    results = simulate_scenarios(params, scenarios, year, 150.0, 60.0, profile, gas).set_index('scenario')
+
+    for scenario in scenarios:
+        single = simulate_scenarios(params, [scenario], year, 150.0, 60.0, profile, gas).iloc[0]
+        assert np.isclose(results.loc[scenario.name, 'heating_kwh'], single['heating_kwh'])
+
+    base = results.loc["výchozí"]
+    assert results.loc["-1 °C", 'heating_kwh'] < base['heating_kwh']
+    assert results.loc["poloviční infiltrace", 'heating_kwh'] < base['heating_kwh']
+    assert np.isclose(results.loc["tepelné čerpadlo", 'heating_kwh'], base['heating_kwh'])
+    assert results.loc["tepelné čerpadlo", 'primary_kwh'] < base['primary_kwh']
+    assert results.loc["slabý zdroj", 'unmet_hours'] > 0
+    assert (results['heating_change_pct'].drop(["výchozí", "tepelné čerpadlo"]) < 0).all()
+    for name, row in results.iterrows():
+        print(f"✓ {name}: {row['heating_kwh']:.0f} kWh ({row['heating_change_pct']:+.1f} %), "
+              f"primární {row['primary_kwh']:.0f} kWh, třída {row['energy_class']}")
+
+
+if __name__ == "__main__":
+    test_reference_scenario_matches_annual_simulation()
+    test_what_if_scenarios_in_one_batch()
+    print("\n✅ Všechny testy variant prošly")
@@ -0,0 +1,96 @@
+"""
+Test globální citlivostní analýzy (core/sensitivity.py)
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.data_models import CalibratedParameters, TemperatureProfile
+from core.sensitivity import (AnnualLabelModel, morris_design, morris_screening,
+                              sobol_indices)
+from core.simulate_year import simulate_annual_heating_demand
+
+
+class _LinearModel:
+    """y = Σ a_i·x_i - analytické indexy S1 = ST = a_i² / Σ a_j²"""
+
+    def __init__(self, coefficients):
+        self.coefficients = np.asarray(coefficients, dtype=float)
+
+    def evaluate(self, X, names):
+        y = X @ self.coefficients
+        return {'heating_kwh_per_m2': y, 'primary_kwh_per_m2': 2 * y}
+
+
+def _label_model():
+    n = 24 * 365
+    year = pd.DataFrame({
+        'timestamp': pd.date_range('2023-01-01', periods=n, freq='h'),
+        'temp_out_c': 8 - 10 * np.cos(np.arange(n) * 2 * np.pi / n),
+    })
+    params = CalibratedParameters(
+        H_env_W_per_K=110.0, infiltration_rate_per_h=0.5, C_th_J_per_K=2.5e7,
+        baseline_TUV_kwh_per_day=0.0, internal_gains_W_per_m2=3.0,
+        rmse_temperature_c=0.2, mape_energy_pct=5.0
+    )
+    model = AnnualLabelModel(params, year, 60.0, 2.5, TemperatureProfile(),
+                             "heat_pump_air", 3.0)
+    return model, params, year
+
+
+def test_estimators_on_linear_function():
+    """Saltelli/Jansen a Morris na lineární funkci dají analytické hodnoty"""
+    print("\n=== Test 1: Analytická funkce ===")
+
+    coefficients = [4.0, 2.0, 1.0, 0.0]
+    factors = {f"x{i}": (0.0, 1.0) for i in range(4)}
+    expected = np.square(coefficients) / np.square(coefficients).sum()
+
+    indices = sobol_indices(_LinearModel(coefficients), factors, n_base=1024)
+    heating = indices[indices['output'] == 'heating_kwh_per_m2']
+    assert np.allclose(heating['S1'], expected, atol=0.05)
+    assert np.allclose(heating['ST'], expected, atol=0.05)
+
+    unit, orders, delta = morris_design(5, 4, levels=4)
+    steps = np.diff(unit.reshape(5, 5, 4), axis=1)
+    assert np.all((np.abs(steps) > 0).sum(axis=2) == 1) and np.allclose(steps.sum(axis=2), delta)
+    assert unit.min() >= 0 and unit.max() <= 1 + 1e-12
+
+    morris = morris_screening(_LinearModel(coefficients), factors, n_trajectories=5)
+    effects = morris[morris['output'] == 'heating_kwh_per_m2']
+    assert np.allclose(effects['mu_star'], coefficients) and np.allclose(effects['sigma'], 0)
+    print(f"✓ S1 = {np.round(heating['S1'].to_numpy(), 3)}, očekáváno {np.round(expected, 3)}")
+
+
+def test_annual_label_sensitivity():
+    """Roční simulace: nominál = simulate_annual_heating_demand; COP ovlivní jen primární energii"""
+    print("\n=== Test 2: Citlivost štítku ===")
+
+    model, params, year = _label_model()
+    nominal = model.evaluate(np.array([[60.0]]), ['area_m2'])['heating_kwh_per_m2'][0]
+    annual = simulate_annual_heating_demand(params, year, 150.0, 60.0, TemperatureProfile())
+    assert np.isclose(nominal, annual['heating_demand_W'].sum() / 1000 / 60.0)
+
+    start = time.perf_counter()
+    morris = morris_screening(model, n_trajectories=6).set_index(['output', 'factor'])
+    morris_time = time.perf_counter() - start
+    start = time.perf_counter()
+    sobol = sobol_indices(model, n_base=16).set_index(['output', 'factor'])
+    sobol_time = time.perf_counter() - start
+
+    heating, primary = 'heating_kwh_per_m2', 'primary_kwh_per_m2'
+    assert morris.loc[(heating, 'efficiency_or_cop'), 'mu_star'] == 0
+    assert morris.loc[(primary, 'efficiency_or_cop'), 'mu_star'] > 0
+    assert morris.loc[(heating, 'day_temp_c'), 'mu'] > 0
+    assert morris.loc[(heating, 'H_env_W_per_K'), 'mu'] > 0
+    assert sobol.loc[(heating, 'efficiency_or_cop'), 'ST'] == 0
+    ranking = sobol.loc[primary, 'ST'].sort_values(ascending=False)
+    print(f"✓ Morris {morris_time * 1000:.0f} ms, Sobol {sobol_time * 1000:.0f} ms; "
+          f"nejvlivnější (ST): {', '.join(ranking.index[:3])}")
+
+
+if __name__ == "__main__":
+    test_estimators_on_linear_function()
+    test_annual_label_sensitivity()
+    print("\n✅ Všechny testy citlivostní analýzy prošly")
@@ -0,0 +1,101 @@
+"""
+Test Monte Carlo šíření nejistoty (core/uncertainty.py)
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from core import rc_kernel
+from core.calibrator import calibrate_model_simple, parameters_to_vector
+from core.data_models import TemperatureProfile
+from core.simulate_year import simulate_annual_heating_demand
+from core.uncertainty import monte_carlo_annual, sample_parameter_vectors
+from tests_support import synthetic_inputs
+
+
+def _year(n=24 * 365):
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2023-01-01', periods=n, freq='h'),
+        'temp_out_c': 8 - 10 * np.cos(np.arange(n) * 2 * np.pi / n),
+    })
+
+
+def _calibrated():
+    daily, hourly = synthetic_inputs(days=14)
+    return calibrate_model_simple(daily, hourly, 150.0, 60.0, 21.0, 0.0, mode="standard")
+
+
+def test_calibration_stores_covariance():
+    """Kalibrace uloží regulární kovarianci; H_env a infiltrace jsou antikorelované"""
+    print("\n=== Test 1: Kovariance z kalibrace ===")
+
+    calibrated = _calibrated()
+    covariance = np.asarray(calibrated.parameter_covariance)
+    p = len(parameters_to_vector(calibrated))
+
+    assert covariance.shape == (p, p)
+    assert np.allclose(covariance, covariance.T)
+    assert np.all(np.linalg.eigvalsh(covariance) > 0)
+
+    # Data určují H_total = H_env + H_vent(n), ne jeho rozdělení
+    corr = covariance[0, 1] / np.sqrt(covariance[0, 0] * covariance[1, 1])
+    assert corr < -0.5, corr
+    print(f"✓ σ(H_env) = {np.sqrt(covariance[0, 0]):.1f} W/K, korelace H_env–n = {corr:.2f}")
+
+
+def test_monte_carlo_quantiles_and_classes():
+    """1000 vzorků pod sekundu; kvantily kolem nominálu, pravděpodobnosti tříd"""
+    print("\n=== Test 2: Monte Carlo ===")
+
+    calibrated = _calibrated()
+    year, profile = _year(), TemperatureProfile()
+    nominal = simulate_annual_heating_demand(calibrated, year, 150.0, 60.0, profile)
+    nominal_per_m2 = nominal['heating_demand_W'].sum() / 1000 / 60.0
+
+    monte_carlo_annual(calibrated, year, 150.0, 60.0, profile, n_samples=10)  # kompilace
+    start = time.perf_counter()
+    result = monte_carlo_annual(calibrated, year, 150.0, 60.0, profile, n_samples=1000,
+                                system_type="condensing_boiler", efficiency_or_cop=0.9)
+    elapsed = time.perf_counter() - start
+
+    q = result.quantiles()
+    assert result.n_samples == 1000 and q[0.05] < q[0.5] < q[0.95]
+    assert q[0.05] < nominal_per_m2 < q[0.95]
+    assert abs(q[0.5] / nominal_per_m2 - 1) < 0.05
+    probabilities = result.class_probabilities()
+    assert np.isclose(sum(probabilities.values()), 1.0)
+    if rc_kernel.HAVE_NUMBA:
+        assert elapsed < 1.0, elapsed
+    print(f"✓ {elapsed * 1000:.0f} ms, 5–95 %: {q[0.05]:.1f}–{q[0.95]:.1f} "
+          f"(nominál {nominal_per_m2:.1f}) kWh/(m²·rok), třídy {probabilities}")
+
+
+def test_degenerate_covariance_reproduces_nominal():
+    """Nulová nejistota: všechny vzorky = nominální roční simulace"""
+    print("\n=== Test 3: Nulová nejistota ===")
+
+    calibrated = _calibrated()
+    p = len(parameters_to_vector(calibrated))
+    certain = calibrated.model_copy(update={'parameter_covariance': (np.eye(p) * 1e-14).tolist()})
+    year, profile = _year(), TemperatureProfile()
+
+    result = monte_carlo_annual(certain, year, 150.0, 60.0, profile, n_samples=20)
+    nominal = simulate_annual_heating_demand(certain, year, 150.0, 60.0, profile)
+    assert np.allclose(result.heating_kwh_per_m2, nominal['heating_demand_W'].sum() / 1000 / 60.0,
+                       rtol=1e-5)
+    assert len(result.class_probabilities()) == 1
+
+    try:
+        sample_parameter_vectors(calibrated.model_copy(update={'parameter_covariance': None}))
+        assert False, "chybějící kovariance musí selhat"
+    except ValueError:
+        pass
+    print("✓ Shoda s nominální simulací")
+
+
+if __name__ == "__main__":
+    test_calibration_stores_covariance()
+    test_monte_carlo_quantiles_and_classes()
+    test_degenerate_covariance_reproduces_nominal()
+    print("\n✅ Všechny testy Monte Carlo nejistoty prošly")
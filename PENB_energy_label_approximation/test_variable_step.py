@@ -0,0 +1,109 @@
+"""
+Test simulace s jemným a proměnným časovým krokem
+"""
+import numpy as np
+import pandas as pd
+
+from core import rc_kernel
+from core.calibrator import CalibrationObjective, prepare_calibration_hours
+from core.preprocess import clean_weather_data
+from core.rc_model import RC1Model
+from core.rc_statespace import build_rc_model
+from tests_support import synthetic_inputs
+
+
+def test_linear_recurrence_variants():
+    """Bloková NumPy rekurence = přímá smyčka (i pro téměř nulový útlum)"""
+    print("\n=== Test 1: Lineární rekurence ===")
+
+    rng = np.random.default_rng(0)
+    b = rng.normal(0, 1, 3000)
+    for a in (np.exp(-rng.uniform(1e-3, 5, 3000)),   # běžné kroky
+              np.exp(-rng.uniform(100, 900, 3000))):  # útlum až pod rozsah float64
+        expected, z = np.empty_like(b), 3.0
+        for k in range(len(b)):
+            z = a[k] * z + b[k]
+            expected[k] = z
+        assert np.allclose(rc_kernel.linear_recurrence(a, b, 3.0, use_numba=False), expected,
+                           rtol=1e-10, atol=1e-12)
+        if rc_kernel.HAVE_NUMBA:
+            assert np.allclose(rc_kernel.linear_recurrence(a, b, 3.0, use_numba=True), expected)
+    print("✓ Shoda s přímou smyčkou")
+
+
+def test_variable_steps_match_sequential():
+    """Nepravidelné kroky = krok po kroku; 15 min se stejnými vstupy = hodinová simulace"""
+    print("\n=== Test 2: Proměnný krok ===")
+
+    rng = np.random.default_rng(1)
+    n = 24 * 4
+    temp_out, q_heat = rng.normal(3, 4, n), rng.uniform(0, 3000, n)
+    dt = rng.choice([600.0, 900.0, 1800.0, 3600.0], n)
+
+    model = RC1Model(120.0, 0.5, 150.0, 2e7, 60.0)
+    T, expected = 20.0, []
+    for k in range(n):
+        T = model.simulate_step(T, temp_out[k], q_heat[k], 0.0, dt_seconds=dt[k])
+        expected.append(T)
+    assert np.allclose(model.simulate_arrays(20.0, temp_out, q_heat, dt_seconds=dt), expected)
+
+    for order in ("1r1c", "2r2c", "3r2c"):
+        model = build_rc_model(order, 120.0, 0.5, 150.0, 2e7, 60.0)
+        hourly = model.simulate_arrays(20.0, temp_out, q_heat)
+        quarter = model.simulate_arrays(20.0, np.repeat(temp_out, 4), np.repeat(q_heat, 4),
+                                        dt_seconds=np.full(4 * n, 900.0))
+        assert np.allclose(quarter[3::4], hourly, atol=1e-9)
+    print(f"✓ {n} nepravidelných kroků, 15min = hodinové pro všechny řády")
+
+
+def test_clean_weather_keeps_native_resolution():
+    """clean_weather_data(freq=None) zachová 10min mřížku a mezery posuzuje v čase"""
+    print("\n=== Test 3: Čištění 10min dat ===")
+
+    timestamps = pd.date_range('2024-01-01', periods=6 * 24 * 2, freq='10min')
+    df = pd.DataFrame({'timestamp': timestamps, 'temp_out_c': np.linspace(0, 10, len(timestamps))})
+    short_gap = df.index[30:36]      # 1 h - interpoluje se
+    long_gap = df.index[100:130]     # 5 h - vypustí se
+    df = df.drop(index=short_gap.append(long_gap))
+
+    cleaned = clean_weather_data(df, freq=None)
+    steps = cleaned['timestamp'].diff().dropna()
+    assert steps.min() == pd.Timedelta(minutes=10)
+    assert len(cleaned) == len(timestamps) - len(long_gap)
+    assert np.allclose(cleaned['temp_out_c'].iloc[30:36],
+                       np.linspace(0, 10, len(timestamps))[30:36])
+
+    hourly = clean_weather_data(df)
+    assert (hourly['timestamp'].diff().dropna() >= pd.Timedelta(hours=1)).all()
+    print(f"✓ {len(cleaned)} záznamů po 10 min (hodinová mřížka: {len(hourly)})")
+
+
+def test_quarter_hour_calibration_objective():
+    """Funkce nákladů na 15min datech ≈ na hodinových (stejné vstupy)"""
+    print("\n=== Test 4: Kalibrace z 15min dat ===")
+
+    daily, hourly = synthetic_inputs(days=7)
+    quarter = pd.DataFrame({
+        'timestamp': pd.date_range(hourly['timestamp'].iloc[0], periods=4 * len(hourly), freq='15min'),
+        'temp_out_c': np.repeat(hourly['temp_out_c'].to_numpy(), 4),
+    })
+    params = [110.0, 0.4, np.log(2.5e7), 2.0]
+
+    results = {}
+    for name, weather in (('hourly', hourly[['timestamp', 'temp_out_c']]), ('quarter', quarter)):
+        hours = prepare_calibration_hours(daily, weather, 21.0)
+        objective = CalibrationObjective(daily, hours, 150.0, 60.0)
+        # Stejná energie, jen jemněji rozložená
+        assert np.isclose(hours['heating_energy_kwh'].sum(), daily['heating_kwh'].sum())
+        results[name] = objective.evaluate(params)
+
+    assert np.allclose(results['quarter'], results['hourly'], rtol=0.05)
+    print(f"✓ hodinová {results['hourly'][1]:.2f} %, 15min {results['quarter'][1]:.2f} % MAPE")
+
+
+if __name__ == "__main__":
+    test_linear_recurrence_variants()
+    test_variable_steps_match_sequential()
+    test_clean_weather_keeps_native_resolution()
+    test_quarter_hour_calibration_objective()
+    print("\n✅ Všechny testy proměnného kroku prošly")
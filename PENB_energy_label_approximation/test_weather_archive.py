@@ -0,0 +1,161 @@
+"""
+Test paměťově mapovaného archivu počasí (core/weather_archive.py)
+"""
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from core.weather_archive import WeatherArchive
+from core.weather_schema import make_weather_frame
+
+
+def _weather(start, days, offset=0.0):
+    timestamps = pd.date_range(start, periods=days * 24, freq='h')
+    return make_weather_frame(
+        timestamps,
+        offset + np.arange(days * 24, dtype=float),
+        ghi_wm2=np.zeros(days * 24),
+        source='Open-Meteo'
+    )
+
+
+def _worker_mean_temp(args):
+    """Worker: otevře archiv a vrátí průměrnou teplotu výřezu"""
+    archive, lat, lon = args
+    df = archive.slice(lat, lon, date(2024, 1, 2), date(2024, 1, 3))
+    return float(df['temp_out_c'].mean()), len(df)
+
+
+def test_write_and_slice_view():
+    """Výřez je pohled do memmapy, ne kopie"""
+    print("\n=== Test 1: Zápis a výřez ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = WeatherArchive(tmp)
+        archive.write(50.0755, 14.4378, _weather('2024-01-01', 5))
+
+        cell = archive.open(50.08, 14.44)
+        assert cell is not None
+        assert cell.n_hours == 120
+
+        df = archive.slice(50.0755, 14.4378, date(2024, 1, 2), date(2024, 1, 3))
+        assert len(df) == 48
+        assert df['timestamp'].iloc[0] == pd.Timestamp('2024-01-02')
+        assert df['temp_out_c'].iloc[0] == 24.0
+        assert np.shares_memory(df['temp_out_c'].to_numpy(), cell.data)
+        assert not cell.data.flags.writeable
+
+        print(f"✓ Buňka {archive.cell_key(50.0755, 14.4378)}: {cell.n_hours} hodin")
+        print(f"✓ Výřez {len(df)} hodin sdílí paměť s memmapou")
+
+
+def test_merge_extends_cell():
+    """Nová data rozšíří buňku, mezera zůstane NaN"""
+    print("\n=== Test 2: Sloučení ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = WeatherArchive(tmp)
+        archive.write(50.0, 14.0, _weather('2024-01-01', 2))
+        archive.write(50.0, 14.0, _weather('2024-01-05', 1, offset=100.0))
+
+        cell = archive.open(50.0, 14.0)
+        assert cell.n_hours == 5 * 24
+        assert cell.covers(date(2024, 1, 1), date(2024, 1, 5))
+
+        gap = archive.slice(50.0, 14.0, date(2024, 1, 3), date(2024, 1, 4))
+        assert gap['temp_out_c'].isna().all()
+
+        last = archive.slice(50.0, 14.0, date(2024, 1, 5), date(2024, 1, 5))
+        assert last['temp_out_c'].iloc[0] == 100.0
+        print(f"✓ Buňka rozšířena na {cell.n_hours} hodin, mezera = NaN")
+
+
+def test_process_pool_readers():
+    """Workery v poolu čtou stejnou buňku bez vlastního stahování"""
+    print("\n=== Test 3: Pool procesů ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = WeatherArchive(tmp)
+        fetched = []
+
+        def fetch(start, end):
+            fetched.append((start, end))
+            return _weather('2024-01-01', 4)
+
+        archive.ensure(50.0, 14.0, date(2024, 1, 1), date(2024, 1, 4), fetch)
+        archive.ensure(50.0, 14.0, date(2024, 1, 2), date(2024, 1, 3), fetch)
+        assert len(fetched) == 1
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(_worker_mean_temp, [(archive, 50.0, 14.0)] * 4))
+
+        assert all(r == results[0] for r in results)
+        assert results[0][1] == 48
+        print(f"✓ 4 workery, průměr {results[0][0]:.1f} °C, {results[0][1]} hodin")
+
+
+def test_slice_outside_archive_raises():
+    """Období mimo rozsah buňky se neořízne potichu"""
+    print("\n=== Test 4: Výřez mimo archiv ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = WeatherArchive(tmp)
+        archive.write(50.0, 14.0, _weather('2024-01-01', 3))
+
+        for start, end in [(date(2023, 12, 31), date(2024, 1, 2)),
+                           (date(2024, 1, 2), date(2024, 1, 4)),
+                           (date(2024, 2, 1), date(2024, 2, 2))]:
+            try:
+                archive.slice(50.0, 14.0, start, end)
+            except ValueError as e:
+                print(f"✓ {start} až {end}: {e}")
+            else:
+                raise AssertionError(f"{start} až {end} mělo selhat")
+
+
+def test_previous_version_kept_for_readers():
+    """Předchozí .npy přežije zápis, čtenář při zmizení souboru zkusí znovu"""
+    print("\n=== Test 5: Souběžní čtenáři ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = WeatherArchive(tmp)
+        writer.write(50.0, 14.0, _weather('2024-01-01', 1))
+        first = writer._data_versions(writer.cell_key(50.0, 14.0))
+        writer.write(50.0, 14.0, _weather('2024-01-02', 1))
+        second = writer._data_versions(writer.cell_key(50.0, 14.0))
+        assert len(second) == 2 and first[0] in second
+        print("✓ Po 2. zápisu zůstává předchozí verze")
+
+        writer.write(50.0, 14.0, _weather('2024-01-03', 1))
+        third = writer._data_versions(writer.cell_key(50.0, 14.0))
+        assert len(third) == 2 and first[0] not in third
+        print("✓ Po 3. zápisu je nejstarší verze smazaná")
+
+        calls = []
+
+        class FlakyArchive(WeatherArchive):
+            """První otevření dat selže jako při souběžném smazání verze"""
+
+            def _load_data(self, path):
+                calls.append(path)
+                if len(calls) == 1:
+                    raise FileNotFoundError(path)
+                return super()._load_data(path)
+
+        reader = FlakyArchive(tmp)
+        df = reader.slice(50.0, 14.0, date(2024, 1, 1), date(2024, 1, 3))
+        assert len(calls) == 2
+        assert len(df) == 72
+        print("✓ Čtenář po FileNotFoundError znovu načetl metadata")
+
+
+if __name__ == "__main__":
+    test_write_and_slice_view()
+    test_merge_extends_cell()
+    test_process_pool_readers()
+    test_slice_outside_archive_raises()
+    test_previous_version_kept_for_readers()
+    print("\n✅ Všechny testy archivu počasí prošly")
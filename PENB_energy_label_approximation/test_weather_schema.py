@@ -0,0 +1,127 @@
+"""
+Test deklarovaného schématu dat o počasí (core/weather_schema.py)
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+from core.weather_schema import (
+    make_weather_frame, concat_weather_frames, SOURCE_DTYPE
+)
+from core.weather_api import create_typical_year_weather
+from core.preprocess import clean_weather_data
+
+
+def test_schema_dtypes():
+    """Měření jsou float32, zdroj je kategorie, timestamp datetime64"""
+    print("\n=== Test 1: Typy sloupců ===")
+
+    timestamps = [datetime(2024, 1, 1) + timedelta(hours=h) for h in range(48)]
+    df = make_weather_frame(
+        timestamps,
+        np.linspace(-5, 5, 48),
+        ghi_wm2=np.zeros(48),
+        source='Open-Meteo'
+    )
+
+    assert df['timestamp'].dtype == 'datetime64[ns]'
+    assert df['temp_out_c'].dtype == np.float32
+    assert df['ghi_wm2'].dtype == np.float32
+    assert df['source'].dtype == SOURCE_DTYPE
+    assert 'humidity_pct' not in df.columns
+    assert 'wind_mps' not in df.columns
+
+    print(f"✓ Sloupce: {list(df.columns)}")
+    print(f"✓ Typy: {dict(df.dtypes.astype(str))}")
+
+
+def test_constant_columns_rejected():
+    """Skalární (konstantní) výplň není povolena"""
+    print("\n=== Test 2: Konstantní sloupce ===")
+
+    timestamps = pd.date_range('2024-01-01', periods=24, freq='h')
+
+    try:
+        make_weather_frame(timestamps, np.zeros(24), humidity_pct=70.0)
+        raise AssertionError("Skalární humidity_pct měla vyvolat ValueError")
+    except ValueError as e:
+        print(f"✓ Zamítnuto: {e}")
+
+    try:
+        make_weather_frame(timestamps, np.zeros(24), source='Neznámý')
+        raise AssertionError("Neznámý zdroj měl vyvolat ValueError")
+    except ValueError as e:
+        print(f"✓ Zamítnuto: {e}")
+
+
+def test_concat_keeps_schema():
+    """Spojení různých zdrojů zachová kategorie a float32"""
+    print("\n=== Test 3: Spojení zdrojů ===")
+
+    first = make_weather_frame(
+        pd.date_range('2024-01-02', periods=24, freq='h'),
+        np.ones(24), source='WeatherAPI'
+    )
+    second = make_weather_frame(
+        pd.date_range('2024-01-01', periods=24, freq='h'),
+        np.zeros(24), wind_mps=np.ones(24), source='Synthetic'
+    )
+
+    df = concat_weather_frames([first, second])
+
+    assert len(df) == 48
+    assert df['timestamp'].is_monotonic_increasing
+    assert df['source'].dtype == SOURCE_DTYPE
+    assert df['temp_out_c'].dtype == np.float32
+    assert df['wind_mps'].dtype == np.float32
+    assert df['wind_mps'].isna().sum() == 24
+    print(f"✓ Spojeno {len(df)} hodin, zdroje: {df['source'].value_counts().to_dict()}")
+
+
+def test_typical_year_memory():
+    """Typický rok má schéma a zabírá zhruba polovinu původní paměti"""
+    print("\n=== Test 4: Typický rok ===")
+
+    df = create_typical_year_weather("50.0755,14.4378", api_key=None)
+    assert len(df) == 8760
+    assert df['temp_out_c'].dtype == np.float32
+    assert set(df['source'].unique()) == {'Typical'}
+
+    legacy = pd.DataFrame({
+        'timestamp': df['timestamp'],
+        'temp_out_c': df['temp_out_c'].astype(float),
+        'humidity_pct': 70.0,
+        'wind_mps': 2.5,
+        'ghi_wm2': df['ghi_wm2'].astype(float),
+    })
+    new_bytes = df.memory_usage(deep=True).sum()
+    legacy_bytes = legacy.memory_usage(deep=True).sum()
+
+    print(f"✓ Paměť: {new_bytes / 1024:.0f} kB (dříve {legacy_bytes / 1024:.0f} kB)")
+    assert new_bytes < 0.5 * legacy_bytes
+
+
+def test_clean_keeps_schema():
+    """clean_weather_data zachová typy i se sloupcem source"""
+    print("\n=== Test 5: Čištění dat ===")
+
+    timestamps = pd.date_range('2024-03-01', periods=10, freq='h').delete([3, 4])
+    df = make_weather_frame(
+        timestamps, np.arange(8, dtype=float), source='Open-Meteo'
+    )
+
+    cleaned = clean_weather_data(df)
+
+    assert len(cleaned) == 10
+    assert cleaned['temp_out_c'].dtype == np.float32
+    assert not cleaned['temp_out_c'].isna().any()
+    print(f"✓ Krátká mezera doplněna, {len(cleaned)} hodin")
+
+
+if __name__ == "__main__":
+    test_schema_dtypes()
+    test_constant_columns_rejected()
+    test_concat_keeps_schema()
+    test_typical_year_memory()
+    test_clean_keeps_schema()
+    print("\n✅ Všechny testy schématu počasí prošly")
@@ -0,0 +1,71 @@
+"""
+Sdílená testovací data (syntetické vstupy, typický rok, vstupy bytu, parametry)
+
+Pomocný modul testů - sám žádné testy neobsahuje.
+"""
+import numpy as np
+import pandas as pd
+
+from core.data_models import (
+    ApartmentGeometry, CalibratedParameters, ComputationMode, DailyEnergyData,
+    HeatingSystemInfo, HeatingSystemType, UserInputs
+)
+
+
+def synthetic_inputs(days=14):
+    """Hodinové počasí a denní spotřeba odvozená z jednoduché ztráty H·ΔT"""
+    rng = np.random.default_rng(3)
+    timestamps = pd.date_range('2024-01-01', periods=days * 24, freq='h')
+    hours = np.arange(days * 24)
+    temp_out = 2 + 5 * np.sin(hours * 2 * np.pi / 24) + rng.normal(0, 1, len(hours))
+    hourly = pd.DataFrame({
+        'timestamp': timestamps,
+        'temp_out_c': temp_out,
+        'ghi_wm2': np.maximum(0, 300 * np.sin((hours % 24 - 6) * np.pi / 12))
+    })
+
+    daily_temp = temp_out.reshape(days, 24).mean(axis=1)
+    daily = pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=days, freq='D'),
+        'heating_kwh': 120.0 * (21.0 - daily_temp) * 24 / 1000 + rng.normal(0, 0.3, days)
+    })
+    return daily, hourly
+
+
+def typical_year_weather():
+    """Syntetický typický rok (8760 hodin) pro roční hodnocení"""
+    timestamps = pd.date_range('2024-01-01', periods=8760, freq='h')
+    hours = np.arange(8760)
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'temp_out_c': 9 + 10 * np.sin(2 * np.pi * (hours / 24 - 110) / 365),
+        'ghi_wm2': np.maximum(0, 400 * np.sin((hours % 24 - 6) * np.pi / 12)),
+    })
+
+
+def apartment_inputs(daily, **changes):
+    """Uživatelské vstupy bytu odpovídající syntetickým denním datům"""
+    fields = dict(
+        geometry=ApartmentGeometry(area_m2=60.0, height_m=2.5),
+        heating_system=HeatingSystemInfo(system_type=HeatingSystemType.CONDENSING_BOILER),
+        location="50.08,14.42",
+        computation_mode=ComputationMode.FAST,
+        daily_energy=[DailyEnergyData(date=d.date(), energy_total_kwh=kwh + 2.0)
+                      for d, kwh in zip(daily['date'], daily['heating_kwh'])],
+        avg_indoor_temp_c=21.0,
+    )
+    fields.update(changes)
+    return UserInputs(**fields)
+
+
+def sample_parameters(H_env=120.0):
+    """Ukázkové kalibrované parametry"""
+    return CalibratedParameters(
+        H_env_W_per_K=H_env,
+        infiltration_rate_per_h=0.5,
+        C_th_J_per_K=2e7,
+        baseline_TUV_kwh_per_day=2.0,
+        internal_gains_W_per_m2=3.0,
+        rmse_temperature_c=0.2,
+        mape_energy_pct=4.0
+    )